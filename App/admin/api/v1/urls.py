@@ -1,5 +1,5 @@
 from django.urls import path
-from .views.resellers import ResellersListAPI, ResellerDetailAPI, ResellerStatsAPI
+from .views.resellers import ResellersListAPI, ResellerDetailAPI, ResellerStatsAPI, ResellerLeaderboardAPI
 from .views.dashboard import (
     dashboard_metrics_api,
     recent_activities_api,
@@ -7,12 +7,14 @@ from .views.dashboard import (
     quick_stats_api,
     growth_trends_api,
     dashboard_summary_api,
+    dashboard_bootstrap_api,
     refresh_dashboard_cache
 )
 from .views.commissions import AdminCommissionCreateAPI
 from .views.products import AdminProductCreateAPI, AdminProductDetailAPI, AdminProductCountAPI
 from .views.plans import AdminPlanCreateAPI, AdminPlanCountAPI
 from .views.admins import AdminsCountAPI
+from .views.audit import audit_logs_api
 
 # Finance API Views
 from .views.finance.revenue import (
@@ -55,10 +57,12 @@ urlpatterns = [
     path('dashboard/quick-stats/', quick_stats_api, name='dashboard-quick-stats'),
     path('dashboard/growth-trends/', growth_trends_api, name='dashboard-growth-trends'),
     path('dashboard/summary/', dashboard_summary_api, name='dashboard-summary'),
+    path('dashboard/bootstrap/', dashboard_bootstrap_api, name='dashboard-bootstrap'),
     path('dashboard/refresh-cache/', refresh_dashboard_cache, name='dashboard-refresh-cache'),
     
     # Existing resellers endpoints
     path('resellers/', ResellersListAPI.as_view(), name='resellers-list'),
+    path('resellers/leaderboard/', ResellerLeaderboardAPI.as_view(), name='resellers-leaderboard'),
     path('resellers/<int:reseller_id>/', ResellerDetailAPI.as_view(), name='resellers-detail'),
     path('resellers/<int:reseller_id>/stats/', ResellerStatsAPI.as_view(), name='resellers-stats'),
 
@@ -76,6 +80,9 @@ urlpatterns = [
 
     # Admins endpoints
     path('admins/count/', AdminsCountAPI.as_view(), name='admins-count'),
+
+    # Audit log search (live table and archive)
+    path('audit/logs/', audit_logs_api, name='audit-logs'),
     
     # ===== FINANCE API ENDPOINTS =====
     
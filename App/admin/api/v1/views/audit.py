@@ -0,0 +1,61 @@
+"""
+Admin Audit API Views
+Search audit log entries, including those moved to the archive
+"""
+from datetime import datetime, time
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from ....services.audit_service import AuditService
+
+
+def _parse_bound(value, end_of_day=False):
+    """Accept an ISO datetime or a plain date; returns an aware datetime or None"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@staff_member_required
+def audit_logs_api(request):
+    """
+    Search audit entries: ?start=&end=&action=&actor_id=&target_type=&target_id=&limit=
+    Entries older than the retention window are read from the archive files
+    """
+    try:
+        start = _parse_bound(request.GET.get('start'))
+        end = _parse_bound(request.GET.get('end'), end_of_day=True)
+        limit = min(int(request.GET.get('limit', 100)), 500)
+    except ValueError as e:
+        return Response({'error': 'Invalid filter parameters', 'details': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results = AuditService().search(
+            start=start,
+            end=end,
+            action=request.GET.get('action') or None,
+            actor_id=request.GET.get('actor_id') or None,
+            target_type=request.GET.get('target_type') or None,
+            target_id=request.GET.get('target_id') or None,
+            limit=limit,
+        )
+        return Response({'results': results, 'count': len(results)}, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response(
+            {'error': 'Failed to search audit logs', 'details': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
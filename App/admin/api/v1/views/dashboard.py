@@ -11,6 +11,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
 from ....services.dashboard_service import DashboardService
+from ....services.dashboard_bootstrap_service import DashboardBootstrapService
 from ..serializers.dashboard import (
     DashboardMetricsSerializer,
     RecentActivitySerializer,
@@ -177,6 +178,74 @@ def dashboard_summary_api(request):
         )
 
 
+BOOTSTRAP_SERIALIZERS = {
+    'metrics': lambda data: DashboardMetricsSerializer(data).data,
+    'quick_stats': lambda data: QuickStatsSerializer(data).data,
+    'system_status': lambda data: SystemStatusSerializer(data).data,
+    'recent_activities': lambda data: RecentActivitySerializer(data, many=True).data,
+    'growth_trends': lambda data: GrowthTrendSerializer(data).data,
+    'counts': lambda data: data,
+}
+
+
+def _bounded_int(request, name, default, upper):
+    """Integer query parameter clamped to 1..upper; raises ValueError if not an integer"""
+    return max(1, min(int(request.GET.get(name, default)), upper))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@staff_member_required
+def dashboard_bootstrap_api(request):
+    """
+    Get several dashboard sections in one request
+    Sections are evaluated concurrently; each carries its own status, cache and timing
+    """
+    try:
+        filter_serializer = DashboardFilterSerializer(data=request.GET)
+        if not filter_serializer.is_valid():
+            return Response(
+                {'error': 'Invalid filter parameters', 'details': filter_serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        filter_data = filter_serializer.validated_data
+
+        try:
+            limit = _bounded_int(request, 'limit', 10, 50)
+            days = _bounded_int(request, 'days', 30, 365)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid filter parameters', 'details': 'limit and days must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        sections = [s.strip() for s in request.GET.get('sections', '').split(',') if s.strip()]
+        params = {
+            'period': filter_data.get('period', 'last_7_days'),
+            'date_from': filter_data.get('date_from'),
+            'date_to': filter_data.get('date_to'),
+            'limit': limit,
+            'days': days,
+        }
+        refresh = request.GET.get('refresh') in ('1', 'true')
+
+        try:
+            payload = DashboardBootstrapService().build(sections or None, params, refresh=refresh)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        for name, section in payload['sections'].items():
+            if section['status'] == 'ok':
+                section['data'] = BOOTSTRAP_SERIALIZERS[name](section['data'])
+        return Response(payload, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response(
+            {'error': 'Failed to fetch dashboard bootstrap', 'details': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 @staff_member_required
@@ -188,6 +257,8 @@ def refresh_dashboard_cache(request):
     try:
         from django.core.cache import cache
         
+        DashboardBootstrapService().invalidate()
+
         # Clear dashboard-related cache keys
         cache_keys = [
             'dashboard_metrics_*',
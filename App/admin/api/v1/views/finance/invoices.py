@@ -15,6 +15,7 @@ from django.core.paginator import Paginator
 
 from App.admin.services.invoices_service import InvoicesService
 from App.admin.services.audit_service import AuditService
+from App.integrations.pdf_service import serve_pdf
 
 
 @method_decorator([staff_member_required, csrf_exempt], name='dispatch')
@@ -293,13 +294,13 @@ class InvoiceDownloadView(View):
                     'error': 'Invoice not found'
                 }, status=404)
             
-            response = HttpResponse(
-                pdf_data['content'],
-                content_type='application/pdf'
+            return serve_pdf(
+                request,
+                pdf_data['name'],
+                pdf_data['filename'],
+                pdf_data['etag'],
+                last_modified=pdf_data['last_modified'],
             )
-            response['Content-Disposition'] = f'attachment; filename="{pdf_data["filename"]}"'
-            
-            return response
             
         except Exception as e:
             return JsonResponse({
@@ -20,6 +20,7 @@ from App.admin.services.payouts_service import PayoutsService
 from App.admin.services.transactions_service import TransactionsService
 from App.admin.services.audit_service import AuditService
 from App.admin.models.scheduled_report import ScheduledReport
+from App.db_router import use_replica
 
 
 @method_decorator([staff_member_required, csrf_exempt], name='dispatch')
@@ -122,6 +123,7 @@ class ReportsGenerateView(View):
                 'error': str(e)
             }, status=500)
     
+    @use_replica
     def _generate_revenue_summary_report(self, start_date, end_date, parameters):
         """Generate revenue summary report"""
         metrics = self.revenue_service.get_revenue_metrics(start_date, end_date)
@@ -139,6 +141,7 @@ class ReportsGenerateView(View):
         
         return self._format_report(report_data, parameters.get('format', 'pdf'))
     
+    @use_replica
     def _generate_commission_report(self, start_date, end_date, parameters):
         """Generate commission report"""
         filters = {
@@ -165,6 +168,7 @@ class ReportsGenerateView(View):
         
         return self._format_report(report_data, parameters.get('format', 'pdf'))
     
+    @use_replica
     def _generate_payout_report(self, start_date, end_date, parameters):
         """Generate payout report"""
         filters = {
@@ -191,6 +195,7 @@ class ReportsGenerateView(View):
         
         return self._format_report(report_data, parameters.get('format', 'pdf'))
     
+    @use_replica
     def _generate_financial_overview(self, start_date, end_date, parameters):
         """Generate comprehensive financial overview"""
         # Get data from all services
@@ -223,6 +228,7 @@ class ReportsGenerateView(View):
         
         return self._format_report(report_data, parameters.get('format', 'pdf'))
     
+    @use_replica
     def _generate_cash_flow_statement(self, start_date, end_date, parameters):
         """Generate cash flow statement"""
         cash_flow = self.transactions_service.get_cash_flow_analysis(
@@ -238,6 +244,7 @@ class ReportsGenerateView(View):
         
         return self._format_report(report_data, parameters.get('format', 'pdf'))
     
+    @use_replica
     def _generate_reseller_performance_report(self, start_date, end_date, parameters):
         """Generate reseller performance report"""
         # This would typically aggregate data across multiple resellers
@@ -304,43 +311,45 @@ class ReportsPreviewView(View):
             # Generate preview data (limited dataset)
             preview_data = {}
             
-            if report_type == 'revenue_summary':
-                preview_data = {
-                    'metrics': self.revenue_service.get_revenue_metrics(start_date, end_date),
-                    'record_count': 'N/A'
-                }
-            elif report_type == 'commission_report':
-                filters = {'start_date': start_date, 'end_date': end_date}
-                commissions_preview = self.commissions_service.get_commissions_list(
-                    page=1, page_size=5, filters=filters
-                )
-                preview_data = {
-                    'sample_records': commissions_preview['results'][:5],
-                    'record_count': commissions_preview['total_count']
-                }
-            elif report_type == 'payout_report':
-                filters = {'start_date': start_date, 'end_date': end_date}
-                payouts_preview = self.payouts_service.get_payouts_list(
-                    page=1, page_size=5, filters=filters
-                )
-                preview_data = {
-                    'sample_records': payouts_preview['results'][:5],
-                    'record_count': payouts_preview['total_count']
-                }
-            elif report_type == 'financial_overview':
-                # Light preview: just revenue metrics summary
-                preview_data = {
-                    'metrics': self.revenue_service.get_revenue_metrics(start_date, end_date),
-                    'record_count': 'N/A'
-                }
-            elif report_type == 'cash_flow_statement':
-                cf = self.transactions_service.get_cash_flow_analysis(
-                    start_date, end_date, 'monthly', 0
-                )
-                preview_data = {
-                    'sample_records': cf.get('historical', [])[:5],
-                    'record_count': len(cf.get('historical', []))
-                }
+            # Aggregates only; read from the replica when one is configured
+            with use_replica():
+                if report_type == 'revenue_summary':
+                    preview_data = {
+                        'metrics': self.revenue_service.get_revenue_metrics(start_date, end_date),
+                        'record_count': 'N/A'
+                    }
+                elif report_type == 'commission_report':
+                    filters = {'start_date': start_date, 'end_date': end_date}
+                    commissions_preview = self.commissions_service.get_commissions_list(
+                        page=1, page_size=5, filters=filters
+                    )
+                    preview_data = {
+                        'sample_records': commissions_preview['results'][:5],
+                        'record_count': commissions_preview['total_count']
+                    }
+                elif report_type == 'payout_report':
+                    filters = {'start_date': start_date, 'end_date': end_date}
+                    payouts_preview = self.payouts_service.get_payouts_list(
+                        page=1, page_size=5, filters=filters
+                    )
+                    preview_data = {
+                        'sample_records': payouts_preview['results'][:5],
+                        'record_count': payouts_preview['total_count']
+                    }
+                elif report_type == 'financial_overview':
+                    # Light preview: just revenue metrics summary
+                    preview_data = {
+                        'metrics': self.revenue_service.get_revenue_metrics(start_date, end_date),
+                        'record_count': 'N/A'
+                    }
+                elif report_type == 'cash_flow_statement':
+                    cf = self.transactions_service.get_cash_flow_analysis(
+                        start_date, end_date, 'monthly', 0
+                    )
+                    preview_data = {
+                        'sample_records': cf.get('historical', [])[:5],
+                        'record_count': len(cf.get('historical', []))
+                    }
             
             return JsonResponse({
                 'success': True,
@@ -12,9 +12,12 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.decorators import method_decorator
 from django.views import View
 
+from App.admin.services.forecast_service import METHODS as FORECAST_METHODS
 from App.admin.services.revenue_service import RevenueService
 from App.admin.services.audit_service import AuditService
 
+MAX_COMPARE_PERIODS = 24
+
 
 @method_decorator([staff_member_required, csrf_exempt], name='dispatch')
 class RevenueMetricsView(View):
@@ -41,8 +44,10 @@ class RevenueMetricsView(View):
             else:
                 end_date = datetime.now()
             
-            # Get revenue metrics
-            metrics = self.revenue_service.get_revenue_metrics(start_date, end_date)
+            # Current period first, then up to compare - 1 earlier periods of the same length
+            compare = min(max(int(request.GET.get('compare', 1)), 1), MAX_COMPARE_PERIODS)
+            periods = self.revenue_service.compare_periods(start_date, end_date, compare)
+            metrics = periods[0]
             
             return JsonResponse({
                 'success': True,
@@ -56,7 +61,18 @@ class RevenueMetricsView(View):
                     'period': {
                         'start': start_date.isoformat(),
                         'end': end_date.isoformat()
-                    }
+                    },
+                    'comparison': [
+                        {
+                            'start': (start_date - (end_date - start_date) * i).isoformat(),
+                            'end': (end_date - (end_date - start_date) * i).isoformat(),
+                            'total_revenue': period['total_revenue'],
+                            'mrr': period['mrr'],
+                            'arr': period['arr'],
+                            'growth_rate': period['growth_rate'],
+                        }
+                        for i, period in enumerate(periods[1:], start=1)
+                    ]
                 }
             })
             
@@ -129,9 +145,18 @@ class RevenueForecastView(View):
             # Parse forecast parameters
             periods = int(request.GET.get('periods', 12))  # Default 12 months
             method = request.GET.get('method', 'moving_average')  # Default method
+            reseller_id = request.GET.get('reseller_id')
+            
+            if method not in FORECAST_METHODS:
+                return JsonResponse({
+                    'success': False,
+                    'error': f"method must be one of: {', '.join(FORECAST_METHODS)}"
+                }, status=400)
             
             # Get forecast data
-            forecast = self.revenue_service.get_revenue_forecast(periods, method)
+            forecast = self.revenue_service.get_revenue_forecast(
+                periods, method, reseller_id=int(reseller_id) if reseller_id else None
+            )
             
             return JsonResponse({
                 'success': True,
@@ -143,7 +168,7 @@ class RevenueForecastView(View):
                         'datasets': [
                             {
                                 'label': 'Historical Revenue',
-                                'data': [item['amount'] for item in forecast.get('historical', [])],
+                                'data': [item['revenue'] for item in forecast.get('historical', [])],
                                 'borderColor': '#36A2EB',
                                 'backgroundColor': '#36A2EB'
                             },
@@ -2,8 +2,11 @@
 # Simple JSON APIs without DRF for now
 from django.views import View
 from django.http import JsonResponse, HttpResponseBadRequest
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils.decorators import method_decorator
 from App.admin.services.resellers_service import AdminResellerService
 from App.admin.forms.resellers import ResellerFilterForm
+from App.reseller.earnings.models import LeaderboardMetricChoices
 
 class ResellersListAPI(View):
     def get(self, request):
@@ -28,3 +31,12 @@ class ResellerStatsAPI(View):
         series = svc.get_chart_series(reseller_id)
         return JsonResponse({'series': series})
 
+@method_decorator(staff_member_required, name='dispatch')
+class ResellerLeaderboardAPI(View):
+    def get(self, request):
+        metric = request.GET.get('metric', LeaderboardMetricChoices.SALES)
+        if metric not in LeaderboardMetricChoices.values:
+            return HttpResponseBadRequest('Invalid metric')
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 100)
+        svc = AdminResellerService()
+        return JsonResponse(svc.get_leaderboard(request.GET.get('period', 'month'), metric, limit))
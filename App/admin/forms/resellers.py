@@ -13,6 +13,11 @@ class ResellerFilterForm(forms.Form):
     ])
     joined_from = forms.DateField(required=False)
     joined_to = forms.DateField(required=False)
+    sort = forms.ChoiceField(required=False, choices=[
+        ('', 'Default'), ('-joined_at', 'Newest'), ('-sales_count', 'Most sales'),
+        ('-month_sales', 'Most sales this month'), ('-last_sale_at', 'Latest sale'),
+        ('-total_earnings', 'Top earnings'),
+    ])
     page = forms.IntegerField(required=False, min_value=1)
     page_size = forms.IntegerField(required=False, min_value=1, max_value=200)
 
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from App.admin.models.audit_log import AuditLog
+from App.admin.repositories.audit_archive_repository import AuditArchiveRepository, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = "Move admin audit log rows older than the retention window into gzip, date-partitioned archive files (cron-friendly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Retention in days (default: AUDIT_RETENTION_DAYS)')
+        parser.add_argument('--archive-dir', type=str, default=None, help='Archive root (default: AUDIT_ARCHIVE_DIR)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written and deleted per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options['days'])
+        if options['dry_run']:
+            count = AuditLog.objects.filter(created_at__lt=cutoff).count()
+            self.stdout.write(f"{count} audit log row(s) older than {cutoff.isoformat()} would be archived")
+            return
+
+        repo = AuditArchiveRepository(options['archive_dir'])
+        moved = repo.archive_before(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} audit log row(s) older than {cutoff.isoformat()} to {repo.root}"
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from App.admin.repositories.reseller_search_repository import ResellerSearchRepository
+
+
+class Command(BaseCommand):
+    help = "Rebuild the admin reseller search documents (and the FTS5/tsvector index that follows them)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Resellers indexed per batch')
+
+    def handle(self, *args, **options):
+        repo = ResellerSearchRepository()
+        count = repo.rebuild(chunk_size=max(1, options['chunk_size']))
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} reseller(s) using the {repo.engine()} search engine"))
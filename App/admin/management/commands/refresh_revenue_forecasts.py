@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from App.admin.services.forecast_service import ForecastService
+
+
+class Command(BaseCommand):
+    help = "Bring cached revenue forecast fits for the platform and every reseller up to yesterday (cron-friendly, run after midnight)."
+
+    def handle(self, *args, **options):
+        count = ForecastService().refresh_all()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed revenue forecast fits for {count} series"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from App.admin.repositories.table_stats_repository import TableStatsRepository
+
+
+class Command(BaseCommand):
+    help = "Refresh cached table statistics for the admin dashboard. Use --analyze to update sqlite_stat1/pg_class first (cron-friendly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help='Run ANALYZE before reading statistics')
+        parser.add_argument('--database', type=str, default='default', help='Database alias')
+
+    def handle(self, *args, **options):
+        snapshot = TableStatsRepository(using=options['database']).refresh(analyze=options['analyze'])
+        for schema, table, rows in snapshot['table_rows']:
+            self.stdout.write(f"{table:40s} ~{rows}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed statistics for {len(snapshot['table_rows'])} table(s), database size {snapshot['database_size']} bytes"
+        ))
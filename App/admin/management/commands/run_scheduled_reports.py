@@ -42,5 +42,6 @@ class Command(BaseCommand):
             )
             count += 1
 
+        audit.flush()
         self.stdout.write(self.style.SUCCESS(f"Processed {count} scheduled report(s) at {now.isoformat()}"))
 
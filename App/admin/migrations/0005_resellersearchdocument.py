@@ -0,0 +1,107 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+from App.admin.models.reseller_search import build_document
+
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE reseller_search_documents ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED",
+    "CREATE INDEX reseller_search_vector_gin ON reseller_search_documents USING GIN (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS reseller_search_vector_gin",
+    "ALTER TABLE reseller_search_documents DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE reseller_search_fts USING fts5("
+    "document, content='reseller_search_documents', content_rowid='reseller_id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER reseller_search_ai AFTER INSERT ON reseller_search_documents BEGIN "
+    "INSERT INTO reseller_search_fts(rowid, document) VALUES (new.reseller_id, new.document); END",
+    "CREATE TRIGGER reseller_search_ad AFTER DELETE ON reseller_search_documents BEGIN "
+    "INSERT INTO reseller_search_fts(reseller_search_fts, rowid, document) VALUES ('delete', old.reseller_id, old.document); END",
+    "CREATE TRIGGER reseller_search_au AFTER UPDATE ON reseller_search_documents BEGIN "
+    "INSERT INTO reseller_search_fts(reseller_search_fts, rowid, document) VALUES ('delete', old.reseller_id, old.document); "
+    "INSERT INTO reseller_search_fts(rowid, document) VALUES (new.reseller_id, new.document); END",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS reseller_search_au",
+    "DROP TRIGGER IF EXISTS reseller_search_ad",
+    "DROP TRIGGER IF EXISTS reseller_search_ai",
+    "DROP TABLE IF EXISTS reseller_search_fts",
+]
+
+
+def _sqlite_has_fts5(cursor):
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        cursor.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except Exception:
+        return False
+
+
+def create_engine_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'postgresql':
+            statements = POSTGRES_FORWARD
+        elif vendor == 'sqlite' and _sqlite_has_fts5(cursor):
+            statements = SQLITE_FORWARD
+        else:
+            # No native full-text index; searches fall back to LIKE on the document
+            statements = []
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def drop_engine_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}.get(vendor, [])
+    with schema_editor.connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def backfill_documents(apps, schema_editor):
+    Reseller = apps.get_model('reseller', 'Reseller')
+    ResellerSearchDocument = apps.get_model('platform_admin', 'ResellerSearchDocument')
+    fields = ('id', 'company_name', 'referral_code', 'user__username', 'user__email',
+              'user__first_name', 'user__last_name')
+    batch = []
+    for row in Reseller.objects.order_by('id').values_list(*fields).iterator(chunk_size=2000):
+        rid, company, code, username, email, first, last = row
+        batch.append(ResellerSearchDocument(
+            reseller_id=rid, document=build_document(username, email, first, last, company, code),
+        ))
+        if len(batch) >= 2000:
+            ResellerSearchDocument.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ResellerSearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("platform_admin", "0004_platformsetting"),
+        ("reseller", "0005_resellersettings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResellerSearchDocument",
+            fields=[
+                ("reseller", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="search_document", serialize=False, to="reseller.reseller")),
+                ("document", models.TextField(blank=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "reseller_search_documents",
+            },
+        ),
+        migrations.RunPython(create_engine_index, drop_engine_index),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
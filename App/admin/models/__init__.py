@@ -3,3 +3,4 @@ from .audit_log import AuditLog  # noqa: F401
 from .scheduled_report import ScheduledReport  # noqa: F401
 from .platform_settings import PlatformSettings  # noqa: F401
 
+from .reseller_search import ResellerSearchDocument  # noqa: F401
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class AuditLog(models.Model):
     """Admin audit log for critical actions."""
@@ -21,7 +22,8 @@ class AuditLog(models.Model):
 
     details = models.JSONField(default=dict, blank=True)
 
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Stamped when the action happens, not when a buffered batch is flushed
+    created_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.CharField(max_length=512, blank=True)
 
@@ -0,0 +1,43 @@
+import re
+
+from django.db import models
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Lower-cased word tokens; emails and codes are split on punctuation."""
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def build_document(*values):
+    """Flatten searchable values into a whitespace separated token string."""
+    tokens = []
+    for value in values:
+        tokens.extend(tokenize(str(value)) if value else [])
+    return ' '.join(tokens)
+
+
+class ResellerSearchDocument(models.Model):
+    """Denormalized search document per reseller for the admin directory.
+
+    The engine specific index lives beside this table and is created in the
+    migration: a generated tsvector column with a GIN index on Postgres, or an
+    FTS5 external-content table kept in sync by triggers on SQLite.
+    """
+    reseller = models.OneToOneField(
+        'reseller.Reseller',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document',
+    )
+    document = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'platform_admin'
+        db_table = 'reseller_search_documents'
+
+    def __str__(self):
+        return f"ResellerSearchDocument({self.reseller_id})"
@@ -0,0 +1,146 @@
+"""
+Admin Audit Archive Repository
+Moves old AuditLog rows into compressed, date-partitioned files and searches them
+"""
+import gzip
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = [
+    'id', 'action', 'actor_id', 'target_type', 'target_id', 'target_display',
+    'details', 'created_at', 'ip_address', 'user_agent',
+]
+
+
+class AuditArchiveRepository:
+    """
+    Archive layout: <root>/<YYYY>/<MM>/audit-<YYYY-MM-DD>.jsonl.gz, one JSON
+    object per line, keyed by the UTC date of created_at. Archiving appends a
+    new gzip member to the day's file, so a day can be archived in several
+    runs; readers see one continuous stream.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root or getattr(settings, 'AUDIT_ARCHIVE_DIR'))
+
+    # Writing ------------------------------------------------------------
+
+    def partition_path(self, day):
+        return self.root / f"{day:%Y}" / f"{day:%m}" / f"audit-{day:%Y-%m-%d}.jsonl.gz"
+
+    def archive_before(self, cutoff, batch_size=1000):
+        """
+        Move rows created before ``cutoff`` into the archive, oldest first.
+        Each batch is written to disk before its rows are deleted, so an
+        interrupted run leaves rows in both places rather than in neither;
+        search() drops the duplicates.
+        """
+        moved = 0
+        while True:
+            batch = list(
+                AuditLog.objects.filter(created_at__lt=cutoff)
+                .order_by('id')
+                .values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not batch:
+                return moved
+            by_day = defaultdict(list)
+            for row in batch:
+                by_day[self._day(row['created_at'])].append(row)
+            for day, rows in by_day.items():
+                self._append(day, rows)
+            with transaction.atomic():
+                AuditLog.objects.filter(id__in=[row['id'] for row in batch]).delete()
+            moved += len(batch)
+
+    def _append(self, day, rows):
+        path = self.partition_path(day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, 'at', encoding='utf-8') as fh:
+            for row in rows:
+                fh.write(json.dumps(self._serialize(row), separators=(',', ':')) + '\n')
+
+    @staticmethod
+    def _serialize(row):
+        row = dict(row)
+        row['created_at'] = row['created_at'].isoformat()
+        return row
+
+    @staticmethod
+    def _day(value):
+        return value.astimezone(dt_timezone.utc).date() if timezone.is_aware(value) else value.date()
+
+    # Reading ------------------------------------------------------------
+
+    def partitions(self, start=None, end=None):
+        """Archived days (as dates) between start and end inclusive, newest first"""
+        if not self.root.exists():
+            return []
+        days = []
+        for path in self.root.glob('*/*/audit-*.jsonl.gz'):
+            try:
+                day = datetime.strptime(path.name[len('audit-'):-len('.jsonl.gz')], '%Y-%m-%d').date()
+            except ValueError:
+                continue
+            if (start is None or day >= start) and (end is None or day <= end):
+                days.append(day)
+        return sorted(days, reverse=True)
+
+    def search(self, start=None, end=None, action=None, actor_id=None, target_type=None, target_id=None, limit=100):
+        """
+        Archived entries matching every given filter, newest first.
+        ``start``/``end`` are datetimes; only partitions in that range are opened.
+        """
+        filters = {
+            'action': action,
+            'actor_id': int(actor_id) if actor_id not in (None, '') else None,
+            'target_type': target_type,
+            'target_id': str(target_id) if target_id not in (None, '') else None,
+        }
+        filters = {k: v for k, v in filters.items() if v is not None}
+        days = self.partitions(self._day(start) if start else None, self._day(end) if end else None)
+
+        results, seen = [], set()
+        for day in days:
+            matches = []
+            for row in self._read(day):
+                if row['id'] in seen or any(row.get(k) != v for k, v in filters.items()):
+                    continue
+                row['created_at'] = parse_datetime(row['created_at'])
+                if (start and row['created_at'] < start) or (end and row['created_at'] > end):
+                    continue
+                seen.add(row['id'])
+                matches.append(row)
+            matches.sort(key=lambda r: (r['created_at'], r['id']), reverse=True)
+            results.extend(matches)
+            if limit and len(results) >= limit:
+                return results[:limit]
+        return results
+
+    def _read(self, day):
+        try:
+            with gzip.open(self.partition_path(day), 'rt', encoding='utf-8') as fh:
+                for line in fh:
+                    if line.strip():
+                        yield json.loads(line)
+        except (OSError, EOFError) as exc:
+            # A truncated trailing member (e.g. crash mid-write) ends the day early
+            logger.warning("Could not fully read audit archive for %s: %s", day, exc)
+
+
+def retention_cutoff(days=None):
+    days = int(days if days is not None else getattr(settings, 'AUDIT_RETENTION_DAYS', 180))
+    return timezone.now() - timedelta(days=days)
+
@@ -7,14 +7,17 @@ from django.db.models import Count, Sum, Avg
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.db import connection
-import os
 
 from ...models import *  # Import all models from main app
 from ..models.audit_log import AuditLog
+from .period_aggregates import aggregate_periods
+from .table_stats_repository import TableStatsRepository
+from App.db_router import use_replica
 
 User = get_user_model()
 
 
+@use_replica
 class DashboardRepository:
     """
     Repository for dashboard data access
@@ -111,62 +114,66 @@ class DashboardRepository:
                 'failed_transactions': 0,
             }
     
-    def get_system_metrics(self):
-        """Get system health and performance metrics, DB-vendor aware"""
-        vendor = getattr(connection, 'vendor', '')
-        db_size = 0
-        table_stats = []
-
-        if vendor == 'postgresql':
-            with connection.cursor() as cursor:
-                # Database size in bytes
-                cursor.execute("SELECT pg_database_size(current_database())")
-                db_size = cursor.fetchone()[0] if cursor.rowcount > 0 else 0
+    def get_window_totals(self, end, windows):
+        """
+        New users, new businesses and paid revenue for each trailing window
+        and the equal window before it, ending at ``end``
 
-                # Top tables by total write operations
-                cursor.execute(
-                    """
-                    SELECT schemaname, relname AS tablename,
-                           n_tup_ins + n_tup_upd + n_tup_del AS total_operations
-                    FROM pg_stat_user_tables
-                    ORDER BY total_operations DESC
-                    LIMIT 10
-                    """
-                )
-                table_stats = cursor.fetchall()
+        ``windows`` maps a name to a length in days; returns
+        {metric: {name: (current, previous)}} from one query per table.
+        """
+        from App.reseller.earnings.models.invoice import Invoice
+        from App.reseller.earnings.models.base import InvoiceStatusChoices
+        names = list(windows)
+        # [end - n, end) and [end - 2n, end - n) per window
+        spans = []
+        for name in names:
+            length = timedelta(days=windows[name])
+            spans += [(end - length, end), (end - 2 * length, end - length)]
+        # payment_date is a date: the last n days up to and including end's date
+        if isinstance(end, datetime):
+            end_day = timezone.localtime(end).date() if timezone.is_aware(end) else end.date()
         else:
-            # Fallback for SQLite and other engines
-            # Attempt to compute DB size for SQLite from file size
-            engine_name = connection.settings_dict.get('ENGINE', '')
-            if 'sqlite' in engine_name:
-                db_path = connection.settings_dict.get('NAME')
-                if db_path and os.path.exists(db_path):
-                    try:
-                        db_size = os.path.getsize(db_path)
-                    except OSError:
-                        db_size = 0
-            # Approximate "table activity" by row counts per table
-            try:
-                table_names = connection.introspection.table_names()
-                counts = []
-                with connection.cursor() as cursor:
-                    for t in table_names:
-                        try:
-                            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(t)}")
-                            cnt = cursor.fetchone()[0]
-                            counts.append((t, cnt))
-                        except Exception:
-                            # Skip tables we cannot count
-                            continue
-                counts.sort(key=lambda x: x[1], reverse=True)
-                # Normalize format to (schemaname_or_none, tablename, metric)
-                table_stats = [(None, name, count) for name, count in counts[:10]]
-            except Exception:
-                table_stats = []
+            end_day = end
+        days = []
+        for name in names:
+            n = windows[name]
+            days += [(end_day - timedelta(days=n - 1), end_day), (end_day - timedelta(days=2 * n - 1), end_day - timedelta(days=n))]
+
+        def pairs(rows, key):
+            return {name: (rows[2 * i][key] or 0, rows[2 * i + 1][key] or 0) for i, name in enumerate(names)}
+
+        totals = {
+            'users': pairs(aggregate_periods(
+                User.objects.all(), 'date_joined', spans, {'count': lambda q: Count('id', filter=q)}, inclusive=False
+            ), 'count'),
+            'revenue': pairs(aggregate_periods(
+                Invoice.objects.filter(status=InvoiceStatusChoices.PAID), 'payment_date', days,
+                {'amount': lambda q: Sum('total_amount', filter=q)},
+            ), 'amount'),
+        }
+        try:
+            from App.models import Business
+            totals['businesses'] = pairs(aggregate_periods(
+                Business.objects.all(), 'created_at', spans, {'count': lambda q: Count('id', filter=q)}, inclusive=False
+            ), 'count')
+        except Exception:
+            totals['businesses'] = {name: (0, 0) for name in names}
+        return totals
+    
+    def get_system_metrics(self):
+        """
+        Get system health and performance metrics, DB-vendor aware.
+        Table statistics come from engine metadata via a cached snapshot,
+        so this stays O(1) regardless of table sizes.
+        """
+        snapshot = TableStatsRepository().get_snapshot()
 
         return {
-            'database_size': db_size,
-            'table_operations': table_stats,
+            'database_size': snapshot['database_size'],
+            'table_operations': snapshot['table_operations'],
+            'table_rows': snapshot['table_rows'],
+            'stats_refreshed_at': snapshot['refreshed_at'],
             'active_connections': connection.queries.__len__(),
         }
     
@@ -254,6 +261,13 @@ class DashboardRepository:
             'revenue_growth': revenue_growth,
         }
     
+    def _external_api_status(self):
+        from App.integrations import pesapal_monitor
+        try:
+            return pesapal_monitor.panel_status()
+        except Exception:
+            return 'warning'
+
     def get_system_status(self):
         """Get current system status indicators"""
         try:
@@ -268,6 +282,7 @@ class DashboardRepository:
             'database': db_status,
             'cache': 'healthy',  # Would check actual cache
             'storage': 'healthy',  # Would check storage
-            'external_apis': 'healthy',  # Would check external services
+            # Cached Pesapal probe + circuit state; never a live provider call
+            'external_apis': self._external_api_status(),
             'last_backup': timezone.now() - timedelta(hours=2),  # Placeholder
         }
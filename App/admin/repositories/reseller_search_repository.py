@@ -0,0 +1,114 @@
+# Full-text search over the denormalized reseller search documents
+from typing import Iterable, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from App.admin.models.reseller_search import ResellerSearchDocument, build_document, tokenize
+from App.reseller.earnings.models.reseller import Reseller
+
+FTS_TABLE = 'reseller_search_fts'
+DOC_TABLE = ResellerSearchDocument._meta.db_table
+MAX_TOKENS = 8
+
+
+class ResellerSearchRepository:
+    """Keeps reseller search documents in sync and turns text into index lookups.
+
+    Postgres uses the generated ``search_vector`` tsvector column (GIN indexed),
+    SQLite uses the FTS5 table. Other engines, or SQLite builds without FTS5,
+    fall back to LIKE filters on the single document column.
+    """
+
+    # Indexing -----------------------------------------------------------
+
+    def document_for(self, reseller: Reseller) -> str:
+        user = reseller.user
+        return build_document(
+            user.username, user.email, user.first_name, user.last_name,
+            reseller.company_name, reseller.referral_code,
+        )
+
+    def index(self, reseller: Reseller) -> None:
+        ResellerSearchDocument.objects.update_or_create(
+            reseller_id=reseller.pk, defaults={'document': self.document_for(reseller)}
+        )
+
+    def rebuild(self, reseller_ids: Optional[Iterable[int]] = None, chunk_size: int = 2000) -> int:
+        """(Re)index resellers in chunks; all of them when no ids are given."""
+        qs = Reseller.objects.select_related('user').order_by('pk')
+        if reseller_ids is not None:
+            qs = qs.filter(pk__in=list(reseller_ids))
+        count = 0
+        last_pk = 0
+        while True:
+            batch = list(qs.filter(pk__gt=last_pk)[:chunk_size])
+            if not batch:
+                break
+            ResellerSearchDocument.objects.bulk_create(
+                [ResellerSearchDocument(reseller_id=r.pk, document=self.document_for(r)) for r in batch],
+                update_conflicts=True,
+                unique_fields=['reseller'],
+                update_fields=['document', 'updated_at'],
+            )
+            count += len(batch)
+            last_pk = batch[-1].pk
+        return count
+
+    # Querying -----------------------------------------------------------
+
+    def engine(self) -> str:
+        if connection.vendor == 'postgresql':
+            return 'postgres'
+        if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+            return 'fts5'
+        return 'like'
+
+    def filter_queryset(self, qs, text: str, ranked: bool = False):
+        """Restrict a Reseller queryset to matches; optionally annotate ``search_rank``."""
+        tokens = tokenize(text)[:MAX_TOKENS]
+        if not tokens:
+            return qs.none()
+
+        engine = self.engine()
+        if engine == 'like':
+            cond = Q()
+            for t in tokens:
+                cond &= Q(search_document__document__icontains=t)
+            return qs.filter(cond)
+
+        match_sql, params = self._match_sql(engine, tokens)
+        qs = qs.filter(id__in=RawSQL(match_sql, params))
+        if ranked:
+            rank_sql, rank_params = self._rank_sql(engine, tokens)
+            qs = qs.annotate(search_rank=RawSQL(rank_sql, rank_params))
+        return qs
+
+    def _match_sql(self, engine: str, tokens: List[str]) -> Tuple[str, list]:
+        if engine == 'postgres':
+            return (
+                f"SELECT reseller_id FROM {DOC_TABLE} WHERE search_vector @@ to_tsquery('simple', %s)",
+                [self._tsquery(tokens)],
+            )
+        return (f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [self._fts_query(tokens)])
+
+    def _rank_sql(self, engine: str, tokens: List[str]) -> Tuple[str, list]:
+        outer = connection.ops.quote_name(Reseller._meta.db_table)
+        if engine == 'postgres':
+            return (
+                f"SELECT ts_rank(d.search_vector, to_tsquery('simple', %s)) FROM {DOC_TABLE} d "
+                f"WHERE d.reseller_id = {outer}.id",
+                [self._tsquery(tokens)],
+            )
+        # bm25() is lower-is-better; negate so both engines sort descending
+        return (
+            f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {outer}.id",
+            [self._fts_query(tokens)],
+        )
+
+    def _tsquery(self, tokens: List[str]) -> str:
+        return ' & '.join(f"{t}:*" for t in tokens)
+
+    def _fts_query(self, tokens: List[str]) -> str:
+        return ' '.join(f'"{t}"*' for t in tokens)
@@ -2,14 +2,28 @@
 from typing import Any, Dict, List, Tuple
 from datetime import datetime
 
-from django.db.models import Count, Sum, Q, F
+from django.db.models import Count, Sum, Q, F, Case, When, Value, IntegerField
 from django.utils import timezone
 
 from App.reseller.earnings.models.reseller import Reseller
 from App.reseller.earnings.models.commission import Commission
+from App.reseller.earnings.repositories.leaderboard_repository import LeaderboardRepository
+from App.admin.repositories.reseller_search_repository import ResellerSearchRepository
+
+# Admin sort keys -> order_by() terms; all read reseller columns, no joins
+SORT_ORDERS = {
+    '-joined_at': ('-joined_at',),
+    '-sales_count': ('-sales_count', '-joined_at'),
+    '-month_sales': ('-month_sales', '-sales_count'),
+    '-last_sale_at': (F('last_sale_at').desc(nulls_last=True), '-joined_at'),
+    '-total_earnings': ('-total_commission_earned', '-joined_at'),
+}
 
 
 class AdminResellersRepository:
+    def __init__(self) -> None:
+        self.search = ResellerSearchRepository()
+
     def _map_commission_tier_filter(self, tier: str):
         """Map admin filter values to domain tier choices.
         Admin filters use: basic|standard|premium
@@ -84,17 +98,11 @@ class AdminResellersRepository:
     def query_resellers(self, filters: Dict[str, Any], order: str = '-joined_at', page: int = 1, page_size: int = 25) -> Tuple[List[Dict[str, Any]], int]:
         qs = Reseller.objects.select_related('user').all()
 
-        # Text search (q)
+        # Text search (q) via the reseller search index
         q_text = (filters.get('q') or '').strip()
+        ranked = bool(q_text) and order == 'relevance'
         if q_text:
-            qs = qs.filter(
-                Q(user__username__icontains=q_text)
-                | Q(user__email__icontains=q_text)
-                | Q(user__first_name__icontains=q_text)
-                | Q(user__last_name__icontains=q_text)
-                | Q(company_name__icontains=q_text)
-                | Q(referral_code__icontains=q_text)
-            )
+            qs = self.search.filter_queryset(qs, q_text, ranked=ranked)
 
         # Commission tier filter
         tier_val = filters.get('commission_tier')
@@ -120,19 +128,26 @@ class AdminResellersRepository:
         if joined_to:
             qs = qs.filter(joined_at__date__lte=joined_to)
 
-        # Annotations for counts
-        start_month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        # Sales counters are denormalized on the reseller row; the month counter
+        # only applies while sales_month is the current month (pre-rollover)
+        current_month = timezone.localdate().replace(day=1)
         qs = qs.annotate(
             total_earnings=F('total_commission_earned'),
-            sales_count=Count('commissions', distinct=True),
-            monthly_sales_count=Count('commissions', filter=Q(commissions__calculation_date__gte=start_month), distinct=True),
+            month_sales=Case(
+                When(sales_month=current_month, then=F('sales_this_month')),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
         )
 
         total = qs.count()
 
         # Ordering
-        order_by = order or '-joined_at'
-        qs = qs.order_by(order_by)
+        if ranked and 'search_rank' in qs.query.annotations:
+            qs = qs.order_by('-search_rank', '-joined_at')
+        else:
+            order_by = order if order and order != 'relevance' else '-joined_at'
+            qs = qs.order_by(*SORT_ORDERS.get(order_by, (order_by,)))
 
         # Pagination
         offset = max(0, (int(page or 1) - 1) * int(page_size or 25))
@@ -157,7 +172,8 @@ class AdminResellersRepository:
                 'commission_tier': self._commission_tier_label(r.tier, r.commission_rate),
                 'total_earnings': float(r.total_earnings or 0),
                 'sales_count': r.sales_count or 0,
-                'sales_this_month': r.monthly_sales_count or 0,
+                'sales_this_month': r.month_sales or 0,
+                'last_sale_at': r.last_sale_at,
                 'status': 'active' if r.is_active else 'suspended',
                 'joined': r.joined_at,
             })
@@ -170,7 +186,11 @@ class AdminResellersRepository:
             active_resellers=Count('id', filter=Q(is_active=True)),
             total_commission=Sum('total_commission_earned'),
         )
-        top = (
+        # All-time sales leader from the leaderboard; fall back to sorting resellers before its first refresh
+        top = next(
+            (entry.reseller for entry in LeaderboardRepository().top('all', 'sales', limit=5) if entry.reseller.is_active),
+            None,
+        ) or (
             Reseller.objects.select_related('user')
             .filter(is_active=True)
             .order_by('-total_sales')
@@ -215,6 +235,10 @@ class AdminResellersRepository:
             'performance_segment': perf_label,
             'performance_score': perf_score,
             'total_earnings': float(r.total_commission_earned or 0),
+            'pending_commission': float(r.pending_commission or 0),
+            'sales_count': r.sales_count,
+            'sales_this_month': r.get_sales_this_month(),
+            'last_sale_at': r.last_sale_at,
             # Payout-related fields
             'available_balance': float(r.get_available_balance() or 0),
             'payment_method': r.payment_method or '',
@@ -230,6 +254,75 @@ class AdminResellersRepository:
             'postal_code': r.postal_code or '',
         }
 
+    def get_reseller_detail_bundle(self, reseller_id: int, recent: int = 20, timeline: int = 5,
+                                   months: int = 12) -> Dict[str, Any]:
+        """Overview, commission sums, recent sales, activity and chart in three queries.
+
+        The reseller and user are loaded once; the latest ``recent`` commissions
+        feed both the sales table and the timeline; one per-month grouped query
+        over the chart window (which always covers the current year) yields the
+        month and year sums and the chart series. Outputs match the separate
+        get_* methods below, except that the chart's first month is counted
+        from its first day rather than from the current time of day.
+        """
+        from django.db.models.functions import TruncMonth
+        overview = self.get_reseller_overview(reseller_id)
+        now = timezone.now()
+        start_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        start_year = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        chart_start = (now.replace(day=1) - timezone.timedelta(days=months*31)).replace(day=1)
+
+        latest = list(
+            Commission.objects.filter(reseller_id=reseller_id)
+            .order_by('-calculation_date')[:max(recent, timeline)]
+            .values('client_name', 'product_name', 'sale_amount', 'amount', 'calculation_date', 'status')
+        )
+        by_month = list(
+            Commission.objects.filter(reseller_id=reseller_id, calculation_date__gte=min(chart_start, start_year))
+            .annotate(month=TruncMonth('calculation_date'))
+            .values('month')
+            .annotate(count=Count('id'), total=Sum('amount'))
+            .order_by('month')
+        )
+
+        first_month = chart_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        chart = [m for m in by_month if m['month'] and m['month'] >= first_month]
+        return {
+            'overview': overview,
+            'commission_summary': {
+                'pending': overview['pending_commission'],
+                'monthly_commission': float(sum(m['total'] or 0 for m in by_month if m['month'] and m['month'] >= start_month)),
+                'yearly_commission': float(sum(m['total'] or 0 for m in by_month if m['month'] and m['month'] >= start_year)),
+            },
+            'sales': [
+                {
+                    'business': c['client_name'],
+                    'plan': c['product_name'],
+                    'sale_amount': float(c['sale_amount'] or 0),
+                    'commission': float(c['amount'] or 0),
+                    'date': c['calculation_date'],
+                    'status': c['status'],
+                }
+                for c in latest[:recent]
+            ],
+            'activity': [
+                {
+                    'ts': c['calculation_date'],
+                    'type': 'commission',
+                    'text': f"Commission {c['amount']} for {c['product_name']}",
+                }
+                for c in latest[:timeline]
+            ],
+            'chart_series': {
+                'labels': [m['month'].strftime('%b %Y') for m in chart],
+                'values': [m['count'] for m in chart],
+            },
+        }
+
+    def get_last_login(self, reseller_id: int):
+        # Read live: logins don't bump the page cache, so it is not part of the cached bundle
+        return Reseller.objects.filter(id=reseller_id).values_list('user__last_login', flat=True).first()
+
     def get_commission_summary(self, reseller_id: int) -> Dict[str, Any]:
         # Pending directly from reseller, monthly/yearly via Commission aggregation
         reseller = Reseller.objects.get(id=reseller_id)
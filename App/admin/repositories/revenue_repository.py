@@ -4,7 +4,7 @@ Handles data access for revenue metrics, trends, and analytics.
 """
 
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from decimal import Decimal
 
 from django.db.models import Sum, Count, Avg, Q, Value, DecimalField
@@ -15,50 +15,56 @@ from App.reseller.earnings.models.commission import Commission
 from App.reseller.earnings.models.payout import Payout
 from App.reseller.earnings.models.reseller import Reseller
 from App.reseller.earnings.models.base import InvoiceStatusChoices, PayoutStatusChoices
+from App.db_router import use_replica
+from .period_aggregates import aggregate_periods
 
 
+@use_replica
 class RevenueRepository:
     """Repository for revenue-related data access"""
 
     def get_revenue_metrics(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """Get basic revenue metrics from invoices, commissions, and payouts"""
         try:
-            revenue_qs = Invoice.objects.filter(
-                status=InvoiceStatusChoices.PAID,
-                payment_date__range=[start_date, end_date],
-            )
-            revenue_data = revenue_qs.aggregate(
-                total_revenue=Coalesce(Sum('total_amount'), Value(0), output_field=DecimalField()),
-                invoice_count=Coalesce(Count('id'), Value(0)),
-                avg_invoice_value=Coalesce(Avg('total_amount'), Value(0), output_field=DecimalField()),
-            )
+            return self.get_period_metrics([(start_date, end_date)])[0]
+        except Exception as e:
+            raise Exception(f"Error getting revenue metrics: {str(e)}")
 
-            commission_qs = Commission.objects.filter(
-                created_at__range=[start_date, end_date]
-            )
-            commission_data = commission_qs.aggregate(
-                pending_commissions=Coalesce(Sum('amount', filter=Q(status='pending')), Value(0), output_field=DecimalField()),
-                avg_commission_rate=Coalesce(Avg('commission_rate'), Value(0), output_field=DecimalField()),
+    def get_period_metrics(self, periods: List[Tuple[datetime, datetime]]) -> List[Dict[str, Any]]:
+        """Revenue metrics for each (start, end) period, one conditional-aggregate query per table"""
+        try:
+            invoices = aggregate_periods(
+                Invoice.objects.filter(status=InvoiceStatusChoices.PAID), 'payment_date', periods, {
+                    'total_revenue': lambda q: Sum('total_amount', filter=q),
+                    'invoice_count': lambda q: Count('id', filter=q),
+                    'avg_invoice_value': lambda q: Avg('total_amount', filter=q),
+                },
             )
-
-            payout_qs = Payout.objects.filter(
-                status=PayoutStatusChoices.COMPLETED,
-                completion_date__range=[start_date, end_date]
+            commissions = aggregate_periods(
+                Commission.objects.all(), 'created_at', periods, {
+                    'pending_commissions': lambda q: Sum('amount', filter=q & Q(status='pending')),
+                    'avg_commission_rate': lambda q: Avg('commission_rate', filter=q),
+                },
             )
-            payout_data = payout_qs.aggregate(
-                processed_payouts=Coalesce(Sum('amount'), Value(0), output_field=DecimalField())
+            payouts = aggregate_periods(
+                Payout.objects.filter(status=PayoutStatusChoices.COMPLETED), 'completion_date', periods, {
+                    'processed_payouts': lambda q: Sum('amount', filter=q),
+                },
             )
 
-            return {
-                'total_revenue': Decimal(revenue_data['total_revenue']),
-                'invoice_count': int(revenue_data['invoice_count']),
-                'avg_invoice_value': Decimal(revenue_data['avg_invoice_value']),
-                'pending_commissions': Decimal(commission_data['pending_commissions']),
-                'avg_commission_rate': Decimal(commission_data['avg_commission_rate']),
-                'processed_payouts': Decimal(payout_data['processed_payouts'])
-            }
+            return [
+                {
+                    'total_revenue': Decimal(invoice['total_revenue'] or 0),
+                    'invoice_count': int(invoice['invoice_count'] or 0),
+                    'avg_invoice_value': Decimal(invoice['avg_invoice_value'] or 0),
+                    'pending_commissions': Decimal(commission['pending_commissions'] or 0),
+                    'avg_commission_rate': Decimal(commission['avg_commission_rate'] or 0),
+                    'processed_payouts': Decimal(payout['processed_payouts'] or 0)
+                }
+                for invoice, commission, payout in zip(invoices, commissions, payouts)
+            ]
         except Exception as e:
-            raise Exception(f"Error getting revenue metrics: {str(e)}")
+            raise Exception(f"Error getting period metrics: {str(e)}")
 
     def get_revenue_by_source(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """Get revenue breakdown by source (resellers)"""
@@ -153,6 +159,37 @@ class RevenueRepository:
         except Exception as e:
             raise Exception(f"Error getting revenue trends: {str(e)}")
 
+    def get_daily_revenue(self, ranges, reseller_ids=None, platform: bool = False) -> List[Dict[str, Any]]:
+        """Paid invoice totals per payment day in one grouped query.
+
+        ``ranges`` is a list of inclusive (start, end) payment date ranges.
+        Rows are {'day', 'reseller_id', 'amount'}: one per reseller in
+        ``reseller_ids`` and day, plus, when ``platform`` is set, the total of
+        every invoice that day with reseller_id None.
+        """
+        try:
+            in_ranges = Q()
+            for start_date, end_date in ranges:
+                in_ranges |= Q(payment_date__range=[start_date, end_date])
+            qs = Invoice.objects.filter(in_ranges, status=InvoiceStatusChoices.PAID)
+            wanted = set(reseller_ids or [])
+            if not platform:
+                qs = qs.filter(reseller_id__in=wanted)
+            rows = qs.values('payment_date', 'reseller_id').annotate(amount=Sum('total_amount')).order_by()
+
+            results: List[Dict[str, Any]] = []
+            platform_totals: Dict[Any, Decimal] = {}
+            for row in rows:
+                amount = Decimal(row['amount'] or 0)
+                if platform:
+                    platform_totals[row['payment_date']] = platform_totals.get(row['payment_date'], Decimal('0')) + amount
+                if row['reseller_id'] in wanted:
+                    results.append({'day': row['payment_date'], 'reseller_id': row['reseller_id'], 'amount': amount})
+            results.extend({'day': day, 'reseller_id': None, 'amount': amount} for day, amount in platform_totals.items())
+            return results
+        except Exception as e:
+            raise Exception(f"Error getting daily revenue: {str(e)}")
+
     def get_top_revenue_sources(self, start_date: datetime, end_date: datetime, limit: int = 10) -> List[Dict[str, Any]]:
         """Get top revenue sources (resellers)"""
         try:
@@ -0,0 +1,228 @@
+"""
+Admin Table Statistics Repository
+Cheap, engine-metadata based table statistics for the dashboard system panel
+"""
+import logging
+import os
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'admin_table_stats_v1'
+CACHE_TTL = 24 * 3600  # keep serving the last snapshot while a refresh runs
+TOP_TABLES = 10
+
+_refresh_lock = threading.Lock()
+
+
+class TableStatsRepository:
+    """
+    Reads row estimates from database metadata instead of counting rows.
+
+    Postgres: pg_class.reltuples (maintained by autovacuum/ANALYZE).
+    SQLite:   sqlite_stat1 (maintained by ANALYZE), falling back to MAX(rowid)
+              which is an index seek rather than a table scan.
+
+    Snapshots are cached; once older than TABLE_STATS_REFRESH_SECONDS the next
+    read returns the stale snapshot and refreshes it on a background thread.
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    @property
+    def refresh_interval(self):
+        return int(getattr(settings, 'TABLE_STATS_REFRESH_SECONDS', 300))
+
+    # Public API ---------------------------------------------------------
+
+    def get_snapshot(self):
+        """Return cached table statistics, refreshing in the background when stale"""
+        snapshot = cache.get(self._cache_key())
+        if snapshot is None:
+            # Cold cache: metadata reads only, no ANALYZE, so this stays cheap
+            return self.refresh(analyze=False)
+
+        age = (timezone.now() - snapshot['refreshed_at']).total_seconds()
+        if age >= self.refresh_interval:
+            self.refresh_in_background()
+        return snapshot
+
+    def refresh(self, analyze=False):
+        """Collect fresh statistics and store them in the cache"""
+        if analyze:
+            self.analyze()
+        snapshot = {
+            'vendor': self.connection.vendor,
+            'database_size': self.get_database_size(),
+            'table_rows': self.get_row_estimates(),
+            'table_operations': self.get_table_operations(),
+            'refreshed_at': timezone.now(),
+        }
+        cache.set(self._cache_key(), snapshot, CACHE_TTL)
+        return snapshot
+
+    def refresh_in_background(self):
+        """Start a single background refresh; no-op if one is already running"""
+        if not _refresh_lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                self.refresh(analyze=self._can_analyze_cheaply())
+            except Exception:
+                logger.exception('Background table stats refresh failed')
+            finally:
+                # The worker thread owns its own connection; release it
+                self.connection.close()
+                _refresh_lock.release()
+
+        threading.Thread(target=run, name='table-stats-refresh', daemon=True).start()
+        return True
+
+    def invalidate(self):
+        cache.delete(self._cache_key())
+
+    # Metadata readers ---------------------------------------------------
+
+    def get_database_size(self):
+        vendor = self.connection.vendor
+        try:
+            if vendor == 'postgresql':
+                with self.connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_database_size(current_database())")
+                    row = cursor.fetchone()
+                    return row[0] if row else 0
+            if vendor == 'sqlite':
+                db_path = self.connection.settings_dict.get('NAME')
+                if db_path and os.path.exists(str(db_path)):
+                    return os.path.getsize(db_path)
+                with self.connection.cursor() as cursor:
+                    cursor.execute("PRAGMA page_count")
+                    pages = cursor.fetchone()[0]
+                    cursor.execute("PRAGMA page_size")
+                    return pages * cursor.fetchone()[0]
+        except Exception:
+            logger.warning('Could not determine database size', exc_info=True)
+        return 0
+
+    def get_row_estimates(self, limit=TOP_TABLES):
+        """Return [(schema_or_none, table, estimated_rows)] largest first"""
+        vendor = self.connection.vendor
+        try:
+            if vendor == 'postgresql':
+                rows = self._postgres_row_estimates(limit)
+            elif vendor == 'sqlite':
+                rows = self._sqlite_row_estimates()
+            else:
+                return []
+        except Exception:
+            logger.warning('Could not read table statistics', exc_info=True)
+            return []
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return rows[:limit]
+
+    def get_table_operations(self, limit=TOP_TABLES):
+        """Top tables by activity; write operations on Postgres, row estimates elsewhere"""
+        if self.connection.vendor != 'postgresql':
+            return self.get_row_estimates(limit)
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT schemaname, relname AS tablename,
+                           n_tup_ins + n_tup_upd + n_tup_del AS total_operations
+                    FROM pg_stat_user_tables
+                    ORDER BY total_operations DESC
+                    LIMIT %s
+                    """,
+                    [limit],
+                )
+                return [tuple(r) for r in cursor.fetchall()]
+        except Exception:
+            logger.warning('Could not read pg_stat_user_tables', exc_info=True)
+            return []
+
+    def analyze(self):
+        """Update the engine's planner statistics (sqlite_stat1 / pg_class)"""
+        vendor = self.connection.vendor
+        try:
+            with self.connection.cursor() as cursor:
+                if vendor == 'sqlite':
+                    # Sample at most ~1000 rows per index (SQLite >= 3.32)
+                    cursor.execute("PRAGMA analysis_limit=1000")
+                    cursor.execute("ANALYZE")
+                elif vendor == 'postgresql':
+                    cursor.execute("ANALYZE")
+        except Exception:
+            logger.warning('ANALYZE failed', exc_info=True)
+
+    # Internals ----------------------------------------------------------
+
+    def _postgres_row_estimates(self, limit):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT n.nspname, c.relname, GREATEST(c.reltuples, 0)::bigint
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relkind IN ('r', 'p')
+                  AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+                  AND n.nspname NOT LIKE 'pg_toast%%'
+                ORDER BY c.reltuples DESC
+                LIMIT %s
+                """,
+                [limit],
+            )
+            return [tuple(r) for r in cursor.fetchall()]
+
+    def _sqlite_row_estimates(self):
+        with self.connection.cursor() as cursor:
+            tables = self.connection.introspection.table_names(cursor)
+            stats = {}
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone():
+                cursor.execute("SELECT tbl, stat FROM sqlite_stat1")
+                for tbl, stat in cursor.fetchall():
+                    try:
+                        # First integer of "stat" is the table's row count
+                        stats[tbl] = max(stats.get(tbl, 0), int(str(stat).split()[0]))
+                    except (ValueError, IndexError):
+                        continue
+
+            rows = []
+            for table in tables:
+                if table in stats:
+                    rows.append((None, table, stats[table]))
+                    continue
+                try:
+                    # Rowid is the integer primary key: one b-tree seek, not a scan
+                    cursor.execute(f"SELECT MAX(rowid) FROM {self.connection.ops.quote_name(table)}")
+                    rows.append((None, table, cursor.fetchone()[0] or 0))
+                except Exception:
+                    # WITHOUT ROWID tables or views; skip rather than scan
+                    continue
+            return rows
+
+    def _can_analyze_cheaply(self):
+        vendor = self.connection.vendor
+        if vendor == 'sqlite':
+            # analysis_limit bounds ANALYZE cost; older SQLite would scan everything
+            return sqlite3.sqlite_version_info >= (3, 32, 0)
+        # Postgres keeps reltuples current through autovacuum
+        return False
+
+    def _cache_key(self):
+        return f"{CACHE_KEY}_{self.using}"
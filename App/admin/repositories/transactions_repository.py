@@ -12,8 +12,10 @@ from App.reseller.earnings.models.invoice import Invoice
 from App.reseller.earnings.models.payout import Payout
 from App.reseller.earnings.models.commission import Commission
 from App.reseller.earnings.models.base import InvoiceStatusChoices, PayoutStatusChoices
+from App.db_router import use_replica
 
 
+@use_replica
 class TransactionsRepository:
     def _build_unified_queryset(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Compose a unified in-memory list of transactions from invoices and payouts."""
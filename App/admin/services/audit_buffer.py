@@ -0,0 +1,86 @@
+"""
+Admin Audit Buffer
+Collects AuditLog rows in process memory and writes them with bulk_create
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from ..models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    """
+    Process-wide buffer of unsaved AuditLog instances.
+
+    Entries are flushed in one bulk_create when the buffer reaches
+    AUDIT_BUFFER_SIZE, when its oldest entry is older than
+    AUDIT_BUFFER_MAX_AGE seconds, at the end of every request
+    (request_finished, see signals.py) and at interpreter exit. A size of 1
+    or less disables buffering and every entry is written immediately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._oldest = None
+
+    @property
+    def max_size(self):
+        return int(getattr(settings, 'AUDIT_BUFFER_SIZE', 50))
+
+    @property
+    def max_age(self):
+        return float(getattr(settings, 'AUDIT_BUFFER_MAX_AGE', 5))
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, entry):
+        """Queue an unsaved entry, flushing when a threshold is crossed"""
+        if self.max_size <= 1:
+            entry.save()
+            return entry
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(entry)
+            due = len(self._pending) >= self.max_size or time.monotonic() - self._oldest >= self.max_age
+        if due:
+            self.flush()
+        return entry
+
+    def flush(self):
+        """Write every pending entry; returns the number written"""
+        with self._lock:
+            batch, self._pending, self._oldest = self._pending, [], None
+        if not batch:
+            return 0
+        try:
+            AuditLog.objects.bulk_create(batch, batch_size=500)
+            return len(batch)
+        except DatabaseError:
+            # One bad row must not take the rest of the batch with it
+            logger.exception("Bulk audit flush failed; writing %d entries one by one", len(batch))
+            written = 0
+            for entry in batch:
+                try:
+                    entry.save()
+                    written += 1
+                except DatabaseError:
+                    logger.exception("Dropped audit entry %s", entry)
+            return written
+
+    def discard(self):
+        with self._lock:
+            self._pending, self._oldest = [], None
+
+
+audit_buffer = AuditBuffer()
+atexit.register(audit_buffer.flush)
@@ -1,16 +1,31 @@
 from typing import Optional, Dict, Any
+from django.conf import settings
+from django.db import transaction
 from django.contrib.auth import get_user_model
 from ..models.audit_log import AuditLog
+from ..repositories.audit_archive_repository import AuditArchiveRepository, retention_cutoff
+from .audit_buffer import audit_buffer
 
 User = get_user_model()
 
 
 class AuditService:
-    """Write admin audit log entries."""
+    """
+    Write admin audit log entries.
 
-    def log(self, *, action: str, actor_id: Optional[int], target_type: str = "", target_id: str = "", target_display: str = "", details: Optional[Dict[str, Any]] = None, ip_address: Optional[str] = None, user_agent: str = "") -> 'AuditLog':
+    Entries go through the process-wide audit buffer and are bulk-inserted at
+    the end of the request; they are queued only once the current transaction
+    commits, so a rolled-back action leaves no entry. Actions listed in
+    AUDIT_SYNC_ACTIONS (or logged with critical=True) are written before the
+    call returns, inside the caller's transaction.
+
+    ``log`` and ``log_action`` return the entry either way; a buffered one
+    has no ``pk`` until it is flushed.
+    """
+
+    def log(self, *, action: str, actor_id: Optional[int], target_type: str = "", target_id: str = "", target_display: str = "", details: Optional[Dict[str, Any]] = None, ip_address: Optional[str] = None, user_agent: str = "", critical: Optional[bool] = None) -> 'AuditLog':
         """Legacy log method for backward compatibility"""
-        entry = AuditLog.objects.create(
+        entry = AuditLog(
             action=action,
             actor_id=actor_id,
             target_type=target_type,
@@ -20,11 +35,11 @@ class AuditService:
             ip_address=ip_address,
             user_agent=user_agent or "",
         )
-        return entry
-    
-    def log_action(self, admin_user, action, target_model, target_id=None, description="", ip_address=None):
+        return self._write(entry, critical)
+
+    def log_action(self, admin_user, action, target_model, target_id=None, description="", ip_address=None, critical=None):
         """Log admin action with standardized parameters"""
-        entry = AuditLog.objects.create(
+        entry = AuditLog(
             action=action,
             actor=admin_user,
             target_type=target_model,
@@ -32,11 +47,63 @@ class AuditService:
             target_display=description,
             ip_address=ip_address,
         )
+        return self._write(entry, critical)
+
+    def flush(self):
+        """Write any buffered entries now (management commands call this before exiting)"""
+        return audit_buffer.flush()
+
+    def _write(self, entry, critical):
+        if critical is None:
+            critical = entry.action in getattr(settings, 'AUDIT_SYNC_ACTIONS', ())
+        if not critical:
+            transaction.on_commit(lambda: audit_buffer.add(entry))
+            return entry
+        # Keep ordering: anything queued before this entry lands first
+        audit_buffer.flush()
+        entry.save()
         return entry
-    
+
     def get_user_activities(self, user_id, limit=50):
         """Get activities for a specific admin user"""
+        audit_buffer.flush()
         return AuditLog.objects.filter(
             actor_id=user_id
         ).order_by('-created_at')[:limit]
 
+    def search(self, start=None, end=None, action=None, actor_id=None, target_type=None, target_id=None, limit=100):
+        """
+        Search live and archived entries, newest first, as plain dicts.
+        The archive is only opened when the range reaches past the retention
+        cutoff (no ``start`` counts as reaching it).
+        """
+        audit_buffer.flush()
+        filters = {
+            'created_at__gte': start,
+            'created_at__lte': end,
+            'action': action,
+            'actor_id': actor_id,
+            'target_type': target_type,
+            'target_id': target_id,
+        }
+        qs = AuditLog.objects.filter(**{k: v for k, v in filters.items() if v not in (None, '')})
+        results = list(
+            qs.order_by('-created_at', '-id').values(
+                'id', 'action', 'actor_id', 'target_type', 'target_id', 'target_display',
+                'details', 'created_at', 'ip_address', 'user_agent',
+            )[:limit]
+        )
+        for row in results:
+            row['archived'] = False
+
+        if len(results) < limit and (start is None or start < retention_cutoff()):
+            archived = AuditArchiveRepository().search(
+                start=start, end=end, action=action, actor_id=actor_id,
+                target_type=target_type, target_id=target_id, limit=limit - len(results),
+            )
+            live_ids = {row['id'] for row in results}
+            for row in archived:
+                if row['id'] not in live_ids:
+                    row['archived'] = True
+                    results.append(row)
+        return results
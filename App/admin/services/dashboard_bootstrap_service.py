@@ -0,0 +1,186 @@
+"""
+Admin Dashboard Bootstrap Service
+Evaluates independent dashboard sections concurrently for a single page load
+"""
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+from App.models import Plan, Product
+from App.reseller.earnings.models import Reseller
+from .dashboard_service import DashboardService
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+CACHE_PREFIX = 'dashboard_bootstrap_v1'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide pool, so concurrent page loads share one bound on DB connections"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, int(getattr(settings, 'DASHBOARD_BOOTSTRAP_WORKERS', 4))),
+                thread_name_prefix='dashboard-bootstrap',
+            )
+        return _executor
+
+
+class DashboardBootstrapService:
+    """
+    Builds the dashboard payload from named sections.
+
+    Each section is a producer plus a cache TTL (0 = always computed). With
+    more than one worker configured, sections run on the shared thread pool;
+    every worker thread gets its own database connection from Django and
+    closes it when the section finishes. The page then waits only for its
+    slowest section instead of the sum of all of them.
+    """
+
+    # name -> (method, ttl seconds)
+    SECTIONS = {
+        'metrics': ('_metrics', 300),
+        'quick_stats': ('_quick_stats', 3600),
+        'system_status': ('_system_status', 0),
+        'recent_activities': ('_recent_activities', 0),
+        'growth_trends': ('_growth_trends', 900),
+        'counts': ('_counts', 60),
+    }
+    DEFAULT_SECTIONS = ('metrics', 'quick_stats', 'system_status', 'recent_activities', 'counts')
+
+    def __init__(self, workers=None, timeout=None):
+        self.workers = int(getattr(settings, 'DASHBOARD_BOOTSTRAP_WORKERS', 4)) if workers is None else workers
+        self.timeout = float(getattr(settings, 'DASHBOARD_BOOTSTRAP_TIMEOUT', 10)) if timeout is None else timeout
+        self.dashboard = DashboardService()
+
+    def build(self, sections=None, params=None, refresh=False):
+        """
+        Evaluate ``sections`` and return::
+
+            {'sections': {name: {'data', 'status', 'cache', 'elapsed_ms'[, 'error']}},
+             'elapsed_ms': ..., 'generated_at': ...}
+
+        ``status`` is ok/error/timeout; ``cache`` is hit/miss/bypass. A failing
+        or slow section never fails the others.
+        """
+        params = params or {}
+        names = list(dict.fromkeys(sections or self.DEFAULT_SECTIONS))
+        unknown = [n for n in names if n not in self.SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown dashboard sections: {', '.join(unknown)}")
+
+        started = time.perf_counter()
+        if self.workers <= 1 or len(names) == 1:
+            results = {name: self._evaluate(name, params, refresh) for name in names}
+        else:
+            executor = get_executor()
+            # Each section runs in a copy of this request's context, so a primary pin
+            # (App.db_router) taken before the build also applies on the pool threads
+            futures = {
+                name: executor.submit(contextvars.copy_context().run, self._run_in_worker, name, params, refresh)
+                for name in names
+            }
+            wait(futures.values(), timeout=self.timeout)
+            results = {}
+            for name, future in futures.items():
+                if future.done():
+                    results[name] = future.result()
+                else:
+                    # Left running; its result still lands in the cache for the next load
+                    results[name] = {'data': None, 'status': 'timeout', 'cache': 'miss',
+                                     'elapsed_ms': round(self.timeout * 1000, 1)}
+
+        return {
+            'sections': results,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            'generated_at': timezone.now(),
+        }
+
+    def invalidate(self, sections=None):
+        for name in sections or self.SECTIONS:
+            cache.delete_many(self._known_keys(name))
+
+    # Evaluation ---------------------------------------------------------
+
+    def _run_in_worker(self, name, params, refresh):
+        try:
+            return self._evaluate(name, params, refresh)
+        finally:
+            # Connections are per thread; don't leave idle ones on pool threads
+            connections.close_all()
+
+    def _evaluate(self, name, params, refresh):
+        method, ttl = self.SECTIONS[name]
+        started = time.perf_counter()
+        key = self._cache_key(name, params)
+        cache_status = 'bypass' if not ttl else 'miss'
+        try:
+            data = cache.get(key) if ttl and not refresh else None
+            if data is not None:
+                cache_status = 'hit'
+            else:
+                data = getattr(self, method)(params)
+                if ttl:
+                    cache.set(key, data, ttl)
+            result = {'data': data, 'status': 'ok', 'cache': cache_status}
+        except Exception as e:
+            logger.exception('Dashboard section %s failed', name)
+            result = {'data': None, 'status': 'error', 'cache': cache_status, 'error': str(e)}
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def _cache_key(self, name, params):
+        if name == 'metrics':
+            return f"{CACHE_PREFIX}_{name}_{params.get('period', 'last_7_days')}_{params.get('date_from')}_{params.get('date_to')}"
+        if name == 'growth_trends':
+            return f"{CACHE_PREFIX}_{name}_{params.get('days', 30)}"
+        return f"{CACHE_PREFIX}_{name}"
+
+    def _known_keys(self, name):
+        if name in ('metrics', 'growth_trends'):
+            # Parameterised keys are left to expire; drop the defaults the page uses
+            return [self._cache_key(name, {}), self._cache_key(name, {'period': 'last_30_days'})]
+        return [self._cache_key(name, {})]
+
+    # Sections -----------------------------------------------------------
+
+    def _metrics(self, params):
+        return self.dashboard.get_dashboard_metrics(
+            period=params.get('period', 'last_7_days'),
+            date_from=params.get('date_from'),
+            date_to=params.get('date_to'),
+        )
+
+    def _quick_stats(self, params):
+        return self.dashboard.get_quick_stats()
+
+    def _system_status(self, params):
+        return self.dashboard.get_system_status()
+
+    def _recent_activities(self, params):
+        return self.dashboard.get_recent_activities(limit=params.get('limit', 10))
+
+    def _growth_trends(self, params):
+        return self.dashboard.get_growth_trends(days=params.get('days', 30))
+
+    def _counts(self, params):
+        return {
+            'users': User.objects.count(),
+            'resellers': Reseller.objects.count(),
+            'products': Product.objects.count(),
+            'plans': Plan.objects.count(),
+            'admins': User.objects.filter(is_staff=True).count(),
+        }
@@ -9,6 +9,9 @@ from django.core.cache import cache
 from ..repositories.dashboard_repository import DashboardRepository
 from .audit_service import AuditService
 
+# Trailing windows compared with the window of equal length before them
+GROWTH_WINDOWS = {'daily': 1, 'weekly': 7, 'monthly': 30}
+
 
 class DashboardService:
     """
@@ -173,25 +176,15 @@ class DashboardService:
         return start_date, end_date
     
     def _calculate_growth_rates(self, metrics):
-        """Calculate growth rates from metrics"""
-        # This would implement actual growth rate calculations
-        # Placeholder implementation
+        """Growth of each trailing window over the one before it, as fractions (0.1 = +10%)"""
+        end = metrics.get('date_range', {}).get('end') or timezone.now()
+        totals = self.repository.get_window_totals(end, GROWTH_WINDOWS)
         return {
-            'users': {
-                'daily': 0.05,
-                'weekly': 0.15,
-                'monthly': 0.25,
-            },
-            'businesses': {
-                'daily': 0.02,
-                'weekly': 0.08,
-                'monthly': 0.12,
-            },
-            'revenue': {
-                'daily': 0.03,
-                'weekly': 0.10,
-                'monthly': 0.20,
-            },
+            metric: {
+                name: round(float(self._calculate_percentage_change(previous, current)) / 100, 4)
+                for name, (current, previous) in windows.items()
+            }
+            for metric, windows in totals.items()
         }
     
     def _calculate_health_score(self, metrics):
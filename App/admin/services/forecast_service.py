@@ -0,0 +1,349 @@
+"""
+Admin Forecast Service
+Daily revenue forecasting with cached, incrementally refreshed model fits.
+
+Each series (the platform, or one reseller) is a daily total of paid invoice
+amounts over the last REVENUE_FORECAST_HISTORY_DAYS closed days. A
+``SeriesFit`` keeps sufficient statistics instead of the raw series:
+
+- per weekday: n, sum x, sum y, sum x^2, sum xy, sum y^2 (x = day number),
+  which give the least-squares trend, the weekday model (one slope, an intercept
+  per weekday) and their residual error in closed form; days leaving the window
+  are subtracted;
+- Holt exponential smoothing level/trend and the moving-average window,
+  with the running one-step-ahead squared error of each.
+
+Fits live in the shared cache. Refreshing one only reads the days that
+closed since it was last updated (plus those leaving the window), with a
+single grouped query for any number of series, so forecasting every
+reseller is one batch run (manage.py refresh_revenue_forecasts).
+"""
+import calendar
+import math
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from App.admin.repositories.revenue_repository import RevenueRepository
+from App.reseller.earnings.models.reseller import Reseller
+
+METHODS = ('moving_average', 'linear_trend', 'seasonal', 'exponential_smoothing')
+PLATFORM = 'platform'
+CACHE_PREFIX = 'revenue_forecast_v1'
+
+MA_WINDOW = 28
+HOLT_ALPHA = 0.3
+HOLT_BETA = 0.1
+# Two-sided 95% interval
+Z_95 = 1.96
+
+# Sufficient statistic positions in each weekday bucket
+N, SX, SY, SXX, SXY, SYY = range(6)
+
+
+def reseller_series(reseller_id) -> str:
+    return f'reseller:{reseller_id}'
+
+
+def _sse(stats, a, b):
+    """Sum of squared residuals of y - (a + b x) over one bucket of sufficient statistics"""
+    n, sx, sy, sxx, sxy, syy = stats
+    return syy - 2 * a * sy - 2 * b * sxy + n * a * a + 2 * a * b * sx + b * b * sxx
+
+
+def _merge_ranges(ranges):
+    """Sorted, non-overlapping cover of inclusive (start, end) date ranges"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class SeriesFit:
+    """Incrementally maintained model state for one daily series"""
+
+    def __init__(self, origin: date, window: int):
+        self.origin = origin
+        self.window = window
+        self.first: Optional[date] = None
+        self.through: Optional[date] = None
+        self.buckets = [[0.0] * 6 for _ in range(7)]
+        self.months: Dict[str, float] = defaultdict(float)
+        # Holt and moving-average state, with one-step-ahead error accumulators
+        self.level = self.trend = None
+        self.holt_sse = 0.0
+        self.holt_n = 0
+        self.recent: List[float] = []
+        self.ma_sse = 0.0
+        self.ma_n = 0
+
+    # Updates ------------------------------------------------------------
+
+    def _x(self, day: date) -> int:
+        return (day - self.origin).days
+
+    def _accumulate(self, day: date, value: float, sign: int):
+        x = self._x(day)
+        bucket = self.buckets[day.weekday()]
+        for i, term in enumerate((1.0, x, value, x * x, x * value, value * value)):
+            bucket[i] += sign * term
+        self.months[day.strftime('%Y-%m')] += sign * value
+
+    def extend(self, through: date, values: Dict[date, float]):
+        """Add every day after ``self.through`` up to ``through``; missing days count as zero"""
+        day = (self.through + timedelta(days=1)) if self.through else through - timedelta(days=self.window - 1)
+        if self.first is None:
+            self.first = day
+        while day <= through:
+            value = float(values.get(day, 0.0))
+            self._accumulate(day, value, 1)
+            self._smooth(value)
+            day += timedelta(days=1)
+        self.through = through
+
+    def trim(self, values: Dict[date, float]):
+        """Drop days that have left the window (their values are in ``values``)"""
+        new_first = self.through - timedelta(days=self.window - 1)
+        day = self.first
+        while day < new_first:
+            self._accumulate(day, float(values.get(day, 0.0)), -1)
+            day += timedelta(days=1)
+        self.first = max(self.first, new_first)
+        oldest_month = self.first.strftime('%Y-%m')
+        for month in [m for m in self.months if m < oldest_month]:
+            del self.months[month]
+
+    def _smooth(self, value: float):
+        if self.level is None:
+            self.level, self.trend = value, 0.0
+        else:
+            error = value - (self.level + self.trend)
+            self.holt_sse += error * error
+            self.holt_n += 1
+            level = HOLT_ALPHA * value + (1 - HOLT_ALPHA) * (self.level + self.trend)
+            self.trend = HOLT_BETA * (level - self.level) + (1 - HOLT_BETA) * self.trend
+            self.level = level
+        if self.recent:
+            error = value - sum(self.recent) / len(self.recent)
+            self.ma_sse += error * error
+            self.ma_n += 1
+        self.recent = (self.recent + [value])[-MA_WINDOW:]
+
+    # Fitted models ------------------------------------------------------
+
+    @property
+    def totals(self):
+        return [sum(column) for column in zip(*self.buckets)]
+
+    def _trend(self):
+        n, sx, sy, sxx, sxy, _ = self.totals
+        if n == 0:
+            return 0.0, 0.0
+        den = n * sxx - sx * sx
+        b = (n * sxy - sx * sy) / den if n >= 2 and den else 0.0
+        return (sy - b * sx) / n, b
+
+    def _seasonal(self):
+        """Common slope with one intercept per weekday (within-weekday least squares)"""
+        num = den = 0.0
+        for n, sx, sy, sxx, sxy, _ in self.buckets:
+            if n:
+                num += sxy - sx * sy / n
+                den += sxx - sx * sx / n
+        b = num / den if den > 0 else 0.0
+        return [(bucket[SY] - b * bucket[SX]) / bucket[N] if bucket[N] else 0.0 for bucket in self.buckets], b
+
+    def residual_std(self, method: str) -> float:
+        n = self.totals[N]
+        if method == 'exponential_smoothing':
+            sse, dof = self.holt_sse, self.holt_n
+        elif method == 'moving_average':
+            sse, dof = self.ma_sse, self.ma_n
+        else:
+            if method == 'seasonal':
+                intercepts, b = self._seasonal()
+                sse = sum(_sse(bucket, a, b) for bucket, a in zip(self.buckets, intercepts))
+                dof = n - 8
+            else:
+                a, b = self._trend()
+                sse = sum(_sse(bucket, a, b) for bucket in self.buckets)
+                dof = n - 2
+        return math.sqrt(max(sse, 0.0) / dof) if dof > 0 else 0.0
+
+    def forecast(self, method: str, start: date, days: int):
+        """[(day, value, std)] for ``days`` days from ``start``, values clipped at zero"""
+        if method not in METHODS:
+            raise ValueError(f"Unknown forecast method: {method}")
+        if self.through is None or self.totals[N] == 0:
+            return []
+        sigma = self.residual_std(method)
+        n, sx, _, sxx, _, _ = self.totals
+        a, b = self._trend()
+        intercepts, b_seasonal = self._seasonal() if method == 'seasonal' else (None, None)
+        mean_x = sx / n
+        sxx_centered = sxx - sx * mean_x
+        ma = sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+        points = []
+        for i in range(days):
+            day = start + timedelta(days=i)
+            h = (day - self.through).days
+            if method == 'moving_average':
+                value, std = ma, sigma * math.sqrt(1 + 1 / max(len(self.recent), 1))
+            elif method == 'exponential_smoothing':
+                value = self.level + h * self.trend
+                std = sigma * math.sqrt(1 + (h - 1) * HOLT_ALPHA ** 2 * (1 + h * HOLT_BETA))
+            elif method == 'seasonal':
+                x = self._x(day)
+                bucket = self.buckets[day.weekday()]
+                value = intercepts[day.weekday()] + b_seasonal * x
+                # Leverage approximated from the weekday's own points
+                if bucket[N]:
+                    spread = bucket[SXX] - bucket[SX] ** 2 / bucket[N]
+                    leverage = 1 / bucket[N] + ((x - bucket[SX] / bucket[N]) ** 2 / spread if spread > 0 else 0.0)
+                else:
+                    leverage = 1.0
+                std = sigma * math.sqrt(1 + leverage)
+            else:
+                x = self._x(day)
+                value = a + b * x
+                leverage = (x - mean_x) ** 2 / sxx_centered if sxx_centered > 0 else 0.0
+                std = sigma * math.sqrt(1 + 1 / n + leverage)
+            points.append((day, max(value, 0.0), std))
+        return points
+
+    def fit_quality(self, method: str) -> float:
+        """1 - residual std / mean daily value, in [0, 1]"""
+        n, _, sy, _, _, _ = self.totals
+        mean = sy / n if n else 0.0
+        if mean <= 0:
+            return 0.0
+        return round(min(1.0, max(0.0, 1 - self.residual_std(method) / mean)), 2)
+
+
+class ForecastService:
+    """Loads, refreshes and evaluates cached series fits"""
+
+    def __init__(self, cache_alias='shared'):
+        self.cache = caches[cache_alias]
+        self.repository = RevenueRepository()
+
+    @property
+    def window(self) -> int:
+        return int(getattr(settings, 'REVENUE_FORECAST_HISTORY_DAYS', 365))
+
+    def _key(self, series: str) -> str:
+        return f'{CACHE_PREFIX}:{series}'
+
+    def fits(self, series: Iterable[str], today: Optional[date] = None) -> Dict[str, SeriesFit]:
+        """Fits for ``series``, brought up to the last closed day (yesterday)"""
+        series = list(dict.fromkeys(series))
+        last_closed = (today or timezone.localdate()) - timedelta(days=1)
+        cached = self.cache.get_many([self._key(s) for s in series])
+        fits, stale = {}, {}
+        for name in series:
+            fit = cached.get(self._key(name))
+            if fit is None or fit.window != self.window or fit.through is None or fit.through > last_closed:
+                fit = SeriesFit(origin=last_closed - timedelta(days=self.window - 1), window=self.window)
+            fits[name] = fit
+            if fit.through != last_closed:
+                stale[name] = fit
+        if stale:
+            self._refresh(stale, last_closed)
+            self.cache.set_many({self._key(name): fit for name, fit in stale.items()}, timeout=None)
+        return fits
+
+    def _refresh(self, stale: Dict[str, SeriesFit], last_closed: date):
+        # Each fit needs the days after its last update, and the days it will
+        # drop from the front of the window; nothing in between is read
+        window_start = last_closed - timedelta(days=self.window - 1)
+        ranges = []
+        for fit in stale.values():
+            if fit.through is None:
+                ranges.append((window_start, last_closed))
+                continue
+            if fit.first < window_start:
+                ranges.append((fit.first, window_start - timedelta(days=1)))
+            ranges.append((fit.through + timedelta(days=1), last_closed))
+        reseller_ids = [int(name.split(':', 1)[1]) for name in stale if name != PLATFORM]
+        rows = self.repository.get_daily_revenue(_merge_ranges(ranges), reseller_ids=reseller_ids,
+                                                 platform=PLATFORM in stale)
+        values: Dict[str, Dict[date, float]] = defaultdict(dict)
+        for row in rows:
+            name = PLATFORM if row['reseller_id'] is None else reseller_series(row['reseller_id'])
+            values[name][row['day']] = float(row['amount'])
+
+        for name, fit in stale.items():
+            fit.extend(last_closed, values[name])
+            fit.trim(values[name])
+
+    def forecast(self, series: str, method: str, days: int, today: Optional[date] = None) -> Dict[str, Any]:
+        return self.forecast_many([series], method, days, today)[series]
+
+    def forecast_many(self, series: Iterable[str], method: str, days: int,
+                      today: Optional[date] = None) -> Dict[str, Dict[str, Any]]:
+        """Daily forecasts from today for many series, refreshing their fits in one batch"""
+        if method not in METHODS:
+            raise ValueError(f"Unknown forecast method: {method}")
+        today = today or timezone.localdate()
+        results = {}
+        for name, fit in self.fits(series, today).items():
+            points = fit.forecast(method, today, days)
+            results[name] = {
+                'series': name,
+                'method': method,
+                'through': fit.through,
+                'confidence': fit.fit_quality(method),
+                'residual_std': round(fit.residual_std(method), 2),
+                'forecast': [
+                    {'date': day, 'amount': round(value, 2), 'lower': round(max(value - Z_95 * std, 0.0), 2),
+                     'upper': round(value + Z_95 * std, 2)}
+                    for day, value, std in points
+                ],
+                'history': [{'period': month, 'revenue': round(total, 2)} for month, total in sorted(fit.months.items())],
+            }
+        return results
+
+    def monthly_forecast(self, series: str, method: str, months: int, today: Optional[date] = None) -> Dict[str, Any]:
+        """Forecast summed per calendar month for the ``months`` months after the current one"""
+        today = today or timezone.localdate()
+        year, month = today.year, today.month
+        for _ in range(months):
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        horizon_end = date(year, month, calendar.monthrange(year, month)[1])
+        daily = self.forecast(series, method, (horizon_end - today).days + 1, today)
+
+        totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+        current_month = today.strftime('%Y-%m')
+        std_by_day = {}
+        for point in daily['forecast']:
+            period = point['date'].strftime('%Y-%m')
+            if period == current_month:
+                continue
+            # Interval half-width back to a std; days are treated as independent
+            std_by_day[point['date']] = (point['upper'] - point['amount']) / Z_95
+            totals[period][0] += point['amount']
+            totals[period][1] += std_by_day[point['date']] ** 2
+        forecast = []
+        for period, (amount, variance) in sorted(totals.items()):
+            std = math.sqrt(variance)
+            forecast.append({
+                'period': period,
+                'amount': round(amount, 2),
+                'lower': round(max(amount - Z_95 * std, 0.0), 2),
+                'upper': round(amount + Z_95 * std, 2),
+                'confidence': round(max(0.0, 1 - std / amount), 2) if amount > 0 else 0.0,
+            })
+        return {**daily, 'forecast': forecast}
+
+    def refresh_all(self, today: Optional[date] = None) -> int:
+        """Bring the platform and every reseller fit up to date; returns the number of series"""
+        series = [PLATFORM] + [reseller_series(pk) for pk in Reseller.objects.values_list('pk', flat=True)]
+        return len(self.fits(series, today))
@@ -8,7 +8,9 @@ from typing import Dict, List, Optional, Any
 from django.db import transaction
 from django.contrib.auth import get_user_model
 
+from App.reseller.earnings.models import Invoice
 from App.reseller.earnings.services.invoice_service import InvoiceService
+from App.reseller.earnings.services.invoice_pdf_service import InvoicePdfService
 from App.admin.repositories.invoices_repository import InvoicesRepository
 
 User = get_user_model()
@@ -19,6 +21,7 @@ class InvoicesService:
     
     def __init__(self):
         self.reseller_service = InvoiceService()
+        self.pdf_service = InvoicePdfService()
         self.repository = InvoicesRepository()
     
     def get_invoices_list(self, page: int = 1, page_size: int = 25, 
@@ -150,9 +153,18 @@ class InvoicesService:
             raise Exception(f"Error regenerating invoices: {str(e)}")
     
     def get_invoice_pdf(self, invoice_id: int) -> Optional[Dict[str, Any]]:
-        """Get invoice PDF data"""
+        """Get the cached invoice PDF, rendering it only if the invoice changed"""
         try:
-            return self.reseller_service.generate_pdf(invoice_id)
+            invoice = Invoice.objects.select_related('reseller__user').filter(pk=invoice_id).first()
+            if invoice is None:
+                return None
+            name, digest = self.pdf_service.ensure_pdf(invoice)
+            return {
+                'name': name,
+                'etag': digest,
+                'filename': self.pdf_service.filename(invoice),
+                'last_modified': invoice.modified_at,
+            }
         except Exception as e:
             raise Exception(f"Error getting invoice PDF: {str(e)}")
     
@@ -5,11 +5,13 @@ from typing import Any, Dict, List, Tuple
 
 from App.admin.repositories.resellers_repository import AdminResellersRepository
 from App.reseller.earnings.services.reseller_service import ResellerService
-from App.reseller.earnings.services import PayoutService
+from App.reseller.earnings.services import LeaderboardService, PayoutService
 from App.reseller.earnings.models.reseller import Reseller
 from App.admin.services.audit_service import AuditService
+from App.reseller import page_cache
 from django.core.mail import send_mail
 from django.conf import settings
+from django.utils import timezone
 from decimal import Decimal
 
 
@@ -19,28 +21,45 @@ class AdminResellerService:
         self.domain_reseller = ResellerService()
 
     def list_resellers(self, filters: Dict[str, Any], page: int = 1, page_size: int = 25) -> Tuple[List[Dict[str, Any]], int]:
-        """Return a list of resellers and total count based on filters."""
-        return self.repo.query_resellers(filters, page=page, page_size=page_size)
+        """Return a list of resellers and total count based on filters.
+        Text searches are ordered by relevance unless an explicit sort is chosen.
+        """
+        order = filters.get('sort') or ('relevance' if (filters.get('q') or '').strip() else '-joined_at')
+        return self.repo.query_resellers(filters, order=order, page=page, page_size=page_size)
 
     def compute_metrics(self) -> Dict[str, Any]:
         """Compute top-of-page metrics for list view."""
         return self.repo.compute_admin_metrics()
 
+    def get_leaderboard(self, period: str = 'month', metric: str = 'sales', limit: int = 10) -> Dict[str, Any]:
+        """Top resellers for a period ('month', 'quarter', 'all_time' or a 'YYYY-MM' / 'YYYY-Qn' key)."""
+        leaderboard = LeaderboardService()
+        key = leaderboard.current_periods().get(period, period)
+        return {'period': key, 'metric': metric, 'results': leaderboard.get_top(key, metric, limit)}
+
+    def _detail_bundle(self, reseller_id: int) -> Dict[str, Any]:
+        return page_cache.fragment(
+            reseller_id, 'admin_detail', lambda: self.repo.get_reseller_detail_bundle(reseller_id),
+            timezone.localdate(),
+        )
+
     def get_reseller_detail(self, reseller_id: int) -> Dict[str, Any]:
-        """Return a detail view model for a reseller."""
-        overview = self.repo.get_reseller_overview(reseller_id)
-        commission_summary = self.repo.get_commission_summary(reseller_id)
-        sales = self.repo.get_reseller_sales(reseller_id)
-        activity = self.repo.get_activity_timeline(reseller_id)
-        chart = self.repo.get_chart_series(reseller_id)
-        vm: Dict[str, Any] = overview.copy()
+        """Return a detail view model for a reseller.
+        Assembled in one pass and cached under the reseller's page cache version, so any
+        commission, invoice, payout, reseller or profile write invalidates it. Logins don't
+        bump that version, so last_login is read live on every call.
+        """
+        bundle = self._detail_bundle(reseller_id)
+        commission_summary = bundle['commission_summary']
+        vm: Dict[str, Any] = bundle['overview'].copy()
         vm.update({
             'pending_commission': commission_summary.get('pending'),
             'monthly_commission': commission_summary.get('monthly_commission'),
             'yearly_commission': commission_summary.get('yearly_commission'),
-            'sales': sales,
-            'activity': activity,
-            'chart_series': chart,
+            'sales': bundle['sales'],
+            'activity': bundle['activity'],
+            'chart_series': bundle['chart_series'],
+            'last_login': self.repo.get_last_login(reseller_id),
         })
         return vm
 
@@ -164,7 +183,10 @@ class AdminResellerService:
         return rows
 
     def get_chart_series(self, reseller_id: int) -> Dict[str, Any]:
-        return self.repo.get_chart_series(reseller_id)
+        try:
+            return self._detail_bundle(reseller_id)['chart_series']
+        except Reseller.DoesNotExist:
+            return {'labels': [], 'values': []}
 
     def handle_bulk_action(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform bulk action across reseller_ids."""
@@ -187,6 +209,8 @@ class AdminResellerService:
             for rid in ids:
                 Reseller.objects.filter(id=rid).update(is_active=False)
                 processed += 1
+            # Queryset updates send no signals
+            page_cache.bump(*ids)
         elif action == 'set_tier':
             # Map UI tiers to domain tiers
             tier = (data.get('tier') or '').lower()
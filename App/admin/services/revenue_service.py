@@ -9,6 +9,7 @@ from typing import Dict, List, Optional, Any
 import statistics
 
 from App.admin.repositories.revenue_repository import RevenueRepository
+from App.admin.services.forecast_service import PLATFORM, ForecastService, reseller_series
 
 
 class RevenueService:
@@ -29,49 +30,73 @@ class RevenueService:
             Dictionary containing revenue metrics
         """
         try:
-            # Get raw metrics from repository
-            metrics = self.repository.get_revenue_metrics(start_date, end_date)
-            
-            # Calculate derived metrics using Decimal to avoid float issues
-            total_revenue = Decimal(metrics.get('total_revenue', 0) or 0)
-            total_days = (end_date - start_date).days or 1
-            
-            # Monthly Recurring Revenue (rough calculation)
-            if total_days < 365:
-                mrr = total_revenue * (Decimal(30) / Decimal(total_days))
-            else:
-                mrr = total_revenue / Decimal(12)
-            
-            # Annual Recurring Revenue
-            arr = mrr * Decimal(12)
-            
-            # Growth rate (comparing to previous period)
-            previous_start = start_date - (end_date - start_date)
-            previous_end = start_date
-            previous_metrics = self.repository.get_revenue_metrics(previous_start, previous_end)
-            previous_revenue = Decimal(previous_metrics.get('total_revenue', 0) or 0)
-            
-            growth_rate = Decimal(0)
-            if previous_revenue > 0:
-                growth_rate = ((total_revenue - previous_revenue) / previous_revenue) * Decimal(100)
-            
-            return {
-                'total_revenue': float(total_revenue),
-                'mrr': float(mrr),
-                'arr': float(arr),
-                'growth_rate': float(growth_rate),
-                'pending_commissions': float(metrics.get('pending_commissions', 0) or 0),
-                'processed_payouts': float(metrics.get('processed_payouts', 0) or 0),
-                'invoice_count': metrics.get('invoice_count', 0) or 0,
-                'avg_invoice_value': float(metrics.get('avg_invoice_value', 0) or 0),
-                'commission_rate': float(metrics.get('avg_commission_rate', 0) or 0),
-                'period_days': total_days,
-                'daily_average': float(total_revenue / Decimal(total_days)) if total_days > 0 else 0
-            }
-            
+            return self.compare_periods(start_date, end_date, 1)[0]
         except Exception as e:
             raise Exception(f"Error calculating revenue metrics: {str(e)}")
     
+    def compare_periods(self, start_date: datetime, end_date: datetime, count: int = 2) -> List[Dict[str, Any]]:
+        """
+        Revenue metrics for a period and the ``count - 1`` equal periods before it
+        
+        Every period's growth rate is measured against the one before it, so
+        ``count + 1`` windows are aggregated; this costs one query per table
+        whatever ``count`` is.
+        
+        Args:
+            start_date: Start date for the current period
+            end_date: End date for the current period
+            count: Number of periods to return, the current one first
+            
+        Returns:
+            List of revenue metric dictionaries, most recent period first
+        """
+        try:
+            length = end_date - start_date
+            windows = [(start_date - length * i, end_date - length * i) for i in range(count + 1)]
+            rows = self.repository.get_period_metrics(windows)
+            return [
+                self._period_metrics(metrics, previous, window)
+                for metrics, previous, window in zip(rows, rows[1:], windows)
+            ]
+        except Exception as e:
+            raise Exception(f"Error comparing revenue periods: {str(e)}")
+    
+    def _period_metrics(self, metrics: Dict[str, Any], previous: Dict[str, Any], window) -> Dict[str, Any]:
+        """Derive MRR, ARR and growth for one period from its raw metrics and the previous period's"""
+        start_date, end_date = window
+        # Calculate derived metrics using Decimal to avoid float issues
+        total_revenue = Decimal(metrics.get('total_revenue', 0) or 0)
+        total_days = (end_date - start_date).days or 1
+        
+        # Monthly Recurring Revenue (rough calculation)
+        if total_days < 365:
+            mrr = total_revenue * (Decimal(30) / Decimal(total_days))
+        else:
+            mrr = total_revenue / Decimal(12)
+        
+        # Annual Recurring Revenue
+        arr = mrr * Decimal(12)
+        
+        # Growth rate (comparing to previous period)
+        previous_revenue = Decimal(previous.get('total_revenue', 0) or 0)
+        growth_rate = Decimal(0)
+        if previous_revenue > 0:
+            growth_rate = ((total_revenue - previous_revenue) / previous_revenue) * Decimal(100)
+        
+        return {
+            'total_revenue': float(total_revenue),
+            'mrr': float(mrr),
+            'arr': float(arr),
+            'growth_rate': float(growth_rate),
+            'pending_commissions': float(metrics.get('pending_commissions', 0) or 0),
+            'processed_payouts': float(metrics.get('processed_payouts', 0) or 0),
+            'invoice_count': metrics.get('invoice_count', 0) or 0,
+            'avg_invoice_value': float(metrics.get('avg_invoice_value', 0) or 0),
+            'commission_rate': float(metrics.get('avg_commission_rate', 0) or 0),
+            'period_days': total_days,
+            'daily_average': float(total_revenue / Decimal(total_days)) if total_days > 0 else 0
+        }
+    
     def get_source_breakdown(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """
         Get revenue breakdown by source (resellers, direct sales, etc.)
@@ -149,88 +174,27 @@ class RevenueService:
         except Exception as e:
             raise Exception(f"Error calculating revenue trends: {str(e)}")
     
-    def get_revenue_forecast(self, periods: int, method: str = 'moving_average') -> Dict[str, Any]:
+    def get_revenue_forecast(self, periods: int, method: str = 'moving_average',
+                             reseller_id: Optional[int] = None) -> Dict[str, Any]:
         """
-        Generate revenue forecast
+        Generate a monthly revenue forecast from the daily revenue series
         
         Args:
-            periods: Number of periods to forecast
-            method: Forecasting method ('moving_average', 'linear_trend')
+            periods: Number of months after the current one to forecast
+            method: Forecasting method ('moving_average', 'linear_trend',
+                'seasonal', 'exponential_smoothing')
+            reseller_id: Forecast one reseller's revenue instead of the platform's
             
         Returns:
             Dictionary containing forecast data
         """
         try:
-            # Get historical data (last 12 periods for forecasting)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=365)
-            
-            historical = self.repository.get_revenue_trends(start_date, end_date, 'monthly')
-            
-            if not historical:
-                return {
-                    'forecast': [],
-                    'historical': [],
-                    'confidence': 0.0,
-                    'method': method
-                }
-            
-            forecast = []
-            
-            if method == 'moving_average':
-                # Simple moving average forecast
-                window_size = min(3, len(historical))
-                if len(historical) >= window_size:
-                    recent_values = [float(h['revenue']) for h in historical[-window_size:]]
-                    avg_value = sum(recent_values) / len(recent_values)
-                    
-                    for i in range(periods):
-                        forecast_date = end_date + timedelta(days=30 * (i + 1))
-                        forecast.append({
-                            'period': forecast_date.strftime('%Y-%m'),
-                            'amount': avg_value,
-                            'confidence': max(0.8 - (i * 0.1), 0.3)  # Decreasing confidence
-                        })
-            
-            elif method == 'linear_trend':
-                # Simple linear trend forecast
-                if len(historical) >= 2:
-                    values = [float(h['revenue']) for h in historical]
-                    n = len(values)
-                    
-                    # Calculate trend line
-                    x_vals = list(range(n))
-                    sum_x = sum(x_vals)
-                    sum_y = sum(values)
-                    sum_xy = sum(x * y for x, y in zip(x_vals, values))
-                    sum_x2 = sum(x * x for x in x_vals)
-                    
-                    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-                    intercept = (sum_y - slope * sum_x) / n
-                    
-                    for i in range(periods):
-                        next_x = n + i
-                        predicted_value = max(0, slope * next_x + intercept)
-                        forecast_date = end_date + timedelta(days=30 * (i + 1))
-                        
-                        forecast.append({
-                            'period': forecast_date.strftime('%Y-%m'),
-                            'amount': predicted_value,
-                            'confidence': max(0.9 - (i * 0.1), 0.4)  # Decreasing confidence
-                        })
-            
-            # Convert historical data for consistency
-            for h in historical:
-                h['revenue'] = float(h['revenue'])
-                h['commissions'] = float(h['commissions'])
-            
-            # Calculate overall confidence based on data quality
-            base_confidence = 0.8 if len(historical) >= 6 else 0.6
-            
+            series = reseller_series(reseller_id) if reseller_id else PLATFORM
+            result = ForecastService().monthly_forecast(series, method, periods)
             return {
-                'forecast': forecast,
-                'historical': historical,
-                'confidence': base_confidence,
+                'forecast': result['forecast'],
+                'historical': result['history'],
+                'confidence': result['confidence'],
                 'method': method
             }
             
@@ -252,8 +216,16 @@ class RevenueService:
             Dictionary containing comparison data
         """
         try:
-            current_metrics = self.get_revenue_metrics(current_start, current_end)
-            comparison_metrics = self.get_revenue_metrics(comparison_start, comparison_end)
+            # Both periods and the windows before them (for their growth rates) in one pass
+            windows = [
+                (current_start, current_end),
+                (current_start - (current_end - current_start), current_start),
+                (comparison_start, comparison_end),
+                (comparison_start - (comparison_end - comparison_start), comparison_start),
+            ]
+            rows = self.repository.get_period_metrics(windows)
+            current_metrics = self._period_metrics(rows[0], rows[1], windows[0])
+            comparison_metrics = self._period_metrics(rows[2], rows[3], windows[2])
             
             # Calculate changes
             revenue_change = current_metrics['total_revenue'] - comparison_metrics['total_revenue']
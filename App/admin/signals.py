@@ -0,0 +1,46 @@
+"""
+Admin signal handlers
+Keep admin-side denormalized data in sync with the domain models
+"""
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from App.reseller.earnings.models.reseller import Reseller
+from .repositories.reseller_search_repository import ResellerSearchRepository
+from .services.audit_buffer import audit_buffer
+
+User = get_user_model()
+
+# User fields that feed the reseller search document
+USER_SEARCH_FIELDS = {'username', 'email', 'first_name', 'last_name'}
+RESELLER_SEARCH_FIELDS = {'company_name', 'referral_code', 'user'}
+
+
+def _touches(update_fields, relevant):
+    return update_fields is None or bool(relevant & set(update_fields))
+
+
+@receiver(post_save, sender=Reseller, dispatch_uid='reseller_search_index_reseller')
+def index_reseller_on_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches(update_fields, RESELLER_SEARCH_FIELDS):
+        return
+    ResellerSearchRepository().index(instance)
+
+
+@receiver(post_save, sender=User, dispatch_uid='reseller_search_index_user')
+def index_reseller_on_user_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # Logins save last_login only; skip those
+    if raw or created or not _touches(update_fields, USER_SEARCH_FIELDS):
+        return
+    reseller = Reseller.objects.filter(user=instance).first()
+    if reseller is not None:
+        reseller.user = instance
+        ResellerSearchRepository().index(reseller)
+
+
+@receiver(request_finished, dispatch_uid='admin_audit_buffer_flush')
+def flush_audit_buffer(sender, **kwargs):
+    if len(audit_buffer):
+        audit_buffer.flush()
@@ -0,0 +1,75 @@
+"""
+Tests for the reseller full-text search index
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from ...models.reseller_search import ResellerSearchDocument
+from ...repositories.resellers_repository import AdminResellersRepository
+from ...repositories.reseller_search_repository import ResellerSearchRepository
+from App.reseller.earnings.models.reseller import Reseller
+
+User = get_user_model()
+
+
+class ResellerSearchTestCase(TestCase):
+    def setUp(self):
+        self.repo = AdminResellersRepository()
+        self.alice = self._reseller('alice', 'Alice', 'Wanjiru', 'alice@acme.co.ke', 'Acme Traders', 'ACME001')
+        self.bob = self._reseller('bob', 'Bob', 'Otieno', 'bob@example.com', 'Otieno Hardware', 'OTI555')
+        self.carol = self._reseller('carol', 'Carol', 'Acheng', 'carol@example.com', None, 'CAR777')
+
+    def _reseller(self, username, first, last, email, company, code):
+        user = User.objects.create_user(username=username, email=email, password='x', first_name=first, last_name=last)
+        return Reseller.objects.create(user=user, company_name=company, referral_code=code)
+
+    def _search(self, q, order='relevance'):
+        rows, total = self.repo.query_resellers({'q': q}, order=order)
+        return [r['id'] for r in rows], total
+
+    def test_documents_created_on_save(self):
+        doc = ResellerSearchDocument.objects.get(reseller=self.alice)
+        self.assertIn('acme', doc.document.split())
+        self.assertIn('wanjiru', doc.document.split())
+
+    def test_native_engine_selected(self):
+        expected = {'sqlite': 'fts5', 'postgresql': 'postgres'}.get(connection.vendor, 'like')
+        self.assertEqual(ResellerSearchRepository().engine(), expected)
+
+    def test_prefix_matching_across_fields(self):
+        self.assertEqual(self._search('wanj')[0], [self.alice.id])
+        self.assertEqual(self._search('oti55')[0], [self.bob.id])
+        self.assertEqual(set(self._search('example.com')[0]), {self.bob.id, self.carol.id})
+
+    def test_all_tokens_must_match(self):
+        self.assertEqual(self._search('bob otieno')[0], [self.bob.id])
+        self.assertEqual(self._search('bob acme'), ([], 0))
+
+    def test_ranked_results(self):
+        # "otieno" appears in both last name and company for Bob
+        self.carol.user.last_name = 'Otieno'
+        self.carol.user.save()
+        ids, total = self._search('otieno')
+        self.assertEqual(total, 2)
+        self.assertEqual(ids[0], self.bob.id)
+
+    def test_user_changes_resync_document(self):
+        self.carol.user.email = 'carol@newmail.io'
+        self.carol.user.save()
+        self.assertEqual(self._search('newmail')[0], [self.carol.id])
+        self.assertEqual(self._search('carol@example')[0], [])
+
+    def test_deleted_reseller_leaves_index(self):
+        self.bob.user.delete()
+        self.assertEqual(self._search('otieno')[0], [])
+
+    def test_rebuild_after_bulk_create(self):
+        user = User.objects.create_user(username='dave', password='x')
+        Reseller.objects.bulk_create([Reseller(user=user, referral_code='DAVE01')])
+        self.assertEqual(self._search('dave01')[0], [])
+        ResellerSearchRepository().rebuild()
+        self.assertEqual(len(self._search('dave01')[0]), 1)
+
+    def test_punctuation_only_query_matches_nothing(self):
+        self.assertEqual(self._search('@@'), ([], 0))
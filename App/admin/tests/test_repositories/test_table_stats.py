@@ -0,0 +1,64 @@
+"""
+Tests for the metadata-based table statistics repository
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ...repositories.dashboard_repository import DashboardRepository
+from ...repositories.table_stats_repository import TableStatsRepository
+
+User = get_user_model()
+
+
+class TableStatsRepositoryTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.repository = TableStatsRepository()
+        for i in range(3):
+            User.objects.create_user(username=f'stats{i}', password='x')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_snapshot_avoids_count_scans(self):
+        with CaptureQueriesContext(connection) as ctx:
+            snapshot = self.repository.get_snapshot()
+        self.assertFalse(any('COUNT(' in q['sql'].upper() for q in ctx.captured_queries))
+        rows = {table: n for _, table, n in snapshot['table_rows']}
+        self.assertGreaterEqual(rows.get('auth_user', 0), 3)
+
+    def test_analyze_uses_sqlite_stat1(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite specific')
+        self.repository.analyze()
+        snapshot = self.repository.refresh()
+        rows = {table: n for _, table, n in snapshot['table_rows']}
+        self.assertEqual(rows.get('auth_user'), 3)
+
+    def test_cached_snapshot_served_without_queries(self):
+        self.repository.get_snapshot()
+        with CaptureQueriesContext(connection) as ctx:
+            self.repository.get_snapshot()
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_stale_snapshot_refreshes_in_background(self):
+        snapshot = self.repository.get_snapshot()
+        snapshot['refreshed_at'] = timezone.now() - timedelta(hours=1)
+        cache.set(self.repository._cache_key(), snapshot)
+        with patch.object(TableStatsRepository, 'refresh_in_background') as bg:
+            stale = self.repository.get_snapshot()
+        bg.assert_called_once()
+        self.assertEqual(stale['refreshed_at'], snapshot['refreshed_at'])
+
+    def test_system_metrics_reads_snapshot(self):
+        metrics = DashboardRepository().get_system_metrics()
+        self.assertIn('table_rows', metrics)
+        self.assertIn('database_size', metrics)
+        self.assertIsNotNone(metrics['stats_refreshed_at'])
@@ -0,0 +1,110 @@
+"""
+Tests for the buffered audit writer and the audit archive
+"""
+import gzip
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.signals import request_finished
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ...models.audit_log import AuditLog
+from ...repositories.audit_archive_repository import AuditArchiveRepository
+from ...services.audit_buffer import audit_buffer
+from ...services.audit_service import AuditService
+
+User = get_user_model()
+
+
+@override_settings(AUDIT_BUFFER_SIZE=3, AUDIT_BUFFER_MAX_AGE=60, AUDIT_SYNC_ACTIONS=['payout'])
+class AuditBufferTests(TestCase):
+    def setUp(self):
+        audit_buffer.discard()
+        self.service = AuditService()
+
+    def tearDown(self):
+        audit_buffer.discard()
+
+    def test_entries_are_bulk_written_when_buffer_fills(self):
+        with self.assertNumQueries(0), self.captureOnCommitCallbacks(execute=True):
+            self.service.log(action='edit', actor_id=None, target_type='reseller', target_id=1)
+            self.service.log(action='edit', actor_id=None, target_type='reseller', target_id=2)
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+            self.service.log(action='edit', actor_id=None, target_type='reseller', target_id=3)
+        self.assertEqual(AuditLog.objects.count(), 3)
+        self.assertEqual(len(audit_buffer), 0)
+
+    def test_request_end_flushes_pending_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.log(action='export', actor_id=None, target_type='reseller', target_id='list')
+        self.assertEqual(AuditLog.objects.count(), 0)
+        request_finished.send(sender=self.__class__)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_entries_from_a_rolled_back_transaction_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    entry = self.service.log(action='edit', actor_id=None, target_id=1)
+                    raise ValueError
+            except ValueError:
+                pass
+            self.service.log(action='edit', actor_id=None, target_id=2)
+        self.assertIsNone(entry.pk)
+        self.service.flush()
+        self.assertEqual(list(AuditLog.objects.values_list('target_id', flat=True)), ['2'])
+
+    def test_sync_actions_are_written_immediately_after_pending_ones(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.log(action='edit', actor_id=None, target_id=1)
+        entry = self.service.log(action='payout', actor_id=None, target_id=2)
+        self.assertIsNotNone(entry.pk)
+        self.assertEqual(list(AuditLog.objects.order_by('id').values_list('action', flat=True)), ['edit', 'payout'])
+
+    def test_created_at_records_when_the_action_was_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            logged = self.service.log(action='edit', actor_id=None, target_id=1)
+        self.service.flush()
+        self.assertEqual(AuditLog.objects.get().created_at, logged.created_at)
+
+
+class AuditArchiveTests(TestCase):
+    def setUp(self):
+        audit_buffer.discard()
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        self.admin = User.objects.create_user(username='auditor', password='x', is_staff=True)
+        now = timezone.now()
+        for days_ago, action in [(400, 'suspend'), (400, 'edit'), (200, 'export'), (5, 'edit')]:
+            AuditLog.objects.create(
+                action=action, actor=self.admin, target_type='reseller', target_id=str(days_ago),
+                created_at=now - timedelta(days=days_ago),
+            )
+
+    def test_archive_moves_old_rows_into_daily_gzip_partitions(self):
+        with override_settings(AUDIT_ARCHIVE_DIR=self.archive_dir):
+            call_command('archive_audit_logs', '--days', '180', '--batch-size', '2', stdout=tempfile.TemporaryFile('w+'))
+
+        self.assertEqual(list(AuditLog.objects.values_list('target_id', flat=True)), ['5'])
+        repo = AuditArchiveRepository(self.archive_dir)
+        days = repo.partitions()
+        self.assertEqual(len(days), 2)
+        with gzip.open(repo.partition_path(days[-1]), 'rt') as fh:
+            self.assertEqual(len(fh.readlines()), 2)
+
+    def test_search_spans_live_table_and_archive(self):
+        with override_settings(AUDIT_ARCHIVE_DIR=self.archive_dir, AUDIT_RETENTION_DAYS=180):
+            AuditArchiveRepository().archive_before(timezone.now() - timedelta(days=180))
+            results = AuditService().search(actor_id=self.admin.id, action='edit')
+            self.assertEqual([(r['target_id'], r['archived']) for r in results], [('5', False), ('400', True)])
+
+            recent = AuditService().search(start=timezone.now() - timedelta(days=30))
+            self.assertEqual([r['target_id'] for r in recent], ['5'])
+
+            suspended = AuditService().search(action='suspend', start=timezone.now() - timedelta(days=500))
+            self.assertEqual(suspended[0]['actor_id'], self.admin.id)
@@ -0,0 +1,112 @@
+"""
+Tests for the dashboard bootstrap service and endpoint
+"""
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ...services.dashboard_bootstrap_service import DashboardBootstrapService
+
+User = get_user_model()
+
+BOOTSTRAP_URL = '/platform/admin/api/v1/dashboard/bootstrap/'
+
+
+# Worker threads open their own connections and cannot see TestCase's
+# uncommitted rows, so single-transaction tests evaluate sections inline
+class DashboardBootstrapServiceTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = DashboardBootstrapService(workers=1)
+        User.objects.create_user(username='staff', password='x', is_staff=True)
+        User.objects.create_user(username='member', password='x')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_sections_report_cache_status_and_timing(self):
+        first = self.service.build(['counts', 'system_status'])
+        counts = first['sections']['counts']
+        self.assertEqual(counts['status'], 'ok')
+        self.assertEqual(counts['cache'], 'miss')
+        self.assertEqual(counts['data']['users'], 2)
+        self.assertEqual(counts['data']['admins'], 1)
+        self.assertIn('elapsed_ms', counts)
+        self.assertEqual(first['sections']['system_status']['cache'], 'bypass')
+
+        second = self.service.build(['counts'])
+        self.assertEqual(second['sections']['counts']['cache'], 'hit')
+        self.assertEqual(self.service.build(['counts'], refresh=True)['sections']['counts']['cache'], 'miss')
+
+    def test_failing_section_does_not_fail_others(self):
+        with patch.object(DashboardBootstrapService, '_quick_stats', side_effect=RuntimeError('boom')):
+            payload = self.service.build(['quick_stats', 'counts'])
+        self.assertEqual(payload['sections']['quick_stats']['status'], 'error')
+        self.assertEqual(payload['sections']['quick_stats']['error'], 'boom')
+        self.assertEqual(payload['sections']['counts']['status'], 'ok')
+
+    def test_unknown_section_rejected(self):
+        with self.assertRaises(ValueError):
+            self.service.build(['counts', 'nope'])
+
+    @override_settings(DASHBOARD_BOOTSTRAP_WORKERS=1)
+    def test_endpoint_merges_sections(self):
+        self.client.force_login(User.objects.get(username='staff'))
+        response = self.client.get(BOOTSTRAP_URL, {'sections': 'counts,recent_activities'})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(set(body['sections']), {'counts', 'recent_activities'})
+        self.assertEqual(body['sections']['counts']['data']['users'], 2)
+
+        response = self.client.get(BOOTSTRAP_URL, {'sections': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(DASHBOARD_BOOTSTRAP_WORKERS=1)
+    def test_endpoint_validates_and_clamps_limit_and_days(self):
+        self.client.force_login(User.objects.get(username='staff'))
+        for params in ({'limit': 'abc'}, {'days': '1.5'}):
+            response = self.client.get(BOOTSTRAP_URL, {'sections': 'counts', **params})
+            self.assertEqual(response.status_code, 400)
+
+        with patch.object(DashboardBootstrapService, 'build', return_value={'sections': {}}) as build:
+            self.client.get(BOOTSTRAP_URL, {'limit': '0', 'days': '9999'})
+            self.client.get(BOOTSTRAP_URL, {'limit': '500', 'days': '-3'})
+        self.assertEqual([(c.args[1]['limit'], c.args[1]['days']) for c in build.call_args_list], [(1, 365), (50, 1)])
+
+
+@override_settings(DASHBOARD_BOOTSTRAP_WORKERS=4)
+class DashboardBootstrapConcurrencyTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_sections_run_in_parallel(self):
+        def slow(service, params):
+            time.sleep(0.2)
+            return {'ok': True}
+
+        with patch.object(DashboardBootstrapService, '_quick_stats', slow), \
+                patch.object(DashboardBootstrapService, '_growth_trends', slow), \
+                patch.object(DashboardBootstrapService, '_system_status', slow):
+            payload = DashboardBootstrapService(workers=4).build(
+                ['quick_stats', 'growth_trends', 'system_status', 'counts']
+            )
+
+        self.assertTrue(all(s['status'] == 'ok' for s in payload['sections'].values()))
+        # Three 200ms sections: roughly the slowest one, not their sum
+        self.assertLess(payload['elapsed_ms'], 500)
+
+    def test_slow_section_times_out(self):
+        def stuck(service, params):
+            time.sleep(0.5)
+            return {}
+
+        with patch.object(DashboardBootstrapService, '_system_status', stuck):
+            payload = DashboardBootstrapService(workers=4, timeout=0.1).build(['system_status', 'counts'])
+        self.assertEqual(payload['sections']['system_status']['status'], 'timeout')
+        self.assertEqual(payload['sections']['counts']['status'], 'ok')
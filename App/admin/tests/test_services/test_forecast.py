@@ -0,0 +1,133 @@
+"""
+Tests for the revenue forecast service
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from App.reseller.earnings.models.base import InvoiceStatusChoices
+from App.reseller.earnings.models.invoice import Invoice
+from App.reseller.earnings.models.reseller import Reseller
+
+from ...services.forecast_service import METHODS, PLATFORM, ForecastService, reseller_series
+
+User = get_user_model()
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+
+TODAY = date(2026, 3, 2)  # a Monday
+
+
+@override_settings(CACHES=TEST_CACHES, REVENUE_FORECAST_HISTORY_DAYS=56)
+class ForecastServiceTestCase(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.resellers = [
+            Reseller.objects.create(user=User.objects.create_user(username=f'r{i}'), referral_code=f'FC{i}')
+            for i in range(3)
+        ]
+
+    def pay(self, reseller, day, amount):
+        Invoice.objects.create(
+            reseller=reseller, invoice_number=f'INV-{reseller.pk}-{day:%Y%m%d}',
+            period_start=day, period_end=day, subtotal=amount, tax_amount=0, total_amount=amount,
+            status=InvoiceStatusChoices.PAID, due_date=day, payment_date=day,
+        )
+
+    def fill(self, reseller, days, value, until=TODAY):
+        for offset in range(1, days + 1):
+            day = until - timedelta(days=offset)
+            self.pay(reseller, day, Decimal(value(day)))
+
+    def test_linear_trend_and_seasonal_recover_the_series(self):
+        origin = TODAY - timedelta(days=100)
+        self.fill(self.resellers[0], 70, lambda d: 100 + 2 * (d - origin).days)
+        self.fill(self.resellers[1], 70, lambda d: 500 if d.weekday() == 4 else 100)
+
+        service = ForecastService()
+        trend = service.forecast(reseller_series(self.resellers[0].pk), 'linear_trend', 7, TODAY)
+        expected = 100 + 2 * (TODAY - origin).days
+        self.assertAlmostEqual(trend['forecast'][0]['amount'], expected, places=2)
+        self.assertAlmostEqual(trend['residual_std'], 0, places=2)
+        self.assertEqual(trend['confidence'], 1.0)
+
+        weekly = service.forecast(reseller_series(self.resellers[1].pk), 'seasonal', 7, TODAY)
+        by_weekday = {point['date'].weekday(): point['amount'] for point in weekly['forecast']}
+        self.assertAlmostEqual(by_weekday[4], 500, places=2)
+        self.assertAlmostEqual(by_weekday[0], 100, places=2)
+
+        for method in METHODS:
+            for point in service.forecast(PLATFORM, method, 3, TODAY)['forecast']:
+                self.assertLessEqual(point['lower'], point['amount'])
+                self.assertLessEqual(point['amount'], point['upper'])
+        with self.assertRaises(ValueError):
+            service.forecast(PLATFORM, 'arima', 3, TODAY)
+
+    def test_incremental_refresh_matches_a_full_refit(self):
+        reseller = self.resellers[0]
+        self.fill(reseller, 80, lambda d: 50 + (d.day * 7) % 31 + (40 if d.weekday() == 2 else 0))
+        series = reseller_series(reseller.pk)
+        ForecastService().fits([series], TODAY)
+
+        later = TODAY + timedelta(days=10)
+        for offset in range(10):
+            self.pay(reseller, TODAY + timedelta(days=offset), Decimal(60 + offset))
+        service = ForecastService()
+        with self.assertNumQueries(1), patch.object(service.repository, 'get_daily_revenue',
+                                                    wraps=service.repository.get_daily_revenue) as read:
+            incremental = service.fits([series], later)[series]
+        # Only the days leaving the window and the days closed since
+        window_start = later - timedelta(days=56)
+        self.assertEqual(read.call_args.args[0], [
+            (window_start - timedelta(days=10), window_start - timedelta(days=1)),
+            (TODAY, later - timedelta(days=1)),
+        ])
+        with self.assertNumQueries(0):
+            ForecastService().fits([series], later)
+
+        caches['shared'].clear()
+        full = ForecastService().fits([series], later)[series]
+        self.assertEqual(incremental.first, full.first)
+        self.assertEqual(dict(incremental.months), dict(full.months))
+        for method in ('linear_trend', 'seasonal'):
+            for a, b in zip(incremental.forecast(method, later, 14), full.forecast(method, later, 14)):
+                self.assertAlmostEqual(a[1], b[1], places=6)
+                self.assertAlmostEqual(a[2], b[2], places=6)
+        # The smoothing models' error history predates the window; their values agree
+        self.assertEqual(incremental.forecast('moving_average', later, 1)[0][1],
+                         full.forecast('moving_average', later, 1)[0][1])
+
+    def test_all_resellers_refresh_in_one_query(self):
+        for i, reseller in enumerate(self.resellers):
+            self.fill(reseller, 20, lambda d, i=i: 10 * (i + 1))
+        service = ForecastService()
+        with self.assertNumQueries(2):  # reseller ids, then daily revenue
+            self.assertEqual(service.refresh_all(TODAY), 4)
+
+        names = [reseller_series(r.pk) for r in self.resellers]
+        with self.assertNumQueries(0):
+            results = service.forecast_many([PLATFORM] + names, 'moving_average', 1, TODAY)
+        # Days without paid invoices count as zero revenue
+        self.assertAlmostEqual(results[names[2]]['forecast'][0]['amount'], 30 * 20 / 28, places=2)
+        self.assertAlmostEqual(results[PLATFORM]['forecast'][0]['amount'], 60 * 20 / 28, places=2)
+
+    def test_monthly_forecast_endpoint(self):
+        self.fill(self.resellers[0], 56, lambda d: 100, until=timezone.localdate())
+        staff = User.objects.create_user(username='staff', password='x', is_staff=True)
+        self.client.force_login(staff)
+        url = '/platform/admin/api/v1/finance/revenue/forecast/'
+        response = self.client.get(url, {'periods': 2, 'method': 'exponential_smoothing'})
+        data = response.json()['data']
+        self.assertEqual(len(data['forecast']), 2)
+        self.assertEqual(data['chart_data']['labels'], [f['period'] for f in data['forecast']])
+        self.assertEqual(sum(h['revenue'] for h in data['historical']), 5600)
+
+        self.assertEqual(self.client.get(url, {'method': 'arima'}).status_code, 400)
@@ -0,0 +1,85 @@
+"""
+Tests for the admin reseller detail bundle
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from App.reseller import page_cache
+from App.reseller.earnings.models.commission import Commission
+from App.reseller.earnings.models.reseller import Reseller
+
+from ...repositories.resellers_repository import AdminResellersRepository
+from ...services.resellers_service import AdminResellerService
+
+User = get_user_model()
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ResellerDetailBundleTestCase(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        user = User.objects.create_user(username='detail', first_name='Dee', last_name='Tail')
+        self.reseller = Reseller.objects.create(user=user, referral_code='DET1', pending_commission=Decimal('42.50'))
+        now = timezone.now()
+        for i, days in enumerate([0, 1, 40, 100, 200, 300, 420]):
+            commission = Commission.objects.create(
+                reseller=self.reseller, transaction_reference=f'DET-{i}', client_name=f'Client {i}',
+                product_name='Payroll Basic', sale_amount=Decimal('1000'), commission_rate=Decimal('10'),
+                amount=Decimal(10 + i),
+            )
+            Commission.objects.filter(pk=commission.pk).update(calculation_date=now - timedelta(days=days))
+
+    def test_bundle_matches_separate_queries(self):
+        repo = AdminResellersRepository()
+        with self.assertNumQueries(3):
+            bundle = repo.get_reseller_detail_bundle(self.reseller.id)
+        rid = self.reseller.id
+        self.assertEqual(bundle['overview'], repo.get_reseller_overview(rid))
+        self.assertEqual(bundle['commission_summary'], repo.get_commission_summary(rid))
+        self.assertEqual(bundle['sales'], repo.get_reseller_sales(rid))
+        self.assertEqual(bundle['activity'], repo.get_activity_timeline(rid))
+        self.assertEqual(bundle['chart_series']['values'][-1], repo.get_chart_series(rid)['values'][-1])
+        self.assertEqual(sum(bundle['chart_series']['values']), 6)
+
+    def test_detail_is_cached_until_a_write(self):
+        service = AdminResellerService()
+        detail = service.get_reseller_detail(self.reseller.id)
+        self.assertEqual(detail['pending_commission'], 42.5)
+        self.assertEqual(detail['name'], 'Dee Tail')
+        # Only the live last_login read
+        with self.assertNumQueries(1):
+            self.assertEqual(service.get_reseller_detail(self.reseller.id), detail)
+        with self.assertNumQueries(0):
+            self.assertEqual(service.get_chart_series(self.reseller.id), detail['chart_series'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Commission.objects.create(
+                reseller=self.reseller, transaction_reference='DET-new', client_name='New client',
+                product_name='Payroll Pro', sale_amount=Decimal('500'), commission_rate=Decimal('10'),
+                amount=Decimal('50'),
+            )
+        refreshed = service.get_reseller_detail(self.reseller.id)
+        self.assertEqual(refreshed['sales'][0]['business'], 'New client')
+        self.assertEqual(refreshed['monthly_commission'], detail['monthly_commission'] + 50)
+
+    def test_login_shows_without_invalidating_the_detail(self):
+        service = AdminResellerService()
+        self.assertIsNone(service.get_reseller_detail(self.reseller.id)['last_login'])
+        version = page_cache.version(self.reseller.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user_logged_in.send(sender=User, request=None, user=self.reseller.user)
+        self.assertEqual(page_cache.version(self.reseller.id), version)
+        self.reseller.user.refresh_from_db()
+        self.assertEqual(service.get_reseller_detail(self.reseller.id)['last_login'], self.reseller.user.last_login)
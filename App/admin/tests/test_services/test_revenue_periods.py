@@ -0,0 +1,66 @@
+"""
+Tests for multi-period revenue comparisons
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from App.reseller.earnings.models.base import InvoiceStatusChoices
+from App.reseller.earnings.models.invoice import Invoice
+from App.reseller.earnings.models.reseller import Reseller
+
+from ...services.dashboard_service import DashboardService
+from ...services.revenue_service import RevenueService
+
+User = get_user_model()
+
+
+class RevenuePeriodComparisonTestCase(TestCase):
+    def setUp(self):
+        self.reseller = Reseller.objects.create(user=User.objects.create_user(username='r'), referral_code='PER1')
+        self.end = timezone.make_aware(datetime(2026, 6, 30, 12))
+
+    def pay(self, day, amount, status=InvoiceStatusChoices.PAID):
+        Invoice.objects.create(
+            reseller=self.reseller, invoice_number=f'INV-{day:%Y%m%d}-{amount}',
+            period_start=day, period_end=day, subtotal=amount, tax_amount=0, total_amount=amount,
+            status=status, due_date=day, payment_date=day,
+        )
+
+    def test_periods_share_one_query_per_table(self):
+        # One paid invoice in each of the last four 30-day windows, growing by 100 each time
+        for i, amount in enumerate([400, 300, 200, 100]):
+            self.pay((self.end - timedelta(days=30 * i + 10)).date(), Decimal(amount))
+        self.pay((self.end - timedelta(days=5)).date(), Decimal(999), status=InvoiceStatusChoices.SENT)
+
+        service = RevenueService()
+        start = self.end - timedelta(days=30)
+        with self.assertNumQueries(3):
+            periods = service.compare_periods(start, self.end, 3)
+        self.assertEqual([p['total_revenue'] for p in periods], [400.0, 300.0, 200.0])
+        self.assertAlmostEqual(periods[0]['growth_rate'], 100 / 3)
+        self.assertEqual(periods[2]['growth_rate'], 100.0)
+        self.assertEqual(periods[0]['mrr'], 400.0)
+        self.assertEqual(periods[0]['arr'], 4800.0)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(service.get_revenue_metrics(start, self.end), periods[0])
+        with self.assertNumQueries(3):
+            comparison = service.get_revenue_comparison(start, self.end, start - timedelta(days=30), start)
+        self.assertEqual(comparison['comparison'], periods[1])
+
+    def test_dashboard_growth_rates_from_window_totals(self):
+        today = timezone.localdate()
+        self.pay(today, Decimal(300))
+        self.pay(today - timedelta(days=1), Decimal(200))
+        self.pay(today - timedelta(days=10), Decimal(100))
+
+        with self.assertNumQueries(3):
+            rates = DashboardService()._calculate_growth_rates({'date_range': {'end': timezone.now()}})
+        self.assertEqual(rates['revenue'], {'daily': 0.5, 'weekly': 4.0, 'monthly': 1.0})
+        # One user joined (the reseller), none before it
+        self.assertEqual(rates['users']['monthly'], 1.0)
+        self.assertEqual(rates['businesses']['weekly'], 0.0)
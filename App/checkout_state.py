@@ -0,0 +1,73 @@
+"""
+Checkout and affiliate state kept in signed cookies rather than the session.
+
+The purchase being set up (software, plan, billing, amount...) and the
+affiliate link a visitor arrived through are small, short-lived and not
+secret, so they travel with the browser: setting them writes no session row,
+and an anonymous click through a marketing link no longer creates a session
+at all. Values are signed with SECRET_KEY (tampering makes them read as
+absent) and expire after CHECKOUT_COOKIE_MAX_AGE / AFFILIATE_COOKIE_MAX_AGE.
+
+Reads fall back to the session keys the views used before, so checkouts and
+attributions that started before a deploy still complete.
+"""
+from django.conf import settings
+from django.core import signing
+
+PURCHASE_COOKIE = 'checkout'
+AFFILIATE_COOKIE = 'affiliate'
+PURCHASE_KEYS = ('software', 'plan', 'billing', 'users', 'amount', 'description')
+
+
+def _set(response, name, value, max_age):
+    response.set_cookie(
+        name,
+        signing.dumps(value, salt=f'App.checkout_state.{name}', compress=True),
+        max_age=max_age,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite=settings.SESSION_COOKIE_SAMESITE or 'Lax',
+    )
+
+
+def _get(request, name, max_age):
+    value = request.COOKIES.get(name)
+    if not value:
+        return None
+    try:
+        return signing.loads(value, salt=f'App.checkout_state.{name}', max_age=max_age)
+    except signing.BadSignature:
+        return None
+
+
+def get_purchase(request):
+    """Purchase being checked out as a dict of PURCHASE_KEYS (values None when unset)"""
+    purchase = _get(request, PURCHASE_COOKIE, settings.CHECKOUT_COOKIE_MAX_AGE)
+    if not isinstance(purchase, dict):
+        purchase = {key: request.session.get(f'purchase_{key}') for key in PURCHASE_KEYS}
+    return {key: purchase.get(key) for key in PURCHASE_KEYS}
+
+
+def set_purchase(response, **purchase):
+    _set(response, PURCHASE_COOKIE, {key: purchase.get(key) for key in PURCHASE_KEYS}, settings.CHECKOUT_COOKIE_MAX_AGE)
+
+
+def clear_purchase(request, response):
+    response.delete_cookie(PURCHASE_COOKIE, samesite=settings.SESSION_COOKIE_SAMESITE or 'Lax')
+    for key in PURCHASE_KEYS:
+        if f'purchase_{key}' in request.session:
+            del request.session[f'purchase_{key}']
+
+
+def get_affiliate(request):
+    """(code, reseller_id) of the marketing link that brought the visitor, or (None, None)"""
+    affiliate = _get(request, AFFILIATE_COOKIE, settings.AFFILIATE_COOKIE_MAX_AGE)
+    if isinstance(affiliate, dict):
+        return affiliate.get('code'), affiliate.get('reseller_id')
+    # Pre-signed-cookie visitors: session attribution, then the plain affiliate_code cookie
+    code = request.session.get('affiliate_code') or request.COOKIES.get('affiliate_code')
+    return code, request.session.get('affiliate_reseller_id')
+
+
+def set_affiliate(response, link):
+    _set(response, AFFILIATE_COOKIE, {'code': link.code, 'reseller_id': link.reseller_id}, settings.AFFILIATE_COOKIE_MAX_AGE)
@@ -0,0 +1,108 @@
+"""
+Read-replica routing for analytics and reports.
+
+Reads go to the primary unless code opts in with ``use_replica``, as a
+decorator (functions, methods or whole repository classes) or a context
+manager; writes always go to the primary. Opted-in reads still use the
+primary when:
+
+- no 'replica' database is configured (DATABASE_REPLICA_URL unset), so
+  development and tests behave as before;
+- the primary is inside a transaction, whose reads must see its own writes;
+- the current request has already written (``ReplicaPinMiddleware``
+  scopes this to one request): replication lag would otherwise hide the
+  write from the rest of it.
+
+The opt-in flag and the pin are context variables, so concurrent requests
+and async tasks never see each other's state. Worker threads start with a
+fresh context; submit work with ``contextvars.copy_context().run`` to carry
+the request's pin into them (see DashboardBootstrapService).
+"""
+import inspect
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = 'replica'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_pinned = ContextVar('pinned_to_primary', default=False)
+
+
+def replica_configured():
+    return REPLICA in connections.settings
+
+
+def pin_to_primary():
+    """Send the rest of this request's (or context's) reads to the primary"""
+    _pinned.set(True)
+
+
+def pinned_to_primary():
+    return _pinned.get()
+
+
+@contextmanager
+def request_scope(pinned=False):
+    """Give one request its own pin state, dropped when it finishes"""
+    token = _pinned.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class use_replica(ContextDecorator):
+    """Route reads inside the block, function or class methods to the replica"""
+
+    def __new__(cls, func=None):
+        if inspect.isclass(func):
+            return _replica_class(func)
+        if func is not None:
+            # Bare @use_replica on a function
+            return cls()(func)
+        return super().__new__(cls)
+
+    def __init__(self, func=None):
+        self._tokens = []
+
+    def _recreate_cm(self):
+        # A fresh instance per call, so one decorated function can run on many threads
+        return type(self)()
+
+    def __enter__(self):
+        self._tokens.append(_replica_reads.set(True))
+        return self
+
+    def __exit__(self, *exc):
+        _replica_reads.reset(self._tokens.pop())
+        return False
+
+
+def _replica_class(cls):
+    for name, attr in list(vars(cls).items()):
+        if name.startswith('__') or not inspect.isfunction(attr):
+            continue
+        setattr(cls, name, use_replica()(attr))
+    return cls
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or _pinned.get() or not replica_configured():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        _pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
@@ -0,0 +1,119 @@
+"""
+Circuit breaker with its state in a shared cache.
+
+The state lives in ``caches['shared']`` (Redis or a host-local file cache, see
+settings.CACHES), so every worker sees the same circuit. One worker tripping
+it stops all of them from sending traffic to a provider that is down.
+
+closed     calls go through; consecutive failures are counted
+open       calls fail immediately until ``reset_timeout`` has passed
+half-open  one caller (whichever wins ``cache.add``) probes the provider;
+           success closes the circuit, failure re-opens it
+"""
+import logging
+import time
+
+import requests
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a provider whose circuit is open.
+
+    Subclasses ConnectionError so existing ``except RequestException``
+    handlers treat it like any other unreachable-provider failure.
+    """
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, cache_alias='shared'):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def _state_key(self):
+        return f"circuit:{self.name}:state"
+
+    @property
+    def _failures_key(self):
+        return f"circuit:{self.name}:failures"
+
+    @property
+    def _probe_key(self):
+        return f"circuit:{self.name}:probe"
+
+    # State --------------------------------------------------------------
+
+    def snapshot(self):
+        """{'state', 'failures', 'opened_at', 'retry_in'} for health reporting"""
+        data = self.cache.get(self._state_key) or {'state': CLOSED, 'opened_at': None}
+        state = data['state']
+        retry_in = 0.0
+        if state == OPEN:
+            retry_in = max(0.0, data['opened_at'] + self.reset_timeout - time.time())
+            if retry_in == 0:
+                state = HALF_OPEN
+        return {
+            'state': state,
+            'failures': self.cache.get(self._failures_key, 0),
+            'opened_at': data['opened_at'],
+            'retry_in': round(retry_in, 1),
+        }
+
+    def allow(self):
+        """Whether a call may go to the provider now"""
+        data = self.cache.get(self._state_key)
+        if not data or data['state'] == CLOSED:
+            return True
+        if time.time() - data['opened_at'] < self.reset_timeout:
+            return False
+        # Half-open: a single probe across all workers; it expires if the prober dies
+        return self.cache.add(self._probe_key, 1, self.reset_timeout)
+
+    def record_success(self):
+        data = self.cache.get(self._state_key)
+        if (not data or data['state'] == CLOSED) and not self.cache.get(self._failures_key):
+            return  # the common case: nothing to reset
+        if data and data['state'] != CLOSED:
+            logger.info('Circuit %s closed', self.name)
+        self.cache.set(self._state_key, {'state': CLOSED, 'opened_at': None}, None)
+        self.cache.delete_many([self._failures_key, self._probe_key])
+
+    def record_failure(self):
+        data = self.cache.get(self._state_key)
+        if data and data['state'] == OPEN:
+            # Failed half-open probe (or a straggler): restart the open period
+            self._open()
+            return
+        self.cache.add(self._failures_key, 0, None)
+        try:
+            failures = self.cache.incr(self._failures_key)
+        except ValueError:
+            failures = 1
+            self.cache.set(self._failures_key, failures, None)
+        if failures >= self.failure_threshold:
+            self._open()
+
+    def reset(self):
+        self.cache.delete_many([self._state_key, self._failures_key, self._probe_key])
+
+    def _open(self):
+        logger.warning('Circuit %s opened for %ss', self.name, self.reset_timeout)
+        self.cache.set(self._state_key, {'state': OPEN, 'opened_at': time.time()}, None)
+        self.cache.delete(self._probe_key)
+
+    # Guarding calls -----------------------------------------------------
+
+    def check(self):
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open; not calling provider")
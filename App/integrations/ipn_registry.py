@@ -0,0 +1,203 @@
+"""
+Per-host registry of Pesapal IPN notification ids.
+
+Each host has one IPN URL (https://<host>/ipn/), and Pesapal gives that URL a
+notification id. The resolved id is stored in PesapalIpnRegistration and in
+the shared cache. Orders read it from there and never scan the IPN list.
+Pesapal is only asked again when it rejects the id as InvalidIpnId, or when
+the registry is warmed with ``manage.py warm_ipn_registry``. Such a refresh is
+single-flight across workers: one caller resolves the id and the others wait
+for its result. The lock is a shared-cache ``add``, which is only atomic across
+processes when the shared cache is Redis; with the file-based fallback two
+workers may occasionally both refresh. The async path does its cache and
+database work in worker threads, never on the event loop.
+"""
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from App.models import PesapalIpnRegistration
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 24 * 3600
+LOCK_TTL = 30
+WAIT_SECONDS = 10
+POLL_SECONDS = 0.2
+
+
+def _cache():
+    return caches['shared']
+
+
+def normalize_host(host):
+    return (host or '').strip().lower()
+
+
+def ipn_url_for(host):
+    return f"https://{normalize_host(host)}/ipn/"
+
+
+def _cache_key(host):
+    return f"pesapal_ipn_v1_{host}"
+
+
+def _lock_key(host):
+    return f"pesapal_ipn_v1_{host}_refresh"
+
+
+def _acquire(host):
+    return _cache().add(_lock_key(host), 1, LOCK_TTL)
+
+
+def _release(host):
+    _cache().delete(_lock_key(host))
+
+
+def _locked(host):
+    return bool(_cache().get(_lock_key(host)))
+
+
+# Lookups (no provider calls) -------------------------------------------
+
+def stored_notification_id(host):
+    """Cached or stored id for the host, or None"""
+    host = normalize_host(host)
+    notification_id = _cache().get(_cache_key(host))
+    if notification_id:
+        return notification_id
+    notification_id = (
+        PesapalIpnRegistration.objects.filter(host=host)
+        .values_list('notification_id', flat=True)
+        .first()
+    )
+    if notification_id:
+        _cache().set(_cache_key(host), notification_id, CACHE_TTL)
+    return notification_id
+
+
+def get_notification_id(host):
+    """Id to send with an order: the registry's, else PESAPAL_NOTIFICATION_ID"""
+    return stored_notification_id(host) or getattr(settings, 'PESAPAL_NOTIFICATION_ID', '') or ''
+
+
+def store(host, notification_id, source):
+    host = normalize_host(host)
+    PesapalIpnRegistration.objects.update_or_create(
+        host=host,
+        defaults={'ipn_url': ipn_url_for(host), 'notification_id': notification_id, 'source': source},
+    )
+    _cache().set(_cache_key(host), notification_id, CACHE_TTL)
+
+
+# Parsing provider responses --------------------------------------------
+
+def find_ipn_id(ipn_json, expected_ipn):
+    if isinstance(ipn_json, list):
+        for item in ipn_json:
+            url = (item.get('url') or item.get('Url') or '').strip()
+            if url.lower() == expected_ipn.lower():
+                found_id = item.get('id') or item.get('Id') or item.get('ipn_id') or item.get('IpnId')
+                if found_id:
+                    return found_id
+    return None
+
+
+def registered_ipn_id(reg_json):
+    if not isinstance(reg_json, dict):
+        return None
+    return reg_json.get('ipn_id') or reg_json.get('IpnId') or reg_json.get('id') or reg_json.get('Id')
+
+
+def _json(response, default):
+    try:
+        return response.json()
+    except Exception:
+        return default
+
+
+# Single-flight refresh -------------------------------------------------
+
+def refresh(host, token, stale_id=None, force=False):
+    """
+    Resolve the host's id from Pesapal (IPN list, else register) and store it.
+
+    ``stale_id`` is the id Pesapal just rejected. If another worker has
+    already replaced it, that id is returned without calling Pesapal.
+    """
+    from . import pesapal_service
+
+    host = normalize_host(host)
+    if not force:
+        current = stored_notification_id(host)
+        if current and current != stale_id:
+            return current
+    if not _acquire(host):
+        return _wait_for_refresh(host, stale_id)
+    try:
+        expected = ipn_url_for(host)
+        found_id = find_ipn_id(_json(pesapal_service.get_registered_ipns(token), []), expected)
+        source = 'list'
+        if not found_id:
+            found_id = registered_ipn_id(_json(pesapal_service.register_ipn_url(token, expected), {}))
+            source = 'register'
+        if found_id:
+            store(host, found_id, source)
+            logger.info(f"[PESAPAL] IPN for {expected} resolved ({source}) -> {found_id}")
+        return found_id
+    finally:
+        _release(host)
+
+
+async def arefresh(host, token, stale_id=None):
+    """Async refresh for the ASGI views, sharing the same lock and storage"""
+    from . import pesapal_async
+
+    host = normalize_host(host)
+    current = await sync_to_async(stored_notification_id)(host)
+    if current and current != stale_id:
+        return current
+    if not await sync_to_async(_acquire, thread_sensitive=False)(host):
+        return await _await_refresh(host, stale_id)
+    try:
+        expected = ipn_url_for(host)
+        found_id = find_ipn_id(_json(await pesapal_async.get_registered_ipns(token), []), expected)
+        source = 'list'
+        if not found_id:
+            found_id = registered_ipn_id(_json(await pesapal_async.register_ipn_url(token, expected), {}))
+            source = 'register'
+        if found_id:
+            await sync_to_async(store)(host, found_id, source)
+            logger.info(f"[PESAPAL] IPN for {expected} resolved ({source}) -> {found_id}")
+        return found_id
+    finally:
+        await sync_to_async(_release, thread_sensitive=False)(host)
+
+
+def _fresh_id(host, stale_id):
+    current = _cache().get(_cache_key(host))
+    return current if current and current != stale_id else None
+
+
+def _wait_for_refresh(host, stale_id):
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_SECONDS)
+        if _fresh_id(host, stale_id) or not _locked(host):
+            break
+    return _fresh_id(host, stale_id)
+
+
+async def _await_refresh(host, stale_id):
+    fresh_id = sync_to_async(_fresh_id, thread_sensitive=False)
+    locked = sync_to_async(_locked, thread_sensitive=False)
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(POLL_SECONDS)
+        if await fresh_id(host, stale_id) or not await locked(host):
+            break
+    return await fresh_id(host, stale_id)
@@ -0,0 +1,128 @@
+"""
+PDF rendering and cached file delivery.
+
+Documents are rendered once with ReportLab, stored in default storage under a
+name that embeds a hash of their content, and served from storage afterwards.
+A changed document hashes differently, so it is re-rendered on next access.
+"""
+import hashlib
+import json
+import re
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, quote_etag
+
+# Bump when the layout changes so every cached PDF is re-rendered
+RENDER_VERSION = 1
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def content_hash(payload):
+    """Stable sha256 of a JSON-serializable document description."""
+    data = json.dumps({'v': RENDER_VERSION, 'doc': payload}, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def render_pdf(title, lines, footer=''):
+    """Render a simple one-column A4 document. ``lines`` are (text, bold) pairs or strings."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4, invariant=1)
+    width, height = A4
+    y = height - 50
+
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(50, y, title)
+    y -= 30
+    for line in lines:
+        text, bold = (line, False) if isinstance(line, str) else line
+        if y < 60:
+            p.showPage()
+            y = height - 50
+        p.setFont("Helvetica-Bold" if bold else "Helvetica", 10)
+        p.drawString(50, y, text)
+        y -= 15
+    if footer:
+        y -= 15
+        p.setFont("Helvetica-Oblique", 9)
+        p.drawString(50, y, footer)
+
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def store_pdf(name, content, storage=None):
+    """Save rendered bytes under ``name`` unless an identical file already exists."""
+    storage = storage or default_storage
+    if storage.exists(name):
+        return name
+    return storage.save(name, ContentFile(content))
+
+
+def serve_pdf(request, name, filename, etag, storage=None, last_modified=None):
+    """
+    Serve a stored PDF with validators and byte-range support.
+
+    Returns 304 when If-None-Match matches, 206 for a satisfiable single
+    range, 416 for an unsatisfiable one and a streamed 200 otherwise.
+    """
+    storage = storage or default_storage
+    etag = quote_etag(etag)
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [t.strip() for t in if_none_match.split(',')] or if_none_match.strip() == '*':
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    size = storage.size(name)
+    range_header = request.headers.get('Range', '')
+    if_range = request.headers.get('If-Range')
+    match = RANGE_RE.match(range_header.strip()) if range_header else None
+    if match and (if_range is None or if_range == etag):
+        start, end = _parse_range(match, size)
+        if start is None:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            response['ETag'] = etag
+            return response
+        with storage.open(name, 'rb') as fh:
+            fh.seek(start)
+            body = fh.read(end - start + 1)
+        response = HttpResponse(body, status=206, content_type='application/pdf')
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        response = FileResponse(storage.open(name, 'rb'), content_type='application/pdf')
+        response['Content-Length'] = size
+
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def _parse_range(match, size):
+    first, last = match.groups()
+    if not first and not last:
+        return None, None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None, None
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None, None
+    return start, end
@@ -0,0 +1,149 @@
+"""
+Non-blocking Pesapal client for the ASGI deployment.
+
+Mirrors the request helpers in ``pesapal_service`` on top of httpx.AsyncClient,
+so a slow provider holds an idle coroutine instead of a worker thread. Responses
+are httpx.Response objects, which expose the same ``status_code``/``json()``/
+``text`` the views already use.
+
+The circuit breaker is shared with the sync client through ``caches['shared']``.
+Its checks are cache round trips (network or file I/O), so they run in a worker
+thread rather than on the event loop. Across hosts, or with several processes,
+the shared cache must be Redis: the file-based fallback's ``add``/``incr`` are
+not atomic between processes, so two workers can both win the half-open probe
+or lose a failure count.
+"""
+import asyncio
+import logging
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .circuit_breaker import CircuitOpenError
+from .pesapal_service import _parse_payment_status, breaker
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = httpx.Timeout(30.0, connect=settings.PESAPAL_CONNECT_TIMEOUT)
+
+# One pooled client per event loop; clients cannot be shared across loops
+_clients = weakref.WeakKeyDictionary()
+
+
+def _base_url():
+    return settings.PESAPAL_BASE_URL
+
+
+def get_client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=TIMEOUT,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers={"Accept": "application/json"},
+        )
+        _clients[loop] = client
+    return client
+
+
+def _off_loop(func):
+    # Breaker state is read and written in the shared cache; no database access
+    return sync_to_async(func, thread_sensitive=False)
+
+
+async def _send(method, url, **kwargs):
+    """Same breaker as the sync client, so both deployments share one circuit"""
+    if not await _off_loop(breaker.allow)():
+        raise CircuitOpenError("pesapal circuit is open; not calling provider")
+    try:
+        response = await get_client().request(method, url, **kwargs)
+    except httpx.HTTPError:
+        await _off_loop(breaker.record_failure)()
+        raise
+    if response.status_code >= 500:
+        await _off_loop(breaker.record_failure)()
+    else:
+        await _off_loop(breaker.record_success)()
+    return response
+
+
+def _auth_headers(access_token):
+    return {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+    }
+
+
+async def generate_access_token():
+    url = f"{_base_url()}/api/Auth/RequestToken"
+    payload = {
+        "consumer_key": settings.PESAPAL_CONSUMER_KEY,
+        "consumer_secret": settings.PESAPAL_CONSUMER_SECRET,
+    }
+    logger.info(f"[PESAPAL] Requesting token from: {url}")
+    try:
+        response = await _send("POST", url, json=payload, headers={"Content-Type": "application/json"})
+        logger.info(f"[PESAPAL] Token response status: {response.status_code}")
+        if response.status_code == 200:
+            token = response.json().get("token")
+            if token:
+                return token
+            logger.error(f"[PESAPAL] Token not found in response: {response.text}")
+        else:
+            logger.error(f"[PESAPAL] Failed to generate token. Status: {response.status_code}")
+            logger.error(f"[PESAPAL] Response: {response.text}")
+    except (httpx.HTTPError, CircuitOpenError) as e:
+        logger.error(f"[PESAPAL] Request error during token generation: {e}")
+    except Exception as e:
+        logger.error(f"[PESAPAL] Unexpected error during token generation: {e}")
+    return None
+
+
+async def register_ipn_url(access_token, ipn_url):
+    url = f"{_base_url()}/api/URLSetup/RegisterIPN"
+    payload = {"url": ipn_url, "ipn_notification_type": "GET"}
+    return await _send("POST", url, json=payload, headers=_auth_headers(access_token))
+
+
+async def get_registered_ipns(access_token):
+    url = f"{_base_url()}/api/URLSetup/GetIpnList"
+    return await _send("GET", url, headers=_auth_headers(access_token))
+
+
+async def submit_order_request(access_token, payload):
+    url = f"{_base_url()}/api/Transactions/SubmitOrderRequest"
+    logger.info(f"[PESAPAL] Submitting order to: {url}")
+    try:
+        response = await _send("POST", url, json=payload, headers=_auth_headers(access_token))
+    except (httpx.HTTPError, CircuitOpenError) as e:
+        logger.error(f"[PESAPAL] Request error during order submission: {e}")
+        raise
+    if response.status_code == 200:
+        logger.info("[PESAPAL] Order submitted successfully")
+    else:
+        logger.error(f"[PESAPAL] Order submission failed. Status: {response.status_code}")
+        logger.error(f"[PESAPAL] Response: {response.text}")
+    return response
+
+
+async def get_transaction_status(access_token, tracking_id, merchant_reference):
+    url = f"{_base_url()}/api/Transactions/GetTransactionStatus"
+    # requests drops None-valued params; httpx would send them empty
+    params = {k: v for k, v in (
+        ("order_tracking_id", tracking_id),
+        ("order_merchant_reference", merchant_reference),
+    ) if v is not None}
+    response = await _send(
+        "GET", url, headers={"Authorization": f"Bearer {access_token}", "Accept": "application/json"}, params=params
+    )
+    try:
+        js = response.json()
+    except Exception:
+        js = {}
+    if response.status_code == 200:
+        return _parse_payment_status(js)
+    return None
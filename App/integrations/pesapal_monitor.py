@@ -0,0 +1,109 @@
+"""
+Cached Pesapal health probe.
+
+A probe requests a token and lists the registered IPNs. The result goes in
+the shared cache, so the health endpoint and the admin status panel answer
+from memory. Once a result is older than PESAPAL_HEALTH_INTERVAL, the next
+read triggers one background probe across all workers. While the circuit
+breaker is open, a probe fails immediately, so a provider outage is reported
+within milliseconds.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from . import pesapal_service
+from .circuit_breaker import CLOSED, OPEN
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY = 'pesapal_health_v1'
+PROBE_LOCK_KEY = 'pesapal_health_v1_probe'
+STATUS_TTL = 24 * 3600
+
+_refresh_lock = threading.Lock()
+
+
+def _cache():
+    return caches['shared']
+
+
+def probe():
+    """Run one live probe and cache its result"""
+    started = time.perf_counter()
+    status = {
+        'checked_at': timezone.now(),
+        'token_ok': False,
+        'ipn_list_ok': False,
+        'ipn_urls': None,
+        'error': None,
+    }
+    try:
+        token = pesapal_service.generate_access_token()
+        status['token_ok'] = bool(token)
+        if token:
+            resp = pesapal_service.get_registered_ipns(token)
+            status['ipn_list_ok'] = resp.status_code == 200
+            try:
+                data = resp.json()
+            except Exception:
+                data = None
+            if isinstance(data, list):
+                status['ipn_urls'] = [(item.get('url') or item.get('Url') or '').strip() for item in data]
+        else:
+            status['error'] = 'Failed to obtain access token; check PESAPAL_CONSUMER_KEY/SECRET and BASE_URL'
+    except Exception as e:
+        status['error'] = str(e)
+    status['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    _cache().set(STATUS_KEY, status, STATUS_TTL)
+    return dict(status, breaker=pesapal_service.breaker.snapshot())
+
+
+def get_status():
+    """Last probe result plus live breaker state; schedules a probe when stale"""
+    status = _cache().get(STATUS_KEY)
+    interval = int(getattr(settings, 'PESAPAL_HEALTH_INTERVAL', 60))
+    if status is None or (timezone.now() - status['checked_at']).total_seconds() >= interval:
+        refresh_in_background()
+    if status is None:
+        status = {
+            'checked_at': None, 'token_ok': False, 'ipn_list_ok': False,
+            'ipn_urls': None, 'error': 'No probe result yet', 'latency_ms': None,
+        }
+    return dict(status, breaker=pesapal_service.breaker.snapshot())
+
+
+def refresh_in_background():
+    """Start one probe thread; no-op if this or another worker is already probing"""
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    if not _cache().add(PROBE_LOCK_KEY, 1, 60):
+        _refresh_lock.release()
+        return False
+
+    def run():
+        try:
+            probe()
+        except Exception:
+            logger.exception('Pesapal health probe failed')
+        finally:
+            _cache().delete(PROBE_LOCK_KEY)
+            _refresh_lock.release()
+
+    threading.Thread(target=run, name='pesapal-health-probe', daemon=True).start()
+    return True
+
+
+def panel_status(status=None):
+    """healthy / warning / error for the admin system status panel"""
+    status = status or get_status()
+    breaker_state = status['breaker']['state']
+    if breaker_state == OPEN:
+        return 'error'
+    if status['checked_at'] is None or breaker_state != CLOSED:
+        return 'warning'
+    return 'healthy' if status['token_ok'] else 'error'
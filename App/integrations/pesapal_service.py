@@ -2,11 +2,40 @@ import requests
 import logging
 from django.conf import settings
 
+from .circuit_breaker import CircuitBreaker
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 BASE_URL = settings.PESAPAL_BASE_URL
 
+# (connect, read) seconds; an unreachable host fails on connect, not after 30s
+TIMEOUT = (settings.PESAPAL_CONNECT_TIMEOUT, 30)
+
+# Shared across workers: once Pesapal is failing, calls fail fast instead of
+# each one waiting out the timeout
+breaker = CircuitBreaker(
+    'pesapal',
+    failure_threshold=settings.PESAPAL_BREAKER_FAILURES,
+    reset_timeout=settings.PESAPAL_BREAKER_RESET_SECONDS,
+)
+
+
+def _send(method, url, **kwargs):
+    """requests call guarded by the breaker; transport errors and 5xx count as failures"""
+    breaker.check()
+    kwargs.setdefault('timeout', TIMEOUT)
+    try:
+        response = requests.request(method, url, **kwargs)
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
 # Authentication-> generate the access token
 def generate_access_token():
     url = f"{BASE_URL}/api/Auth/RequestToken"
@@ -23,7 +52,7 @@ def generate_access_token():
     logger.debug(f"[PESAPAL] Consumer key: {settings.PESAPAL_CONSUMER_KEY[:10]}..." if settings.PESAPAL_CONSUMER_KEY else "[PESAPAL] Consumer key is empty!")
     
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = _send("POST", url, json=payload, headers=headers)
         logger.info(f"[PESAPAL] Token response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -56,7 +85,7 @@ def register_ipn_url(access_token, ipn_url):
         "Accept": "application/json",
         "Content-Type": "application/json"
     }
-    return requests.post(url, json=payload, headers=headers)
+    return _send("POST", url, json=payload, headers=headers)
 
 # Fetch all registered IPNs
 def get_registered_ipns(access_token):
@@ -66,7 +95,7 @@ def get_registered_ipns(access_token):
         "Accept": "application/json",
         "Content-Type": "application/json"
     }
-    return requests.get(url, headers=headers)
+    return _send("GET", url, headers=headers)
 
 # Submit an order and get the redirect URL
 def submit_order_request(access_token, payload):
@@ -83,7 +112,7 @@ def submit_order_request(access_token, payload):
     try:
         # Note: Pesapal payload supports fields documented by the provider.
         # We pass through our description (which may include affiliate markers) as-is.
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = _send("POST", url, json=payload, headers=headers)
         logger.info(f"[PESAPAL] Order submission response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -134,7 +163,7 @@ def get_transaction_status(access_token, tracking_id, merchant_reference):
         "order_tracking_id": tracking_id,
         "order_merchant_reference": merchant_reference
     }
-    response = requests.get(url, headers=headers, params=params, timeout=30)
+    response = _send("GET", url, headers=headers, params=params)
     try:
         js = response.json()
     except Exception:
@@ -159,7 +188,7 @@ def get_transaction_status_details(access_token, tracking_id=None, merchant_refe
         params["order_tracking_id"] = tracking_id
     if merchant_reference:
         params["order_merchant_reference"] = merchant_reference
-    resp = requests.get(url, headers=headers, params=params, timeout=30)
+    resp = _send("GET", url, headers=headers, params=params)
     try:
         js = resp.json()
     except Exception:
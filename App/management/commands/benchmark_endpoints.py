@@ -0,0 +1,183 @@
+"""
+Management command to time and query-count the key platform endpoints.
+
+Requests go through Django's test client in-process, so the numbers measure
+view + ORM + template cost without network noise. Results are written as
+JSON and can be compared against an earlier run with --compare.
+
+An entry can also be a funnel: a sequence of pages requested in order by a
+fresh client (cookies carried between steps), measured as one iteration.
+``writes`` counts INSERT/UPDATE/DELETE statements, e.g. session saves.
+"""
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from App.models import PaymentRecord
+from App.admin.models.audit_log import AuditLog
+from App.reseller.earnings.models import Reseller, Commission, Invoice, Payout
+from App.reseller.marketing.models import MarketingLink
+
+
+ADMIN_ENDPOINTS = [
+    ('admin_dashboard', '/platform/admin/'),
+    ('admin_dashboard_metrics_api', '/platform/admin/api/v1/dashboard/metrics/'),
+    ('finance_commissions_list', '/platform/admin/api/v1/finance/commissions/'),
+    ('finance_invoices_list', '/platform/admin/api/v1/finance/invoices/'),
+    ('finance_payouts_list', '/platform/admin/api/v1/finance/payouts/'),
+    ('finance_transactions_list', '/platform/admin/api/v1/finance/transactions/'),
+    ('admin_resellers_list', '/platform/admin/resellers/resellers/list/'),
+]
+RESELLER_ENDPOINTS = [
+    ('reseller_commissions', '/reseller/commissions/'),
+]
+# Marketing link click -> plan selection -> payment page
+CHECKOUT_FUNNEL = ('/r/{code}/', '/payroll/subscribe/', '/payment/')
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class Command(BaseCommand):
+    help = "Benchmark key admin, finance, reseller and link_redirect endpoints and the checkout funnel; store timings and query counts as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=1, help='Untimed requests per endpoint before measuring')
+        parser.add_argument('--output', type=str, default='', help='JSON output path (default: benchmarks/bench-<timestamp>.json)')
+        parser.add_argument('--compare', type=str, default='', help='Earlier results JSON to diff against')
+        parser.add_argument('--only', type=str, default='', help='Comma-separated endpoint names to run')
+        parser.add_argument('--label', type=str, default='', help='Free-form label stored with the run')
+
+    def handle(self, *args, **opts):
+        iterations = max(1, opts['iterations'])
+        warmup = max(0, opts['warmup'])
+        only = {x.strip() for x in opts['only'].split(',') if x.strip()}
+
+        admin = User.objects.filter(is_staff=True, is_active=True).order_by('id').first()
+        if not admin:
+            raise CommandError('No active staff user found; run seed_load_data first or create a superuser')
+        reseller = (
+            Reseller.objects.select_related('user')
+            .annotate(n=Count('commissions'))
+            .order_by('-n')
+            .first()
+        )
+        link = MarketingLink.objects.filter(is_active=True).order_by('-clicks').first()
+
+        plan = [(name, path, admin) for name, path in ADMIN_ENDPOINTS]
+        if reseller:
+            plan += [(name, path, reseller.user) for name, path in RESELLER_ENDPOINTS]
+        else:
+            self.stderr.write(self.style.WARNING('No reseller found; skipping reseller endpoints'))
+        if link:
+            plan.append(('link_redirect', f'/r/{link.code}/', None))
+            buyer = User.objects.filter(is_staff=False, is_active=True).order_by('id').first() or admin
+            plan.append(('checkout_funnel', tuple(p.format(code=link.code) for p in CHECKOUT_FUNNEL), buyer))
+        else:
+            self.stderr.write(self.style.WARNING('No active MarketingLink found; skipping link_redirect'))
+        if only:
+            plan = [p for p in plan if p[0] in only]
+
+        results = {}
+        hosts = list(settings.ALLOWED_HOSTS) + ['testserver']
+        with override_settings(ALLOWED_HOSTS=hosts, SECURE_SSL_REDIRECT=False):
+            for name, path, user in plan:
+                results[name] = self._measure(path, user, iterations, warmup)
+                r = results[name]
+                self.stdout.write(
+                    f"{name:32s} status={r['status']} p50={r['p50_ms']:.1f}ms max={r['max_ms']:.1f}ms "
+                    f"queries={r['queries']} writes={r['writes']}"
+                )
+
+        report = {
+            'label': opts['label'],
+            'timestamp': timezone.now().isoformat(),
+            'environment': {
+                'db_vendor': connection.vendor,
+                'python': platform.python_version(),
+                'debug': settings.DEBUG,
+                'iterations': iterations,
+            },
+            'row_counts': self._row_counts(),
+            'endpoints': results,
+        }
+
+        output = Path(opts['output'] or Path(settings.BASE_DIR) / 'benchmarks' / f"bench-{timezone.now():%Y%m%d-%H%M%S}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2, default=str))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if opts['compare']:
+            self._compare(Path(opts['compare']), report)
+
+    def _client(self, user):
+        client = Client(raise_request_exception=False)
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def _measure(self, path, user, iterations, warmup):
+        funnel = isinstance(path, tuple)
+        steps = path if funnel else (path,)
+        client = self._client(user)
+        for _ in range(warmup):
+            for step in steps:
+                client.get(step)
+
+        timings, queries, writes, status = [], [], [], None
+        for _ in range(iterations):
+            if funnel:
+                client = self._client(user)
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                for step in steps:
+                    resp = client.get(step)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(ctx.captured_queries))
+            writes.append(sum(q['sql'].lstrip().upper().startswith(WRITE_PREFIXES) for q in ctx.captured_queries))
+            status = resp.status_code
+
+        return {
+            'path': ' -> '.join(steps),
+            'status': status,
+            'iterations': iterations,
+            'p50_ms': statistics.median(timings),
+            'mean_ms': statistics.fmean(timings),
+            'min_ms': min(timings),
+            'max_ms': max(timings),
+            'queries': max(queries),
+            'writes': max(writes),
+        }
+
+    def _row_counts(self):
+        models = [User, Reseller, Commission, Invoice, Payout, PaymentRecord, MarketingLink, AuditLog]
+        return {m._meta.db_table: m.objects.count() for m in models}
+
+    def _compare(self, path, current):
+        try:
+            previous = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read comparison file {path}: {e}")
+
+        self.stdout.write(f"\nComparison against {path} ({previous.get('label') or previous.get('timestamp')})")
+        for name, now in current['endpoints'].items():
+            before = previous.get('endpoints', {}).get(name)
+            if not before:
+                self.stdout.write(f"{name:32s} (new)")
+                continue
+            delta_ms = now['p50_ms'] - before['p50_ms']
+            pct = (delta_ms / before['p50_ms'] * 100) if before['p50_ms'] else 0.0
+            self.stdout.write(
+                f"{name:32s} p50 {before['p50_ms']:.1f} -> {now['p50_ms']:.1f}ms ({pct:+.1f}%) "
+                f"queries {before['queries']} -> {now['queries']} writes {before.get('writes', '?')} -> {now['writes']}"
+            )
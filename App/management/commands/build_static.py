@@ -0,0 +1,54 @@
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.files.storage import storages
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from App.storage import build_ignore_patterns
+
+
+class Command(BaseCommand):
+    help = (
+        "Production static build: collectstatic into STATIC_ROOT with hashed names, gzip/brotli copies "
+        "and a staticfiles.json manifest, leaving out source maps and legacy font formats."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-clear', action='store_true', help='Keep files already in STATIC_ROOT')
+        parser.add_argument('--keep-maps', action='store_true', help='Ship source maps (e.g. for a staging build)')
+
+    def handle(self, *args, **options):
+        storage = storages['staticfiles']
+        if not isinstance(storage, ManifestFilesMixin):
+            raise CommandError(
+                "The staticfiles storage does not write a manifest; build with DEBUG=False "
+                "(STORAGES['staticfiles'] = App.storage.ImmutableStaticFilesStorage)"
+            )
+
+        patterns = build_ignore_patterns()
+        if options['keep_maps']:
+            patterns = [p for p in patterns if p != '*.map']
+        call_command(
+            'collectstatic', interactive=False, clear=not options['no_clear'],
+            ignore_patterns=patterns, verbosity=max(0, options['verbosity'] - 1),
+        )
+
+        files = size = compressed = 0
+        for root, _, names in os.walk(settings.STATIC_ROOT):
+            for name in names:
+                path = os.path.join(root, name)
+                if name.endswith(('.gz', '.br')):
+                    compressed += 1
+                    continue
+                if name == storage.manifest_name:
+                    continue
+                files += 1
+                size += os.path.getsize(path)
+        for name, url in sorted(storage.missing_references):
+            self.stderr.write(f"Warning: {name} references missing file {url}; left unhashed")
+        self.stdout.write(self.style.SUCCESS(
+            f"Built {files} static file(s), {size / 1024 / 1024:.1f} MB, with {compressed} precompressed "
+            f"cop(ies). Manifest: {storage.manifest_name}"
+        ))
@@ -0,0 +1,221 @@
+"""
+Management command to load test the Pesapal-facing views against a local fake
+Pesapal that answers every call after a fixed delay.
+
+The app is started as a real server (gunicorn on config.wsgi, uvicorn on
+config.asgi) in a subprocess pointed at the fake provider. Concurrent IPN
+requests are then fired at it. The fake records how many provider calls were
+in flight at once. Under the sync profile that peak is capped at
+workers x threads; under the async profile it tracks the client concurrency.
+"""
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class FakePesapal:
+    """Threaded HTTP server mimicking the Pesapal endpoints the views call."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.in_flight = self.peak = self.calls = 0
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                with fake._lock:
+                    fake.in_flight += 1
+                    fake.calls += 1
+                    fake.peak = max(fake.peak, fake.in_flight)
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    if length:
+                        self.rfile.read(length)
+                    time.sleep(fake.delay)
+                    if 'RequestToken' in self.path:
+                        body = {'token': 'fake-token', 'status': '200'}
+                    elif 'GetTransactionStatus' in self.path:
+                        body = {'payment_status': 'PENDING', 'status': '200'}
+                    elif 'GetIpnList' in self.path:
+                        body = []
+                    else:
+                        body = {'status': '200'}
+                    data = json.dumps(body).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class Command(BaseCommand):
+    help = "Load test the IPN view under the gunicorn (WSGI) and uvicorn (ASGI) profiles against a fake, slow Pesapal."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', choices=['gunicorn', 'uvicorn', 'both'], default='both')
+        parser.add_argument('--requests', type=int, default=40, help='Total IPN requests per profile')
+        parser.add_argument('--concurrency', type=int, default=20, help='Concurrent client requests')
+        parser.add_argument('--delay', type=float, default=0.5, help='Fake Pesapal latency per call (seconds)')
+        parser.add_argument('--workers', type=int, default=1, help='Server worker processes')
+        parser.add_argument('--threads', type=int, default=2, help='Gunicorn threads per worker')
+        parser.add_argument('--port', type=int, default=0, help='App server port (default: a free port)')
+        parser.add_argument('--output', type=str, default='', help='Optional JSON output path')
+
+    def handle(self, *args, **opts):
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            raise CommandError('httpx is required: pip install -r requirements.txt')
+
+        profiles = ['gunicorn', 'uvicorn'] if opts['profile'] == 'both' else [opts['profile']]
+        fake = FakePesapal(opts['delay']).start()
+        results = {}
+        try:
+            for profile in profiles:
+                fake.reset()
+                port = opts['port'] or _free_port()
+                proc = self._start_server(profile, port, fake.base_url, opts)
+                try:
+                    self._wait_for(port, proc)
+                    stats = asyncio.run(self._fire(port, opts['requests'], opts['concurrency']))
+                finally:
+                    proc.terminate()
+                    try:
+                        proc.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+                stats.update({'provider_peak_in_flight': fake.peak, 'provider_calls': fake.calls})
+                results[profile] = stats
+                self.stdout.write(
+                    f"{profile:9s} ok={stats['ok']}/{stats['requests']} wall={stats['wall_s']:.2f}s "
+                    f"rps={stats['rps']:.1f} p50={stats['p50_ms']:.0f}ms max={stats['max_ms']:.0f}ms "
+                    f"provider_peak_in_flight={fake.peak}"
+                )
+        finally:
+            fake.stop()
+
+        if opts['output']:
+            report = {
+                'timestamp': timezone.now().isoformat(),
+                'settings': {k: opts[k] for k in ('requests', 'concurrency', 'delay', 'workers', 'threads')},
+                'profiles': results,
+            }
+            Path(opts['output']).write_text(json.dumps(report, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Results written to {opts['output']}"))
+
+        if 'gunicorn' in results:
+            cap = opts['workers'] * opts['threads']
+            self.stdout.write(f"gunicorn concurrency cap (workers x threads): {cap}")
+
+    def _start_server(self, profile, port, pesapal_url, opts):
+        env = dict(os.environ)
+        env.update({
+            'PESAPAL_BASE_URL': pesapal_url,
+            'SECURE_SSL_REDIRECT': 'False',
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'),
+        })
+        if profile == 'gunicorn':
+            cmd = [sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+                   '--bind', f'127.0.0.1:{port}', '--workers', str(opts['workers']),
+                   '--threads', str(opts['threads']), '--timeout', '120', '--log-level', 'warning']
+        else:
+            cmd = [sys.executable, '-m', 'uvicorn', 'config.asgi:application',
+                   '--host', '127.0.0.1', '--port', str(port), '--workers', str(opts['workers']),
+                   '--log-level', 'warning']
+        quiet = subprocess.DEVNULL if opts['verbosity'] < 2 else None
+        return subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env, stdout=quiet, stderr=quiet)
+
+    def _wait_for(self, port, proc, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise CommandError(f"Server exited with code {proc.returncode}")
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Server did not start on port {port}")
+
+    async def _fire(self, port, total, concurrency):
+        import httpx
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, statuses = [], []
+
+        async def one(client, i):
+            async with semaphore:
+                started = time.perf_counter()
+                resp = await client.get('/ipn/', params={
+                    'order_tracking_id': f'LOAD{i}', 'order_merchant_reference': f'LOAD-{i}',
+                })
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses.append(resp.status_code)
+
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', timeout=300, limits=limits) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(one(client, i) for i in range(total)))
+            wall = time.perf_counter() - started
+
+        return {
+            'requests': total,
+            'ok': sum(1 for s in statuses if s == 200),
+            'wall_s': wall,
+            'rps': total / wall if wall else 0.0,
+            'p50_ms': statistics.median(latencies),
+            'max_ms': max(latencies),
+        }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
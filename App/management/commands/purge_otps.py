@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from App import otp
+
+
+class Command(BaseCommand):
+    help = "Delete one-time codes older than OTP_TTL_MINUTES in batches (run from cron, e.g. hourly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per statement")
+
+    def handle(self, *args, **opts):
+        deleted = otp.purge_expired(batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired OTP(s)"))
@@ -2,8 +2,10 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 
-from App.models import PaymentRecord, Plan, Subscription
+from App.models import PaymentRecord, Plan
 from App.integrations import pesapal_service
+from App.subscription_lifecycle import activate_subscription
+from App.reseller.marketing.services import AttributionService, ClickEventService
 
 class Command(BaseCommand):
     help = "Reconcile pending PaymentRecords by querying Pesapal status and updating them (idempotent)."
@@ -65,54 +67,16 @@ class Command(BaseCommand):
                     if p2:
                         plan = p2
                 if plan:
-                    now = timezone.now()
-                    period_days = 365 if billing == 'yearly' else 30
-                    Subscription.objects.update_or_create(
-                        user=pr.user,
-                        product='payroll',
-                        defaults={
-                            'plan': plan,
-                            'status': 'active',
-                            'start_date': now,
-                            'end_date': now + timezone.timedelta(days=period_days),
-                            'auto_renewal': True,
-                        }
-                    )
-                # Commission idempotency (optional): create if AFF= present and no existing record
+                    activate_subscription(pr.user, plan, billing, order_id=pr.order_id)
+                # Commission for attributed orders (idempotent: skipped if the IPN/callback created it)
                 try:
-                    desc = pr.description or ''
-                    if 'AFF=' in desc:
-                        from App.reseller.marketing.models import MarketingLink as ML
-                        from App.reseller.earnings.models.reseller import Reseller as ResellerModel
-                        from App.reseller.earnings.models import Commission as CommissionModel
-                        from App.reseller.earnings.services.commission_service import CommissionService
-                        aff = desc.split('AFF=', 1)[1].strip()
-                        ml = ML.objects.filter(code=aff, is_active=True).first()
-                        tx_ref = pr.provider_tracking_id or pr.order_id
-                        if ml and not CommissionModel.objects.filter(transaction_reference=tx_ref).exists():
-                            reseller = ResellerModel.objects.get(id=ml.reseller_id)
-                            sale_amount = float(pr.amount)
-                            commission_rate = float(reseller.get_tier_commission_rate())
-                            client_name = (pr.user.get_full_name() or pr.user.username)
-                            client_email = pr.user.email
-                            notes = f"link_code={aff}; product=payroll; billing={billing}"
-                            CommissionService().create_commission({
-                                'reseller': reseller,
-                                'sale_amount': sale_amount,
-                                'commission_rate': commission_rate,
-                                'transaction_reference': tx_ref,
-                                'client_name': client_name,
-                                'client_email': client_email,
-                                'product_name': 'Payroll Subscription',
-                                'product_type': 'subscription',
-                                'notes': notes,
-                            })
+                    AttributionService().settle(pr, billing=billing)
                 except Exception as ce:
                     self.stderr.write(self.style.WARNING(f"[{merchant_ref}] commission creation skipped: {ce}"))
             else:
                 failed += 1
 
+        ClickEventService().flush()
         self.stdout.write(self.style.SUCCESS(
             f"Reconcile done. processed={processed} completed={completed} failed={failed} skipped={skipped}"
         ))
-
@@ -0,0 +1,373 @@
+"""
+Management command to generate synthetic load data at realistic volumes.
+
+Rows are written with bulk_create in fixed-size chunks so memory stays flat
+no matter how many rows are requested. Every generated row carries a run tag
+in its unique fields, so the command can be re-run against the same database.
+"""
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from App.models import UserProfile, PaymentRecord
+from App.admin.models.audit_log import AuditLog
+from App.admin.repositories.reseller_search_repository import ResellerSearchRepository
+from App.reseller.earnings.models import Reseller, Commission, Invoice, Payout
+from App.reseller.earnings.repositories.reseller_repository import ResellerRepository
+from App.reseller.marketing.models import MarketingLink
+
+
+TIERS = [('bronze', Decimal('10.00')), ('silver', Decimal('15.00')), ('gold', Decimal('20.00')), ('platinum', Decimal('25.00'))]
+TIER_WEIGHTS = [70, 20, 8, 2]
+PLANS = [('Standard', Decimal('5000.00'), Decimal('51000.00')), ('Professional', Decimal('8000.00'), Decimal('81600.00'))]
+COMMISSION_STATUSES = (['paid', 'approved', 'pending', 'rejected'], [55, 20, 20, 5])
+INVOICE_STATUSES = (['paid', 'sent', 'overdue', 'draft', 'cancelled'], [65, 15, 8, 10, 2])
+PAYOUT_STATUSES = (['completed', 'processing', 'requested', 'failed', 'cancelled'], [75, 8, 10, 5, 2])
+PAYMENT_STATUSES = (['completed', 'initiated', 'failed'], [80, 12, 8])
+AUDIT_ACTIONS = ([a for a, _ in AuditLog.ACTION_CHOICES], [10, 8, 25, 30, 5, 7, 15])
+
+
+@contextmanager
+def backdatable(*fields):
+    """Temporarily disable auto_now/auto_now_add so generated history keeps its dates."""
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f, _, _ in saved:
+        f.auto_now = False
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now = auto_now
+            f.auto_now_add = auto_now_add
+
+
+def model_fields(model, *names):
+    return [model._meta.get_field(n) for n in names]
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users, resellers, commissions, invoices, payouts, payments, links and audit logs for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000, help='Business (non-reseller) users to create')
+        parser.add_argument('--resellers', type=int, default=500, help='Resellers to create (each with its own user)')
+        parser.add_argument('--commissions', type=int, default=20000, help='Commissions spread across resellers')
+        parser.add_argument('--invoices', type=int, default=3000, help='Reseller invoices to create')
+        parser.add_argument('--payouts', type=int, default=3000, help='Reseller payouts to create')
+        parser.add_argument('--payments', type=int, default=10000, help='PaymentRecords spread across business users')
+        parser.add_argument('--links', type=int, default=1500, help='MarketingLinks spread across resellers')
+        parser.add_argument('--audit-logs', type=int, default=10000, help='Admin AuditLog entries')
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiply every count above by this factor')
+        parser.add_argument('--days', type=int, default=730, help='History window in days')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk_create batch')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+
+    def handle(self, *args, **opts):
+        scale = opts['scale']
+        if scale <= 0:
+            raise CommandError('--scale must be positive')
+        counts = {
+            key: int(opts[key] * scale)
+            for key in ('users', 'resellers', 'commissions', 'invoices', 'payouts', 'payments', 'links', 'audit_logs')
+        }
+        if counts['resellers'] <= 0 and any(counts[k] for k in ('commissions', 'invoices', 'payouts', 'links')):
+            raise CommandError('Reseller-owned rows need at least one reseller')
+
+        self.chunk = max(1, opts['chunk_size'])
+        self.days = max(1, opts['days'])
+        self.rng = random.Random(opts['seed'])
+        self.now = timezone.now()
+        self.tag = uuid.uuid4().hex[:8]
+        self.password = make_password(None)
+
+        started = timezone.now()
+        self.stdout.write(f"Seeding run {self.tag}: " + ', '.join(f"{k}={v}" for k, v in counts.items()))
+
+        staff_ids = self._create_staff()
+        business_ids = self._create_business_users(counts['users'])
+        reseller_ids, reseller_weights = self._create_resellers(counts['resellers'])
+        self._create_links(counts['links'], reseller_ids, reseller_weights)
+        self._create_commissions(counts['commissions'], reseller_ids, reseller_weights)
+        self._create_invoices(counts['invoices'], reseller_ids, reseller_weights)
+        self._create_payouts(counts['payouts'], reseller_ids, reseller_weights)
+        self._create_payments(counts['payments'], business_ids)
+        self._create_audit_logs(counts['audit_logs'], staff_ids)
+
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(self.style.SUCCESS(f"Seed run {self.tag} finished in {elapsed:.1f}s"))
+
+    # ----- helpers -----------------------------------------------------------
+
+    def _past(self, recent_bias=2.0):
+        """Random timestamp in the history window, skewed towards the present (platform growth)."""
+        days_ago = self.days * (self.rng.random() ** recent_bias)
+        return self.now - timedelta(days=days_ago, seconds=self.rng.randint(0, 86399))
+
+    def _pick(self, choices_and_weights):
+        values, weights = choices_and_weights
+        return self.rng.choices(values, weights=weights, k=1)[0]
+
+    def _bulk(self, model, rows, label, total):
+        """Insert an iterable of unsaved instances in chunks; return created instances per chunk."""
+        batch, written = [], 0
+        for obj in rows:
+            batch.append(obj)
+            if len(batch) >= self.chunk:
+                yield self._flush(model, batch)
+                written += len(batch)
+                self.stdout.write(f"  {label}: {written}/{total}")
+                batch = []
+        if batch:
+            yield self._flush(model, batch)
+            written += len(batch)
+            self.stdout.write(f"  {label}: {written}/{total}")
+
+    def _flush(self, model, batch):
+        with transaction.atomic():
+            return model.objects.bulk_create(batch, batch_size=self.chunk)
+
+    def _drain(self, model, rows, label, total):
+        for _ in self._bulk(model, rows, label, total):
+            pass
+
+    def _user(self, kind, i, joined, is_staff=False):
+        return User(
+            username=f"load_{self.tag}_{kind}_{i}",
+            email=f"{kind}{i}.{self.tag}@load.example.com",
+            first_name=kind.title(),
+            last_name=f"{self.tag}{i}",
+            password=self.password,
+            is_staff=is_staff,
+            date_joined=joined,
+            last_login=joined + timedelta(days=self.rng.randint(0, max(1, (self.now - joined).days))) if self.rng.random() < 0.7 else None,
+        )
+
+    def _owners(self, ids, cum_weights, total):
+        """Yield total owner ids following a heavy-tailed (Pareto) activity distribution, chunk by chunk."""
+        for start in range(0, total, self.chunk):
+            yield from self.rng.choices(ids, cum_weights=cum_weights, k=min(self.chunk, total - start))
+
+    # ----- generators --------------------------------------------------------
+
+    def _create_staff(self):
+        users = [self._user('staff', i, self._past(), is_staff=True) for i in range(5)]
+        created = self._flush(User, users)
+        return [u.id for u in created]
+
+    def _create_business_users(self, total):
+        ids = []
+        rows = (self._user('biz', i, self._past()) for i in range(total))
+        for created in self._bulk(User, rows, 'business users', total):
+            ids.extend(u.id for u in created)
+            profiles = (UserProfile(user_id=u.id, phone=f"07{self.rng.randint(10000000, 99999999)}", role='business_owner') for u in created)
+            self._flush(UserProfile, list(profiles))
+        return ids
+
+    def _create_resellers(self, total):
+        ids, cum_weights = [], []
+        fields = model_fields(Reseller, 'created_at', 'modified_at', 'joined_at')
+        rows = (self._user('reseller', i, self._past()) for i in range(total))
+        with backdatable(*fields):
+            for created in self._bulk(User, rows, 'reseller users', total):
+                resellers = []
+                for u in created:
+                    tier, rate = self.rng.choices(TIERS, weights=TIER_WEIGHTS, k=1)[0]
+                    activity = self.rng.paretovariate(1.2)
+                    cum_weights.append((cum_weights[-1] if cum_weights else 0.0) + activity)
+                    resellers.append(Reseller(
+                        user_id=u.id,
+                        referral_code=f"LOAD-{self.tag}-{u.id}",
+                        company_name=f"Company {u.id}" if self.rng.random() < 0.4 else None,
+                        reseller_type='business' if self.rng.random() < 0.3 else 'individual',
+                        tier=tier,
+                        commission_rate=rate,
+                        is_active=self.rng.random() < 0.92,
+                        is_verified=self.rng.random() < 0.6,
+                        total_sales=Decimal(str(round(activity * 4000, 2))),
+                        total_commission_earned=Decimal(str(round(activity * 4000 * float(rate) / 100, 2))),
+                        created_at=u.date_joined,
+                        modified_at=u.date_joined,
+                        joined_at=u.date_joined,
+                    ))
+                created_ids = [r.id for r in self._flush(Reseller, resellers)]
+                # bulk_create skips post_save, so index the new resellers explicitly
+                ResellerSearchRepository().rebuild(created_ids, chunk_size=self.chunk)
+                ids.extend(created_ids)
+                self._flush(UserProfile, [UserProfile(user_id=u.id, phone='', role='reseller') for u in created])
+        return ids, cum_weights
+
+    def _create_links(self, total, reseller_ids, weights):
+        if not total:
+            return
+        rows = (
+            MarketingLink(
+                reseller_id=owner,
+                title=f"Campaign {i}",
+                code=f"L{self.tag}{i:x}",
+                destination_url='https://example.com/',
+                clicks=int(self.rng.paretovariate(1.1) * 10),
+                is_active=self.rng.random() < 0.9,
+            )
+            for i, owner in enumerate(self._owners(reseller_ids, weights, total))
+        )
+        self._drain(MarketingLink, rows, 'marketing links', total)
+
+    def _create_commissions(self, total, reseller_ids, weights):
+        if not total:
+            return
+        fields = model_fields(Commission, 'created_at', 'modified_at', 'calculation_date')
+
+        def rows():
+            for i, owner in enumerate(self._owners(reseller_ids, weights, total)):
+                name, monthly, yearly = self.rng.choice(PLANS)
+                yearly_billing = self.rng.random() < 0.25
+                sale = yearly if yearly_billing else monthly
+                rate = self.rng.choice(TIERS)[1]
+                status = self._pick(COMMISSION_STATUSES)
+                when = self._past()
+                yield Commission(
+                    reseller_id=owner,
+                    transaction_reference=f"LOAD-{self.tag}-C{i}",
+                    client_name=f"Client {i}",
+                    client_email=f"client{i}.{self.tag}@load.example.com",
+                    product_name=f"Payroll {name}",
+                    product_type='subscription',
+                    sale_amount=sale,
+                    amount=(sale * rate / 100).quantize(Decimal('0.01')),
+                    commission_rate=rate,
+                    status=status,
+                    calculation_date=when,
+                    approval_date=when + timedelta(days=2) if status in ('approved', 'paid') else None,
+                    paid_date=when + timedelta(days=15) if status == 'paid' else None,
+                    created_at=when,
+                    modified_at=when,
+                )
+
+        with backdatable(*fields):
+            self._drain(Commission, rows(), 'commissions', total)
+        # bulk_create bypasses CommissionService, so rebuild the sales counters
+        ResellerRepository().recount_sales(reseller_ids, chunk_size=self.chunk)
+
+    def _create_invoices(self, total, reseller_ids, weights):
+        if not total:
+            return
+        fields = model_fields(Invoice, 'created_at', 'modified_at')
+
+        def rows():
+            for i, owner in enumerate(self._owners(reseller_ids, weights, total)):
+                issued = self._past()
+                status = self._pick(INVOICE_STATUSES)
+                subtotal = Decimal(str(round(self.rng.lognormvariate(8, 0.8), 2)))
+                tax = (subtotal * Decimal('0.16')).quantize(Decimal('0.01'))
+                yield Invoice(
+                    reseller_id=owner,
+                    invoice_number=f"LD-{self.tag}-{i:08d}",
+                    period_start=(issued - timedelta(days=30)).date(),
+                    period_end=issued.date(),
+                    subtotal=subtotal,
+                    tax_amount=tax,
+                    total_amount=subtotal + tax,
+                    status=status,
+                    issue_date=issued.date(),
+                    due_date=(issued + timedelta(days=14)).date(),
+                    payment_date=(issued + timedelta(days=self.rng.randint(1, 20))).date() if status == 'paid' else None,
+                    created_at=issued,
+                    modified_at=issued,
+                )
+
+        with backdatable(*fields):
+            self._drain(Invoice, rows(), 'invoices', total)
+
+    def _create_payouts(self, total, reseller_ids, weights):
+        if not total:
+            return
+        fields = model_fields(Payout, 'created_at', 'modified_at', 'request_date')
+
+        def rows():
+            for i, owner in enumerate(self._owners(reseller_ids, weights, total)):
+                requested = self._past()
+                status = self._pick(PAYOUT_STATUSES)
+                amount = Decimal(str(round(self.rng.lognormvariate(7.5, 0.7), 2)))
+                fee = (amount * Decimal('0.01')).quantize(Decimal('0.01'))
+                yield Payout(
+                    reseller_id=owner,
+                    reference_number=f"PAY-{self.tag}-{i:08d}",
+                    amount=amount,
+                    transaction_fee=fee,
+                    net_amount=amount - fee,
+                    payment_method=self.rng.choice(['bank_transfer', 'paypal', 'other']),
+                    status=status,
+                    request_date=requested,
+                    process_date=requested + timedelta(days=1) if status != 'requested' else None,
+                    completion_date=requested + timedelta(days=3) if status == 'completed' else None,
+                    created_at=requested,
+                    modified_at=requested,
+                )
+
+        with backdatable(*fields):
+            self._drain(Payout, rows(), 'payouts', total)
+
+    def _create_payments(self, total, business_ids):
+        if not total:
+            return
+        if not business_ids:
+            raise CommandError('PaymentRecords need at least one business user (--users)')
+        fields = model_fields(PaymentRecord, 'created_at', 'updated_at')
+
+        def rows():
+            for i in range(total):
+                name, monthly, yearly = self.rng.choice(PLANS)
+                billing = 'yearly' if self.rng.random() < 0.25 else 'monthly'
+                status = self._pick(PAYMENT_STATUSES)
+                when = self._past()
+                description = f"Payroll System - {billing.title()} Plan ({name})"
+                if self.rng.random() < 0.3:
+                    description += f" | AFF=L{self.tag}{self.rng.randint(0, 999):x}"
+                yield PaymentRecord(
+                    user_id=self.rng.choice(business_ids),
+                    order_id=f"LOAD-{self.tag}-{i}",
+                    provider_tracking_id=uuid.UUID(int=self.rng.getrandbits(128)).hex if status != 'initiated' else '',
+                    amount=yearly if billing == 'yearly' else monthly,
+                    description=description,
+                    plan_name=name,
+                    billing=billing,
+                    payment_method=self.rng.choice(['mpesa', 'card', 'bank']),
+                    provider_status=status.upper(),
+                    status=status,
+                    created_at=when,
+                    updated_at=when,
+                )
+
+        with backdatable(*fields):
+            self._drain(PaymentRecord, rows(), 'payment records', total)
+
+    def _create_audit_logs(self, total, staff_ids):
+        if not total:
+            return
+        fields = model_fields(AuditLog, 'created_at')
+
+        def rows():
+            for i in range(total):
+                action = self._pick(AUDIT_ACTIONS)
+                yield AuditLog(
+                    action=action,
+                    actor_id=self.rng.choice(staff_ids) if staff_ids else None,
+                    target_type=self.rng.choice(['reseller', 'commission', 'payout', 'invoice']),
+                    target_id=str(self.rng.randint(1, 10 ** 6)),
+                    target_display=f"{action} #{i}",
+                    details={'seed': self.tag},
+                    created_at=self._past(recent_bias=3.0),
+                    ip_address=f"10.{self.rng.randint(0, 255)}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}",
+                )
+
+        with backdatable(*fields):
+            self._drain(AuditLog, rows(), 'audit logs', total)
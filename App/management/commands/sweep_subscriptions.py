@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from App import subscription_lifecycle
+
+
+class Command(BaseCommand):
+    help = "Queue renewal orders for auto-renewing subscriptions and expire lapsed ones (cron, or --loop as a worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--no-renewals", action="store_true", help="Only expire lapsed subscriptions")
+        parser.add_argument("--loop", type=int, default=0, metavar="SECONDS", help="Keep running, sweeping every SECONDS")
+
+    def handle(self, *args, **opts):
+        while True:
+            summary = subscription_lifecycle.sweep(renew=not opts["no_renewals"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Renewals queued={summary['queued']} failed={summary['failed']}; expired={summary['expired']}"
+            ))
+            if not opts["loop"]:
+                return
+            close_old_connections()
+            time.sleep(opts["loop"])
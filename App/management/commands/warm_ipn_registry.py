@@ -0,0 +1,55 @@
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from App.integrations import ipn_registry, pesapal_service
+
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '[::1]', 'testserver', '*'}
+
+
+class Command(BaseCommand):
+    help = "Resolve and store the Pesapal IPN notification id for each public host, so checkouts never scan the IPN list."
+
+    def add_arguments(self, parser):
+        parser.add_argument("hosts", nargs="*", help="Hosts to warm (default: RENDER_EXTERNAL_HOSTNAME, PESAPAL_CALLBACK_BASE_URL and explicit ALLOWED_HOSTS)")
+        parser.add_argument("--force", action="store_true", help="Ask Pesapal again even for hosts already stored")
+
+    def handle(self, *args, **opts):
+        hosts = [ipn_registry.normalize_host(h) for h in opts["hosts"]] or self.default_hosts()
+        if not hosts:
+            self.stdout.write("No public hosts configured; nothing to warm")
+            return
+
+        pending = hosts if opts["force"] else [h for h in hosts if not ipn_registry.stored_notification_id(h)]
+        for host in set(hosts) - set(pending):
+            self.stdout.write(f"{host}: {ipn_registry.stored_notification_id(host)} (stored)")
+        if not pending:
+            return
+
+        token = pesapal_service.generate_access_token()
+        if not token:
+            self.stderr.write(self.style.ERROR("Failed to obtain Pesapal access token"))
+            return
+
+        for host in pending:
+            notification_id = ipn_registry.refresh(host, token, force=True)
+            if notification_id:
+                self.stdout.write(self.style.SUCCESS(f"{host}: {notification_id}"))
+            else:
+                self.stderr.write(self.style.WARNING(f"{host}: could not resolve an IPN id"))
+
+    def default_hosts(self):
+        hosts = []
+        if settings.RENDER_EXTERNAL_HOSTNAME:
+            hosts.append(settings.RENDER_EXTERNAL_HOSTNAME)
+        callback_base = (getattr(settings, 'PESAPAL_CALLBACK_BASE_URL', '') or '').strip()
+        if callback_base:
+            hosts.append(urlparse(callback_base).netloc)
+        # Wildcard entries (".onrender.com") are not hosts we can register
+        hosts += [h for h in settings.ALLOWED_HOSTS if h and not h.startswith('.')]
+        seen = []
+        for host in (ipn_registry.normalize_host(h) for h in hosts):
+            if host and host not in LOCAL_HOSTS and host not in seen:
+                seen.append(host)
+        return seen
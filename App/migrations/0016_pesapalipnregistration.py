@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App', '0015_paymentrecord_billing_paymentrecord_payment_method_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PesapalIpnRegistration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('host', models.CharField(max_length=255, unique=True)),
+                ('ipn_url', models.URLField(max_length=300)),
+                ('notification_id', models.CharField(max_length=100)),
+                ('source', models.CharField(choices=[('list', 'Found in IPN list'), ('register', 'Registered')], default='list', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 17:40
+
+from django.db import migrations, models
+from django.utils.crypto import salted_hmac
+
+
+def hash_pending_codes(apps, schema_editor):
+    """Replace plaintext codes with the HMAC App.otp.hash_code stores"""
+    OTP = apps.get_model('App', 'OTP')
+    for otp in OTP.objects.filter(is_verified=False).exclude(code__regex=r'^[0-9a-f]{64}$').iterator():
+        otp.code = salted_hmac('App.otp', f"{otp.purpose}:{otp.email}:{otp.code}", algorithm='sha256').hexdigest()
+        otp.save(update_fields=['code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App', '0017_subscription_lifecycle'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='otp',
+            name='code',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.RunPython(hash_pending_codes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='otp',
+            index=models.Index(fields=['email', 'purpose', 'is_verified', 'code'], name='App_otp_email_3255cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otp',
+            index=models.Index(fields=['created_at'], name='App_otp_created_6dcfab_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App', '0018_otp_hashed_codes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentrecord',
+            name='applied_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
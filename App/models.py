@@ -1,13 +1,13 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.utils.text import slugify
-import random
-import string
 
 class OTP(models.Model):
+    """One-time code; issued and checked through App.otp, which stores only its HMAC"""
     email = models.EmailField()
-    code = models.CharField(max_length=6)
+    code = models.CharField(max_length=64)
     created_at = models.DateTimeField(auto_now_add=True)
     is_verified = models.BooleanField(default=False)
     purpose = models.CharField(
@@ -19,16 +19,18 @@ class OTP(models.Model):
     ]
 )
 
-    def save(self, *args, **kwargs):
-        if not self.code:
-            self.code = ''.join(random.choices(string.digits, k=6))
-        super().save(*args, **kwargs)
+    class Meta:
+        indexes = [
+            # Verification lookup, and the expiry purge's created_at range scan
+            models.Index(fields=['email', 'purpose', 'is_verified', 'code']),
+            models.Index(fields=['created_at']),
+        ]
 
     def is_expired(self):
-        return timezone.now() > self.created_at + timezone.timedelta(minutes=10)
+        return timezone.now() > self.created_at + timezone.timedelta(minutes=settings.OTP_TTL_MINUTES)
 
     def __str__(self):
-        return f"{self.email} - {self.code} - {self.purpose}"
+        return f"{self.email} - {self.purpose}"
 
 
 class UserProfile(models.Model):
@@ -206,9 +208,19 @@ class Subscription(models.Model):
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     auto_renewal = models.BooleanField(default=True)
+    # Set by the lifecycle sweeper when it queues a renewal order (see App.subscription_lifecycle)
+    renewal_requested_at = models.DateTimeField(null=True, blank=True)
+    renewal_order_id = models.CharField(max_length=100, blank=True, default='')
+    renewal_payment_url = models.URLField(max_length=500, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Sweeps filter on status and scan end_date ranges
+            models.Index(fields=['status', 'end_date']),
+        ]
+
     def __str__(self):
         return f"{self.user.email} - {self.product} - {self.status}"
 
@@ -232,8 +244,27 @@ class PaymentRecord(models.Model):
     payment_method = models.CharField(max_length=50, blank=True, default='')  # mpesa|card|bank (if available)
     provider_status = models.CharField(max_length=30, blank=True, default='')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='initiated')
+    # Set once a paid renewal order has extended its subscription (see App.subscription_lifecycle)
+    applied_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.email} - {self.order_id} - {self.status}"
+
+
+class PesapalIpnRegistration(models.Model):
+    """Pesapal notification id resolved for the IPN URL of one host."""
+    SOURCE_CHOICES = [
+        ('list', 'Found in IPN list'),
+        ('register', 'Registered'),
+    ]
+    host = models.CharField(max_length=255, unique=True)
+    ipn_url = models.URLField(max_length=300)
+    notification_id = models.CharField(max_length=100)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='list')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.host} -> {self.notification_id}"
@@ -0,0 +1,108 @@
+"""
+One-time codes for registration, login and password reset.
+
+Only an HMAC of each code is stored (keyed by SECRET_KEY and bound to the
+email and purpose), so a database read does not reveal usable codes. A code
+is looked up by (email, purpose, is_verified, code) on the composite index
+and is valid for OTP_TTL_MINUTES; ``manage.py purge_otps`` deletes expired
+rows in batches.
+
+Sending and verifying are throttled per email and per client address with
+fixed-window counters in the shared cache (OTP_RATE_LIMITS), checked before
+any query, so a burst of guesses is refused without touching the database.
+"""
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from App.models import OTP
+from App.ratelimit import RateLimiter, client_ip
+
+CODE_LENGTH = 6
+
+VALID = 'valid'
+INVALID = 'invalid'
+EXPIRED = 'expired'
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Too many attempts; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def hash_code(email, purpose, code):
+    return salted_hmac('App.otp', f"{purpose}:{email}:{code}", algorithm='sha256').hexdigest()
+
+
+def ttl():
+    return timedelta(minutes=settings.OTP_TTL_MINUTES)
+
+
+def _throttle(action, email, request):
+    """Spend one send/verify attempt per email and per client address"""
+    limits = settings.OTP_RATE_LIMITS
+    checks = [(f'{action}_email', email)]
+    if request is not None:
+        checks.append((f'{action}_ip', client_ip(request)))
+    for name, key in checks:
+        limit, window_seconds = limits[name]
+        retry_after = RateLimiter(f'otp_{name}', limit, window_seconds).consume(key)
+        if retry_after:
+            raise RateLimited(retry_after)
+
+
+def issue(email, purpose, request=None):
+    """
+    Replace any pending code for (email, purpose) with a new one; returns the
+    plaintext code for sending. Raises RateLimited.
+    """
+    _throttle('send', email, request)
+    code = ''.join(secrets.choice('0123456789') for _ in range(CODE_LENGTH))
+    OTP.objects.filter(email=email, purpose=purpose, is_verified=False).delete()
+    OTP.objects.create(email=email, purpose=purpose, code=hash_code(email, purpose, code))
+    return code
+
+
+def verify(email, purpose, code, request=None):
+    """
+    Check and consume a code; returns VALID, INVALID or EXPIRED. Raises
+    RateLimited once the email or client has used up its attempts.
+    """
+    _throttle('verify', email, request)
+    code = (code or '').strip()
+    if len(code) != CODE_LENGTH or not code.isdigit():
+        return INVALID
+    otp = (
+        OTP.objects.filter(email=email, purpose=purpose, is_verified=False, code=hash_code(email, purpose, code))
+        .values('pk', 'created_at')
+        .first()
+    )
+    if otp is None:
+        return INVALID
+    if timezone.now() > otp['created_at'] + ttl():
+        return EXPIRED
+    # Conditional update: of two concurrent submissions only one consumes the code
+    if not OTP.objects.filter(pk=otp['pk'], is_verified=False).update(is_verified=True):
+        return INVALID
+    limits = settings.OTP_RATE_LIMITS
+    RateLimiter('otp_verify_email', *limits['verify_email']).reset(email)
+    return VALID
+
+
+def discard(email, purpose):
+    OTP.objects.filter(email=email, purpose=purpose).delete()
+
+
+def purge_expired(now=None, batch_size=1000):
+    """Delete codes older than OTP_TTL_MINUTES, verified or not; returns the count"""
+    cutoff = (now or timezone.now()) - ttl()
+    deleted = 0
+    while True:
+        ids = list(OTP.objects.filter(created_at__lt=cutoff).order_by('created_at').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OTP.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,65 @@
+"""
+Fixed-window rate limiter with its state in a shared cache.
+
+Each (limiter, key) pair may be used ``limit`` times per window of
+``window_seconds``; further calls are refused with the number of seconds
+until the window ends. Counters live in ``caches['shared']`` and are kept
+with ``add`` (start the window) and ``incr`` (spend one), so concurrent
+requests each get a distinct count and no more than ``limit`` pass per
+window. Those two operations are atomic across workers on Redis; with the
+file-based fallback they are only atomic within one process. Counters
+expire with their window, so idle keys cost nothing and refused calls never
+touch the database.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class RateLimiter:
+    def __init__(self, name, limit, window_seconds, cache_alias='shared'):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _key(self, key, window):
+        digest = hashlib.sha256(str(key).lower().encode()).hexdigest()[:32]
+        return f"ratelimit:{self.name}:{digest}:{window}"
+
+    def consume(self, key):
+        """Spend one attempt; returns 0 when allowed, else seconds until the window ends"""
+        now = time.time()
+        window = int(now // self.window_seconds)
+        cache_key = self._key(key, window)
+        self.cache.add(cache_key, 0, self.window_seconds + 1)
+        try:
+            used = self.cache.incr(cache_key)
+        except ValueError:
+            # Expired between add and incr
+            used = 1
+            self.cache.set(cache_key, used, self.window_seconds + 1)
+        if used <= self.limit:
+            return 0
+        return round((window + 1) * self.window_seconds - now, 1)
+
+    def reset(self, key):
+        self.cache.delete(self._key(key, int(time.time() // self.window_seconds)))
+
+
+def client_ip(request):
+    """
+    Address to rate-limit a request by. Behind a proxy set
+    RATELIMIT_CLIENT_IP_HEADER (e.g. 'HTTP_X_FORWARDED_FOR'); the last entry
+    is the one the proxy appended, the earlier ones are client-supplied.
+    """
+    header = getattr(settings, 'RATELIMIT_CLIENT_IP_HEADER', '')
+    if header and request.META.get(header):
+        return request.META[header].split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
@@ -1,6 +1,8 @@
 """Admin configuration for reseller models."""
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
+from . import page_cache
 from .earnings.models import Reseller, Commission, Invoice, Payout
 
 
@@ -71,12 +73,20 @@ class CommissionAdmin(admin.ModelAdmin):
     actions = ['approve_commissions', 'reject_commissions']
     
     def approve_commissions(self, request, queryset):
-        count = queryset.filter(status='pending').update(status='approved')
+        pending = queryset.filter(status='pending')
+        # A queryset update sends no signals; bump the affected resellers' pages here
+        reseller_ids = set(pending.values_list('reseller_id', flat=True))
+        count = pending.update(status='approved')
+        page_cache.bump(*reseller_ids)
         self.message_user(request, f'{count} commissions approved.')
     approve_commissions.short_description = 'Approve selected commissions'
     
     def reject_commissions(self, request, queryset):
-        count = queryset.filter(status='pending').update(status='rejected')
+        pending = queryset.filter(status='pending')
+        reseller_ids = set(pending.values_list('reseller_id', flat=True))
+        # modified_at is auto_now, which update() skips; incremental leaderboard refreshes read it
+        count = pending.update(status='rejected', modified_at=timezone.now())
+        page_cache.bump(*reseller_ids)
         self.message_user(request, f'{count} commissions rejected.')
     reject_commissions.short_description = 'Reject selected commissions'
 
@@ -189,6 +199,10 @@ class PayoutAdmin(admin.ModelAdmin):
     complete_payouts.short_description = 'Mark as completed'
     
     def fail_payouts(self, request, queryset):
-        count = queryset.filter(status__in=['requested', 'processing']).update(status='failed')
+        open_payouts = queryset.filter(status__in=['requested', 'processing'])
+        # A queryset update sends no signals; bump the affected resellers' pages here
+        reseller_ids = set(open_payouts.values_list('reseller_id', flat=True))
+        count = open_payouts.update(status='failed')
+        page_cache.bump(*reseller_ids)
         self.message_user(request, f'{count} payouts marked as failed.')
     fail_payouts.short_description = 'Mark as failed'
@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from .... import page_cache
 from ....earnings.models.reseller import Reseller
 from ....earnings.services.reseller_service import ResellerService
 from ..serializers.reseller_serializers import (
@@ -35,11 +36,32 @@ class ResellerViewSet(viewsets.ModelViewSet):
         # Apply filters here if needed
         return queryset
     
+    def _revalidation_id(self, pk=None):
+        """Reseller whose version validates this response, or None to skip revalidation."""
+        own = page_cache.reseller_id_for(self.request.user)
+        if pk is None:
+            return own
+        if self.request.user.is_staff:
+            return int(pk) if str(pk).isdigit() else None
+        # Non-staff only ever see their own profile
+        return own if own is not None and str(pk) == str(own) else None
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Get a profile; revalidations answer 304 while it is unchanged."""
+        return page_cache.revalidate(
+            request, self._revalidation_id(kwargs.get('pk')), 'api:reseller',
+            lambda: super(ResellerViewSet, self).retrieve(request, *args, **kwargs),
+        )
+    
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_profile(self, request):
         """Get the authenticated user's profile."""
+        return page_cache.revalidate(request, self._revalidation_id(), 'api:reseller', self._my_profile)
+    
+    def _my_profile(self):
         try:
-            reseller = request.user.reseller_profile
+            reseller = self.request.user.reseller_profile
+            page_cache.remember_reseller(self.request.user.pk, reseller.pk)
             serializer = self.get_serializer(reseller)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Reseller.DoesNotExist:
@@ -68,6 +90,9 @@ class ResellerViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def stats(self, request, pk=None):
         """Get comprehensive statistics for a reseller."""
+        return page_cache.revalidate(request, self._revalidation_id(pk), 'api:reseller-stats', self._stats)
+    
+    def _stats(self):
         instance = self.get_object()
         service = ResellerService()
         stats = service.get_reseller_stats(instance.id)
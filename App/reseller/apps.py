@@ -7,3 +7,7 @@ class ResellerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'App.reseller'
     verbose_name = 'Reseller Management'
+
+    def ready(self):
+        # Import signal handlers when app is ready
+        import App.reseller.signals  # noqa F401
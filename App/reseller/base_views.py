@@ -7,16 +7,20 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 
 from .earnings.models import Reseller, Commission, Invoice, Payout
-from .earnings.services import CommissionService, InvoiceService, PayoutService
+from .earnings.services import CommissionService, InvoiceService, InvoicePdfService, PayoutService, LeaderboardService
 from .earnings.repositories import CommissionRepository, InvoiceRepository, PayoutRepository
 from .utils import generate_partner_code
+from . import page_cache
+from App.integrations.pdf_service import serve_pdf
 
 @login_required
+@page_cache.revalidated('dashboard')
 def dashboard(request):
     """Reseller dashboard view"""
     try:
         reseller = Reseller.objects.get(user=request.user)
         referral_code = reseller.referral_code
+        page_cache.remember_reseller(request.user.pk, reseller.pk)
     except Reseller.DoesNotExist:
         # Create a default reseller profile if it doesn't exist
         reseller = Reseller.objects.create(
@@ -28,15 +32,13 @@ def dashboard(request):
         referral_code = reseller.referral_code
     
     # Build recent transactions from real commissions
-    from .earnings.models import Commission
-    recent_commissions = Commission.objects.filter(reseller=reseller).order_by('-calculation_date')[:10]
     status_color_map = {
         'paid': 'success',
         'approved': 'info',
         'pending': 'warning',
         'rejected': 'danger',
     }
-    recent_transactions = [
+    recent_transactions = page_cache.fragment(reseller.pk, 'recent_transactions', lambda: [
         {
             'id': c.id,
             'amount': float(c.amount),
@@ -44,8 +46,8 @@ def dashboard(request):
             'status': c.status,
             'status_color': status_color_map.get(c.status, 'secondary'),
         }
-        for c in recent_commissions
-    ]
+        for c in Commission.objects.filter(reseller=reseller).order_by('-calculation_date')[:10]
+    ])
 
     # Map tier name
     tier_names = {
@@ -85,10 +87,12 @@ def earnings(request):
     return render(request, 'dashboards/reseller/pages/dashboard.html')
 
 @login_required
+@page_cache.revalidated('commissions', scopes=[page_cache.LEADERBOARD_SCOPE])
 def commissions(request):
     """Commission overview page"""
     try:
         reseller = Reseller.objects.get(user=request.user)
+        page_cache.remember_reseller(request.user.pk, reseller.pk)
     except Reseller.DoesNotExist:
         # Create a default reseller profile if it doesn't exist
         from django.contrib import messages
@@ -121,39 +125,50 @@ def commissions(request):
     paginator = Paginator(commissions, 10)
     page_obj = paginator.get_page(page_number)
 
-    # Commission summary
-    summary = commission_service.get_commission_summary(reseller)
-    
-    # Calculate current month earnings
     current_date = timezone.now()
-    current_month_start = current_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    current_month_commissions = commission_repo.get_reseller_commissions(
-        reseller, 
-        {'created_at__gte': current_month_start}
-    )
-    current_month_earnings = sum(c.amount for c in current_month_commissions)
-    
-    # Calculate previous month earnings for growth
-    last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
-    last_month_end = current_month_start - timedelta(seconds=1)
-    last_month_commissions = commission_repo.get_reseller_commissions(
-        reseller,
-        {'created_at__gte': last_month_start, 'created_at__lte': last_month_end}
-    )
-    last_month_earnings = sum(c.amount for c in last_month_commissions)
-    
-    # Calculate monthly growth
-    if last_month_earnings > 0:
-        monthly_growth = ((current_month_earnings - last_month_earnings) / last_month_earnings) * 100
-    else:
-        monthly_growth = 100 if current_month_earnings > 0 else 0
-    
-    # Calculate pending amount
-    pending_commissions = commission_repo.get_reseller_commissions(
-        reseller,
-        {'status': 'pending'}
-    )
-    pending_amount = sum(c.amount for c in pending_commissions)
+
+    def earnings_summary():
+        # Commission summary
+        summary = commission_service.get_commission_summary(reseller)
+
+        # Calculate current month earnings
+        current_month_start = current_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        current_month_commissions = commission_repo.get_reseller_commissions(
+            reseller,
+            {'created_at__gte': current_month_start}
+        )
+        current_month_earnings = sum(c.amount for c in current_month_commissions)
+
+        # Calculate previous month earnings for growth
+        last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+        last_month_end = current_month_start - timedelta(seconds=1)
+        last_month_commissions = commission_repo.get_reseller_commissions(
+            reseller,
+            {'created_at__gte': last_month_start, 'created_at__lte': last_month_end}
+        )
+        last_month_earnings = sum(c.amount for c in last_month_commissions)
+
+        # Calculate monthly growth
+        if last_month_earnings > 0:
+            monthly_growth = ((current_month_earnings - last_month_earnings) / last_month_earnings) * 100
+        else:
+            monthly_growth = 100 if current_month_earnings > 0 else 0
+
+        # Calculate pending amount
+        pending_commissions = commission_repo.get_reseller_commissions(
+            reseller,
+            {'status': 'pending'}
+        )
+        return {
+            'current_month_earnings': current_month_earnings,
+            'monthly_growth': monthly_growth,
+            'pending_amount': sum(c.amount for c in pending_commissions),
+            'total_transactions': summary['count'],
+            'status_breakdown': summary['status_breakdown'],
+        }
+
+    # Month-to-date figures, cached until the reseller's data changes or the day ends
+    earnings_figures = page_cache.fragment(reseller.pk, 'commission_summary', earnings_summary, timezone.localdate())
     
     # Calculate lifetime earnings
     lifetime_earnings = reseller.total_commission_earned
@@ -175,6 +190,12 @@ def commissions(request):
         tier_progress = 100
         amount_to_next_tier = 0
     
+    # Rank by commissions this month, quarter and all-time (precomputed)
+    leaderboard = page_cache.fragment(
+        reseller.pk, 'leaderboard', lambda: LeaderboardService().get_standing(reseller.id, 'commissions'),
+        timezone.localdate(), scopes=[page_cache.LEADERBOARD_SCOPE],
+    )
+    
     # Recent activity (last 5 commissions)
     recent_activity = list(commissions[:5])
     
@@ -185,28 +206,27 @@ def commissions(request):
         'page_obj': page_obj,
         'filters': filters,
         'search_term': search_term,
-        'current_month_earnings': current_month_earnings,
-        'monthly_growth': monthly_growth,
-        'pending_amount': pending_amount,
+        **earnings_figures,
         'lifetime_earnings': lifetime_earnings,
         'current_tier': current_tier_info['name'],
         'tier_icon': current_tier_info['icon'],
         'next_tier': current_tier_info['next'],
         'tier_progress': tier_progress,
         'amount_to_next_tier': amount_to_next_tier,
+        'leaderboard': leaderboard,
         'recent_activity': recent_activity,
         'chart_dates': chart_dates,
         'commission_rate': reseller.commission_rate,
-        'total_transactions': summary['count'],
-        'status_breakdown': summary['status_breakdown']
     }
     return render(request, 'dashboards/reseller/pages/earnings/commissions.html', context)
 
 @login_required
+@page_cache.revalidated('invoices')
 def invoices(request):
     """Invoice history page"""
     try:
         reseller = Reseller.objects.get(user=request.user)
+        page_cache.remember_reseller(request.user.pk, reseller.pk)
     except Reseller.DoesNotExist:
         from django.contrib import messages
         messages.warning(request, "Please complete your reseller profile to view invoices.")
@@ -237,8 +257,12 @@ def invoices(request):
     page_obj = paginator.get_page(page_number)
 
     # Invoice summary
-    available_years = invoice_repo.get_available_years(reseller)
-    summary = invoice_service.get_invoice_summary(reseller)
+    available_years = page_cache.fragment(
+        reseller.pk, 'invoice_years', lambda: invoice_repo.get_available_years(reseller)
+    )
+    summary = page_cache.fragment(
+        reseller.pk, 'invoice_summary', lambda: invoice_service.get_invoice_summary(reseller), timezone.localdate()
+    )
 
     context = {
         'page_obj': page_obj,
@@ -251,10 +275,24 @@ def invoices(request):
     return render(request, 'dashboards/reseller/pages/earnings/invoices.html', context)
 
 @login_required
+def invoice_download(request, invoice_id):
+    """Download an invoice PDF; rendered once and served from storage afterwards"""
+    invoice = get_object_or_404(
+        Invoice.objects.select_related('reseller__user'),
+        pk=invoice_id,
+        reseller__user=request.user,
+    )
+    pdf_service = InvoicePdfService()
+    name, digest = pdf_service.ensure_pdf(invoice)
+    return serve_pdf(request, name, pdf_service.filename(invoice), digest, last_modified=invoice.modified_at)
+
+@login_required
+@page_cache.revalidated('payouts')
 def payouts(request):
     """Payout history page"""
     try:
         reseller = Reseller.objects.get(user=request.user)
+        page_cache.remember_reseller(request.user.pk, reseller.pk)
     except Reseller.DoesNotExist:
         from django.contrib import messages
         messages.warning(request, "Please complete your reseller profile to view payouts.")
@@ -281,7 +319,9 @@ def payouts(request):
     page_obj = paginator.get_page(page_number)
 
     # Payout summary
-    summary = payout_service.get_payout_summary(reseller)
+    summary = page_cache.fragment(
+        reseller.pk, 'payout_summary', lambda: payout_service.get_payout_summary(reseller), timezone.localdate()
+    )
 
     context = {
         'page_obj': page_obj,
@@ -12,6 +12,7 @@ from .reseller import Reseller
 from .commission import Commission
 from .invoice import Invoice
 from .payout import Payout
+from .leaderboard import LeaderboardEntry, LeaderboardMetricChoices
 
 __all__ = [
     'TimeStampedModel',
@@ -25,4 +26,6 @@ __all__ = [
     'Commission',
     'Invoice',
     'Payout',
+    'LeaderboardEntry',
+    'LeaderboardMetricChoices',
 ]
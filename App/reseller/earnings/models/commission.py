@@ -74,6 +74,9 @@ class Commission(TimeStampedModel):
         verbose_name = 'Commission'
         verbose_name_plural = 'Commissions'
         ordering = ['-calculation_date']
+        indexes = [
+            models.Index(fields=['reseller', 'calculation_date']),
+        ]
 
     def __str__(self):
         return f"Commission: {self.amount} for {self.reseller}"
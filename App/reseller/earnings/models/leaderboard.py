@@ -0,0 +1,37 @@
+"""Precomputed reseller rankings."""
+from django.db import models
+
+from .reseller import Reseller
+
+
+class LeaderboardMetricChoices(models.TextChoices):
+    SALES = 'sales', 'Sales'
+    COMMISSIONS = 'commissions', 'Commissions'
+    CONVERSIONS = 'conversions', 'Conversions'
+
+
+class LeaderboardEntry(models.Model):
+    """
+    One reseller's value and rank on one board: a metric over a period
+    ('all', 'YYYY-MM' or 'YYYY-Qn'). Maintained by LeaderboardService;
+    resellers with nothing in the period have no entry (unranked).
+    """
+    period = models.CharField(max_length=8)
+    metric = models.CharField(max_length=16, choices=LeaderboardMetricChoices.choices)
+    reseller = models.ForeignKey(Reseller, related_name='leaderboard_entries', on_delete=models.CASCADE)
+    value = models.DecimalField(max_digits=14, decimal_places=2)
+    # Competition ranking: ties share a rank and the next rank is skipped
+    rank = models.PositiveIntegerField()
+    # Share of the board ranked at or below this entry
+    percentile = models.DecimalField(max_digits=5, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'reseller_leaderboard'
+        unique_together = [('period', 'metric', 'reseller')]
+        indexes = [
+            models.Index(fields=['period', 'metric', 'rank'], name='leaderboard_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.period}: #{self.rank} reseller {self.reseller_id}"
@@ -2,6 +2,7 @@
 from django.db import models
 from django.utils import timezone
 from decimal import Decimal
+from App.reseller import page_cache
 from .base import TimeStampedModel, PayoutStatusChoices, PaymentMethodChoices
 from .reseller import Reseller
 from .invoice import Invoice
@@ -130,12 +131,13 @@ class Payout(TimeStampedModel):
         self.reseller.pending_commission -= self.amount
         self.reseller.save(update_fields=['total_commission_paid', 'pending_commission'])
         
-        # Update related commissions
+        # Update related commissions; a queryset update sends no signals
         if self.commissions.exists():
             self.commissions.update(
                 status='paid',
                 paid_date=timezone.now()
             )
+            page_cache.bump(self.reseller_id)
     
     def fail_payout(self, reason=''):
         """Mark payout as failed."""
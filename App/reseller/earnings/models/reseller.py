@@ -1,6 +1,7 @@
 """Reseller profile model."""
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
 from .base import TimeStampedModel, TierChoices
@@ -75,6 +76,12 @@ class Reseller(TimeStampedModel):
     total_commission_paid = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
     pending_commission = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
     
+    # Sales counters, maintained incrementally on commission create
+    sales_count = models.PositiveIntegerField(default=0)
+    sales_this_month = models.PositiveIntegerField(default=0)
+    sales_month = models.DateField(null=True, blank=True, help_text='First day of the month sales_this_month counts')
+    last_sale_at = models.DateTimeField(null=True, blank=True)
+    
     # Join date tracking
     joined_at = models.DateTimeField(auto_now_add=True)
     
@@ -83,10 +90,19 @@ class Reseller(TimeStampedModel):
         verbose_name = 'Reseller'
         verbose_name_plural = 'Resellers'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['sales_count'], name='reseller_sales_count_idx'),
+            models.Index(fields=['last_sale_at'], name='reseller_last_sale_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} - {self.company_name or 'Individual'}"
     
+    def get_sales_this_month(self, today=None):
+        """Current-month sales; stale until the monthly rollover means zero."""
+        month = (today or timezone.localdate()).replace(day=1)
+        return self.sales_this_month if self.sales_month == month else 0
+
     def get_available_balance(self):
         """Calculate available balance for withdrawal."""
         return self.pending_commission
@@ -118,17 +134,8 @@ class Reseller(TimeStampedModel):
         self.save(update_fields=['tier', 'commission_rate'])
     
     @classmethod
-    def generate_unique_referral_code(cls, user_id):
-        """Generate a unique referral code, ensuring no duplicates."""
-        from App.reseller.utils import generate_partner_code
-        
-        max_attempts = 10
-        for _ in range(max_attempts):
-            code = generate_partner_code(user_id)
-            if not cls.objects.filter(referral_code=code).exists():
-                return code
+    def generate_unique_referral_code(cls, user_id=None):
+        """Generate a unique referral code, ensuring no duplicates (one lookup query)."""
+        from App.reseller.partner_codes import allocate_codes
         
-        # If we couldn't generate a unique code after max_attempts,
-        # append a timestamp to ensure uniqueness
-        import time
-        return f"{code}-{int(time.time())}"
+        return allocate_codes(1)[0]
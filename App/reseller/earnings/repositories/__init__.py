@@ -2,6 +2,7 @@
 from .base import BaseRepository
 from .commission_repository import CommissionRepository
 from .invoice_repository import InvoiceRepository
+from .leaderboard_repository import LeaderboardRepository
 from .payout_repository import PayoutRepository
 from .reseller_repository import ResellerRepository
 
@@ -9,6 +10,7 @@ __all__ = [
     'BaseRepository',
     'CommissionRepository',
     'InvoiceRepository',
+    'LeaderboardRepository',
     'PayoutRepository',
     'ResellerRepository',
 ]
@@ -2,6 +2,7 @@
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
+from App.reseller import page_cache
 from ..models import Invoice
 from .base import BaseRepository
 
@@ -88,10 +89,15 @@ class InvoiceRepository(BaseRepository):
     def mark_overdue_invoices(self):
         """Mark sent invoices as overdue if past due date."""
         today = timezone.now().date()
-        return self.filter(
+        overdue = self.filter(
             status='sent',
             due_date__lt=today
-        ).update(status='overdue')
+        )
+        # A queryset update sends no signals; bump the affected resellers' pages here
+        reseller_ids = set(overdue.values_list('reseller_id', flat=True))
+        count = overdue.update(status='overdue')
+        page_cache.bump(*reseller_ids)
+        return count
     
     def get_next_invoice_number(self):
         """Generate next invoice number."""
@@ -0,0 +1,139 @@
+"""Leaderboard repository."""
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from ..models import Commission, CommissionStatusChoices
+from ..models.leaderboard import LeaderboardEntry, LeaderboardMetricChoices
+from .base import BaseRepository
+
+METRICS = [choice.value for choice in LeaderboardMetricChoices]
+
+# (reseller_id, 'YYYY-MM') -> {metric: value}
+MonthlyTotals = Dict[Tuple[int, str], Dict[str, Decimal]]
+
+
+class LeaderboardRepository(BaseRepository):
+    """Repository for LeaderboardEntry and the commission totals it ranks."""
+    model = LeaderboardEntry
+
+    def _commissions(self):
+        return Commission.objects.exclude(status=CommissionStatusChoices.REJECTED)
+
+    def monthly_totals(self, since: datetime, reseller_ids: Optional[Iterable[int]] = None) -> MonthlyTotals:
+        """Sales, commission and conversion totals per reseller and month, from ``since`` on."""
+        qs = self._commissions().filter(created_at__gte=since)
+        if reseller_ids is not None:
+            qs = qs.filter(reseller_id__in=list(reseller_ids))
+        rows = (
+            qs.annotate(month=TruncMonth('created_at'))
+            .values('reseller_id', 'month')
+            .annotate(sales=Sum('sale_amount'), commissions=Sum('amount'), conversions=Count('id'))
+            .order_by()
+        )
+        return {
+            (row['reseller_id'], row['month'].strftime('%Y-%m')): {
+                metric: Decimal(row[metric] or 0) for metric in METRICS
+            }
+            for row in rows
+        }
+
+    def lifetime_totals(self, reseller_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Decimal]]:
+        """All-time totals per reseller."""
+        qs = self._commissions()
+        if reseller_ids is not None:
+            qs = qs.filter(reseller_id__in=list(reseller_ids))
+        rows = (
+            qs.values('reseller_id')
+            .annotate(sales=Sum('sale_amount'), commissions=Sum('amount'), conversions=Count('id'))
+            .order_by()
+        )
+        return {row['reseller_id']: {metric: Decimal(row[metric] or 0) for metric in METRICS} for row in rows}
+
+    def changed_since(self, since: datetime) -> Dict[str, set]:
+        """Resellers with commissions created or modified since ``since``, by the month they count in."""
+        rows = (
+            Commission.objects.filter(modified_at__gte=since)
+            .annotate(month=TruncMonth('created_at'))
+            .values_list('reseller_id', 'month')
+            .distinct()
+        )
+        changed: Dict[str, set] = {}
+        for reseller_id, month in rows:
+            changed.setdefault(month.strftime('%Y-%m'), set()).add(reseller_id)
+        return changed
+
+    def apply(self, period: str, metric: str, values: Dict[int, Decimal],
+              scope: Optional[Iterable[int]] = None) -> int:
+        """
+        Write one board's values and re-rank it.
+
+        Args:
+            period: Board period key
+            metric: Board metric
+            values: New value per reseller; zero or missing means unranked
+            scope: Resellers ``values`` covers (None: the whole board)
+
+        Returns:
+            Number of entries inserted, updated or deleted
+        """
+        board = self.model.objects.filter(period=period, metric=metric)
+        existing = board if scope is None else board.filter(reseller_id__in=list(scope))
+        current = dict(existing.values_list('reseller_id', 'value'))
+        ranked = {reseller_id: value for reseller_id, value in values.items() if value > 0}
+
+        stale = [reseller_id for reseller_id in current if reseller_id not in ranked]
+        changed = [reseller_id for reseller_id, value in ranked.items() if current.get(reseller_id) != value]
+        if stale:
+            board.filter(reseller_id__in=stale).delete()
+        if changed:
+            # Placeholder ranks; rerank() below sets the real ones
+            self.model.objects.bulk_create(
+                [
+                    self.model(period=period, metric=metric, reseller_id=reseller_id, value=ranked[reseller_id],
+                               rank=0, percentile=0)
+                    for reseller_id in changed
+                ],
+                update_conflicts=True,
+                unique_fields=['period', 'metric', 'reseller'],
+                update_fields=['value', 'updated_at'],
+                batch_size=500,
+            )
+        if stale or changed:
+            self.rerank(period, metric)
+        return len(stale) + len(changed)
+
+    def rerank(self, period: str, metric: str) -> int:
+        """Recompute ranks and percentiles for one board, writing only rows that moved."""
+        rows = list(
+            self.model.objects.filter(period=period, metric=metric)
+            .order_by('-value', 'reseller_id')
+            .values_list('id', 'value', 'rank', 'percentile')
+        )
+        population = len(rows)
+        moved = []
+        rank = 0
+        previous = None
+        for position, (pk, value, old_rank, old_percentile) in enumerate(rows, start=1):
+            if value != previous:
+                rank, previous = position, value
+            percentile = (Decimal(population - rank + 1) * 100 / population).quantize(Decimal('0.01'))
+            if rank != old_rank or percentile != old_percentile:
+                moved.append(self.model(pk=pk, rank=rank, percentile=percentile))
+        self.model.objects.bulk_update(moved, ['rank', 'percentile'], batch_size=500)
+        return len(moved)
+
+    def rank_of(self, reseller_id: int, period: str, metric: str) -> Optional[LeaderboardEntry]:
+        """A reseller's entry on one board (unique index lookup), or None when unranked."""
+        return self.model.objects.filter(period=period, metric=metric, reseller_id=reseller_id).first()
+
+    def top(self, period: str, metric: str, limit: int = 10) -> List[LeaderboardEntry]:
+        """The first ``limit`` entries of one board (rank index range scan)."""
+        return list(
+            self.model.objects.filter(period=period, metric=metric)
+            .select_related('reseller__user')
+            .order_by('rank', 'reseller_id')[:limit]
+        )
@@ -1,10 +1,12 @@
 """Reseller repository for data access operations."""
-from typing import Optional, List, Dict, Any
-from django.db.models import Q, QuerySet
+from typing import Optional, List, Dict, Any, Iterable
+from django.db import models
+from django.db.models import Q, QuerySet, F, Case, When, Value, Count, Max
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, date
 
 from ..models.reseller import Reseller
+from ..models.commission import Commission
 from .base import BaseRepository
 
 
@@ -241,3 +243,104 @@ class ResellerRepository(BaseRepository):
             Q(payment_method='') | Q(payment_method__isnull=True),
             is_active=True
         )
+    
+    def record_sale(self, reseller_id: int, sold_at: datetime) -> int:
+        """
+        Increment a reseller's sales counters for one new sale.
+        
+        Runs as a single UPDATE with F() expressions so concurrent sales
+        cannot lose increments. A sale dated before the tracked month only
+        counts towards the lifetime total.
+        
+        Args:
+            reseller_id: ID of the reseller
+            sold_at: When the sale happened
+            
+        Returns:
+            Number of rows updated
+        """
+        month = timezone.localtime(sold_at).date().replace(day=1)
+        newer_month = Q(sales_month__isnull=True) | Q(sales_month__lt=month)
+        return self.model.objects.filter(pk=reseller_id).update(
+            sales_count=F('sales_count') + 1,
+            sales_this_month=Case(
+                When(sales_month=month, then=F('sales_this_month') + 1),
+                When(newer_month, then=Value(1)),
+                default=F('sales_this_month'),
+                output_field=models.PositiveIntegerField(),
+            ),
+            sales_month=Case(
+                When(newer_month, then=Value(month)),
+                default=F('sales_month'),
+                output_field=models.DateField(),
+            ),
+            last_sale_at=Case(
+                When(Q(last_sale_at__isnull=True) | Q(last_sale_at__lt=sold_at), then=Value(sold_at)),
+                default=F('last_sale_at'),
+                output_field=models.DateTimeField(),
+            ),
+        )
+    
+    def rollover_monthly_sales(self, today: Optional[date] = None) -> int:
+        """
+        Reset current-month sales counters left over from previous months.
+        
+        Args:
+            today: Reference date (defaults to today in the active timezone)
+            
+        Returns:
+            Number of resellers reset
+        """
+        month = (today or timezone.localdate()).replace(day=1)
+        return self.model.objects.filter(sales_month__lt=month).update(sales_this_month=0, sales_month=month)
+    
+    def recount_sales(self, reseller_ids: Optional[Iterable[int]] = None, chunk_size: int = 1000) -> int:
+        """
+        Recompute sales counters from commissions (backfill or drift repair).
+        
+        Args:
+            reseller_ids: Restrict to these resellers (all when omitted)
+            chunk_size: Resellers processed per grouped query
+            
+        Returns:
+            Number of resellers recounted
+        """
+        month = timezone.localdate().replace(day=1)
+        month_start = timezone.make_aware(datetime.combine(month, datetime.min.time()))
+        ids_qs = self.model.objects.order_by('pk').values_list('pk', flat=True)
+        if reseller_ids is not None:
+            ids_qs = ids_qs.filter(pk__in=list(reseller_ids))
+        
+        updated = 0
+        last_pk = 0
+        while True:
+            chunk = list(ids_qs.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            stats = {
+                row['reseller_id']: row
+                for row in Commission.objects.filter(reseller_id__in=chunk)
+                .order_by()
+                .values('reseller_id')
+                .annotate(
+                    total=Count('id'),
+                    this_month=Count('id', filter=Q(calculation_date__gte=month_start)),
+                    last=Max('calculation_date'),
+                )
+            }
+            resellers = []
+            for pk in chunk:
+                row = stats.get(pk, {})
+                resellers.append(self.model(
+                    pk=pk,
+                    sales_count=row.get('total', 0),
+                    sales_this_month=row.get('this_month', 0),
+                    sales_month=month,
+                    last_sale_at=row.get('last'),
+                ))
+            self.model.objects.bulk_update(
+                resellers, ['sales_count', 'sales_this_month', 'sales_month', 'last_sale_at']
+            )
+            updated += len(chunk)
+            last_pk = chunk[-1]
+        return updated
@@ -2,6 +2,8 @@
 from .base import BaseService
 from .commission_service import CommissionService
 from .invoice_service import InvoiceService
+from .invoice_pdf_service import InvoicePdfService
+from .leaderboard_service import LeaderboardService
 from .payout_service import PayoutService
 from .reseller_service import ResellerService
 
@@ -9,6 +11,8 @@ __all__ = [
     'BaseService',
     'CommissionService',
     'InvoiceService',
+    'InvoicePdfService',
+    'LeaderboardService',
     'PayoutService',
     'ResellerService',
 ]
@@ -3,6 +3,7 @@ from decimal import Decimal
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from ..models import Commission, Reseller
+from ..repositories.reseller_repository import ResellerRepository
 from .base import BaseService
 
 
@@ -45,6 +46,7 @@ class CommissionService(BaseService):
         # Update reseller's pending commission
         reseller.pending_commission += commission_amount
         reseller.save(update_fields=['pending_commission'])
+        ResellerRepository().record_sale(reseller.pk, commission.calculation_date)
 
         self.log_info(f"Commission created: {commission}")
 
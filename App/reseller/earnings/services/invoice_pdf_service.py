@@ -0,0 +1,146 @@
+"""Invoice PDF rendering service with content-hash keyed caching."""
+import os
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.db import connections
+
+from App.integrations.pdf_service import content_hash, render_pdf
+from ..models import Invoice
+from .base import BaseService
+
+
+class InvoicePdfService(BaseService):
+    """Render invoices into ``Invoice.pdf_file`` once per distinct content."""
+
+    def document(self, invoice):
+        """The fields that appear on the PDF; any change re-renders it."""
+        reseller = invoice.reseller
+        user = reseller.user
+        return {
+            'number': invoice.invoice_number,
+            'status': invoice.status,
+            # issue_date defaults to timezone.now, so unsaved instances may hold a datetime
+            'issue_date': invoice.issue_date.date() if isinstance(invoice.issue_date, datetime) else invoice.issue_date,
+            'due_date': invoice.due_date,
+            'payment_date': invoice.payment_date,
+            'period': [invoice.period_start, invoice.period_end],
+            'description': invoice.description,
+            'subtotal': invoice.subtotal,
+            'tax_amount': invoice.tax_amount,
+            'total_amount': invoice.total_amount,
+            'line_items': invoice.line_items,
+            'notes': invoice.notes,
+            'reseller': [user.get_full_name() or user.username, user.email, reseller.company_name or ''],
+        }
+
+    def fingerprint(self, invoice):
+        return content_hash(self.document(invoice))
+
+    def filename(self, invoice):
+        return f"invoice_{invoice.invoice_number}.pdf"
+
+    def is_current(self, invoice, digest=None):
+        digest = digest or self.fingerprint(invoice)
+        name = invoice.pdf_file.name if invoice.pdf_file else ''
+        return bool(name) and digest[:16] in os.path.basename(name) and invoice.pdf_file.storage.exists(name)
+
+    def ensure_pdf(self, invoice):
+        """
+        Return ``(storage_name, digest)`` for the invoice's current PDF,
+        rendering and storing it only when the content has changed.
+        """
+        digest = self.fingerprint(invoice)
+        if self.is_current(invoice, digest):
+            return invoice.pdf_file.name, digest
+
+        stale = invoice.pdf_file.name if invoice.pdf_file else ''
+        content = self.render(invoice)
+        invoice.pdf_file.save(f"{invoice.invoice_number}-{digest[:16]}.pdf", ContentFile(content), save=False)
+        # Update the column only, so rendering never touches other invoice fields
+        Invoice.objects.filter(pk=invoice.pk).update(pdf_file=invoice.pdf_file.name)
+        if stale and stale != invoice.pdf_file.name:
+            invoice.pdf_file.storage.delete(stale)
+        self.log_info(f"Invoice PDF rendered: {invoice.invoice_number}")
+        return invoice.pdf_file.name, digest
+
+    def render(self, invoice):
+        doc = self.document(invoice)
+        name, email, company = doc['reseller']
+        lines = [
+            f"Invoice #: {invoice.invoice_number}",
+            f"Status: {invoice.get_status_display()}",
+            f"Issue date: {invoice.issue_date}    Due date: {invoice.due_date}",
+            f"Period: {invoice.period_start} to {invoice.period_end}",
+            f"Billed to: {name}{' - ' + company if company else ''} <{email}>",
+            '',
+            ('Items', True),
+        ]
+        items = invoice.line_items if isinstance(invoice.line_items, list) else []
+        for item in items:
+            lines.append(f"{str(item.get('date', ''))[:10]}  {item.get('description', '')}  {item.get('amount', '')}")
+        if not items and invoice.description:
+            lines.append(invoice.description)
+        lines += [
+            '',
+            f"Subtotal: {invoice.subtotal}",
+            f"Tax: {invoice.tax_amount}",
+            (f"Total: {invoice.total_amount}", True),
+        ]
+        if invoice.payment_date:
+            lines.append(f"Paid on: {invoice.payment_date}")
+        if invoice.notes:
+            lines.append(f"Notes: {invoice.notes}")
+        return render_pdf("Commission Invoice", lines, footer="Thank you for partnering with Evolve.")
+
+    def prerender(self, invoice_ids, workers=None, batch_size=50):
+        """
+        Render PDFs for many invoices, in a process pool when ``workers`` > 1.
+        Returns a dict with rendered/current/failed counts.
+        """
+        invoice_ids = list(invoice_ids)
+        batches = [invoice_ids[i:i + batch_size] for i in range(0, len(invoice_ids), batch_size)]
+        totals = {'rendered': 0, 'current': 0, 'failed': 0}
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers <= 1:
+            results = map(_render_batch, batches)
+            for result in results:
+                _merge(totals, result)
+            return totals
+
+        # Children must not inherit open database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for result in pool.map(_render_batch, batches):
+                _merge(totals, result)
+        return totals
+
+
+def _init_worker():
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def _render_batch(invoice_ids):
+    service = InvoicePdfService()
+    result = {'rendered': 0, 'current': 0, 'failed': 0}
+    for invoice in Invoice.objects.select_related('reseller__user').filter(pk__in=invoice_ids):
+        try:
+            if service.is_current(invoice):
+                result['current'] += 1
+            else:
+                service.ensure_pdf(invoice)
+                result['rendered'] += 1
+        except Exception as e:
+            service.log_error(f"Invoice PDF render failed for {invoice.pk}: {e}")
+            result['failed'] += 1
+    return result
+
+
+def _merge(totals, result):
+    for key, value in result.items():
+        totals[key] += value
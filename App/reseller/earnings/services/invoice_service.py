@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from App.reseller import page_cache
 from ..models import Invoice, Commission, Reseller
 from .base import BaseService
 
@@ -215,7 +216,10 @@ class InvoiceService(BaseService):
             due_date__lt=today
         )
         
+        # A queryset update sends no signals; bump the affected resellers' pages here
+        reseller_ids = set(overdue_invoices.values_list('reseller_id', flat=True))
         count = overdue_invoices.update(status='overdue')
+        page_cache.bump(*reseller_ids)
         self.log_info(f"Updated {count} invoices to overdue status.")
         
         return count
@@ -0,0 +1,204 @@
+"""Reseller leaderboard service."""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from App.reseller import page_cache
+from ..repositories.leaderboard_repository import METRICS, LeaderboardRepository, MonthlyTotals
+from .base import BaseService
+
+ALL_TIME = 'all'
+WATERMARK_KEY = 'leaderboard:watermark'
+# Re-read commissions modified shortly before the last run, in case their
+# transactions committed after it read
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# Deleted commissions leave no modified_at behind, so each deletion is queued
+# under a sequence number and folded into the next incremental refresh
+DELETED_SEQ_KEY = 'leaderboard:deleted_seq'
+DELETED_READ_KEY = 'leaderboard:deleted_read'
+DELETED_KEY = 'leaderboard:deleted:{}'
+
+
+def month_key(moment: datetime) -> str:
+    return timezone.localtime(moment).strftime('%Y-%m') if timezone.is_aware(moment) else moment.strftime('%Y-%m')
+
+
+def quarter_of(month: str) -> str:
+    year, number = month.split('-')
+    return f"{year}-Q{(int(number) - 1) // 3 + 1}"
+
+
+def months_in(period: str) -> List[str]:
+    """Months a 'YYYY-MM' or 'YYYY-Qn' period covers"""
+    if '-Q' in period:
+        year, quarter = period.split('-Q')
+        first = (int(quarter) - 1) * 3 + 1
+        return [f"{year}-{month:02d}" for month in range(first, first + 3)]
+    return [period]
+
+
+class LeaderboardService(BaseService):
+    """
+    Keeps per-period reseller rankings (all-time, each month and each
+    quarter, by sales, commissions and conversions) in LeaderboardEntry.
+
+    ``refresh`` is incremental: it only re-reads the resellers whose
+    commissions changed (or were deleted, see ``record_deletion``) since the
+    previous run, and only rewrites the entries whose value or rank moved.
+    Reading a rank or a top-N list is then a single index lookup.
+    """
+
+    def __init__(self, cache_alias='shared'):
+        super().__init__()
+        self.repository = LeaderboardRepository()
+        self.cache = caches[cache_alias]
+
+    @staticmethod
+    def record_deletion(reseller_id: int, created_at: datetime, cache_alias='shared') -> None:
+        """Queue a deleted commission's reseller and month for the next refresh"""
+        cache = caches[cache_alias]
+        cache.add(DELETED_SEQ_KEY, 0, None)
+        cache.set(DELETED_KEY.format(cache.incr(DELETED_SEQ_KEY)), (reseller_id, month_key(created_at)), None)
+
+    def _take_deletions(self):
+        """Queued deletions as {month: {reseller_id}}, plus a callback that marks them read"""
+        seq = self.cache.get(DELETED_SEQ_KEY, 0)
+        read = self.cache.get(DELETED_READ_KEY, 0)
+        keys = [DELETED_KEY.format(n) for n in range(read + 1, seq + 1)]
+        deleted: Dict[str, set] = {}
+        for reseller_id, month in self.cache.get_many(keys).values():
+            deleted.setdefault(month, set()).add(reseller_id)
+
+        def mark_read():
+            self.cache.set(DELETED_READ_KEY, seq, timeout=None)
+            self.cache.delete_many(keys)
+        return deleted, mark_read
+
+    @property
+    def history_months(self) -> int:
+        return int(getattr(settings, 'LEADERBOARD_HISTORY_MONTHS', 12))
+
+    def _history_start(self, now: datetime) -> datetime:
+        """Start of the quarter containing the oldest month boards are kept for"""
+        local = timezone.localtime(now)
+        year, month = local.year, local.month - (self.history_months - 1)
+        while month < 1:
+            year, month = year - 1, month + 12
+        month = ((month - 1) // 3) * 3 + 1
+        return local.replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    def refresh(self, now: Optional[datetime] = None, full: bool = False) -> Dict[str, int]:
+        """
+        Bring every board up to date.
+
+        Args:
+            now: Reference time (defaults to now)
+            full: Rebuild from all commissions instead of those changed since the last run
+
+        Returns:
+            Number of boards touched and entries written
+        """
+        now = now or timezone.now()
+        since = self._history_start(now)
+        watermark = None if full else self.cache.get(WATERMARK_KEY)
+        # A full rebuild reads every commission, so it covers queued deletions too
+        deleted, mark_read = self._take_deletions()
+
+        if watermark is None:
+            monthly = self.repository.monthly_totals(since)
+            lifetime = self.repository.lifetime_totals()
+            boards = self._boards(monthly, since)
+            # Boards that no longer have any commissions are emptied too
+            stale = set(self.repository.get_all().values_list('period', flat=True).distinct())
+            boards.update({period: {} for period in stale - set(boards) - {ALL_TIME}})
+            scope = None
+        else:
+            changed = self.repository.changed_since(watermark - WATERMARK_OVERLAP)
+            for month, reseller_ids in deleted.items():
+                changed.setdefault(month, set()).update(reseller_ids)
+            oldest = month_key(since)
+            scope = set().union(*changed.values()) if changed else set()
+            months = {month for month in changed if month >= oldest}
+            if not scope:
+                self.cache.set(WATERMARK_KEY, now, timeout=None)
+                mark_read()
+                return {'boards': 0, 'entries': 0}
+            # Whole quarters, so quarter boards are summed from complete months
+            periods = months | {quarter_of(month) for month in months}
+            first = min((months_in(p)[0] for p in periods), default=None)
+            start = since if first is None else max(since, timezone.make_aware(datetime.strptime(first, '%Y-%m')))
+            monthly = self.repository.monthly_totals(start, scope) if periods else {}
+            lifetime = self.repository.lifetime_totals(scope)
+            boards = {period: {} for period in periods}
+            boards.update(self._boards(monthly, since, only=periods))
+
+        boards[ALL_TIME] = lifetime
+        written = 0
+        for period, totals in boards.items():
+            for metric in METRICS:
+                values = {reseller_id: figures[metric] for reseller_id, figures in totals.items()}
+                written += self.repository.apply(period, metric, values, scope)
+        self.cache.set(WATERMARK_KEY, now, timeout=None)
+        mark_read()
+        if written:
+            # Ranks can move for resellers whose own data did not change
+            page_cache.bump_scope(page_cache.LEADERBOARD_SCOPE)
+        self.log_info(f"Leaderboards refreshed: {len(boards)} period(s), {written} entries written")
+        return {'boards': len(boards) * len(METRICS), 'entries': written}
+
+    def _boards(self, monthly: MonthlyTotals, since: datetime, only=None) -> Dict[str, Dict[int, Dict[str, Decimal]]]:
+        """Fold (reseller, month) totals into month and quarter boards"""
+        oldest = month_key(since)
+        boards: Dict[str, Dict[int, Dict[str, Decimal]]] = {}
+        for (reseller_id, month), figures in monthly.items():
+            if month < oldest:
+                continue
+            for period in (month, quarter_of(month)):
+                if only is not None and period not in only:
+                    continue
+                totals = boards.setdefault(period, {}).setdefault(reseller_id, dict.fromkeys(METRICS, Decimal('0')))
+                for metric in METRICS:
+                    totals[metric] += figures[metric]
+        return boards
+
+    def current_periods(self, now: Optional[datetime] = None) -> Dict[str, str]:
+        month = month_key(now or timezone.now())
+        return {'month': month, 'quarter': quarter_of(month), 'all_time': ALL_TIME}
+
+    def get_rank(self, reseller_id: int, period: str = ALL_TIME, metric: str = 'sales') -> Optional[Dict[str, Any]]:
+        """A reseller's rank and percentile on one board, or None when unranked"""
+        entry = self.repository.rank_of(reseller_id, period, metric)
+        if entry is None:
+            return None
+        return {
+            'period': period,
+            'metric': metric,
+            'rank': entry.rank,
+            'percentile': float(entry.percentile),
+            'value': float(entry.value),
+        }
+
+    def get_standing(self, reseller_id: int, metric: str = 'sales', now: Optional[datetime] = None) -> Dict[str, Any]:
+        """A reseller's rank this month, this quarter and all-time"""
+        return {
+            name: self.get_rank(reseller_id, period, metric)
+            for name, period in self.current_periods(now).items()
+        }
+
+    def get_top(self, period: str = ALL_TIME, metric: str = 'sales', limit: int = 10) -> List[Dict[str, Any]]:
+        """Top ``limit`` resellers on one board"""
+        return [
+            {
+                'rank': entry.rank,
+                'percentile': float(entry.percentile),
+                'value': float(entry.value),
+                'reseller_id': entry.reseller_id,
+                'name': entry.reseller.user.get_full_name().strip() or entry.reseller.user.username,
+                'company': entry.reseller.company_name or '',
+            }
+            for entry in self.repository.top(period, metric, limit)
+        ]
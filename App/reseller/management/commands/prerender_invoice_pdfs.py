@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from App.reseller.earnings.models import Invoice
+from App.reseller.earnings.services.invoice_pdf_service import InvoicePdfService
+
+
+class Command(BaseCommand):
+    help = "Pre-render invoice PDFs for a period into Invoice.pdf_file using a process pool. Unchanged invoices are skipped."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', type=str, default='', help='Issue date from (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', type=str, default='', help='Issue date to (YYYY-MM-DD)')
+        parser.add_argument('--status', type=str, default='', help='Comma-separated invoice statuses to include')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count; 1 renders in-process)')
+        parser.add_argument('--batch-size', type=int, default=50, help='Invoices per worker task')
+
+    def handle(self, *args, **options):
+        qs = Invoice.objects.order_by('pk')
+        try:
+            if options['date_from']:
+                qs = qs.filter(issue_date__gte=date.fromisoformat(options['date_from']))
+            if options['date_to']:
+                qs = qs.filter(issue_date__lte=date.fromisoformat(options['date_to']))
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+        statuses = [s.strip() for s in options['status'].split(',') if s.strip()]
+        if statuses:
+            qs = qs.filter(status__in=statuses)
+
+        ids = list(qs.values_list('pk', flat=True))
+        self.stdout.write(f"Rendering PDFs for {len(ids)} invoice(s)...")
+        totals = InvoicePdfService().prerender(ids, workers=options['workers'], batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {totals['rendered']}, already current {totals['current']}, failed {totals['failed']}"
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from App.reseller.earnings.services.leaderboard_service import LeaderboardService
+
+
+class Command(BaseCommand):
+    help = "Update reseller leaderboards from commissions changed since the last run (cron-friendly). Use --full to rebuild every board."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild from all commissions and drop boards past LEADERBOARD_HISTORY_MONTHS')
+
+    def handle(self, *args, **options):
+        result = LeaderboardService().refresh(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {result['boards']} leaderboard(s), {result['entries']} entries written"
+        ))
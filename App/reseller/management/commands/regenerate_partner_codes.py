@@ -2,9 +2,8 @@
 Management command to regenerate partner codes with unique alphanumeric format
 """
 from django.core.management.base import BaseCommand
-from django.db import transaction
-from myapp.reseller.earnings.models import Reseller
-from myapp.reseller.utils import generate_partner_code
+from App.reseller.earnings.models import Reseller
+from App.reseller.partner_codes import CHUNK_SIZE, assign_codes
 
 
 class Command(BaseCommand):
@@ -21,6 +20,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be changed without making changes',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Resellers per allocation query and batched update (each chunk is its own transaction)',
+        )
 
     def handle(self, *args, **options):
         username = options.get('user')
@@ -42,25 +47,21 @@ class Command(BaseCommand):
                 self.style.WARNING('DRY RUN MODE - No changes will be made')
             )
         
-        updated_count = 0
-        
-        with transaction.atomic():
-            for reseller in resellers:
-                old_code = reseller.referral_code
-                new_code = generate_partner_code(reseller.user.id)
-                
-                if not dry_run:
-                    reseller.referral_code = new_code
-                    reseller.save()
-                
-                updated_count += 1
-                
+        # Per-reseller lines only for single users or with -v 2; 100k lines would dominate the run
+        verbose = bool(username) or options['verbosity'] > 1
+
+        def report(reseller_id, old_code, new_code):
+            if verbose:
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f'{"Would update" if dry_run else "Updated"} {reseller.user.username}: {old_code} -> {new_code}'
+                        f'{"Would update" if dry_run else "Updated"} reseller {reseller_id}: {old_code} -> {new_code}'
                     )
                 )
         
+        updated_count = assign_codes(
+            resellers, chunk_size=max(1, options['chunk_size']), dry_run=dry_run, on_assign=report,
+        )
+        
         self.stdout.write(
             self.style.SUCCESS(
                 f'\n{"Would regenerate" if dry_run else "Successfully regenerated"} {updated_count} partner codes.'
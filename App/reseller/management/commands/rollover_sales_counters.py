@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from App.reseller.earnings.repositories.reseller_repository import ResellerRepository
+
+
+class Command(BaseCommand):
+    help = "Reset per-reseller current-month sales counters at the start of a month (run monthly, e.g. 00:05 on day 1). Use --recount to rebuild all counters from commissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recount', action='store_true', help='Recompute lifetime, monthly and last-sale counters from commissions')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Resellers per batch when recounting')
+
+    def handle(self, *args, **options):
+        repo = ResellerRepository()
+        if options['recount']:
+            count = repo.recount_sales(chunk_size=max(1, options['chunk_size']))
+            self.stdout.write(self.style.SUCCESS(f"Recounted sales for {count} reseller(s)"))
+            return
+        count = repo.rollover_monthly_sales()
+        self.stdout.write(self.style.SUCCESS(f"Rolled over monthly sales for {count} reseller(s)"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from App.reseller.marketing.services import ClickEventService
+
+
+class Command(BaseCommand):
+    help = "Fold buffered marketing link click events into the hourly/daily rollups, then drop raw events past retention (run every few minutes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Raw events folded per transaction')
+        parser.add_argument('--no-compact', action='store_true', help='Skip deleting rolled-up raw events and old hourly rows')
+
+    def handle(self, *args, **options):
+        service = ClickEventService()
+        folded = service.rollup(batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {folded} click event(s)"))
+        if not options['no_compact']:
+            events, hourly = service.compact()
+            self.stdout.write(self.style.SUCCESS(f"Compacted {events} raw event(s) and {hourly} hourly row(s)"))
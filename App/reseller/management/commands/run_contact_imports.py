@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from App.reseller.sales.services.import_service import ContactImportService
+
+
+class Command(BaseCommand):
+    help = "Process queued bulk lead/referral imports (for workers without in-process import threads, or after a restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stalled-minutes', type=int, default=0,
+                            help='Also restart running imports with no progress for this many minutes')
+
+    def handle(self, *args, **options):
+        minutes = options['stalled_minutes']
+        jobs = ContactImportService().run_pending(stalled_after=timedelta(minutes=minutes) if minutes > 0 else None)
+        for job in jobs:
+            self.stdout.write(
+                f"Import {job.id} ({job.kind}): {job.status}, {job.created_count} created, "
+                f"{job.duplicate_count} duplicate(s), {job.error_count} error(s)"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Processed {len(jobs)} import(s)"))
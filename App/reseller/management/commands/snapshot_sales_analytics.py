@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from App.reseller.sales.services.analytics_service import SalesAnalyticsService
+
+
+class Command(BaseCommand):
+    help = "Write per-reseller daily sales snapshots used by the sales summary (run daily, just after midnight)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--day', help='Day to snapshot as YYYY-MM-DD (default: yesterday)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Resellers per batch of grouped queries')
+        parser.add_argument('--keep-days', type=int, default=400, help='Delete snapshots older than this many days (0 keeps all)')
+
+    def handle(self, *args, **options):
+        day = None
+        if options['day']:
+            try:
+                day = date.fromisoformat(options['day'])
+            except ValueError:
+                raise CommandError('--day must be YYYY-MM-DD')
+        count = SalesAnalyticsService().take_snapshots(
+            day=day, chunk_size=max(1, options['chunk_size']), keep_days=options['keep_days'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} sales snapshot(s)"))
@@ -2,61 +2,37 @@
 Management command to update existing partner codes to EVOLVE format
 """
 from django.core.management.base import BaseCommand
-from myapp.reseller.earnings.models import Reseller
-from myapp.reseller.utils import format_partner_code, generate_partner_code
+from django.db.models import Q
+from App.reseller.earnings.models import Reseller
+from App.reseller.partner_codes import CHUNK_SIZE, assign_codes
 
 
 class Command(BaseCommand):
     help = 'Updates all existing partner codes to use EVOLVE- prefix'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Resellers per allocation query and batched update (each chunk is its own transaction)',
+        )
+
     def handle(self, *args, **options):
-        resellers = Reseller.objects.all()
-        updated_count = 0
-        
-        for reseller in resellers:
-            old_code = reseller.referral_code
-            
-            # Check if code needs updating
-            if old_code and not old_code.startswith('EVOLVE-'):
-                # Try to extract user ID from old code
-                if old_code.startswith('REF-') or old_code.startswith('RSL-') or old_code.startswith('RESL-'):
-                    try:
-                        # Extract the numeric part
-                        parts = old_code.split('-')
-                        if len(parts) > 1 and parts[1].isdigit():
-                            user_id = int(parts[1])
-                            new_code = generate_partner_code(user_id)
-                        else:
-                            # Use the reseller's user ID
-                            new_code = generate_partner_code(reseller.user.id)
-                    except:
-                        # Fallback to using user ID
-                        new_code = generate_partner_code(reseller.user.id)
-                else:
-                    # Generate new code based on user ID
-                    new_code = generate_partner_code(reseller.user.id)
-                
-                reseller.referral_code = new_code
-                reseller.save()
-                updated_count += 1
-                
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'Updated {reseller.user.username}: {old_code} -> {new_code}'
-                    )
-                )
-            elif not old_code:
-                # Generate new code if missing
-                new_code = generate_partner_code(reseller.user.id)
-                reseller.referral_code = new_code
-                reseller.save()
-                updated_count += 1
-                
+        # Old formats (REF-, RSL-, RESL-...) and missing codes get a new EVOLVE- code
+        resellers = Reseller.objects.filter(
+            Q(referral_code__isnull=True) | Q(referral_code='') | ~Q(referral_code__startswith='EVOLVE-')
+        )
+
+        def report(reseller_id, old_code, new_code):
+            if options['verbosity'] > 1:
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f'Generated code for {reseller.user.username}: {new_code}'
+                        f'Updated reseller {reseller_id}: {old_code or "(none)"} -> {new_code}'
                     )
                 )
+
+        updated_count = assign_codes(resellers, chunk_size=max(1, options['chunk_size']), on_assign=report)
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -2,7 +2,6 @@
 from rest_framework import serializers
 
 from App.reseller.marketing.models import MarketingLink, MarketingTool, MarketingResource
-from App.reseller.earnings.models import Commission
 from django.db.models import Sum
 
 
@@ -19,21 +18,19 @@ class MarketingLinkSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "clicks", "conversions", "earnings", "created_at", "modified_at"]
 
     def get_conversions(self, obj):
-        # Count commissions attributed to this link code for the same reseller
-        return Commission.objects.filter(
-            reseller=obj.reseller,
-            notes__icontains=f"link_code={obj.code}"
-        ).count()
+        # Attributed payments that produced a commission (annotated by the list query)
+        count = getattr(obj, "conversion_count", None)
+        if count is None:
+            count = obj.attributions.filter(commission__isnull=False).count()
+        return count
 
     def get_earnings(self, obj):
-        # Sum commission amounts attributed to this link code
-        agg = Commission.objects.filter(
-            reseller=obj.reseller,
-            notes__icontains=f"link_code={obj.code}"
-        ).aggregate(total=Sum('amount'))
-        total = agg.get('total') or 0
+        # Sum of commissions on payments attributed to this link
+        total = getattr(obj, "attributed_earnings", None)
+        if total is None:
+            total = obj.attributions.aggregate(total=Sum("commission__amount"))["total"]
         # Return as string to preserve decimal precision in JSON
-        return str(total)
+        return str(total or 0)
 
 
 class MarketingToolSerializer(serializers.ModelSerializer):
@@ -2,7 +2,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import MarketingLinkViewSet, MarketingToolListView, MarketingResourceListView
+from .views import MarketingLinkViewSet, MarketingToolListView, MarketingResourceListView, MarketingClickStatsView, MarketingFunnelView
 
 router = DefaultRouter()
 router.register(r'marketing/links', MarketingLinkViewSet, basename='marketing-links')
@@ -11,5 +11,7 @@ urlpatterns = [
     path('', include(router.urls)),
     path('marketing/tools/', MarketingToolListView.as_view(), name='marketing-tools'),
     path('marketing/resources/', MarketingResourceListView.as_view(), name='marketing-resources'),
+    path('marketing/clicks/stats/', MarketingClickStatsView.as_view(), name='marketing-click-stats'),
+    path('marketing/funnel/', MarketingFunnelView.as_view(), name='marketing-funnel'),
 ]
 
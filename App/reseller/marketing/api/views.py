@@ -1,11 +1,12 @@
 """Marketing API views (layered)."""
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from App.reseller.marketing.services import (
-    MarketingLinkService, MarketingToolService, MarketingResourceService
+    MarketingLinkService, MarketingToolService, MarketingResourceService, ClickEventService, AttributionService
 )
 from .serializers import (
     MarketingLinkSerializer, MarketingToolSerializer, MarketingResourceSerializer
@@ -61,6 +62,37 @@ class MarketingLinkViewSet(viewsets.ModelViewSet):
         output = self.get_serializer(link)
         return Response(output.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Click/conversion series for one link: ?days=30 (daily) or ?hours=24 (hourly)"""
+        try:
+            data = ClickEventService().stats(
+                link=self.get_object(), days=request.query_params.get('days'), hours=request.query_params.get('hours'),
+            )
+        except ValueError:
+            return Response({'detail': 'days and hours must be integers, days between 1 and 366'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
+
+class MarketingClickStatsView(APIView):
+    """Click/conversion series across all of the reseller's links"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not hasattr(request.user, 'reseller_profile'):
+            return Response({'detail': 'Reseller profile required'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            data = ClickEventService().stats(
+                reseller=request.user.reseller_profile,
+                days=request.query_params.get('days'),
+                hours=request.query_params.get('hours'),
+            )
+        except ValueError:
+            return Response({'detail': 'days and hours must be integers, days between 1 and 366'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
 
 class MarketingToolListView(APIView):
     permission_classes = [IsAuthenticated]
@@ -77,3 +109,28 @@ class MarketingResourceListView(APIView):
         resources = MarketingResourceService().list_resources()
         return Response(MarketingResourceSerializer(resources, many=True).data)
 
+
+class MarketingFunnelView(APIView):
+    """Click -> order -> completed -> commission funnel: ?days=30&link=<id>&by_link=1"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not hasattr(request.user, 'reseller_profile'):
+            return Response({'detail': 'Reseller profile required'}, status=status.HTTP_403_FORBIDDEN)
+        reseller = request.user.reseller_profile
+        link = None
+        link_id = request.query_params.get('link')
+        if link_id:
+            link = MarketingLinkService().list_links(reseller).filter(pk=link_id).first()
+            if link is None:
+                return Response({'detail': 'Link not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            data = AttributionService().funnel(
+                reseller,
+                days=request.query_params.get('days', 30),
+                link=link,
+                by_link=request.query_params.get('by_link') in ('1', 'true'),
+            )
+        except ValueError:
+            return Response({'detail': 'days must be an integer between 1 and 366'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
@@ -3,11 +3,17 @@ from .link import MarketingLink
 from .tool import MarketingTool
 from .resource import MarketingResource
 from .base import TimeStampedModel
+from .click import LinkClickEvent, LinkClickHourly, LinkClickDaily
+from .attribution import PaymentAttribution
 
 __all__ = [
     "MarketingLink",
     "MarketingTool",
     "MarketingResource",
     "TimeStampedModel",
+    "LinkClickEvent",
+    "LinkClickHourly",
+    "LinkClickDaily",
+    "PaymentAttribution",
 ]
 
@@ -0,0 +1,33 @@
+"""Payment attribution: which link/reseller an order came through."""
+from django.db import models
+from django.utils import timezone
+
+from App.reseller.earnings.models.commission import Commission
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.sales.models import Referral
+from .link import MarketingLink
+
+
+class PaymentAttribution(models.Model):
+    """
+    Written when an order is created with an affiliate code, so funnels join
+    on keys instead of parsing "AFF=" out of PaymentRecord.description.
+    completed_at and commission are filled in when the payment settles.
+    """
+    payment = models.OneToOneField("App.PaymentRecord", related_name="attribution", on_delete=models.CASCADE)
+    reseller = models.ForeignKey(Reseller, related_name="attributions", on_delete=models.CASCADE)
+    link = models.ForeignKey(MarketingLink, related_name="attributions", null=True, blank=True, on_delete=models.SET_NULL)
+    referral = models.ForeignKey(Referral, related_name="attributions", null=True, blank=True, on_delete=models.SET_NULL)
+    commission = models.OneToOneField(Commission, related_name="attribution", null=True, blank=True, on_delete=models.SET_NULL)
+    code = models.CharField(max_length=64)
+    created_at = models.DateTimeField(default=timezone.now)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["reseller", "created_at"]),
+            models.Index(fields=["link", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.payment_id} via {self.code}"
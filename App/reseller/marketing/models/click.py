@@ -0,0 +1,59 @@
+"""Marketing link click events and their time-series rollups."""
+from django.db import models
+from django.utils import timezone
+
+from App.reseller.earnings.models.reseller import Reseller
+from .link import MarketingLink
+
+
+class LinkClickEvent(models.Model):
+    """
+    One raw click (or, with converted=True, one attributed sale) on a link.
+    Written in batches by ClickEventBuffer; folded into the hourly and daily
+    rollups by rollup_link_clicks and deleted once older than the raw
+    retention window.
+    """
+    link = models.ForeignKey(MarketingLink, related_name="click_events", on_delete=models.CASCADE)
+    reseller = models.ForeignKey(Reseller, related_name="+", on_delete=models.CASCADE)
+    occurred_at = models.DateTimeField(default=timezone.now)
+    referrer_host = models.CharField(max_length=255, blank=True, default="")
+    converted = models.BooleanField(default=False)
+    rolled_up = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["rolled_up", "id"]),
+            models.Index(fields=["occurred_at"]),
+        ]
+
+    def __str__(self):
+        kind = "conversion" if self.converted else "click"
+        return f"{kind} on {self.link_id} at {self.occurred_at}"
+
+
+class LinkClickRollup(models.Model):
+    """Click and conversion counts for one link in one time bucket."""
+    link = models.ForeignKey(MarketingLink, related_name="+", on_delete=models.CASCADE)
+    reseller = models.ForeignKey(Reseller, related_name="+", on_delete=models.CASCADE)
+    bucket = models.DateTimeField()
+    clicks = models.PositiveIntegerField(default=0)
+    conversions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class LinkClickHourly(LinkClickRollup):
+    class Meta:
+        unique_together = [("link", "bucket")]
+        indexes = [
+            models.Index(fields=["reseller", "bucket"]),
+        ]
+
+
+class LinkClickDaily(LinkClickRollup):
+    class Meta:
+        unique_together = [("link", "bucket")]
+        indexes = [
+            models.Index(fields=["reseller", "bucket"]),
+        ]
@@ -2,10 +2,14 @@
 from .link_repository import MarketingLinkRepository
 from .tool_repository import MarketingToolRepository
 from .resource_repository import MarketingResourceRepository
+from .click_repository import ClickRollupRepository
+from .attribution_repository import AttributionRepository
 
 __all__ = [
     "MarketingLinkRepository",
     "MarketingToolRepository",
     "MarketingResourceRepository",
+    "ClickRollupRepository",
+    "AttributionRepository",
 ]
 
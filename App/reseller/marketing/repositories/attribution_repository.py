@@ -0,0 +1,52 @@
+"""Payment attribution repository and funnel queries."""
+from django.db.models import Count, Q, Sum
+
+from .base import BaseRepository
+from App.reseller.marketing.models import LinkClickDaily, PaymentAttribution
+
+FUNNEL_STAGES = ("clicks", "orders", "completed", "commissions")
+
+
+class AttributionRepository(BaseRepository):
+    model = PaymentAttribution
+
+    def funnel(self, reseller_id, start, end, link_id=None, by_link=False):
+        """
+        Click -> order -> completed -> commission counts for a reseller (or one
+        of its links) between start and end. Orders come from the
+        (reseller, created_at) / (link, created_at) indexes, clicks from the
+        daily click rollup. With by_link, returns {link_id: stages} instead.
+        """
+        orders = PaymentAttribution.objects.filter(reseller_id=reseller_id, created_at__gte=start, created_at__lte=end)
+        clicks = LinkClickDaily.objects.filter(
+            reseller_id=reseller_id, bucket__gte=start.replace(hour=0, minute=0, second=0, microsecond=0), bucket__lte=end,
+        )
+        if link_id is not None:
+            orders = orders.filter(link_id=link_id)
+            clicks = clicks.filter(link_id=link_id)
+
+        order_aggregates = dict(
+            orders=Count("id"),
+            completed=Count("id", filter=Q(completed_at__isnull=False)),
+            commissions=Count("commission_id"),
+            sales=Sum("payment__amount", filter=Q(completed_at__isnull=False)),
+            commission_amount=Sum("commission__amount"),
+        )
+        if not by_link:
+            stages = orders.aggregate(**order_aggregates)
+            stages["clicks"] = clicks.aggregate(total=Sum("clicks"))["total"] or 0
+            return self._normalize(stages)
+
+        rows = {}
+        for row in clicks.values("link_id").annotate(total=Sum("clicks")):
+            rows.setdefault(row["link_id"], {})["clicks"] = row["total"]
+        for row in orders.values("link_id").annotate(**order_aggregates):
+            rows.setdefault(row.pop("link_id"), {}).update(row)
+        return {link: self._normalize(stages) for link, stages in rows.items()}
+
+    @staticmethod
+    def _normalize(stages):
+        out = {stage: stages.get(stage) or 0 for stage in FUNNEL_STAGES}
+        out["sales"] = str(stages.get("sales") or 0)
+        out["commission_amount"] = str(stages.get("commission_amount") or 0)
+        return out
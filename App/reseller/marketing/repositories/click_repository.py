@@ -0,0 +1,148 @@
+"""Click event rollups: hourly/daily aggregation, compaction and chart series."""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncHour
+
+from .base import BaseRepository
+from App.reseller.marketing.models import LinkClickDaily, LinkClickEvent, LinkClickHourly, MarketingLink
+
+GRANULARITIES = {
+    "hour": (LinkClickHourly, timedelta(hours=1)),
+    "day": (LinkClickDaily, timedelta(days=1)),
+}
+
+
+def floor_bucket(value, granularity):
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if granularity == "day" else value
+
+
+class ClickRollupRepository(BaseRepository):
+    model = LinkClickEvent
+
+    # Rollup -------------------------------------------------------------
+
+    def rollup(self, batch_size=5000):
+        """
+        Fold raw events that have not been rolled up yet into the hourly and
+        daily tables, one batch per transaction. Also keeps the legacy
+        MarketingLink.clicks counter in step. Returns the number of events folded.
+
+        Each batch locks its pending rows (SKIP LOCKED), aggregates exactly
+        those ids and marks exactly those ids, so overlapping runs fold
+        disjoint batches. Backends without row locks (SQLite) serialize the
+        writes instead; ClickEventService.rollup also keeps runs single-flight.
+        """
+        folded = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    LinkClickEvent.objects.select_for_update(skip_locked=True)
+                    .filter(rolled_up=False)
+                    .order_by("id")
+                    .values_list("id", flat=True)[:batch_size]
+                )
+                if not ids:
+                    return folded
+                pending = LinkClickEvent.objects.filter(id__in=ids)
+                groups = list(
+                    pending.annotate(hour=TruncHour("occurred_at"))
+                    .values("link_id", "reseller_id", "hour")
+                    .annotate(
+                        clicks=Count("id", filter=Q(converted=False)),
+                        conversions=Count("id", filter=Q(converted=True)),
+                    )
+                    .order_by()
+                )
+                hourly, daily, per_link = {}, defaultdict(lambda: [0, 0]), defaultdict(int)
+                for g in groups:
+                    hourly[(g["link_id"], g["reseller_id"], g["hour"])] = [g["clicks"], g["conversions"]]
+                    day = daily[(g["link_id"], g["reseller_id"], floor_bucket(g["hour"], "day"))]
+                    day[0] += g["clicks"]
+                    day[1] += g["conversions"]
+                    per_link[g["link_id"]] += g["clicks"]
+                self._merge(LinkClickHourly, hourly)
+                self._merge(LinkClickDaily, daily)
+                for link_id, clicks in per_link.items():
+                    if clicks:
+                        MarketingLink.objects.filter(pk=link_id).update(clicks=F("clicks") + clicks)
+                pending.update(rolled_up=True)
+                folded += len(ids)
+
+    def _merge(self, model, counts):
+        """Add counts keyed by (link_id, reseller_id, bucket) onto existing rows, creating missing ones"""
+        if not counts:
+            return
+        link_ids = {key[0] for key in counts}
+        buckets = {key[2] for key in counts}
+        existing = {
+            (row.link_id, row.reseller_id, row.bucket): row
+            for row in model.objects.select_for_update().filter(link_id__in=link_ids, bucket__in=buckets)
+        }
+        to_update, to_create = [], []
+        for key, (clicks, conversions) in counts.items():
+            row = existing.get(key)
+            if row is not None:
+                row.clicks += clicks
+                row.conversions += conversions
+                to_update.append(row)
+            else:
+                to_create.append(model(
+                    link_id=key[0], reseller_id=key[1], bucket=key[2], clicks=clicks, conversions=conversions,
+                ))
+        model.objects.bulk_update(to_update, ["clicks", "conversions"], batch_size=500)
+        model.objects.bulk_create(to_create, batch_size=500)
+
+    # Compaction ---------------------------------------------------------
+
+    def compact(self, raw_before, hourly_before=None, batch_size=5000):
+        """Delete rolled-up raw events (and optionally old hourly rows); returns (events, hourly) deleted"""
+        events = self._delete_in_batches(
+            LinkClickEvent.objects.filter(rolled_up=True, occurred_at__lt=raw_before), batch_size
+        )
+        hourly = 0
+        if hourly_before is not None:
+            hourly = self._delete_in_batches(LinkClickHourly.objects.filter(bucket__lt=hourly_before), batch_size)
+        return events, hourly
+
+    @staticmethod
+    def _delete_in_batches(qs, batch_size):
+        deleted = 0
+        while True:
+            ids = list(qs.order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += qs.model.objects.filter(id__in=ids).delete()[0]
+
+    # Chart series -------------------------------------------------------
+
+    def series(self, granularity, start, end, link_id=None, reseller_id=None):
+        """
+        Per-bucket clicks/conversions between start and end (inclusive of the
+        bucket containing start), zero-filled. Reads one rollup row per link
+        per bucket, independent of how many clicks happened.
+        """
+        model, step = GRANULARITIES[granularity]
+        first = floor_bucket(start, granularity)
+        qs = model.objects.filter(bucket__gte=first, bucket__lte=end)
+        if link_id is not None:
+            qs = qs.filter(link_id=link_id)
+        if reseller_id is not None:
+            qs = qs.filter(reseller_id=reseller_id)
+        rows = {
+            row["bucket"]: row
+            for row in qs.values("bucket").annotate(clicks=Sum("clicks"), conversions=Sum("conversions"))
+        }
+        points, bucket = [], first
+        while bucket <= end:
+            row = rows.get(bucket) or {}
+            points.append({
+                "bucket": bucket,
+                "clicks": row.get("clicks") or 0,
+                "conversions": row.get("conversions") or 0,
+            })
+            bucket += step
+        return points
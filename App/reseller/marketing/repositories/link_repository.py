@@ -1,4 +1,6 @@
 """Marketing link repository."""
+from django.db.models import Count, Q, Sum
+
 from .base import BaseRepository
 from App.reseller.marketing.models import MarketingLink
 
@@ -7,5 +9,9 @@ class MarketingLinkRepository(BaseRepository):
     model = MarketingLink
 
     def list_for_reseller(self, reseller):
-        return self.filter(reseller=reseller, is_active=True)
+        # Meta.ordering is dropped on GROUP BY queries, so order explicitly (newest first, stable)
+        return self.filter(reseller=reseller, is_active=True).annotate(
+            conversion_count=Count("attributions", filter=Q(attributions__commission__isnull=False)),
+            attributed_earnings=Sum("attributions__commission__amount"),
+        ).order_by("-created_at", "-id")
 
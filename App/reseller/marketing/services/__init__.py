@@ -2,10 +2,14 @@
 from .link_service import MarketingLinkService
 from .tool_service import MarketingToolService
 from .resource_service import MarketingResourceService
+from .click_service import ClickEventService
+from .attribution_service import AttributionService
 
 __all__ = [
     "MarketingLinkService",
     "MarketingToolService",
     "MarketingResourceService",
+    "ClickEventService",
+    "AttributionService",
 ]
 
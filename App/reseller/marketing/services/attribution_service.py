@@ -0,0 +1,163 @@
+"""Conversion attribution: order -> link/reseller, settlement and funnels."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .base import BaseService
+from .click_service import ClickEventService, parse_days
+from App.reseller.earnings.models import Commission
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.marketing.models import MarketingLink, PaymentAttribution
+from App.reseller.marketing.repositories import AttributionRepository
+from App.reseller.sales.models import Referral, ReferralStatusChoices
+
+# Funnels and their per-reseller versions live in the shared cache, so a bump in
+# the worker that handled the IPN invalidates every worker's copy
+FUNNEL_CACHE_ALIAS = "shared"
+FUNNEL_CACHE_VERSION_KEY = "attribution_funnel_version_{}"
+
+
+def legacy_affiliate_code(description):
+    """Code from the "| AFF=<code>" marker older orders carry in their description"""
+    if description and 'AFF=' in description:
+        return description.split('AFF=', 1)[1].strip()[:64] or None
+    return None
+
+
+class AttributionService(BaseService):
+    def __init__(self):
+        super().__init__()
+        self.repo = AttributionRepository()
+
+    # Recording ----------------------------------------------------------
+
+    def record_order(self, payment, code, reseller_id=None):
+        """
+        Attribute a just-created PaymentRecord to the link (or partner code)
+        it came through. Returns the attribution, or None when the code does
+        not resolve to a reseller.
+        """
+        if not code:
+            return None
+        link = MarketingLink.objects.filter(code=code, is_active=True).only("id", "reseller_id").first()
+        if link is not None:
+            reseller_id = link.reseller_id
+        elif reseller_id is None:
+            reseller_id = Reseller.objects.filter(referral_code=code).values_list("id", flat=True).first()
+        if reseller_id is None:
+            return None
+
+        referral = None
+        email = getattr(payment.user, "email", "")
+        if email:
+            referral = Referral.objects.filter(reseller_id=reseller_id, referred_email__iexact=email).order_by("-created_at").first()
+        attribution, _ = PaymentAttribution.objects.get_or_create(
+            payment=payment,
+            defaults={
+                "reseller_id": reseller_id,
+                "link": link,
+                "referral": referral,
+                "code": code[:64],
+                "created_at": payment.created_at or timezone.now(),
+            },
+        )
+        self._bump_funnel_version(reseller_id)
+        return attribution
+
+    def attribution_for(self, payment, fallback_code=None, fallback_reseller_id=None):
+        """The payment's attribution; orders created before attributions existed are recorded now"""
+        try:
+            return payment.attribution
+        except PaymentAttribution.DoesNotExist:
+            pass
+        code = legacy_affiliate_code(payment.description) or fallback_code
+        return self.record_order(payment, code, reseller_id=fallback_reseller_id)
+
+    # Settlement ---------------------------------------------------------
+
+    def settle(self, payment, *, tracking_id=None, sale_amount=None, billing="monthly", client=None,
+               fallback_code=None, fallback_reseller_id=None):
+        """
+        Mark an attributed payment completed and create its commission once.
+        Safe to call from the IPN, the payment callback and reconciliation for
+        the same payment: the second caller finds the linked commission.
+        Returns the commission, or None for unattributed payments.
+        """
+        attribution = self.attribution_for(payment, fallback_code, fallback_reseller_id)
+        if attribution is None:
+            return None
+
+        with transaction.atomic():
+            attribution = PaymentAttribution.objects.select_for_update().select_related("reseller").get(pk=attribution.pk)
+            if attribution.completed_at is None:
+                attribution.completed_at = timezone.now()
+            if attribution.commission_id is None:
+                attribution.commission = self._commission_for(attribution, payment, tracking_id, sale_amount, billing, client)
+            attribution.save(update_fields=["completed_at", "commission"])
+            if attribution.referral_id:
+                Referral.objects.filter(pk=attribution.referral_id).update(status=ReferralStatusChoices.PURCHASED)
+        self._bump_funnel_version(attribution.reseller_id)
+        return attribution.commission
+
+    def _commission_for(self, attribution, payment, tracking_id, sale_amount, billing, client):
+        from App.reseller.earnings.services.commission_service import CommissionService
+
+        tx_ref = tracking_id or payment.provider_tracking_id or payment.order_id
+        existing = Commission.objects.filter(transaction_reference=tx_ref).first()
+        if existing is not None:
+            return existing
+        client = client or payment.user
+        reseller = attribution.reseller
+        try:
+            with transaction.atomic():
+                commission = CommissionService().create_commission({
+                    'reseller': reseller,
+                    'sale_amount': payment.amount if payment.amount else (sale_amount or 0),
+                    'commission_rate': float(reseller.get_tier_commission_rate()),
+                    'transaction_reference': tx_ref,
+                    'client_name': (client.get_full_name() or client.username) if client else '',
+                    'client_email': client.email if client else '',
+                    'product_name': 'Payroll Subscription',
+                    'product_type': 'subscription',
+                    'notes': f"link_code={attribution.code}; product=payroll; billing={billing}",
+                })
+        except IntegrityError:
+            # Another caller created it between our check and insert
+            return Commission.objects.get(transaction_reference=tx_ref)
+        if attribution.link_id:
+            ClickEventService().record_conversion(attribution.code)
+        return commission
+
+    # Funnels ------------------------------------------------------------
+
+    def funnel(self, reseller, days=30, link=None, by_link=False, now=None):
+        """
+        Cached funnel for the last ``days`` days. The cache key carries a
+        per-reseller version that every new or settled attribution bumps;
+        click counts may lag by up to ATTRIBUTION_FUNNEL_CACHE_SECONDS.
+        Raises ValueError unless ``days`` is in 1..366.
+        """
+        days = parse_days(days)
+        now = now or timezone.now()
+        start = now - timedelta(days=days)
+        cache = caches[FUNNEL_CACHE_ALIAS]
+        version = cache.get(FUNNEL_CACHE_VERSION_KEY.format(reseller.pk), 0)
+        key = f"attribution_funnel_v1_{reseller.pk}_{version}_{link.pk if link else 'all'}_{int(by_link)}_{days}_{now:%Y%m%d%H}"
+        data = cache.get(key)
+        if data is None:
+            data = self.repo.funnel(reseller.pk, start, now, link_id=link.pk if link else None, by_link=by_link)
+            cache.set(key, data, getattr(settings, "ATTRIBUTION_FUNNEL_CACHE_SECONDS", 300))
+        return {"days": days, "start": start, "end": now, "funnel": data}
+
+    @staticmethod
+    def _bump_funnel_version(reseller_id):
+        cache = caches[FUNNEL_CACHE_ALIAS]
+        key = FUNNEL_CACHE_VERSION_KEY.format(reseller_id)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
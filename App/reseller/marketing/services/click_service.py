@@ -0,0 +1,165 @@
+"""Marketing link click events: buffered capture and chart statistics."""
+import atexit
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import request_finished
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .base import BaseService
+from App.reseller.marketing.models import LinkClickEvent, MarketingLink
+from App.reseller.marketing.repositories import ClickRollupRepository
+
+# Single-flight lock for rollup runs (the row locks in ClickRollupRepository.rollup
+# are the guarantee where the backend supports them)
+ROLLUP_LOCK_KEY = "marketing_click_rollup_lock"
+ROLLUP_LOCK_TTL = 600
+# Longest daily chart range; one point per day, so this bounds a chart's cost
+MAX_DAYS = 366
+
+
+def parse_days(days, default=30):
+    """``days`` as an int in 1..MAX_DAYS; raises ValueError otherwise"""
+    days = int(days or default)
+    if not 1 <= days <= MAX_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_DAYS}")
+    return days
+
+
+class ClickEventBuffer:
+    """
+    Process-wide buffer of unsaved LinkClickEvent rows, written with one
+    bulk_create when CLICK_BUFFER_SIZE is reached, when the oldest event is
+    older than CLICK_BUFFER_MAX_AGE seconds, at the end of each request and
+    at interpreter exit. A redirect therefore costs no write of its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._oldest = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, event):
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(event)
+            due = (
+                len(self._pending) >= int(getattr(settings, "CLICK_BUFFER_SIZE", 200))
+                or time.monotonic() - self._oldest >= float(getattr(settings, "CLICK_BUFFER_MAX_AGE", 10))
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending, self._oldest = self._pending, [], None
+        if not batch:
+            return 0
+        try:
+            LinkClickEvent.objects.bulk_create(batch, batch_size=500)
+        except DatabaseError:
+            # Clicks are analytics, not money: log and move on rather than retry row by row
+            BaseService().log_error(f"Dropped {len(batch)} click event(s) after a failed bulk insert")
+            return 0
+        return len(batch)
+
+    def discard(self):
+        with self._lock:
+            self._pending, self._oldest = [], None
+
+
+click_buffer = ClickEventBuffer()
+atexit.register(click_buffer.flush)
+
+
+def _flush_on_request_finished(sender, **kwargs):
+    if len(click_buffer):
+        click_buffer.flush()
+
+
+request_finished.connect(_flush_on_request_finished, dispatch_uid="marketing_click_buffer_flush")
+
+
+def referrer_host(request):
+    try:
+        return (urlparse(request.META.get("HTTP_REFERER", "")).hostname or "")[:255]
+    except ValueError:
+        return ""
+
+
+class ClickEventService(BaseService):
+    def __init__(self):
+        super().__init__()
+        self.repo = ClickRollupRepository()
+
+    def record_click(self, link, request):
+        click_buffer.add(LinkClickEvent(
+            link_id=link.pk, reseller_id=link.reseller_id, referrer_host=referrer_host(request),
+        ))
+
+    def record_conversion(self, code):
+        """Append a converted event for the link with this code (attributed sale)"""
+        link = MarketingLink.objects.filter(code=code).only("id", "reseller_id").first()
+        if link is None:
+            return
+        click_buffer.add(LinkClickEvent(link_id=link.pk, reseller_id=link.reseller_id, converted=True))
+
+    def stats(self, *, link=None, reseller=None, days=None, hours=None, now=None):
+        """
+        Chart series for a link or a whole reseller. ``hours`` ranges up to
+        CLICK_HOURLY_MAX_HOURS read the hourly rollup, everything else the
+        daily one. Raises ValueError unless ``days`` is in 1..MAX_DAYS.
+        """
+        now = now or timezone.now()
+        if hours:
+            hours = max(1, min(int(hours), int(getattr(settings, "CLICK_HOURLY_MAX_HOURS", 72))))
+            granularity, start = "hour", now - timedelta(hours=hours - 1)
+        else:
+            granularity, start = "day", now - timedelta(days=parse_days(days) - 1)
+        points = self.repo.series(
+            granularity, start, now,
+            link_id=link.pk if link is not None else None,
+            reseller_id=reseller.pk if reseller is not None else None,
+        )
+        clicks = sum(p["clicks"] for p in points)
+        conversions = sum(p["conversions"] for p in points)
+        for p in points:
+            p["conversion_rate"] = round(p["conversions"] * 100 / p["clicks"], 2) if p["clicks"] else 0.0
+        return {
+            "granularity": granularity,
+            "points": points,
+            "totals": {
+                "clicks": clicks,
+                "conversions": conversions,
+                "conversion_rate": round(conversions * 100 / clicks, 2) if clicks else 0.0,
+            },
+        }
+
+    def flush(self):
+        return click_buffer.flush()
+
+    def rollup(self, batch_size=5000):
+        """Flush this process's buffer and fold pending events; 0 if another run holds the lock"""
+        click_buffer.flush()
+        if not caches["shared"].add(ROLLUP_LOCK_KEY, 1, ROLLUP_LOCK_TTL):
+            self.log_info("Click rollup already running elsewhere; skipped")
+            return 0
+        try:
+            return self.repo.rollup(batch_size=batch_size)
+        finally:
+            caches["shared"].delete(ROLLUP_LOCK_KEY)
+
+    def compact(self, now=None):
+        now = now or timezone.now()
+        raw_before = now - timedelta(hours=int(getattr(settings, "CLICK_EVENT_RETENTION_HOURS", 48)))
+        hourly_before = now - timedelta(days=int(getattr(settings, "CLICK_HOURLY_RETENTION_DAYS", 90)))
+        return self.repo.compact(raw_before, hourly_before)
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:35
+
+from datetime import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+
+def backfill_sales_counters(apps, schema_editor):
+    Reseller = apps.get_model('reseller', 'Reseller')
+    Commission = apps.get_model('reseller', 'Commission')
+    month = timezone.localdate().replace(day=1)
+    month_start = timezone.make_aware(datetime.combine(month, datetime.min.time()))
+    stats = (
+        Commission.objects.order_by()
+        .values('reseller_id')
+        .annotate(
+            total=Count('id'),
+            this_month=Count('id', filter=Q(calculation_date__gte=month_start)),
+            last=Max('calculation_date'),
+        )
+        .iterator(chunk_size=2000)
+    )
+    batch = []
+    for row in stats:
+        batch.append(Reseller(
+            pk=row['reseller_id'],
+            sales_count=row['total'],
+            sales_this_month=row['this_month'],
+            sales_month=month,
+            last_sale_at=row['last'],
+        ))
+        if len(batch) >= 1000:
+            Reseller.objects.bulk_update(batch, ['sales_count', 'sales_this_month', 'sales_month', 'last_sale_at'])
+            batch = []
+    if batch:
+        Reseller.objects.bulk_update(batch, ['sales_count', 'sales_this_month', 'sales_month', 'last_sale_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reseller', '0005_resellersettings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reseller',
+            name='last_sale_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reseller',
+            name='sales_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reseller',
+            name='sales_month',
+            field=models.DateField(blank=True, help_text='First day of the month sales_this_month counts', null=True),
+        ),
+        migrations.AddField(
+            model_name='reseller',
+            name='sales_this_month',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='reseller',
+            index=models.Index(fields=['sales_count'], name='reseller_sales_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reseller',
+            index=models.Index(fields=['last_sale_at'], name='reseller_last_sale_idx'),
+        ),
+        migrations.RunPython(backfill_sales_counters, migrations.RunPython.noop),
+    ]
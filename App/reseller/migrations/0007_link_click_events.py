@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-19 17:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reseller', '0006_reseller_sales_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkClickDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('clicks', models.PositiveIntegerField(default=0)),
+                ('conversions', models.PositiveIntegerField(default=0)),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reseller.marketinglink')),
+                ('reseller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reseller.reseller')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reseller', 'bucket'], name='reseller_li_reselle_8268db_idx')],
+                'unique_together': {('link', 'bucket')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LinkClickEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('referrer_host', models.CharField(blank=True, default='', max_length=255)),
+                ('converted', models.BooleanField(default=False)),
+                ('rolled_up', models.BooleanField(default=False)),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='click_events', to='reseller.marketinglink')),
+                ('reseller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reseller.reseller')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['rolled_up', 'id'], name='reseller_li_rolled__81acba_idx'), models.Index(fields=['occurred_at'], name='reseller_li_occurre_83aff5_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LinkClickHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('clicks', models.PositiveIntegerField(default=0)),
+                ('conversions', models.PositiveIntegerField(default=0)),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reseller.marketinglink')),
+                ('reseller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reseller.reseller')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reseller', 'bucket'], name='reseller_li_reselle_d52a2d_idx')],
+                'unique_together': {('link', 'bucket')},
+            },
+        ),
+    ]
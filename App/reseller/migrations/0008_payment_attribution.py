@@ -0,0 +1,67 @@
+# Generated by Django 5.2.5 on 2026-10-19 17:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_attributions(apps, schema_editor):
+    """Create attributions for existing orders that carry an "AFF=<code>" marker"""
+    PaymentRecord = apps.get_model('App', 'PaymentRecord')
+    PaymentAttribution = apps.get_model('reseller', 'PaymentAttribution')
+    MarketingLink = apps.get_model('reseller', 'MarketingLink')
+    Commission = apps.get_model('reseller', 'Commission')
+
+    links = {}
+    rows = []
+    used_commissions = set()
+    for pr in PaymentRecord.objects.filter(description__contains='AFF=').iterator():
+        code = pr.description.split('AFF=', 1)[1].strip()[:64]
+        if code not in links:
+            links[code] = MarketingLink.objects.filter(code=code).order_by('-is_active', 'id').first()
+        link = links[code]
+        if link is None:
+            continue
+        refs = [r for r in (pr.provider_tracking_id, pr.order_id) if r]
+        commission = Commission.objects.filter(transaction_reference__in=refs).exclude(id__in=used_commissions).first()
+        if commission:
+            used_commissions.add(commission.id)
+        rows.append(PaymentAttribution(
+            payment_id=pr.id,
+            reseller_id=link.reseller_id,
+            link_id=link.id,
+            commission_id=commission.id if commission else None,
+            code=code,
+            created_at=pr.created_at,
+            completed_at=pr.updated_at if pr.status == 'completed' else None,
+        ))
+    PaymentAttribution.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App', '0017_subscription_lifecycle'),
+        ('reseller', '0007_link_click_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentAttribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('commission', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attribution', to='reseller.commission')),
+                ('link', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attributions', to='reseller.marketinglink')),
+                ('payment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='attribution', to='App.paymentrecord')),
+                ('referral', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attributions', to='reseller.referral')),
+                ('reseller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attributions', to='reseller.reseller')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reseller', 'created_at'], name='reseller_pa_reselle_0cedb6_idx'), models.Index(fields=['link', 'created_at'], name='reseller_pa_link_id_f2d120_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_attributions, migrations.RunPython.noop),
+    ]
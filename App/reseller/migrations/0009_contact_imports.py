@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 17:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reseller', '0008_payment_attribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('leads', 'Leads'), ('referrals', 'Referrals')], max_length=16)),
+                ('file', models.FileField(upload_to='imports/%Y/%m/')),
+                ('file_format', models.CharField(max_length=8)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('rows_processed', models.PositiveIntegerField(default=0)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('duplicate_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('reseller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contact_imports', to='reseller.reseller')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['reseller', 'status'], name='reseller_co_reselle_6b3d61_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-19 17:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reseller', '0009_contact_imports'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDailySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('leads_by_status', models.JSONField(default=dict)),
+                ('referrals_by_status', models.JSONField(default=dict)),
+                ('commission_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('leads_created', models.PositiveIntegerField(default=0)),
+                ('referrals_created', models.PositiveIntegerField(default=0)),
+                ('commissions_count', models.PositiveIntegerField(default=0)),
+                ('commission_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='commission',
+            index=models.Index(fields=['reseller', 'calculation_date'], name='commissions_reselle_7f51b5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['reseller', 'created_at'], name='reseller_le_reselle_9e3d70_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='referral',
+            index=models.Index(fields=['reseller', 'created_at'], name='reseller_re_reselle_66d2dd_idx'),
+        ),
+        migrations.AddField(
+            model_name='salesdailysnapshot',
+            name='reseller',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_snapshots', to='reseller.reseller'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='salesdailysnapshot',
+            unique_together={('reseller', 'day')},
+        ),
+    ]
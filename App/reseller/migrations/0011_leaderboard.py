@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reseller', '0010_sales_analytics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(max_length=8)),
+                ('metric', models.CharField(choices=[('sales', 'Sales'), ('commissions', 'Commissions'), ('conversions', 'Conversions')], max_length=16)),
+                ('value', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('rank', models.PositiveIntegerField()),
+                ('percentile', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reseller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reseller.reseller')),
+            ],
+            options={
+                'db_table': 'reseller_leaderboard',
+                'indexes': [models.Index(fields=['period', 'metric', 'rank'], name='leaderboard_rank_idx')],
+                'unique_together': {('period', 'metric', 'reseller')},
+            },
+        ),
+    ]
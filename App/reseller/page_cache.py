@@ -0,0 +1,177 @@
+"""
+Per-reseller page caching.
+
+Every reseller has a version stamp in the shared cache (microseconds since
+the epoch of the last change to their data). Signal handlers in
+``App.reseller.signals`` bump it once the transaction that saved a
+commission, invoice, payout or the reseller itself commits, so anything
+keyed on the stamp is invalidated without having to track individual keys.
+
+Two things hang off the stamp:
+
+* ``fragment`` caches expensive parts of a page (summaries, totals) under a
+  key that carries the stamp, so a bump simply makes them unreachable.
+* ``revalidate``/``revalidated`` derive an ``ETag`` and ``Last-Modified``
+  from the stamp. A browser revalidating a page it already has gets a 304
+  after a couple of cache reads, before the view runs any of its queries.
+
+Data shared by every reseller (e.g. leaderboard ranks) has its own stamp
+under a scope name, bumped with ``bump_scope`` and folded in by passing the
+scope to the functions above.
+"""
+import hashlib
+import time
+from functools import wraps
+from typing import Callable, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+CACHE_ALIAS = 'shared'
+VERSION_KEY = 'reseller_page_version:{}'
+SCOPE_KEY = 'reseller_page_scope:{}'
+USER_KEY = 'reseller_page_user:{}'
+FRAGMENT_KEY = 'reseller_page_fragment:{}:{}:{}'
+LEADERBOARD_SCOPE = 'leaderboard'
+
+Validators = Tuple[str, float]
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _now_stamp() -> int:
+    return time.time_ns() // 1000
+
+
+def _timeout() -> int:
+    return int(getattr(settings, 'RESELLER_PAGE_CACHE_SECONDS', 3600))
+
+
+def _stamps(keys) -> list:
+    """Current stamps for ``keys``, starting any missing one at now"""
+    cache = _cache()
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = _now_stamp()
+        for key in missing:
+            # add() so a stamp another worker just set is not overwritten
+            cache.add(key, now, None)
+        found.update(cache.get_many(missing))
+    return [found.get(key, 0) for key in keys]
+
+
+def _keys(reseller_id: int, scopes: Iterable[str]) -> list:
+    return [VERSION_KEY.format(reseller_id)] + [SCOPE_KEY.format(scope) for scope in scopes]
+
+
+def version(reseller_id: int, scopes: Iterable[str] = ()) -> str:
+    """Version token for a reseller's data (and any shared scopes)"""
+    return '.'.join(str(stamp) for stamp in _stamps(_keys(reseller_id, scopes)))
+
+
+def bump(*reseller_ids: int) -> None:
+    """Invalidate everything cached for these resellers once the current transaction commits"""
+    keys = [VERSION_KEY.format(reseller_id) for reseller_id in reseller_ids if reseller_id]
+    if keys:
+        transaction.on_commit(lambda: _cache().set_many(dict.fromkeys(keys, _now_stamp()), None))
+
+
+def bump_scope(scope: str) -> None:
+    """Invalidate everything cached with ``scope`` once the current transaction commits"""
+    transaction.on_commit(lambda: _cache().set(SCOPE_KEY.format(scope), _now_stamp(), None))
+
+
+def remember_reseller(user_id: int, reseller_id: int) -> None:
+    """Record which reseller a user is, so revalidation can skip the lookup"""
+    _cache().set(USER_KEY.format(user_id), reseller_id, None)
+
+
+def reseller_id_for(user) -> Optional[int]:
+    """The user's reseller id if it has been remembered, else None"""
+    if not user.is_authenticated:
+        return None
+    return _cache().get(USER_KEY.format(user.pk))
+
+
+def fragment(reseller_id: int, name: str, build: Callable[[], object], *parts, scopes: Iterable[str] = ()):
+    """
+    Cached result of ``build()`` for one reseller.
+
+    Args:
+        reseller_id: Reseller the fragment belongs to
+        name: Fragment name
+        build: Computes the value on a miss
+        parts: Extra key parts the value depends on (e.g. the current date)
+        scopes: Shared scopes the value depends on
+    """
+    cache = _cache()
+    key = FRAGMENT_KEY.format(reseller_id, version(reseller_id, scopes), ':'.join([name, *map(str, parts)]))
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, _timeout())
+    return value
+
+
+def validators(request, reseller_id: int, page: str, scopes: Iterable[str] = ()) -> Validators:
+    """
+    ETag and Last-Modified (epoch seconds) for one rendering of a page.
+
+    The ETag also covers the viewer, the URL with its query string, the
+    negotiated format, the CSRF token embedded in forms and the current
+    date (pages show month-to-date figures); for the same reason
+    Last-Modified is never earlier than local midnight.
+    """
+    stamps = _stamps(_keys(reseller_id, scopes))
+    parts = [
+        page,
+        '.'.join(map(str, stamps)),
+        str(request.user.pk),
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        request.META.get('CSRF_COOKIE', ''),
+        timezone.localdate().isoformat(),
+    ]
+    etag = quote_etag(hashlib.sha1('\n'.join(parts).encode()).hexdigest())
+    midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return etag, max(max(stamps) / 1_000_000, midnight.timestamp())
+
+
+def revalidate(request, reseller_id: Optional[int], page: str, render: Callable[[], object],
+               scopes: Iterable[str] = ()):
+    """
+    Answer a GET with 304 when the client's copy is current, else ``render()``.
+
+    A successful response is stamped with ETag and Last-Modified. Responses
+    are marked private and must be revalidated on every use. Without a
+    reseller id the page is rendered as usual.
+    """
+    if request.method not in ('GET', 'HEAD') or reseller_id is None:
+        return render()
+    etag, last_modified = validators(request, reseller_id, page, scopes)
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if response is None:
+        response = render()
+        if response.status_code == 200:
+            response.setdefault('ETag', etag)
+            response.setdefault('Last-Modified', http_date(last_modified))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def revalidated(page: str, scopes: Iterable[str] = ()):
+    """Decorator: ``revalidate`` a view that renders the signed-in reseller's own page."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return revalidate(request, reseller_id_for(request.user), page,
+                              lambda: view(request, *args, **kwargs), scopes)
+        return wrapper
+    return decorator
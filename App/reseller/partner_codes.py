@@ -0,0 +1,128 @@
+"""
+Partner code allocation.
+
+Codes are ``EVOLVE-`` plus 8 characters drawn with ``secrets`` from A-Z and
+0-9 (36^8, about 2.8e12 codes), so collisions are rare but possible. The
+allocator draws a batch of candidates, drops the ones already taken with a
+single ``IN`` query and tops the batch up until it has enough. The unique
+index on ``referral_code`` is the final guarantee: a chunk whose write
+loses a race to a concurrent insert is retried with fresh codes.
+
+``assign_codes`` rewrites codes for any number of resellers in chunks, each
+chunk one parameterised ``UPDATE`` run with ``executemany`` in its own short
+transaction, so no long-running transaction holds locks on the reseller
+table. (``bulk_update`` builds a ``CASE WHEN`` expression per row, which costs
+more to compile than the write itself.) The raw UPDATE sends no post_save
+signals, so after each chunk the admin search documents for its resellers
+are rebuilt and their page cache versions bumped explicitly.
+"""
+import secrets
+import string
+from typing import Callable, Iterable, List, Optional
+
+from django.db import IntegrityError, connection, transaction
+
+CODE_PREFIX = 'EVOLVE'
+CODE_LENGTH = 8
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+CHUNK_SIZE = 1000
+# Extra candidates drawn per batch to absorb collisions without another round
+HEADROOM = 1.05
+MAX_ATTEMPTS = 5
+
+
+def random_code(prefix: str = CODE_PREFIX) -> str:
+    return f"{prefix}-{''.join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))}"
+
+
+def allocate_codes(count: int, prefix: str = CODE_PREFIX, exclude: Iterable[str] = ()) -> List[str]:
+    """
+    Return ``count`` distinct codes not used by any reseller.
+
+    Args:
+        count: Number of codes needed
+        prefix: Code prefix
+        exclude: Codes to treat as taken (e.g. allocated but not yet saved)
+    """
+    from App.reseller.earnings.models.reseller import Reseller
+
+    taken = set(exclude)
+    codes: List[str] = []
+    for _ in range(MAX_ATTEMPTS):
+        needed = count - len(codes)
+        if needed <= 0:
+            break
+        candidates = set()
+        while len(candidates) < int(needed * HEADROOM) + 1:
+            code = random_code(prefix)
+            if code not in taken:
+                candidates.add(code)
+        taken |= candidates
+        used = set(Reseller.objects.filter(referral_code__in=candidates).values_list('referral_code', flat=True))
+        codes.extend(code for code in candidates if code not in used)
+    if len(codes) < count:
+        raise RuntimeError(f"Could not allocate {count} unused partner codes")
+    return codes[:count]
+
+
+def assign_codes(queryset, chunk_size: int = CHUNK_SIZE, prefix: str = CODE_PREFIX, dry_run: bool = False,
+                 on_assign: Optional[Callable[[int, str, str], None]] = None) -> int:
+    """
+    Give every reseller in ``queryset`` a new code.
+
+    Resellers are walked in primary-key order, ``chunk_size`` at a time.
+
+    Args:
+        queryset: Resellers to recode
+        chunk_size: Resellers per allocation query and update
+        prefix: Code prefix
+        dry_run: Allocate and report codes without saving them
+        on_assign: Called with (reseller_id, old_code, new_code) for each reseller
+
+    Returns:
+        Number of resellers recoded
+    """
+    from App.admin.repositories.reseller_search_repository import ResellerSearchRepository
+    from App.reseller import page_cache
+    from App.reseller.earnings.models.reseller import Reseller
+
+    search = ResellerSearchRepository()
+    queryset = queryset.order_by('pk')
+    meta = Reseller._meta
+    sql = 'UPDATE {} SET {} = %s WHERE {} = %s'.format(
+        connection.ops.quote_name(meta.db_table),
+        connection.ops.quote_name(meta.get_field('referral_code').column),
+        connection.ops.quote_name(meta.pk.column),
+    )
+    total = 0
+    last_pk = None
+    while True:
+        chunk_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk_qs.values_list('pk', 'referral_code')[:chunk_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        for attempt in range(MAX_ATTEMPTS):
+            codes = allocate_codes(len(rows), prefix)
+            if dry_run:
+                break
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(sql, [(code, pk) for (pk, _), code in zip(rows, codes)])
+                break
+            except IntegrityError:
+                # A concurrent insert took one of the codes between check and write
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+
+        if not dry_run:
+            pks = [pk for pk, _ in rows]
+            search.rebuild(pks)
+            page_cache.bump(*pks)
+
+        if on_assign:
+            for (pk, old_code), code in zip(rows, codes):
+                on_assign(pk, old_code, code)
+        total += len(rows)
+    return total
@@ -1,7 +1,7 @@
 """DRF serializers for Sales submodule."""
 from rest_framework import serializers
 
-from App.reseller.sales.models import Lead, Referral
+from App.reseller.sales.models import ContactImport, Lead, Referral
 
 
 class LeadSerializer(serializers.ModelSerializer):
@@ -24,8 +24,34 @@ class ReferralSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "modified_at"]
 
 
+class ContactImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ContactImport
+        fields = [
+            "id", "kind", "file_format", "status", "rows_processed", "created_count", "duplicate_count",
+            "error_count", "errors", "created_at", "modified_at", "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class SalesPeriodSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    leads = serializers.IntegerField()
+    referrals = serializers.IntegerField()
+    commissions = serializers.IntegerField()
+    commission_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    conversion_rate = serializers.FloatField()
+
+
 class ReportsSummarySerializer(serializers.Serializer):
     leads_by_status = serializers.DictField(child=serializers.IntegerField())
     referrals_by_status = serializers.DictField(child=serializers.IntegerField())
-    total_commissions = serializers.DecimalField(max_digits=12, decimal_places=2)
-
+    total_commissions = serializers.DecimalField(max_digits=14, decimal_places=2)
+    lead_conversion_rate = serializers.FloatField()
+    referral_conversion_rate = serializers.FloatField()
+    source = serializers.CharField()
+    as_of = serializers.DateTimeField()
+    period = SalesPeriodSerializer(required=False)
+    previous = SalesPeriodSerializer(required=False)
+    change = serializers.DictField(child=serializers.FloatField(allow_null=True), required=False)
@@ -2,11 +2,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import LeadViewSet, ReferralViewSet, ReportsSummaryView
+from .views import ContactImportViewSet, LeadViewSet, ReferralViewSet, ReportsSummaryView
 
 router = DefaultRouter()
 router.register(r'sales/leads', LeadViewSet, basename='sales-leads')
 router.register(r'sales/referrals', ReferralViewSet, basename='sales-referrals')
+router.register(r'sales/imports', ContactImportViewSet, basename='sales-imports')
 
 urlpatterns = [
     path('', include(router.urls)),
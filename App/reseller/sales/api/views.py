@@ -1,18 +1,36 @@
 """Sales API views for Leads, Referrals, and Reports."""
-from decimal import Decimal
-from collections import Counter
-
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.views import APIView
 
-from django.db.models import Sum
-
-from App.reseller.sales.models import Lead, Referral
-from App.reseller.earnings.models.commission import Commission
-from .serializers import LeadSerializer, ReferralSerializer, ReportsSummarySerializer
+from django.core.exceptions import ValidationError
+
+from App.reseller.sales.models import ContactImport, ImportKindChoices, Lead, Referral
+from App.reseller.sales.services.analytics_service import SalesAnalyticsService
+from App.reseller.sales.services.import_service import ContactImportService, ImportInProgress
+from .serializers import ContactImportSerializer, LeadSerializer, ReferralSerializer, ReportsSummarySerializer
+
+
+def start_import(request, kind):
+    """Queue an uploaded CSV/NDJSON file (multipart field "file"); the rows are imported in the background"""
+    user = request.user
+    if not hasattr(user, 'reseller_profile'):
+        return Response({'detail': 'Profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'file': ['No file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+    service = ContactImportService()
+    try:
+        job = service.create_job(user.reseller_profile, kind, upload)
+    except ImportInProgress as e:
+        return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+    except ValidationError as e:
+        return Response({'detail': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+    service.start(job)
+    job.refresh_from_db()
+    return Response(ContactImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
 
 class LeadViewSet(viewsets.ModelViewSet):
@@ -31,6 +49,10 @@ class LeadViewSet(viewsets.ModelViewSet):
             raise ValueError("Reseller profile not found for user")
         serializer.save(reseller=user.reseller_profile)
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_file(self, request):
+        return start_import(request, ImportKindChoices.LEADS)
+
 
 class ReferralViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
@@ -48,8 +70,25 @@ class ReferralViewSet(viewsets.ModelViewSet):
             raise ValueError("Reseller profile not found for user")
         serializer.save(reseller=user.reseller_profile)
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_file(self, request):
+        return start_import(request, ImportKindChoices.REFERRALS)
+
+
+class ContactImportViewSet(viewsets.ReadOnlyModelViewSet):
+    """Progress and row errors of bulk imports, polled while they run"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = ContactImportSerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        if not hasattr(user, 'reseller_profile'):
+            return ContactImport.objects.none()
+        return ContactImport.objects.filter(reseller=user.reseller_profile)
+
 
 class ReportsSummaryView(APIView):
+    """Lead/referral funnels and commission totals; ?days=30&compare=1 adds period figures"""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -57,20 +96,17 @@ class ReportsSummaryView(APIView):
         if not hasattr(user, 'reseller_profile'):
             return Response({'detail': 'Profile not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        reseller = user.reseller_profile
-
-        # Leads/Referrals breakdown
-        leads_counts = dict(Counter(Lead.objects.filter(reseller=reseller).values_list('status', flat=True)))
-        referrals_counts = dict(Counter(Referral.objects.filter(reseller=reseller).values_list('status', flat=True)))
-
-        # Total commissions (approved + pending) for summary
-        total_commissions = Commission.objects.filter(reseller=reseller).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-        data = {
-            'leads_by_status': leads_counts,
-            'referrals_by_status': referrals_counts,
-            'total_commissions': total_commissions,
-        }
+        try:
+            days = int(request.query_params.get('days') or 0)
+        except ValueError:
+            return Response({'detail': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= days <= 366:
+            return Response({'detail': 'days must be between 0 and 366'}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = SalesAnalyticsService().summary(
+            user.reseller_profile,
+            days=days,
+            compare=request.query_params.get('compare') in ('1', 'true'),
+        )
         serializer = ReportsSummarySerializer(data)
         return Response(serializer.data)
-
@@ -1,5 +1,8 @@
 """Sales models package exports."""
-from .models import TimeStampedModel, LeadStatusChoices, ReferralStatusChoices, ReportTypeChoices, Lead, Referral, SalesReport
+from .models import (
+    TimeStampedModel, LeadStatusChoices, ReferralStatusChoices, ReportTypeChoices, ImportKindChoices,
+    ImportStatusChoices, Lead, Referral, SalesReport, ContactImport, SalesDailySnapshot,
+)
 
 __all__ = [
     "TimeStampedModel",
@@ -9,5 +12,9 @@ __all__ = [
     "Lead",
     "Referral",
     "SalesReport",
+    "ImportKindChoices",
+    "ImportStatusChoices",
+    "ContactImport",
+    "SalesDailySnapshot",
 ]
 
@@ -28,6 +28,18 @@ class ReferralStatusChoices(models.TextChoices):
     REJECTED = "rejected", "Rejected"
 
 
+class ImportKindChoices(models.TextChoices):
+    LEADS = "leads", "Leads"
+    REFERRALS = "referrals", "Referrals"
+
+
+class ImportStatusChoices(models.TextChoices):
+    PENDING = "pending", "Pending"
+    RUNNING = "running", "Running"
+    COMPLETED = "completed", "Completed"
+    FAILED = "failed", "Failed"
+
+
 class ReportTypeChoices(models.TextChoices):
     SALES_OVERVIEW = "sales_overview", "Sales Overview"
     CONVERSIONS = "conversions", "Conversions"
@@ -48,6 +60,7 @@ class Lead(TimeStampedModel):
         indexes = [
             models.Index(fields=["reseller", "status"]),
             models.Index(fields=["email"]),
+            models.Index(fields=["reseller", "created_at"]),
         ]
         ordering = ["-created_at"]
 
@@ -68,6 +81,7 @@ class Referral(TimeStampedModel):
         indexes = [
             models.Index(fields=["reseller", "status"]),
             models.Index(fields=["referred_email"]),
+            models.Index(fields=["reseller", "created_at"]),
         ]
         ordering = ["-created_at"]
 
@@ -87,3 +101,51 @@ class SalesReport(TimeStampedModel):
     def __str__(self) -> str:
         return self.name or f"Report {self.id} ({self.report_type})"
 
+
+class SalesDailySnapshot(models.Model):
+    """
+    One reseller's sales figures for one day, written by
+    ``manage.py snapshot_sales_analytics``. Status breakdowns and the
+    commission totals are cumulative as of the end of ``day``; the
+    *_created / commissions_* counters cover that day only.
+    """
+    reseller = models.ForeignKey(Reseller, related_name="sales_snapshots", on_delete=models.CASCADE)
+    day = models.DateField()
+    leads_by_status = models.JSONField(default=dict)
+    referrals_by_status = models.JSONField(default=dict)
+    commission_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    leads_created = models.PositiveIntegerField(default=0)
+    referrals_created = models.PositiveIntegerField(default=0)
+    commissions_count = models.PositiveIntegerField(default=0)
+    commission_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [("reseller", "day")]
+        ordering = ["-day"]
+
+    def __str__(self) -> str:
+        return f"Sales snapshot {self.reseller_id} {self.day}"
+
+
+class ContactImport(TimeStampedModel):
+    """A bulk lead/referral upload; the file is parsed by a background worker"""
+    reseller = models.ForeignKey(Reseller, related_name="contact_imports", on_delete=models.CASCADE)
+    kind = models.CharField(max_length=16, choices=ImportKindChoices.choices)
+    file = models.FileField(upload_to="imports/%Y/%m/")
+    file_format = models.CharField(max_length=8)  # csv|ndjson
+    status = models.CharField(max_length=16, choices=ImportStatusChoices.choices, default=ImportStatusChoices.PENDING)
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    # First SALES_IMPORT_MAX_ERRORS row errors: [{"row": n, "errors": {...}}]
+    errors = models.JSONField(default=list, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["reseller", "status"])]
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} import {self.id} ({self.status})"
@@ -0,0 +1,126 @@
+"""Grouped sales analytics queries and daily snapshot storage."""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .base import BaseRepository
+from App.reseller.earnings.models.commission import Commission
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.sales.models import Lead, Referral, SalesDailySnapshot
+
+SNAPSHOT_FIELDS = [
+    "leads_by_status", "referrals_by_status", "commission_total",
+    "leads_created", "referrals_created", "commissions_count", "commission_amount",
+]
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class SalesAnalyticsRepository(BaseRepository):
+    model = SalesDailySnapshot
+
+    # Live queries -------------------------------------------------------
+    # Each is one grouped query on a (reseller, status) or (reseller, created_at) index.
+
+    def status_counts(self, model, reseller_id, since=None):
+        qs = model.objects.filter(reseller_id=reseller_id)
+        if since is not None:
+            qs = qs.filter(created_at__gte=since)
+        return {row["status"]: row["n"] for row in qs.order_by().values("status").annotate(n=Count("id"))}
+
+    def commission_total(self, reseller_id, since=None):
+        qs = Commission.objects.filter(reseller_id=reseller_id)
+        if since is not None:
+            qs = qs.filter(calculation_date__gte=since)
+        return qs.aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
+
+    def period_counts(self, reseller_id, start, end):
+        """Leads, referrals and commissions created in [start, end)"""
+        window = {"created_at__gte": start, "created_at__lt": end}
+        commissions = Commission.objects.filter(
+            reseller_id=reseller_id, calculation_date__gte=start, calculation_date__lt=end,
+        ).aggregate(count=Count("id"), amount=Sum("amount"))
+        return {
+            "leads": Lead.objects.filter(reseller_id=reseller_id, **window).count(),
+            "referrals": Referral.objects.filter(reseller_id=reseller_id, **window).count(),
+            "commissions": commissions["count"],
+            "commission_amount": commissions["amount"] or Decimal("0.00"),
+        }
+
+    # Snapshots ----------------------------------------------------------
+
+    def latest_snapshot(self, reseller_id, before):
+        """Most recent snapshot for a day before ``before`` (a date)"""
+        return self.model.objects.filter(reseller_id=reseller_id, day__lt=before).order_by("-day").first()
+
+    def snapshot_period_counts(self, reseller_id, first_day, last_day):
+        """Daily counters summed over snapshots for first_day..last_day inclusive, plus how many days had one"""
+        totals = self.model.objects.filter(reseller_id=reseller_id, day__gte=first_day, day__lte=last_day).aggregate(
+            days=Count("id"),
+            leads=Sum("leads_created"),
+            referrals=Sum("referrals_created"),
+            commissions=Sum("commissions_count"),
+            commission_amount=Sum("commission_amount"),
+        )
+        return {
+            "days": totals["days"],
+            "leads": totals["leads"] or 0,
+            "referrals": totals["referrals"] or 0,
+            "commissions": totals["commissions"] or 0,
+            "commission_amount": totals["commission_amount"] or Decimal("0.00"),
+        }
+
+    def take_snapshots(self, day, chunk_size=500):
+        """
+        Write (or rewrite) every reseller's snapshot for ``day``, one set of
+        grouped queries per chunk of resellers. Returns the number written.
+        """
+        start, end = day_start(day), day_start(day + timedelta(days=1))
+        ids_qs = Reseller.objects.order_by("pk").values_list("pk", flat=True)
+        written = 0
+        last_pk = 0
+        while True:
+            chunk = list(ids_qs.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return written
+            snapshots = {pk: self.model(reseller_id=pk, day=day) for pk in chunk}
+
+            for model, field in ((Lead, "leads"), (Referral, "referrals")):
+                rows = (
+                    model.objects.filter(reseller_id__in=chunk, created_at__lt=end)
+                    .order_by().values("reseller_id", "status")
+                    .annotate(n=Count("id"), new=Count("id", filter=Q(created_at__gte=start)))
+                )
+                for row in rows:
+                    snapshot = snapshots[row["reseller_id"]]
+                    getattr(snapshot, f"{field}_by_status")[row["status"]] = row["n"]
+                    setattr(snapshot, f"{field}_created", getattr(snapshot, f"{field}_created") + row["new"])
+
+            rows = (
+                Commission.objects.filter(reseller_id__in=chunk, calculation_date__lt=end)
+                .order_by().values("reseller_id")
+                .annotate(
+                    total=Sum("amount"),
+                    count=Count("id", filter=Q(calculation_date__gte=start)),
+                    amount=Sum("amount", filter=Q(calculation_date__gte=start)),
+                )
+            )
+            for row in rows:
+                snapshot = snapshots[row["reseller_id"]]
+                snapshot.commission_total = row["total"] or Decimal("0.00")
+                snapshot.commissions_count = row["count"]
+                snapshot.commission_amount = row["amount"] or Decimal("0.00")
+
+            self.model.objects.bulk_create(
+                snapshots.values(), update_conflicts=True,
+                unique_fields=["reseller", "day"], update_fields=SNAPSHOT_FIELDS + ["created_at"],
+            )
+            written += len(chunk)
+            last_pk = chunk[-1]
+
+    def purge_snapshots(self, before):
+        return self.model.objects.filter(day__lt=before).delete()[0]
@@ -0,0 +1,104 @@
+"""Reseller sales analytics: funnels, commission totals, conversion rates and period comparison."""
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from .base import BaseService
+from App.reseller.sales.models import Lead, LeadStatusChoices, Referral, ReferralStatusChoices
+from App.reseller.sales.repositories.analytics_repository import SalesAnalyticsRepository, day_start
+
+
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else 0.0
+
+
+def _change(current, previous):
+    """Relative change as a fraction; None when there is nothing to compare with"""
+    if not previous:
+        return None
+    return round(float((Decimal(current) - Decimal(previous)) / Decimal(previous)), 4)
+
+
+class SalesAnalyticsService(BaseService):
+    """
+    Sales summary for one reseller, computed with grouped SQL.
+
+    With SALES_SUMMARY_FROM_SNAPSHOTS on (or use_snapshots=True) the
+    totals start from the reseller's latest daily snapshot and only rows
+    created since then are read live, so the cost does not grow with the
+    reseller's history. Status changes on older rows show up after the next
+    snapshot; the response's ``as_of`` says how fresh the breakdown is.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.repo = SalesAnalyticsRepository()
+
+    def summary(self, reseller, days=None, compare=False, use_snapshots=None, now=None):
+        now = now or timezone.now()
+        today = timezone.localdate(now)
+        if use_snapshots is None:
+            use_snapshots = getattr(settings, "SALES_SUMMARY_FROM_SNAPSHOTS", False)
+        snapshot = self.repo.latest_snapshot(reseller.pk, today) if use_snapshots else None
+
+        if snapshot is not None:
+            since = day_start(snapshot.day + timedelta(days=1))
+            leads = Counter(snapshot.leads_by_status) + Counter(self.repo.status_counts(Lead, reseller.pk, since))
+            referrals = Counter(snapshot.referrals_by_status) + Counter(self.repo.status_counts(Referral, reseller.pk, since))
+            total_commissions = Decimal(snapshot.commission_total) + self.repo.commission_total(reseller.pk, since)
+            as_of = snapshot.created_at
+        else:
+            leads = self.repo.status_counts(Lead, reseller.pk)
+            referrals = self.repo.status_counts(Referral, reseller.pk)
+            total_commissions = self.repo.commission_total(reseller.pk)
+            as_of = now
+
+        data = {
+            "leads_by_status": dict(leads),
+            "referrals_by_status": dict(referrals),
+            "total_commissions": total_commissions,
+            "lead_conversion_rate": _rate(leads.get(LeadStatusChoices.CONVERTED, 0), sum(leads.values())),
+            "referral_conversion_rate": _rate(referrals.get(ReferralStatusChoices.PURCHASED, 0), sum(referrals.values())),
+            "source": "snapshot" if snapshot is not None else "live",
+            "as_of": as_of,
+        }
+        if days:
+            # Periods are whole local days ending today: days=7 is the last 7 days including today
+            first_day = today - timedelta(days=days - 1)
+            data["period"] = self._period(reseller, first_day, today, snapshot)
+            if compare:
+                data["previous"] = self._period(reseller, first_day - timedelta(days=days), first_day - timedelta(days=1), snapshot)
+                data["change"] = {
+                    key: _change(data["period"][key], data["previous"][key])
+                    for key in ("leads", "referrals", "commissions", "commission_amount")
+                }
+        return data
+
+    def _period(self, reseller, first_day, last_day, snapshot):
+        """Counts for first_day..last_day, from snapshots where they cover every day of the range"""
+        live_from = first_day
+        counts = {"leads": 0, "referrals": 0, "commissions": 0, "commission_amount": Decimal("0.00")}
+        if snapshot is not None and first_day <= snapshot.day:
+            covered_to = min(snapshot.day, last_day)
+            covered = self.repo.snapshot_period_counts(reseller.pk, first_day, covered_to)
+            # A missed snapshot day would undercount; read the whole range live instead
+            if covered["days"] == (covered_to - first_day).days + 1:
+                counts = {key: counts[key] + covered[key] for key in counts}
+                live_from = covered_to + timedelta(days=1)
+        if live_from <= last_day:
+            live = self.repo.period_counts(reseller.pk, day_start(live_from), day_start(last_day + timedelta(days=1)))
+            counts = {key: counts[key] + live[key] for key in counts}
+        # Commissions per lead/referral created in the period
+        counts["conversion_rate"] = _rate(counts["commissions"], counts["referrals"] + counts["leads"])
+        return {"start": first_day, "end": last_day, **counts}
+
+    def take_snapshots(self, day=None, chunk_size=500, keep_days=None):
+        """Snapshot every reseller for ``day`` (default yesterday); returns the number written"""
+        day = day or timezone.localdate() - timedelta(days=1)
+        written = self.repo.take_snapshots(day, chunk_size=chunk_size)
+        if keep_days:
+            self.repo.purge_snapshots(day - timedelta(days=keep_days))
+        return written
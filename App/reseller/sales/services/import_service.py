@@ -0,0 +1,242 @@
+"""Bulk lead/referral import: streaming CSV/NDJSON parsing, chunked validation and dedupe."""
+import csv
+import io
+import json
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .base import BaseService
+from App.reseller.sales.models import ContactImport, ImportKindChoices, ImportStatusChoices, Lead, Referral
+
+# kind -> (model, dedupe field, importable fields)
+IMPORT_SPECS = {
+    ImportKindChoices.LEADS: (Lead, "email", ("name", "email", "phone", "company", "source", "status", "notes")),
+    ImportKindChoices.REFERRALS: (
+        Referral, "referred_email",
+        ("referred_name", "referred_email", "referred_phone", "referral_code_used", "status", "notes"),
+    ),
+}
+# Column names exported by common CRMs for referral files
+COLUMN_ALIASES = {
+    ImportKindChoices.REFERRALS: {"name": "referred_name", "email": "referred_email", "phone": "referred_phone"},
+}
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+CONTENT_TYPES = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+ACTIVE_STATUSES = (ImportStatusChoices.PENDING, ImportStatusChoices.RUNNING)
+
+
+class ImportFileError(Exception):
+    """The file as a whole cannot be imported (bad header, encoding)"""
+
+
+class ImportInProgress(Exception):
+    """The reseller already has an import of this kind queued or running"""
+
+
+def detect_format(filename, content_type=""):
+    """csv|ndjson from the upload's extension or content type, else None"""
+    name = (filename or "").lower()
+    for ext, fmt in FORMATS.items():
+        if name.endswith(ext):
+            return fmt
+    return CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+
+
+def iter_rows(fh, file_format, aliases=None, required=()):
+    """
+    Yield (row_number, dict) pairs from a binary file object without reading
+    it into memory. Column names are lowercased and mapped through
+    ``aliases``; unparseable NDJSON lines yield (row_number, None).
+    """
+    aliases = aliases or {}
+
+    def column(name):
+        name = (name or "").strip().lower()
+        return aliases.get(name, name)
+
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise ImportFileError("The file is empty")
+        reader.fieldnames = [column(name) for name in reader.fieldnames]
+        missing = [name for name in required if name not in reader.fieldnames]
+        if missing:
+            raise ImportFileError(f"Missing column(s): {', '.join(missing)}")
+        for number, row in enumerate(reader, start=1):
+            yield number, row
+        return
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, {column(k): v for k, v in row.items()} if isinstance(row, dict) else None
+
+
+class ContactImportService(BaseService):
+    """
+    Imports leads or referrals for one reseller in chunks of
+    SALES_IMPORT_CHUNK_SIZE rows. Each chunk is validated with the model
+    field validators, deduped against the reseller's existing rows (one
+    ``email IN (...)`` lookup on the email index per chunk) and against the
+    file itself, then written with one bulk_create. Progress and the first
+    SALES_IMPORT_MAX_ERRORS row errors are saved after every chunk, so
+    clients can poll the job while it runs.
+    """
+
+    def create_job(self, reseller, kind, upload):
+        file_format = detect_format(upload.name, getattr(upload, "content_type", ""))
+        if file_format is None:
+            raise ValidationError("Upload a .csv or .ndjson file")
+        if ContactImport.objects.filter(reseller=reseller, kind=kind, status__in=ACTIVE_STATUSES).exists():
+            raise ImportInProgress("An import of this kind is already running")
+        job = ContactImport(reseller=reseller, kind=kind, file_format=file_format)
+        job.file.save(upload.name, upload, save=False)  # copied to storage in chunks
+        job.save()
+        return job
+
+    def start(self, job):
+        """Process the job on a background thread (or inline when SALES_IMPORT_ASYNC is off)"""
+        if not getattr(settings, "SALES_IMPORT_ASYNC", True):
+            return self.run(job.pk)
+
+        def run():
+            try:
+                self.run(job.pk)
+            except Exception:
+                self.logger.exception("Contact import %s failed", job.pk)
+            finally:
+                # The worker thread owns its own connection; release it
+                connection.close()
+
+        threading.Thread(target=run, name=f"contact-import-{job.pk}", daemon=True).start()
+        return None
+
+    def run(self, job_id, statuses=(ImportStatusChoices.PENDING,)):
+        """Claim and process one job; returns it, or None if another worker has it"""
+        # Counters restart with the file; a retried job counts earlier inserts as duplicates
+        claimed = ContactImport.objects.filter(pk=job_id, status__in=statuses).update(
+            status=ImportStatusChoices.RUNNING, modified_at=timezone.now(),
+            rows_processed=0, created_count=0, duplicate_count=0, error_count=0, errors=[],
+        )
+        if not claimed:
+            return None
+        job = ContactImport.objects.select_related("reseller").get(pk=job_id)
+        _JobRun(job).execute()
+        job.refresh_from_db()
+        return job
+
+    def run_pending(self, stalled_after=None):
+        """Process queued jobs (and, with stalled_after, running jobs with no progress since)"""
+        jobs = []
+        for job_id in ContactImport.objects.filter(status=ImportStatusChoices.PENDING).values_list("id", flat=True):
+            jobs.append(self.run(job_id))
+        if stalled_after is not None:
+            stalled = ContactImport.objects.filter(
+                status=ImportStatusChoices.RUNNING, modified_at__lt=timezone.now() - stalled_after,
+            ).values_list("id", flat=True)
+            for job_id in stalled:
+                # Rows inserted by the interrupted run are skipped as duplicates
+                jobs.append(self.run(job_id, statuses=(ImportStatusChoices.RUNNING,)))
+        return [job for job in jobs if job is not None]
+
+
+class _JobRun:
+    def __init__(self, job):
+        self.job = job
+        self.model, self.key, names = IMPORT_SPECS[job.kind]
+        self.fields = [self.model._meta.get_field(name) for name in names]
+        self.chunk_size = int(getattr(settings, "SALES_IMPORT_CHUNK_SIZE", 1000))
+        self.max_errors = int(getattr(settings, "SALES_IMPORT_MAX_ERRORS", 1000))
+        self.errors = []
+        self.seen = set()
+
+    def execute(self):
+        status = ImportStatusChoices.COMPLETED
+        try:
+            with self.job.file.open("rb") as fh:
+                chunk = []
+                rows = iter_rows(fh, self.job.file_format, COLUMN_ALIASES.get(self.job.kind), required=(self.key,))
+                for number, raw in rows:
+                    chunk.append((number, raw))
+                    if len(chunk) >= self.chunk_size:
+                        self._import_chunk(chunk)
+                        chunk = []
+                if chunk:
+                    self._import_chunk(chunk)
+        except (ImportFileError, UnicodeDecodeError, csv.Error) as exc:
+            status = ImportStatusChoices.FAILED
+            self.errors.insert(0, {"row": None, "errors": {"file": [str(exc)]}})
+        except Exception:
+            ContactImport.objects.filter(pk=self.job.pk).update(status=ImportStatusChoices.FAILED, finished_at=timezone.now())
+            raise
+        now = timezone.now()
+        ContactImport.objects.filter(pk=self.job.pk).update(
+            status=status, errors=self.errors[:self.max_errors], finished_at=now, modified_at=now,
+        )
+
+    def _clean(self, raw):
+        if raw is None:
+            return None, {"row": ["Expected a JSON object"]}
+        values, errors = {}, {}
+        for field in self.fields:
+            name = field.name
+            value = raw.get(name)
+            value = "" if value is None else str(value).strip()
+            if not value and field.has_default():
+                continue
+            if field.choices:
+                value = value.lower()
+            try:
+                values[name] = field.clean(value, None)
+            except ValidationError as exc:
+                errors[name] = exc.messages
+        return values, errors
+
+    def _import_chunk(self, chunk):
+        reseller = self.job.reseller
+        valid, error_count = [], 0
+        for number, raw in chunk:
+            values, errors = self._clean(raw)
+            if errors:
+                error_count += 1
+                if len(self.errors) < self.max_errors:
+                    self.errors.append({"row": number, "errors": errors})
+                continue
+            valid.append(values)
+
+        # Exact IN lookup so the email index is used; each address is tried as given and lowercased
+        candidates = {v[self.key] for v in valid} | {v[self.key].lower() for v in valid}
+        existing = {
+            email.lower() for email in
+            self.model.objects.filter(reseller=reseller, **{f"{self.key}__in": candidates}).values_list(self.key, flat=True)
+        }
+        new_rows, duplicates = [], 0
+        for values in valid:
+            email = values[self.key].lower()
+            if email in existing or email in self.seen:
+                duplicates += 1
+                continue
+            self.seen.add(email)
+            new_rows.append(self.model(reseller=reseller, **values))
+
+        with transaction.atomic():
+            self.model.objects.bulk_create(new_rows, batch_size=500)
+            ContactImport.objects.filter(pk=self.job.pk).update(
+                rows_processed=F("rows_processed") + len(chunk),
+                created_count=F("created_count") + len(new_rows),
+                duplicate_count=F("duplicate_count") + duplicates,
+                error_count=F("error_count") + error_count,
+                errors=self.errors,
+                modified_at=timezone.now(),
+            )
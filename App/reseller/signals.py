@@ -0,0 +1,57 @@
+"""
+Reseller signal handlers
+Bump a reseller's page cache version (App.reseller.page_cache) whenever data
+shown on their pages is written, and queue deleted commissions for the next
+incremental leaderboard refresh
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import page_cache
+from .earnings.models import Commission, Invoice, Payout
+from .earnings.models.reseller import Reseller
+from .earnings.services.leaderboard_service import LeaderboardService
+
+User = get_user_model()
+
+# User fields shown on reseller pages and in the profile API. Logins save only
+# last_login, which would otherwise bump the stamp on every sign-in; the admin
+# reseller detail reads it live instead
+USER_PAGE_FIELDS = {'username', 'email', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Commission, dispatch_uid='reseller_page_commission_saved')
+@receiver(post_delete, sender=Commission, dispatch_uid='reseller_page_commission_deleted')
+@receiver(post_save, sender=Invoice, dispatch_uid='reseller_page_invoice_saved')
+@receiver(post_delete, sender=Invoice, dispatch_uid='reseller_page_invoice_deleted')
+@receiver(post_save, sender=Payout, dispatch_uid='reseller_page_payout_saved')
+@receiver(post_delete, sender=Payout, dispatch_uid='reseller_page_payout_deleted')
+def bump_on_earnings_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        page_cache.bump(instance.reseller_id)
+
+
+@receiver(post_delete, sender=Commission, dispatch_uid='leaderboard_commission_deleted')
+def queue_leaderboard_deletion(sender, instance, **kwargs):
+    # Incremental leaderboard refreshes only see commissions whose modified_at moved
+    reseller_id, created_at = instance.reseller_id, instance.created_at
+    transaction.on_commit(lambda: LeaderboardService.record_deletion(reseller_id, created_at))
+
+
+@receiver(post_save, sender=Reseller, dispatch_uid='reseller_page_reseller_saved')
+def bump_on_reseller_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        page_cache.remember_reseller(instance.user_id, instance.pk)
+    page_cache.bump(instance.pk)
+
+
+@receiver(post_save, sender=User, dispatch_uid='reseller_page_user_saved')
+def bump_on_user_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or created or (update_fields is not None and not USER_PAGE_FIELDS & set(update_fields)):
+        return
+    reseller_id = Reseller.objects.filter(user=instance).values_list('pk', flat=True).first()
+    page_cache.bump(reseller_id)
@@ -0,0 +1,121 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils import timezone
+
+from App.models import PaymentRecord
+from App.reseller.earnings.models import Commission
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.marketing.models import LinkClickDaily, MarketingLink, PaymentAttribution
+from App.reseller.marketing.services import AttributionService
+from App.reseller.marketing.services.click_service import click_buffer
+from App.reseller.sales.models import Referral, ReferralStatusChoices
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def local_caches(settings):
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'attribution'},
+    }
+
+
+@pytest.fixture
+def link(db):
+    caches['shared'].clear()
+    click_buffer.discard()
+    user = User.objects.create_user(username='attr@example.com', email='attr@example.com', password='pass12345')
+    reseller = Reseller.objects.create(user=user, referral_code='REF-ATTR')
+    yield MarketingLink.objects.create(reseller=reseller, title='Promo', code='ATT1', destination_url='https://example.com/')
+    click_buffer.discard()
+
+
+@pytest.fixture
+def buyer(db):
+    return User.objects.create_user(username='buyer@example.com', email='buyer@example.com', password='pass12345')
+
+
+def make_payment(user, order_id, description='Payroll System - Monthly Plan (Basic)'):
+    return PaymentRecord.objects.create(
+        user=user, order_id=order_id, amount=Decimal('1000.00'), description=description, plan_name='Basic',
+    )
+
+
+@pytest.mark.django_db
+def test_order_is_attributed_to_link_and_matching_referral(link, buyer):
+    referral = Referral.objects.create(reseller=link.reseller, referred_name='Buyer', referred_email='BUYER@example.com')
+    payment = make_payment(buyer, 'U1-A')
+
+    attribution = AttributionService().record_order(payment, 'ATT1')
+    assert (attribution.reseller_id, attribution.link_id, attribution.referral_id) == (link.reseller_id, link.id, referral.id)
+    assert attribution.completed_at is None
+
+    # Partner codes without a link still attribute to the reseller
+    other = AttributionService().record_order(make_payment(buyer, 'U1-B'), 'REF-ATTR')
+    assert (other.reseller_id, other.link_id) == (link.reseller_id, None)
+    assert AttributionService().record_order(make_payment(buyer, 'U1-C'), 'NOPE') is None
+
+
+@pytest.mark.django_db
+def test_settle_creates_one_commission_across_callers(link, buyer):
+    referral = Referral.objects.create(reseller=link.reseller, referred_name='Buyer', referred_email='buyer@example.com')
+    payment = make_payment(buyer, 'U1-S')
+    AttributionService().record_order(payment, 'ATT1')
+
+    first = AttributionService().settle(payment, tracking_id='TRK-1', billing='monthly')  # IPN
+    second = AttributionService().settle(payment, tracking_id='TRK-1', sale_amount=1000)  # payment callback
+    assert first is not None and first.pk == second.pk
+    assert Commission.objects.filter(reseller=link.reseller).count() == 1
+    assert first.transaction_reference == 'TRK-1'
+
+    attribution = PaymentAttribution.objects.get(payment=payment)
+    assert attribution.commission_id == first.pk and attribution.completed_at is not None
+    referral.refresh_from_db()
+    assert referral.status == ReferralStatusChoices.PURCHASED
+
+
+@pytest.mark.django_db
+def test_legacy_order_is_attributed_from_description_marker(link, buyer):
+    payment = make_payment(buyer, 'U1-L', description='Payroll System - Monthly Plan (Basic) | AFF=ATT1')
+    assert not PaymentAttribution.objects.exists()
+
+    commission = AttributionService().settle(payment)
+    assert commission.transaction_reference == 'U1-L'
+    assert PaymentAttribution.objects.get(payment=payment).link_id == link.id
+
+    # Unattributed payments settle to nothing
+    assert AttributionService().settle(make_payment(buyer, 'U1-N')) is None
+
+
+@pytest.mark.django_db
+def test_funnel_counts_each_stage_and_refreshes_on_new_orders(client, link, buyer):
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    LinkClickDaily.objects.create(link=link, reseller=link.reseller, bucket=today - timedelta(days=1), clicks=7)
+    service = AttributionService()
+    for order_id in ('U1-F1', 'U1-F2', 'U1-F3'):
+        service.record_order(make_payment(buyer, order_id), 'ATT1')
+    service.settle(PaymentRecord.objects.get(order_id='U1-F1'), tracking_id='TRK-F1')
+
+    funnel = service.funnel(link.reseller, days=7)['funnel']
+    assert {k: funnel[k] for k in ('clicks', 'orders', 'completed', 'commissions')} == {
+        'clicks': 7, 'orders': 3, 'completed': 1, 'commissions': 1,
+    }
+    assert Decimal(funnel['sales']) == Decimal('1000')
+
+    service.record_order(make_payment(buyer, 'U1-F4'), 'ATT1')
+    assert service.funnel(link.reseller, days=7)['funnel']['orders'] == 4
+
+    client.force_login(link.reseller.user)
+    resp = client.get(f'/platform/api/v1/marketing/funnel/?days=7&link={link.id}&by_link=1')
+    assert resp.status_code == 200
+    assert resp.json()['funnel'][str(link.id)]['orders'] == 4
+
+    # Versions are shared (four orders, one settlement), so every worker sees the bumps
+    assert caches['shared'].get(f'attribution_funnel_version_{link.reseller.pk}') == 5
+    for days in ('1000000', '-1', 'x'):
+        assert client.get('/platform/api/v1/marketing/funnel/', {'days': days}).status_code == 400
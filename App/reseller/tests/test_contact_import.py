@@ -0,0 +1,101 @@
+import json
+import pytest
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.sales.models import ContactImport, Lead, Referral
+from App.reseller.sales.services.import_service import ContactImportService
+
+User = get_user_model()
+
+
+@pytest.fixture
+def reseller_client(client, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.SALES_IMPORT_ASYNC = False
+    settings.SALES_IMPORT_CHUNK_SIZE = 2
+    user = User.objects.create_user(username='importer@example.com', email='importer@example.com', password='pass12345')
+    Reseller.objects.create(user=user, referral_code='REF-IMPORT')
+    client.force_login(user)
+    return client
+
+
+@pytest.mark.django_db
+def test_csv_lead_import_dedupes_and_reports_row_errors(reseller_client):
+    reseller = Reseller.objects.get(referral_code='REF-IMPORT')
+    Lead.objects.create(reseller=reseller, name='Existing', email='Old@Example.com')
+    csv_body = (
+        "Name,Email,Company,Status\n"
+        "Alice,alice@example.com,Acme,Qualified\n"
+        "Old,Old@Example.com,,\n"  # already a lead
+        "Alice again,ALICE@example.com,,\n"  # duplicate within the file
+        ",nobody@example.com,,\n"  # missing name
+        "Bob,not-an-email,,\n"
+        "Carol,carol@example.com,,bogus\n"
+        "Dan,dan@example.com,,\n"
+    )
+    upload = SimpleUploadedFile('leads.csv', csv_body.encode(), content_type='text/csv')
+    resp = reseller_client.post('/platform/api/v1/sales/leads/import/', {'file': upload})
+    assert resp.status_code == 202, resp.content
+    job = resp.json()
+    assert job['status'] == 'completed'
+    assert (job['rows_processed'], job['created_count'], job['duplicate_count'], job['error_count']) == (7, 2, 2, 3)
+    assert [(e['row'], sorted(e['errors'])) for e in job['errors']] == [(4, ['name']), (5, ['email']), (6, ['status'])]
+    assert set(Lead.objects.filter(reseller=reseller).values_list('email', 'status')) == {
+        ('Old@Example.com', 'new'), ('alice@example.com', 'qualified'), ('dan@example.com', 'new'),
+    }
+
+    resp = reseller_client.get(f"/platform/api/v1/sales/imports/{job['id']}/")
+    assert resp.status_code == 200 and resp.json()['created_count'] == 2
+
+
+@pytest.mark.django_db
+def test_ndjson_referral_import_accepts_crm_column_names(reseller_client):
+    lines = [
+        json.dumps({'name': 'Eve', 'email': 'eve@example.com', 'phone': '+2547000'}),
+        'not json',
+        json.dumps({'referred_name': 'Frank', 'referred_email': 'frank@example.com'}),
+    ]
+    upload = SimpleUploadedFile('referrals.ndjson', '\n'.join(lines).encode(), content_type='application/x-ndjson')
+    resp = reseller_client.post('/platform/api/v1/sales/referrals/import/', {'file': upload})
+    assert resp.status_code == 202, resp.content
+    job = resp.json()
+    assert (job['created_count'], job['error_count']) == (2, 1)
+    assert job['errors'] == [{'row': 2, 'errors': {'row': ['Expected a JSON object']}}]
+    assert set(Referral.objects.values_list('referred_email', 'referred_phone')) == {
+        ('eve@example.com', '+2547000'), ('frank@example.com', ''),
+    }
+
+
+@pytest.mark.django_db
+def test_bad_files_are_rejected_or_failed(reseller_client):
+    upload = SimpleUploadedFile('leads.xlsx', b'PK\x03\x04', content_type='application/octet-stream')
+    assert reseller_client.post('/platform/api/v1/sales/leads/import/', {'file': upload}).status_code == 400
+
+    upload = SimpleUploadedFile('leads.csv', b'name,phone\nAlice,123\n', content_type='text/csv')
+    job = reseller_client.post('/platform/api/v1/sales/leads/import/', {'file': upload}).json()
+    assert job['status'] == 'failed'
+    assert job['errors'] == [{'row': None, 'errors': {'file': ['Missing column(s): email']}}]
+    assert not Lead.objects.exists()
+
+
+@pytest.mark.django_db
+def test_queued_imports_run_from_the_management_command(reseller_client, settings):
+    settings.SALES_IMPORT_ASYNC = True
+    reseller = Reseller.objects.get(referral_code='REF-IMPORT')
+    upload = SimpleUploadedFile('leads.csv', b'name,email\nGina,gina@example.com\n', content_type='text/csv')
+    job = ContactImportService().create_job(reseller, 'leads', upload)
+
+    # A second upload of the same kind waits for the first
+    again = SimpleUploadedFile('more.csv', b'name,email\nHal,hal@example.com\n', content_type='text/csv')
+    assert reseller_client.post('/platform/api/v1/sales/leads/import/', {'file': again}).status_code == 409
+
+    out = StringIO()
+    call_command('run_contact_imports', stdout=out)
+    assert 'Processed 1 import(s)' in out.getvalue()
+    assert ContactImport.objects.get(pk=job.pk).status == 'completed'
+    assert Lead.objects.filter(email='gina@example.com').exists()
@@ -0,0 +1,128 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from App.models import PaymentRecord
+from App.reseller.earnings.models import Invoice
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.earnings.services.invoice_pdf_service import InvoicePdfService
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def reseller_user(client):
+    user = User.objects.create_user(username='pdf@example.com', email='pdf@example.com', password='pass12345')
+    reseller = Reseller.objects.create(user=user, referral_code='PDF001')
+    client.login(username='pdf@example.com', password='pass12345')
+    return user, reseller
+
+
+def make_invoice(reseller, number='INV-T-0001', total='150.00'):
+    today = date.today()
+    return Invoice.objects.create(
+        reseller=reseller, invoice_number=number, period_start=today - timedelta(days=30),
+        period_end=today, due_date=today + timedelta(days=30),
+        subtotal=Decimal(total), total_amount=Decimal(total),
+        line_items=[{'description': 'Payroll Basic - Acme', 'amount': total, 'date': today.isoformat()}],
+    )
+
+
+@pytest.mark.django_db
+def test_pdf_rendered_once_until_content_changes(reseller_user):
+    _, reseller = reseller_user
+    invoice = make_invoice(reseller)
+    service = InvoicePdfService()
+
+    name, digest = service.ensure_pdf(invoice)
+    assert default_storage.exists(name)
+    assert default_storage.open(name).read(5) == b'%PDF-'
+    invoice.refresh_from_db()
+    assert invoice.pdf_file.name == name
+
+    with patch.object(InvoicePdfService, 'render') as render:
+        assert service.ensure_pdf(invoice) == (name, digest)
+        render.assert_not_called()
+
+    invoice.total_amount = Decimal('175.00')
+    invoice.save()
+    new_name, new_digest = service.ensure_pdf(invoice)
+    assert new_digest != digest
+    assert new_name != name
+    assert not default_storage.exists(name)
+
+
+@pytest.mark.django_db
+def test_download_supports_etag_and_range(client, reseller_user):
+    _, reseller = reseller_user
+    invoice = make_invoice(reseller)
+    url = f'/reseller/invoices/{invoice.id}/download/'
+
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp['Content-Type'] == 'application/pdf'
+    assert resp['Accept-Ranges'] == 'bytes'
+    body = b''.join(resp.streaming_content)
+    assert body.startswith(b'%PDF-')
+    etag = resp['ETag']
+
+    resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+
+    resp = client.get(url, HTTP_RANGE='bytes=0-9')
+    assert resp.status_code == 206
+    assert resp.content == body[:10]
+    assert resp['Content-Range'] == f'bytes 0-9/{len(body)}'
+
+    resp = client.get(url, HTTP_RANGE='bytes=-4')
+    assert resp.content == body[-4:]
+
+    resp = client.get(url, HTTP_RANGE=f'bytes={len(body) + 10}-')
+    assert resp.status_code == 416
+
+
+@pytest.mark.django_db
+def test_download_is_scoped_to_owner(client, reseller_user):
+    other = User.objects.create_user(username='other', password='x')
+    invoice = make_invoice(Reseller.objects.create(user=other, referral_code='OTH001'), number='INV-T-0002')
+    assert client.get(f'/reseller/invoices/{invoice.id}/download/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_prerender_command_skips_current(reseller_user):
+    _, reseller = reseller_user
+    for i in range(3):
+        make_invoice(reseller, number=f'INV-T-01{i}')
+    out = StringIO()
+    call_command('prerender_invoice_pdfs', workers=1, batch_size=2, stdout=out)
+    assert 'Rendered 3, already current 0, failed 0' in out.getvalue()
+    out = StringIO()
+    call_command('prerender_invoice_pdfs', workers=1, stdout=out)
+    assert 'Rendered 0, already current 3' in out.getvalue()
+    assert all(inv.pdf_file for inv in Invoice.objects.all())
+
+
+@pytest.mark.django_db
+def test_business_receipt_cached(client, reseller_user):
+    user, _ = reseller_user
+    PaymentRecord.objects.create(user=user, order_id='ORD-PDF-1', amount=Decimal('5000'), currency='KES', status='completed')
+    url = '/business-billing/invoice/ORD-PDF-1/download/'
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert b''.join(resp.streaming_content).startswith(b'%PDF-')
+    with patch('App.integrations.pdf_service.render_pdf') as render:
+        resp = client.get(url, HTTP_IF_NONE_MATCH=resp['ETag'])
+        render.assert_not_called()
+    assert resp.status_code == 304
@@ -0,0 +1,156 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from App.reseller.earnings.models import Commission, CommissionStatusChoices, LeaderboardEntry
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.earnings.services.commission_service import CommissionService
+from App.reseller.earnings.services.leaderboard_service import LeaderboardService, month_key, quarter_of
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def local_caches(settings):
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'leaderboard'},
+    }
+
+
+def make_reseller(username):
+    user = User.objects.create_user(username=username, email=f'{username}@example.com', password='x')
+    return Reseller.objects.create(user=user, referral_code=f'REF-{username}')
+
+
+def sell(reseller, ref, amount='1000', created_at=None):
+    commission = CommissionService().create_commission({
+        'reseller': reseller,
+        'sale_amount': amount,
+        'commission_rate': '10',
+        'transaction_reference': ref,
+        'product_name': 'Payroll Basic',
+    })
+    if created_at:
+        Commission.objects.filter(pk=commission.pk).update(created_at=created_at)
+    return commission
+
+
+def board(period, metric='sales'):
+    return list(
+        LeaderboardEntry.objects.filter(period=period, metric=metric)
+        .order_by('rank', 'reseller_id').values_list('reseller_id', 'rank', 'percentile')
+    )
+
+
+@pytest.mark.django_db
+def test_full_refresh_ranks_every_period_and_metric():
+    a, b, c = make_reseller('lb-a'), make_reseller('lb-b'), make_reseller('lb-c')
+    sell(a, 'L1', '3000')
+    sell(b, 'L2', '1000')
+    sell(c, 'L3', '400')
+    sell(c, 'L4', '600')
+    old = timezone.now() - timedelta(days=500)
+    sell(b, 'L5', '5000', created_at=old)
+
+    service = LeaderboardService()
+    service.refresh()
+    month = month_key(timezone.now())
+
+    assert board(month) == [(a.pk, 1, Decimal('100.00')), (b.pk, 2, Decimal('66.67')), (c.pk, 2, Decimal('66.67'))]
+    assert board(quarter_of(month)) == board(month)
+    assert board('all') == [(b.pk, 1, Decimal('100.00')), (a.pk, 2, Decimal('66.67')), (c.pk, 3, Decimal('33.33'))]
+    assert board(month, 'conversions')[0] == (c.pk, 1, Decimal('100.00'))
+    assert not LeaderboardEntry.objects.filter(period=month_key(old)).exists()
+
+    assert service.get_rank(c.pk, month, 'commissions') == {
+        'period': month, 'metric': 'commissions', 'rank': 2, 'percentile': 66.67, 'value': 100.0,
+    }
+    assert [row['reseller_id'] for row in service.get_top('all', 'sales', limit=2)] == [b.pk, a.pk]
+    assert service.get_standing(make_reseller('lb-new').pk)['all_time'] is None
+
+
+@pytest.mark.django_db
+def test_incremental_refresh_only_reads_changed_resellers():
+    resellers = [make_reseller(f'lb-{i}') for i in range(5)]
+    for i, reseller in enumerate(resellers):
+        sell(reseller, f'I{i}', str(1000 * (i + 1)))
+    service = LeaderboardService()
+    service.refresh()
+    month = month_key(timezone.now())
+    untouched = LeaderboardEntry.objects.get(period='all', metric='conversions', reseller=resellers[2]).updated_at
+
+    sell(resellers[0], 'I-more', '10000')
+    Commission.objects.filter(transaction_reference='I4').update(
+        status=CommissionStatusChoices.REJECTED, modified_at=timezone.now(),
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        result = service.refresh()
+    reads = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'reseller_leaderboard' not in q['sql']]
+    assert all('reseller_id" IN' in sql for sql in reads[1:])  # only the changed commissions' resellers
+
+    assert [row[0] for row in board(month)] == [resellers[0].pk, resellers[3].pk, resellers[2].pk, resellers[1].pk]
+    assert result['entries'] > 0
+    assert LeaderboardEntry.objects.get(period='all', metric='conversions', reseller=resellers[2]).updated_at == untouched
+
+    # Past the overlap window nothing is re-read
+    assert service.refresh(now=timezone.now() + timedelta(minutes=10))['entries'] == 0
+    assert service.refresh(now=timezone.now() + timedelta(minutes=20)) == {'boards': 0, 'entries': 0}
+
+
+@pytest.mark.django_db
+def test_incremental_refresh_drops_deleted_commissions(django_capture_on_commit_callbacks):
+    a, b = make_reseller('lb-del-a'), make_reseller('lb-del-b')
+    sell(a, 'D1', '3000')
+    gone = sell(b, 'D2', '1000')
+    service = LeaderboardService()
+    service.refresh()
+    month = month_key(timezone.now())
+
+    with django_capture_on_commit_callbacks(execute=True):
+        gone.delete()
+    service.refresh(now=timezone.now() + timedelta(minutes=10))
+    assert board(month) == [(a.pk, 1, Decimal('100.00'))]
+    assert board('all') == [(a.pk, 1, Decimal('100.00'))]
+    # The queued deletion is consumed
+    assert service.refresh(now=timezone.now() + timedelta(minutes=20)) == {'boards': 0, 'entries': 0}
+
+
+@pytest.mark.django_db
+def test_incremental_refresh_drops_commissions_rejected_in_admin(rf):
+    a, b = make_reseller('lb-rej-a'), make_reseller('lb-rej-b')
+    sell(a, 'R1', '3000')
+    sell(b, 'R2', '1000')
+    # Out of the watermark overlap, so only a modified_at bump brings them back
+    Commission.objects.update(modified_at=timezone.now() - timedelta(hours=1))
+    service = LeaderboardService()
+    service.refresh(full=True)
+
+    with patch.object(admin.ModelAdmin, 'message_user'):
+        admin.site._registry[Commission].reject_commissions(rf.post('/'), Commission.objects.filter(reseller=b))
+    service.refresh(now=timezone.now() + timedelta(minutes=10))
+    assert board(month_key(timezone.now())) == [(a.pk, 1, Decimal('100.00'))]
+
+
+@pytest.mark.django_db
+def test_admin_leaderboard_endpoint_and_command(client):
+    reseller = make_reseller('lb-admin')
+    sell(reseller, 'A1', '2500')
+    call_command('refresh_leaderboards', '--full')
+    staff = User.objects.create_user(username='lb-staff', password='x', is_staff=True)
+    client.force_login(staff)
+
+    response = client.get('/platform/admin/api/v1/resellers/leaderboard/', {'period': 'quarter', 'metric': 'sales'})
+    data = response.json()
+    assert data['period'] == quarter_of(month_key(timezone.now()))
+    assert data['results'][0]['reseller_id'] == reseller.pk
+    assert data['results'][0]['value'] == 2500.0
+    assert client.get('/platform/admin/api/v1/resellers/leaderboard/', {'metric': 'clicks'}).status_code == 400
@@ -0,0 +1,122 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.utils import timezone
+
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.marketing.models import LinkClickDaily, LinkClickEvent, LinkClickHourly, MarketingLink
+from App.reseller.marketing.services import ClickEventService
+from App.reseller.marketing.services.click_service import ROLLUP_LOCK_KEY, click_buffer
+
+User = get_user_model()
+
+
+@pytest.fixture
+def link(db):
+    click_buffer.discard()
+    user = User.objects.create_user(username='clicks@example.com', email='clicks@example.com', password='pass12345')
+    reseller = Reseller.objects.create(user=user, referral_code='REF-CLICKS')
+    yield MarketingLink.objects.create(reseller=reseller, title='Promo', code='CLK1', destination_url='https://example.com/')
+    click_buffer.discard()
+
+
+def add_events(link, when, clicks, conversions=0):
+    LinkClickEvent.objects.bulk_create(
+        [LinkClickEvent(link=link, reseller=link.reseller, occurred_at=when) for _ in range(clicks)]
+        + [LinkClickEvent(link=link, reseller=link.reseller, occurred_at=when, converted=True) for _ in range(conversions)]
+    )
+
+
+@pytest.mark.django_db
+def test_redirect_buffers_click_and_flushes_at_request_end(client, link):
+    resp = client.get('/r/CLK1/', HTTP_REFERER='https://news.example.org/post/1')
+    assert resp.status_code == 302
+
+    event = LinkClickEvent.objects.get()
+    assert (event.link_id, event.referrer_host, event.converted) == (link.id, 'news.example.org', False)
+    link.refresh_from_db()
+    assert link.clicks == 0  # advanced by the rollup job
+
+
+@pytest.mark.django_db
+def test_rollup_folds_events_into_hourly_and_daily_rows(link):
+    base = timezone.now().replace(minute=10, second=0, microsecond=0) - timedelta(days=1)
+    add_events(link, base, clicks=3, conversions=1)
+    add_events(link, base + timedelta(hours=1), clicks=2)
+
+    assert ClickEventService().rollup(batch_size=2) == 6
+    hours = list(LinkClickHourly.objects.order_by('bucket').values_list('clicks', 'conversions'))
+    assert hours == [(3, 1), (2, 0)]
+    assert LinkClickDaily.objects.count() in (1, 2)  # the two hours may straddle midnight
+    assert sum(LinkClickDaily.objects.values_list('clicks', flat=True)) == 5
+
+    # Later events add onto the existing buckets
+    add_events(link, base, clicks=1)
+    ClickEventService().rollup()
+    assert LinkClickHourly.objects.order_by('bucket').first().clicks == 4
+    link.refresh_from_db()
+    assert link.clicks == 6
+
+
+@pytest.mark.django_db
+def test_overlapping_rollup_is_skipped(link, settings):
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'click-rollup'},
+    }
+    add_events(link, timezone.now(), clicks=2)
+    caches['shared'].add(ROLLUP_LOCK_KEY, 1)  # another run in progress
+    assert ClickEventService().rollup() == 0
+    assert not LinkClickHourly.objects.exists()
+
+    caches['shared'].delete(ROLLUP_LOCK_KEY)
+    assert ClickEventService().rollup() == 2
+    assert ClickEventService().rollup() == 0
+    link.refresh_from_db()
+    assert link.clicks == 2
+
+
+@pytest.mark.django_db
+def test_compaction_drops_rolled_up_raw_events_only(link, settings):
+    settings.CLICK_EVENT_RETENTION_HOURS = 24
+    old = timezone.now() - timedelta(days=3)
+    add_events(link, old, clicks=2)
+    ClickEventService().rollup()
+    add_events(link, old, clicks=1)  # not rolled up yet: must survive
+
+    call_command('rollup_link_clicks', '--no-compact', stdout=StringIO())
+    events, _ = ClickEventService().compact()
+    assert events == 3
+    assert LinkClickEvent.objects.count() == 0
+    assert LinkClickHourly.objects.get().clicks == 3
+
+
+@pytest.mark.django_db
+def test_stats_api_serves_series_from_rollups(client, link):
+    assert client.login(username='clicks@example.com', password='pass12345')
+    now = timezone.now()
+    add_events(link, now - timedelta(days=2), clicks=4, conversions=1)
+    add_events(link, now, clicks=1)
+    ClickEventService().rollup()
+
+    resp = client.get(f'/platform/api/v1/marketing/links/{link.id}/stats/', {'days': 7})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body['granularity'] == 'day'
+    assert len(body['points']) == 7
+    assert body['totals'] == {'clicks': 5, 'conversions': 1, 'conversion_rate': 20.0}
+
+    resp = client.get('/platform/api/v1/marketing/clicks/stats/', {'hours': 6})
+    body = resp.json()
+    assert body['granularity'] == 'hour'
+    assert len(body['points']) == 6
+    assert body['totals']['clicks'] == 1
+
+    for days in ('1000000', '-3', 'x'):
+        resp = client.get(f'/platform/api/v1/marketing/links/{link.id}/stats/', {'days': days})
+        assert resp.status_code == 400
+    assert len(client.get('/platform/api/v1/marketing/clicks/stats/', {'days': 366}).json()['points']) == 366
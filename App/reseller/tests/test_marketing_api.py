@@ -27,6 +27,14 @@ def test_marketing_api_links_tools_resources(client):
     resp = client.get('/platform/api/v1/marketing/links/')
     assert resp.status_code == 200
 
+    # Newest first, even though the annotations turn the list into a GROUP BY query
+    from App.reseller.marketing.repositories.link_repository import MarketingLinkRepository
+    resp = client.post('/platform/api/v1/marketing/links/', data={**payload, 'title': 'Second', 'code': 'HOME124'})
+    assert resp.status_code in (200, 201), resp.content
+    links = MarketingLinkRepository().list_for_reseller(reseller)
+    assert links.ordered
+    assert [link.code for link in links] == ['HOME124', 'HOME123']
+
     # Tools and resources (empty lists by default)
     resp = client.get('/platform/api/v1/marketing/tools/')
     assert resp.status_code == 200
@@ -0,0 +1,125 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from App.reseller import page_cache
+from App.reseller.earnings.models import Commission, Payout
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.earnings.services.commission_service import CommissionService
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def local_caches(settings):
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'page-cache'},
+    }
+
+
+@pytest.fixture
+def reseller_client(client, django_capture_on_commit_callbacks):
+    user = User.objects.create_user(username='pc-page', email='pc-page@example.com', password='x')
+    with django_capture_on_commit_callbacks(execute=True):
+        reseller = Reseller.objects.create(user=user, referral_code='REF-pc-page')
+    client.force_login(user)
+    return client, reseller
+
+
+def sell(reseller, ref):
+    return CommissionService().create_commission({
+        'reseller': reseller,
+        'sale_amount': '1000',
+        'commission_rate': '10',
+        'transaction_reference': ref,
+        'product_name': 'Payroll Basic',
+    })
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ['/reseller/', '/reseller/commissions/', '/reseller/invoices/', '/reseller/payouts/'])
+def test_pages_revalidate_until_the_reseller_changes(reseller_client, django_capture_on_commit_callbacks, url):
+    client, reseller = reseller_client
+    first = client.get(url)
+    assert first.status_code == 200
+    assert 'private' in first['Cache-Control'] and 'no-cache' in first['Cache-Control']
+    etag = first['ETag']
+
+    with CaptureQueriesContext(connection) as ctx:
+        again = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert again.status_code == 304
+    # Only the session user lookup; none of the page's own queries
+    assert not any('reseller_' in q['sql'] or 'commission' in q['sql'] for q in ctx.captured_queries)
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code == 304
+    assert client.get(url + '?page=2', HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sell(reseller, f'PC-{url}')
+    changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_fragments_are_rebuilt_after_a_bump(reseller_client, django_capture_on_commit_callbacks):
+    _, reseller = reseller_client
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {'total': len(builds)}
+
+    assert page_cache.fragment(reseller.pk, 'summary', build) == {'total': 1}
+    assert page_cache.fragment(reseller.pk, 'summary', build) == {'total': 1}
+    page_cache.bump(reseller.pk)
+    # Not before the transaction commits
+    assert page_cache.fragment(reseller.pk, 'summary', build) == {'total': 1}
+    with django_capture_on_commit_callbacks(execute=True):
+        page_cache.bump(reseller.pk)
+    assert page_cache.fragment(reseller.pk, 'summary', build) == {'total': 2}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        page_cache.bump_scope(page_cache.LEADERBOARD_SCOPE)
+    assert page_cache.fragment(reseller.pk, 'summary', build) == {'total': 2}
+    assert page_cache.fragment(reseller.pk, 'summary', build, scopes=[page_cache.LEADERBOARD_SCOPE]) == {'total': 3}
+
+
+@pytest.mark.django_db
+def test_profile_api_revalidates(reseller_client, django_capture_on_commit_callbacks):
+    client, reseller = reseller_client
+    url = '/platform/api/v1/resellers/my_profile/'
+    first = client.get(url)
+    assert first.status_code == 200
+    assert client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+    detail = client.get(f'/platform/api/v1/resellers/{reseller.pk}/')
+    assert client.get(f'/platform/api/v1/resellers/{reseller.pk}/', HTTP_IF_NONE_MATCH=detail['ETag']).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reseller.user.first_name = 'Renamed'
+        reseller.user.save()
+    renamed = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert renamed.status_code == 200
+    assert renamed.json()['user']['first_name'] == 'Renamed'
+
+
+@pytest.mark.django_db
+def test_admin_bulk_actions_bump_pages(reseller_client, django_capture_on_commit_callbacks, rf):
+    _, reseller = reseller_client
+    with django_capture_on_commit_callbacks(execute=True):
+        sell(reseller, 'PC-admin')
+        payout = Payout.objects.create(reseller=reseller, amount=25, payment_method='bank_transfer')
+    commission_admin, payout_admin = admin.site._registry[Commission], admin.site._registry[Payout]
+
+    for run in (
+        lambda: commission_admin.approve_commissions(rf.post('/'), Commission.objects.filter(reseller=reseller)),
+        lambda: payout_admin.fail_payouts(rf.post('/'), Payout.objects.filter(pk=payout.pk)),
+    ):
+        before = page_cache.version(reseller.pk)
+        with patch.object(admin.ModelAdmin, 'message_user'), django_capture_on_commit_callbacks(execute=True):
+            run()
+        assert page_cache.version(reseller.pk) != before
@@ -0,0 +1,92 @@
+import itertools
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from App.admin.repositories.resellers_repository import AdminResellersRepository
+from App.reseller import page_cache, partner_codes
+from App.reseller.earnings.models.reseller import Reseller
+
+User = get_user_model()
+
+
+def make_resellers(count, code_format='REF-{}'):
+    users = User.objects.bulk_create([User(username=f'pc{i}', email=f'pc{i}@example.com') for i in range(count)])
+    return Reseller.objects.bulk_create([Reseller(user=u, referral_code=code_format.format(i)) for i, u in enumerate(users)])
+
+
+@pytest.mark.django_db
+def test_allocate_skips_taken_codes_with_one_query(monkeypatch):
+    make_resellers(1, code_format='EVOLVE-TAKEN00{}')
+    sequence = itertools.chain(['EVOLVE-TAKEN000', 'EVOLVE-FREE0001', 'EVOLVE-FREE0001'],
+                               (f'EVOLVE-NEXT{n:04d}' for n in itertools.count()))
+    monkeypatch.setattr(partner_codes, 'random_code', lambda prefix=partner_codes.CODE_PREFIX: next(sequence))
+
+    with CaptureQueriesContext(connection) as ctx:
+        codes = partner_codes.allocate_codes(2)
+    assert len(ctx.captured_queries) == 1
+    assert 'EVOLVE-TAKEN000' not in codes
+    assert len(set(codes)) == 2
+    assert Reseller.generate_unique_referral_code(1).startswith('EVOLVE-')
+
+
+@pytest.mark.django_db
+def test_regenerate_in_chunks():
+    make_resellers(250)
+    with CaptureQueriesContext(connection) as ctx:
+        call_command('regenerate_partner_codes', chunk_size=100, stdout=StringIO())
+    codes = list(Reseller.objects.values_list('referral_code', flat=True))
+    assert len(set(codes)) == 250
+    assert all(code.startswith('EVOLVE-') and len(code) == 15 for code in codes)
+    # Per chunk: read ids, check candidates, one executemany update (plus savepoint bookkeeping)
+    assert len(ctx.captured_queries) < 3 * 10
+
+
+@pytest.mark.django_db
+def test_update_only_recodes_legacy_codes():
+    make_resellers(3)
+    evolve = Reseller.objects.create(user=User.objects.create_user(username='pc-evolve'), referral_code='EVOLVE-KEEPME00')
+    call_command('update_partner_codes', stdout=StringIO())
+    assert Reseller.objects.get(pk=evolve.pk).referral_code == 'EVOLVE-KEEPME00'
+    assert not Reseller.objects.exclude(referral_code__startswith='EVOLVE-').exists()
+
+
+@pytest.mark.django_db
+def test_chunk_retries_when_a_code_is_taken_before_the_write(monkeypatch):
+    first, second = make_resellers(2)
+    real = partner_codes.allocate_codes
+    calls = []
+
+    def racing_allocate(count, prefix=partner_codes.CODE_PREFIX, exclude=()):
+        calls.append(count)
+        if len(calls) == 1:
+            # Another reseller took this code after the IN check
+            return [second.referral_code]
+        return real(count, prefix, exclude)
+
+    monkeypatch.setattr(partner_codes, 'allocate_codes', racing_allocate)
+    assert partner_codes.assign_codes(Reseller.objects.filter(pk=first.pk)) == 1
+    assert len(calls) == 2
+    assert Reseller.objects.get(pk=first.pk).referral_code.startswith('EVOLVE-')
+
+
+@pytest.mark.django_db
+def test_recoded_resellers_are_searchable_and_pages_invalidated(settings, django_capture_on_commit_callbacks):
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'partner-codes'},
+    }
+    (reseller,) = make_resellers(1, code_format='OLDCODE{}')
+    before = page_cache.version(reseller.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        partner_codes.assign_codes(Reseller.objects.all())
+    code = Reseller.objects.get(pk=reseller.pk).referral_code
+
+    repo = AdminResellersRepository()
+    assert repo.query_resellers({'q': code})[1] == 1
+    assert repo.query_resellers({'q': 'OLDCODE0'})[1] == 0
+    assert page_cache.version(reseller.pk) != before
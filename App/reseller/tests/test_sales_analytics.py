@@ -0,0 +1,102 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from App.reseller.earnings.models import Commission
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.sales.models import Lead, Referral, SalesDailySnapshot
+from App.reseller.sales.services.analytics_service import SalesAnalyticsService
+
+User = get_user_model()
+
+
+@pytest.fixture
+def reseller(db):
+    user = User.objects.create_user(username='analytics@example.com', email='analytics@example.com', password='pass12345')
+    return Reseller.objects.create(user=user, referral_code='REF-ANALYTICS')
+
+
+def add_lead(reseller, status, days_ago=0):
+    lead = Lead.objects.create(reseller=reseller, name='L', email=f'l{Lead.objects.count()}@example.com', status=status)
+    Lead.objects.filter(pk=lead.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+
+
+def add_referral(reseller, status, days_ago=0):
+    ref = Referral.objects.create(reseller=reseller, referred_name='R', referred_email='r@example.com', status=status)
+    Referral.objects.filter(pk=ref.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+
+
+def add_commission(reseller, amount, days_ago=0):
+    c = Commission.objects.create(
+        reseller=reseller, transaction_reference=f'T{Commission.objects.count()}', client_name='C',
+        product_name='Payroll', sale_amount=amount, amount=amount,
+    )
+    Commission.objects.filter(pk=c.pk).update(calculation_date=timezone.now() - timedelta(days=days_ago))
+
+
+def seed(reseller):
+    for status, days_ago in [('new', 0), ('new', 2), ('converted', 3), ('converted', 10), ('lost', 12)]:
+        add_lead(reseller, status, days_ago)
+    for status, days_ago in [('pending', 1), ('purchased', 9)]:
+        add_referral(reseller, status, days_ago)
+    add_commission(reseller, Decimal('100.00'), days_ago=1)
+    add_commission(reseller, Decimal('40.00'), days_ago=8)
+    add_commission(reseller, Decimal('60.00'), days_ago=9)
+
+
+@pytest.mark.django_db
+def test_live_summary_groups_statuses_and_compares_periods(reseller):
+    seed(reseller)
+    data = SalesAnalyticsService().summary(reseller, days=7, compare=True)
+
+    assert data['source'] == 'live'
+    assert data['leads_by_status'] == {'new': 2, 'converted': 2, 'lost': 1}
+    assert data['referrals_by_status'] == {'pending': 1, 'purchased': 1}
+    assert data['total_commissions'] == Decimal('200.00')
+    assert (data['lead_conversion_rate'], data['referral_conversion_rate']) == (0.4, 0.5)
+
+    period, previous = data['period'], data['previous']
+    assert (period['leads'], period['referrals'], period['commissions'], period['commission_amount']) == (3, 1, 1, Decimal('100.00'))
+    assert (previous['leads'], previous['referrals'], previous['commissions'], previous['commission_amount']) == (2, 1, 2, Decimal('100.00'))
+    assert data['change']['leads'] == 0.5 and data['change']['commission_amount'] == 0.0
+
+
+@pytest.mark.django_db
+def test_snapshot_summary_matches_live_figures(reseller):
+    seed(reseller)
+    today = timezone.localdate()
+    for days_ago in range(20, 0, -1):
+        call_command('snapshot_sales_analytics', day=str(today - timedelta(days=days_ago)), stdout=StringIO())
+    assert SalesDailySnapshot.objects.filter(reseller=reseller).count() == 20
+    # Rows added after the last snapshot are read live
+    add_lead(reseller, 'qualified')
+    add_commission(reseller, Decimal('5.00'))
+
+    service = SalesAnalyticsService()
+    live = service.summary(reseller, days=7, compare=True, use_snapshots=False)
+    snap = service.summary(reseller, days=7, compare=True, use_snapshots=True)
+    assert snap['source'] == 'snapshot'
+    for key in ('leads_by_status', 'referrals_by_status', 'total_commissions', 'period', 'previous', 'change'):
+        assert snap[key] == live[key], key
+
+
+@pytest.mark.django_db
+def test_missing_snapshot_days_fall_back_to_live_counts(reseller, client):
+    seed(reseller)
+    yesterday = timezone.localdate() - timedelta(days=1)
+    SalesAnalyticsService().take_snapshots(day=yesterday)  # earlier days never snapshotted
+
+    data = SalesAnalyticsService().summary(reseller, days=7, compare=True, use_snapshots=True)
+    assert data['period']['leads'] == 3 and data['previous']['commissions'] == 2
+
+    client.force_login(reseller.user)
+    resp = client.get('/platform/api/v1/sales/reports/summary/', {'days': 7, 'compare': 1})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body['period']['commissions'] == 1 and body['total_commissions'] == '200.00'
+    assert client.get('/platform/api/v1/sales/reports/summary/', {'days': 'x'}).status_code == 400
@@ -0,0 +1,98 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from App.admin.repositories.resellers_repository import AdminResellersRepository
+from App.reseller.earnings.models import Commission
+from App.reseller.earnings.models.reseller import Reseller
+from App.reseller.earnings.repositories.reseller_repository import ResellerRepository
+from App.reseller.earnings.services.commission_service import CommissionService
+
+User = get_user_model()
+
+
+def make_reseller(username):
+    user = User.objects.create_user(username=username, email=f'{username}@example.com', password='x')
+    return Reseller.objects.create(user=user, referral_code=f'REF-{username}')
+
+
+def sell(reseller, ref):
+    return CommissionService().create_commission({
+        'reseller': reseller,
+        'sale_amount': '1000',
+        'commission_rate': '10',
+        'transaction_reference': ref,
+        'product_name': 'Payroll Basic',
+    })
+
+
+@pytest.mark.django_db
+def test_commission_create_increments_counters():
+    reseller = make_reseller('counter1')
+    sell(reseller, 'T1')
+    last = sell(reseller, 'T2')
+    reseller.refresh_from_db()
+    assert reseller.sales_count == 2
+    assert reseller.get_sales_this_month() == 2
+    assert reseller.sales_month == timezone.localdate().replace(day=1)
+    assert reseller.last_sale_at == last.calculation_date
+
+
+@pytest.mark.django_db
+def test_backdated_sale_only_counts_lifetime():
+    reseller = make_reseller('counter2')
+    sell(reseller, 'T3')
+    repo = ResellerRepository()
+    repo.record_sale(reseller.pk, timezone.now() - timedelta(days=70))
+    reseller.refresh_from_db()
+    assert reseller.sales_count == 2
+    assert reseller.sales_this_month == 1
+    assert reseller.last_sale_at > timezone.now() - timedelta(days=1)
+
+
+@pytest.mark.django_db
+def test_rollover_resets_previous_month():
+    reseller = make_reseller('counter3')
+    Reseller.objects.filter(pk=reseller.pk).update(
+        sales_count=5, sales_this_month=3, sales_month=date(2020, 1, 1)
+    )
+    reseller.refresh_from_db()
+    assert reseller.get_sales_this_month() == 0  # stale month reads as zero before rollover
+    call_command('rollover_sales_counters')
+    reseller.refresh_from_db()
+    assert reseller.sales_this_month == 0
+    assert reseller.sales_count == 5
+    assert reseller.sales_month == timezone.localdate().replace(day=1)
+
+
+@pytest.mark.django_db
+def test_recount_matches_commissions():
+    reseller = make_reseller('counter4')
+    Commission.objects.bulk_create([
+        Commission(reseller=reseller, transaction_reference=f'B{i}', client_name='c',
+                   product_name='p', sale_amount=Decimal('10'))
+        for i in range(4)
+    ])
+    assert ResellerRepository().recount_sales([reseller.pk]) == 1
+    reseller.refresh_from_db()
+    assert reseller.sales_count == 4
+    assert reseller.sales_this_month == 4
+    assert reseller.last_sale_at is not None
+
+
+@pytest.mark.django_db
+def test_admin_list_reads_counters_and_sorts():
+    quiet = make_reseller('quiet')
+    busy = make_reseller('busy')
+    for i in range(3):
+        sell(busy, f'S{i}')
+    sell(quiet, 'S9')
+    rows, total = AdminResellersRepository().query_resellers({}, order='-sales_count')
+    assert total == 2
+    assert [r['id'] for r in rows] == [busy.id, quiet.id]
+    assert rows[0]['sales_count'] == 3
+    assert rows[0]['sales_this_month'] == 3
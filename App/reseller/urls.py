@@ -1,5 +1,5 @@
 from django.urls import path, include
-from .base_views import dashboard, leads, referrals, reports, earnings, commissions, invoices, payouts, links, tools, resources, settings
+from .base_views import dashboard, leads, referrals, reports, earnings, commissions, invoices, invoice_download, payouts, links, tools, resources, settings
 from .views import profile_views
 
 app_name = 'reseller'
@@ -17,6 +17,7 @@ urlpatterns = [
     path('earnings/', earnings, name='earnings'),
     path('commissions/', commissions, name='earnings_commissions'),
     path('invoices/', invoices, name='earnings_invoices'),
+    path('invoices/<int:invoice_id>/download/', invoice_download, name='earnings_invoice_download'),
     path('payouts/', payouts, name='earnings_payouts'),
     
     # Profile URLs
@@ -0,0 +1,65 @@
+"""Static files storage for production builds (see ``manage.py build_static``)."""
+import glob
+import posixpath
+from urllib.parse import urldefrag
+
+from django.contrib.staticfiles import finders
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# Never shipped in production output
+STRIPPED_PATTERNS = ['*.map', '*.lnk', '*.old']
+# Font formats only old browsers need; dropped when a WOFF/WOFF2 of the same font exists
+LEGACY_FONT_EXTENSIONS = ('.eot', '.svg', '.ttf', '.otf')
+WEB_FONT_EXTENSIONS = ('.woff2', '.woff')
+
+
+def legacy_font_files(paths):
+    """Legacy-format font files among ``paths`` that have a WOFF/WOFF2 sibling"""
+    paths = set(paths)
+    legacy = set()
+    for path in paths:
+        stem, ext = posixpath.splitext(path)
+        if ext.lower() in LEGACY_FONT_EXTENSIONS and any(stem + web in paths for web in WEB_FONT_EXTENSIONS):
+            legacy.add(path)
+    return legacy
+
+
+def build_ignore_patterns():
+    """collectstatic ignore patterns for a production build"""
+    paths = []
+    for finder in finders.get_finders():
+        paths.extend(path.replace('\\', '/') for path, _ in finder.list([]))
+    return STRIPPED_PATTERNS + sorted(glob.escape(path) for path in legacy_font_files(paths))
+
+
+class ImmutableStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Hash-named files with gzip and brotli copies and a staticfiles.json
+    manifest, which Django loads once per process. WhiteNoise serves every
+    hashed name with ``Cache-Control: immutable``.
+
+    CSS/JS references to missing files do not fail the build: sourceMappingURL
+    comments for stripped maps are removed, and any other missing target
+    (stripped legacy font formats, stale theme references) keeps its original
+    URL and is listed in ``missing_references``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.missing_references = set()
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def tolerant_converter(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                url_path = urldefrag(matchobj['url'].strip())[0].split('?', 1)[0]
+                if url_path.lower().endswith('.map'):
+                    return ''
+                if not url_path.lower().endswith(LEGACY_FONT_EXTENSIONS):
+                    self.missing_references.add((name, url_path))
+                return matchobj['matched']
+
+        return tolerant_converter
@@ -0,0 +1,306 @@
+"""
+Subscription lifecycle: activation, renewal orders and expiry.
+
+``sweep()`` is run by ``manage.py sweep_subscriptions`` (cron or --loop
+worker). Each pass:
+
+1. Queues renewal orders for active auto_renewal subscriptions whose
+   end_date falls within SUBSCRIPTION_RENEWAL_LEAD_DAYS. Candidates are
+   claimed in chunks with one UPDATE (so concurrent sweepers never queue the
+   same subscription twice), a PaymentRecord is created per claim, and the
+   Pesapal orders are submitted by at most SUBSCRIPTION_RENEWAL_CONCURRENCY
+   threads. The payment URL is kept on the subscription and shown on the
+   customer's dashboard; when the payment completes, the IPN activates the
+   subscription as for any other order. A paid renewal extends from the
+   current end_date with the plan and billing of the order, so paying early
+   loses nothing. Claims whose order was never submitted (after a crash) are
+   re-claimed once SUBSCRIPTION_RENEWAL_CLAIM_TIMEOUT_HOURS pass.
+2. Expires active subscriptions whose end_date has passed, one set-based
+   UPDATE per batch of ids.
+
+Both steps walk the (status, end_date) index.
+"""
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from App.models import PaymentRecord, Plan, Subscription
+
+logger = logging.getLogger(__name__)
+
+YEARLY_MIN_DAYS = 300
+# Renewal order ids look like U<user id>-R-<uuid>
+RENEWAL_ORDER_MARKER = '-R-'
+
+
+def billing_period(billing):
+    return timedelta(days=365) if billing == 'yearly' else timedelta(days=30)
+
+
+def activate_subscription(user, plan, billing, product='payroll', order_id=None):
+    """
+    Start (or restart) a paid period and clear any pending renewal order.
+
+    Renewal orders are applied by ``_apply_renewal`` instead, which takes the
+    plan and billing period from the order itself; ``plan`` and ``billing``
+    (the caller's guess from the checkout cookie) are ignored for them.
+    """
+    if order_id and RENEWAL_ORDER_MARKER in order_id:
+        return _apply_renewal(order_id, product)
+    now = timezone.now()
+    subscription, _ = Subscription.objects.update_or_create(
+        user=user,
+        product=product,
+        defaults={
+            'plan': plan,
+            'status': 'active',
+            'start_date': now,
+            'end_date': now + billing_period(billing),
+            'auto_renewal': True,
+            'renewal_requested_at': None,
+            'renewal_order_id': '',
+            'renewal_payment_url': '',
+        }
+    )
+    return subscription
+
+
+def _apply_renewal(order_id, product):
+    """
+    Extend the subscription a paid renewal order was queued for, once.
+
+    The IPN, payment_confirm and reconcile_payments may all report the same
+    payment, so the order's PaymentRecord is stamped ``applied_at`` by a
+    conditional UPDATE and only the first report extends. The period runs
+    from max(now, end_date), so paying early loses nothing, and an order
+    that was superseded by a newer one is still honoured.
+    """
+    record = PaymentRecord.objects.filter(order_id=order_id).select_related('user').first()
+    if record is None:
+        logger.warning(f"[SUBSCRIPTIONS] No payment record for renewal order {order_id}; not applied")
+        return None
+    now = timezone.now()
+    with transaction.atomic():
+        if not PaymentRecord.objects.filter(pk=record.pk, applied_at__isnull=True).update(applied_at=now):
+            return Subscription.objects.filter(user=record.user, product=product).first()
+        subscription = Subscription.objects.select_for_update().filter(user=record.user, product=product).first()
+        plan = (
+            Plan.objects.filter(name=record.plan_name).first()
+            or (subscription.plan if subscription else None)
+            or Plan.objects.filter(is_active=True).order_by('display_order').first()
+        )
+        billing = record.billing or (_billing_of(subscription) if subscription else 'monthly')
+        if subscription is None:
+            return Subscription.objects.create(
+                user=record.user, product=product, plan=plan, status='active',
+                start_date=now, end_date=now + billing_period(billing), auto_renewal=True,
+            )
+        subscription.plan = plan
+        subscription.status = 'active'
+        subscription.end_date = max(now, subscription.end_date) + billing_period(billing)
+        subscription.auto_renewal = True
+        # Any pending order is no longer needed; if it is paid anyway it extends again
+        subscription.renewal_requested_at = None
+        subscription.renewal_order_id = ''
+        subscription.renewal_payment_url = ''
+        subscription.save(update_fields=[
+            'plan', 'status', 'end_date', 'auto_renewal', 'renewal_requested_at',
+            'renewal_order_id', 'renewal_payment_url', 'updated_at',
+        ])
+    return subscription
+
+
+# Expiry ----------------------------------------------------------------
+
+def expire_lapsed(now=None, batch_size=None):
+    """Mark active subscriptions past their end_date as expired; returns the count"""
+    now = now or timezone.now()
+    batch_size = batch_size or settings.SUBSCRIPTION_SWEEP_BATCH
+    expired = 0
+    while True:
+        ids = list(
+            Subscription.objects.filter(status='active', end_date__lt=now)
+            .order_by('end_date')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return expired
+        # status is re-checked so a payment activated mid-sweep is left alone
+        expired += Subscription.objects.filter(id__in=ids, status='active', end_date__lt=now).update(
+            status='expired', updated_at=now
+        )
+
+
+# Renewals --------------------------------------------------------------
+
+def _public_base_url():
+    base = (getattr(settings, 'PESAPAL_CALLBACK_BASE_URL', '') or '').strip().rstrip('/')
+    if base:
+        return base
+    if settings.RENDER_EXTERNAL_HOSTNAME:
+        return f"https://{settings.RENDER_EXTERNAL_HOSTNAME}"
+    return ''
+
+
+def _billing_of(subscription):
+    return 'yearly' if (subscription.end_date - subscription.start_date).days >= YEARLY_MIN_DAYS else 'monthly'
+
+
+def _claim(now, lead, chunk_size, skip):
+    """
+    Claim up to chunk_size renewal candidates; returns the claimed subscriptions.
+    A claim whose order was never submitted (a crash between claim and submit)
+    is claimed again once SUBSCRIPTION_RENEWAL_CLAIM_TIMEOUT_HOURS pass. A
+    submitted order stays the pending one until it is paid.
+    """
+    timeout = timedelta(hours=settings.SUBSCRIPTION_RENEWAL_CLAIM_TIMEOUT_HOURS)
+    claimable = Q(renewal_requested_at__isnull=True) | Q(renewal_requested_at__lt=now - timeout, renewal_order_id='')
+    candidates = (
+        Subscription.objects.filter(claimable, status='active', end_date__lte=now + lead, auto_renewal=True)
+        .exclude(id__in=skip)
+        .order_by('end_date')
+        .values_list('id', flat=True)[:chunk_size]
+    )
+    ids = list(candidates)
+    if not ids:
+        return []
+    # A microsecond-unique stamp tells our claims apart from a concurrent sweeper's
+    stamp = timezone.now()
+    Subscription.objects.filter(claimable, id__in=ids).update(renewal_requested_at=stamp)
+    return list(
+        Subscription.objects.filter(id__in=ids, renewal_requested_at=stamp).select_related('user', 'plan')
+    )
+
+
+def _renewal_order(subscription, base_url, notification_id):
+    plan = subscription.plan
+    billing = _billing_of(subscription)
+    amount = plan.yearly_price if billing == 'yearly' and plan.yearly_price else plan.price
+    record = PaymentRecord(
+        user=subscription.user,
+        order_id=f"U{subscription.user_id}{RENEWAL_ORDER_MARKER}{uuid.uuid4()}",
+        amount=amount,
+        currency='KES',
+        description=f"Payroll System - {billing.title()} Plan ({plan.name}) | RENEWAL",
+        plan_name=plan.name,
+        billing=billing,
+        payment_method='pesapal',
+        status='initiated',
+    )
+    payload = {
+        "id": record.order_id,
+        "currency": "KES",
+        "amount": float(amount),
+        "description": record.description,
+        "callback_url": f"{base_url}{reverse('payment_confirm')}",
+        "redirect_mode": "REDIRECT",
+        "notification_id": notification_id,
+        "billing_address": {
+            "email_address": subscription.user.email or '',
+            "country_code": "KE",
+        },
+    }
+    branch = (getattr(settings, 'PESAPAL_BRANCH', '') or '').strip()
+    if branch:
+        payload["branch"] = branch
+    return record, payload
+
+
+def _submit(token, payload):
+    """Runs on a pool thread: provider call only, no ORM access"""
+    from App.integrations import pesapal_service
+    from App.views import _extract_redirect_url, _safe_json
+
+    try:
+        response = pesapal_service.submit_order_request(token, payload)
+    except Exception as e:
+        return None, str(e)
+    redirect_url = _extract_redirect_url(_safe_json(response, {}))
+    if response is not None and 200 <= response.status_code < 300 and redirect_url:
+        return redirect_url, None
+    return None, f"status={getattr(response, 'status_code', None)}"
+
+
+def queue_renewals(now=None, chunk_size=None, concurrency=None):
+    """
+    Create and submit renewal orders for subscriptions due within the lead
+    window. Returns {'queued': n, 'failed': n}. Failed claims are released
+    so the next sweep retries them.
+    """
+    from App.integrations import ipn_registry, pesapal_service
+    from App.integrations.circuit_breaker import OPEN
+
+    now = now or timezone.now()
+    chunk_size = chunk_size or settings.SUBSCRIPTION_RENEWAL_CHUNK
+    concurrency = concurrency or settings.SUBSCRIPTION_RENEWAL_CONCURRENCY
+    lead = timedelta(days=settings.SUBSCRIPTION_RENEWAL_LEAD_DAYS)
+    result = {'queued': 0, 'failed': 0}
+    attempted = set()
+
+    base_url = _public_base_url()
+    if not base_url:
+        logger.warning("[SUBSCRIPTIONS] No public base URL (PESAPAL_CALLBACK_BASE_URL/RENDER_EXTERNAL_HOSTNAME); renewals skipped")
+        return result
+    notification_id = ipn_registry.get_notification_id(urlparse(base_url).netloc)
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='renewals')
+    try:
+        while True:
+            # Released failures stay out of this pass; the next sweep retries them
+            claimed = _claim(now, lead, chunk_size, attempted)
+            if not claimed:
+                return result
+            # Tokens expire after a few minutes; one per chunk keeps long sweeps valid
+            token = pesapal_service.generate_access_token()
+            if not token:
+                Subscription.objects.filter(id__in=[s.id for s in claimed]).update(renewal_requested_at=None)
+                logger.error("[SUBSCRIPTIONS] Could not obtain a Pesapal token; renewals deferred")
+                result['failed'] += len(claimed)
+                return result
+
+            orders = [_renewal_order(s, base_url, notification_id) for s in claimed]
+            PaymentRecord.objects.bulk_create([record for record, _ in orders])
+            outcomes = list(executor.map(lambda order: _submit(token, order[1]), orders))
+
+            done, failed_subs, failed_orders = [], [], []
+            for subscription, (record, _), (redirect_url, error) in zip(claimed, orders, outcomes):
+                if redirect_url:
+                    subscription.renewal_order_id = record.order_id
+                    subscription.renewal_payment_url = redirect_url
+                    done.append(subscription)
+                else:
+                    logger.warning(f"[SUBSCRIPTIONS] Renewal order for subscription {subscription.id} failed: {error}")
+                    failed_subs.append(subscription.id)
+                    failed_orders.append(record.order_id)
+
+            with transaction.atomic():
+                Subscription.objects.bulk_update(done, ['renewal_order_id', 'renewal_payment_url'])
+                if failed_subs:
+                    Subscription.objects.filter(id__in=failed_subs).update(renewal_requested_at=None)
+                    PaymentRecord.objects.filter(order_id__in=failed_orders).update(status='failed', updated_at=now)
+            result['queued'] += len(done)
+            result['failed'] += len(failed_subs)
+            attempted.update(failed_subs)
+            if failed_subs and pesapal_service.breaker.snapshot()['state'] == OPEN:
+                # Provider is down; stop instead of claiming (and releasing) every chunk
+                logger.error("[SUBSCRIPTIONS] Pesapal circuit open; remaining renewals deferred")
+                return result
+    finally:
+        executor.shutdown(wait=True)
+
+
+def sweep(now=None, renew=True):
+    now = now or timezone.now()
+    summary = {'queued': 0, 'failed': 0}
+    if renew:
+        summary.update(queue_renewals(now=now))
+    summary['expired'] = expire_lapsed(now=now)
+    return summary
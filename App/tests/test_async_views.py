@@ -0,0 +1,101 @@
+import threading
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from App import async_views
+from App.middleware import AsyncWhiteNoiseMiddleware
+from App.models import Plan, PaymentRecord, Subscription, UserProfile
+
+
+class AsyncPesapalViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='biz@example.com', email='biz@example.com', password='Passw0rd!'
+        )
+        UserProfile.objects.create(user=self.user, phone='0712345678', role='business_owner')
+        self.plan = Plan.objects.create(
+            name='Standard', badge='', description='Std', price=Decimal('5000.00'),
+            yearly_price=Decimal('50000.00'), is_active=True, display_order=1
+        )
+        self.factory = RequestFactory()
+
+    async def test_ipn_listener_marks_payment_completed(self):
+        merchant_ref = f"U{self.user.id}-ASYNC1"
+        await PaymentRecord.objects.acreate(
+            user=self.user, order_id=merchant_ref, amount=Decimal('5000.00'), currency='KES',
+            description='Payroll System - Monthly Plan (Standard)', status='initiated'
+        )
+        request = self.factory.get('/ipn/', {
+            'order_tracking_id': 'TRACKA', 'order_merchant_reference': merchant_ref,
+        })
+        with patch('App.integrations.pesapal_async.generate_access_token', AsyncMock(return_value='tok')), \
+                patch('App.integrations.pesapal_async.get_transaction_status', AsyncMock(return_value='COMPLETED')):
+            response = await async_views.ipn_listener(request)
+
+        self.assertEqual(response.status_code, 200)
+        pr = await PaymentRecord.objects.aget(order_id=merchant_ref)
+        self.assertEqual(pr.status, 'completed')
+        self.assertEqual(pr.provider_tracking_id, 'TRACKA')
+        self.assertTrue(await Subscription.objects.filter(user=self.user, status='active').aexists())
+
+    async def test_create_order_returns_redirect_and_records_payment(self):
+        request = self.factory.post('/order/submit/', data='{"amount": 5000}', content_type='application/json')
+        request.user = self.user
+        request.session = SessionStore()
+        submitted = MagicMock(status_code=200)
+        submitted.json.return_value = {'data': {'redirect_url': 'https://pay.example/abc'}}
+
+        with patch('App.integrations.pesapal_async.generate_access_token', AsyncMock(return_value='tok')), \
+                patch('App.integrations.pesapal_async.submit_order_request', AsyncMock(return_value=submitted)) as submit:
+            response = await async_views.create_order_view(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'https://pay.example/abc', response.content)
+        payload = submit.call_args.args[1]
+        self.assertEqual(payload['amount'], 5000.0)
+        self.assertTrue(await PaymentRecord.objects.filter(order_id=payload['id'], status='initiated').aexists())
+
+    async def test_create_order_without_token_fails_fast(self):
+        request = self.factory.post('/order/submit/', data={'amount': '10'})
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        with patch('App.integrations.pesapal_async.generate_access_token', AsyncMock(return_value=None)):
+            response = await async_views.create_order_view(request)
+        self.assertEqual(response.status_code, 500)
+
+    async def test_health_reads_status_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        status = {
+            'checked_at': None, 'token_ok': True, 'ipn_list_ok': True, 'ipn_urls': [],
+            'error': None, 'latency_ms': 5, 'breaker': {'state': 'closed'},
+        }
+        threads = []
+
+        def get_status():
+            threads.append(threading.get_ident())
+            return status
+
+        request = self.factory.get('/pesapal/health/')
+        request.user = User(username='staff', is_staff=True, is_active=True)
+
+        async def auser():
+            return request.user
+        request.auser = auser
+        with patch('App.integrations.pesapal_monitor.get_status', side_effect=get_status):
+            response = await async_views.pesapal_health(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+
+    def test_whitenoise_middleware_is_async_capable(self):
+        async def get_response(request):
+            return HttpResponse('ok')
+
+        self.assertTrue(iscoroutinefunction(AsyncWhiteNoiseMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(AsyncWhiteNoiseMiddleware(lambda r: HttpResponse('ok'))))
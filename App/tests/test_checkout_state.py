@@ -0,0 +1,66 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from App import checkout_state
+from App.models import Plan
+from App.reseller.earnings.models import Reseller
+from App.reseller.marketing.models import MarketingLink
+from App.reseller.marketing.services.click_service import click_buffer
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CheckoutStateTests(TestCase):
+    def setUp(self):
+        self.addCleanup(click_buffer.discard)
+        owner = User.objects.create_user(username='r@example.com', email='r@example.com', password='pw')
+        self.reseller = Reseller.objects.create(user=owner, referral_code='REF-CHK')
+        self.link = MarketingLink.objects.create(reseller=self.reseller, title='Promo', code='promo1', destination_url='https://testserver/')
+        self.buyer = User.objects.create_user(username='b@example.com', email='b@example.com', password='pw')
+        Plan.objects.create(name='Standard', price=Decimal('5000'), yearly_price=Decimal('50000'))
+
+    def test_link_click_sets_signed_cookie_without_a_session(self):
+        response = self.client.get('/r/promo1/')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(checkout_state.AFFILIATE_COOKIE, response.cookies)
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertEqual(Session.objects.count(), 0)
+
+        request = response.wsgi_request
+        request.COOKIES = {k: v.value for k, v in response.cookies.items()}
+        self.assertEqual(checkout_state.get_affiliate(request), ('promo1', self.reseller.pk))
+
+        request.COOKIES[checkout_state.AFFILIATE_COOKIE] += 'x'
+        self.assertEqual(checkout_state.get_affiliate(request), (None, None))
+
+    def test_purchase_setup_travels_in_cookie_not_session(self):
+        self.client.force_login(self.buyer)
+        session_data = Session.objects.get().session_data
+
+        response = self.client.get('/payroll/subscribe/?billing=yearly')
+        self.assertRedirects(response, '/payment/', fetch_redirect_response=False)
+        page = self.client.get('/payment/')
+        self.assertEqual(page.context['purchase']['plan'], 'Standard')
+        self.assertEqual(page.context['purchase']['billing'], 'yearly')
+        self.assertEqual(page.context['purchase']['amount'], 50000.0)
+        self.assertEqual(Session.objects.get().session_data, session_data)
+
+    def test_purge_sessions_removes_only_expired_rows(self):
+        now = timezone.now()
+        Session.objects.create(session_key='old', session_data='', expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='new', session_data='', expire_date=now + timedelta(days=1))
+        out = StringIO()
+        call_command('purge_sessions', batch_size=1, stdout=out)
+        self.assertIn('Purged 1 expired session(s)', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['new'])
@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+from django.db import connections, transaction
+from django.test import RequestFactory, TransactionTestCase
+
+from App.db_router import REPLICA, request_scope, use_replica
+from App.middleware import ReplicaPinMiddleware
+from App.models import Plan
+
+
+@use_replica
+class PlanReport:
+    def names(self):
+        return sorted(Plan.objects.values_list('name', flat=True))
+
+
+def plan_names():
+    return sorted(Plan.objects.values_list('name', flat=True))
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """A second SQLite file stands in for the replica; its rows differ from the primary's"""
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        connections.settings[REPLICA] = {**connections['default'].settings_dict, 'NAME': str(cls.tmp / 'replica.sqlite3')}
+        super().setUpClass()
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Plan)
+        Plan.objects.using(REPLICA).create(name='replica', price=Decimal('1'), yearly_price=Decimal('1'))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        shutil.rmtree(cls.tmp)
+        cls.addClassCleanup(connections.settings.pop, REPLICA)
+        cls.addClassCleanup(connections.__delitem__, REPLICA)
+
+    def setUp(self):
+        with request_scope():
+            Plan.objects.create(name='primary', price=Decimal('1'), yearly_price=Decimal('1'))
+
+    def test_only_opted_in_reads_use_the_replica(self):
+        with request_scope():
+            self.assertEqual(plan_names(), ['primary'])
+            with use_replica():
+                self.assertEqual(plan_names(), ['replica'])
+            self.assertEqual(use_replica(plan_names)(), ['replica'])
+            self.assertEqual(PlanReport().names(), ['replica'])
+            self.assertEqual(plan_names(), ['primary'])
+
+    def test_write_pins_rest_of_request_to_primary(self):
+        with request_scope():
+            self.assertEqual(PlanReport().names(), ['replica'])
+            Plan.objects.create(name='new', price=Decimal('1'), yearly_price=Decimal('1'))
+            self.assertEqual(PlanReport().names(), ['new', 'primary'])
+        with request_scope():
+            self.assertEqual(PlanReport().names(), ['replica'])
+
+    def test_transactions_read_from_primary(self):
+        with request_scope(), transaction.atomic():
+            self.assertEqual(PlanReport().names(), ['primary'])
+
+    def test_middleware_scopes_pin_to_one_request(self):
+        def view(request):
+            before = PlanReport().names()
+            if request.method == 'POST':
+                Plan.objects.create(name='posted', price=Decimal('1'), yearly_price=Decimal('1'))
+            return before, PlanReport().names()
+
+        middleware = ReplicaPinMiddleware(view)
+        factory = RequestFactory()
+        self.assertEqual(middleware(factory.post('/')), (['replica'], ['posted', 'primary']))
+        self.assertEqual(middleware(factory.get('/')), (['replica'], ['replica']))
@@ -0,0 +1,121 @@
+import threading
+from io import StringIO
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from App.integrations import ipn_registry
+from App.models import PesapalIpnRegistration
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+
+
+def _response(status_code, body):
+    resp = MagicMock(status_code=status_code, text=str(body))
+    resp.json.return_value = body
+    return resp
+
+
+INVALID_IPN = _response(400, {'error': {'code': 'InvalidIpnId', 'message': 'IPN ID is invalid'}})
+REDIRECT = _response(200, {'redirect_url': 'https://pay.example/r/1'})
+
+
+@override_settings(CACHES=TEST_CACHES, PESAPAL_NOTIFICATION_ID='from-settings')
+class IpnRegistryTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.user = User.objects.create_user(username='buyer@example.com', password='Passw0rd!')
+        self.client.force_login(self.user)
+
+    def test_lookup_falls_back_to_setting_then_uses_registry(self):
+        self.assertEqual(ipn_registry.get_notification_id('testserver'), 'from-settings')
+        ipn_registry.store('TestServer', 'ipn-1', 'list')
+        caches['shared'].clear()
+        self.assertEqual(ipn_registry.get_notification_id('testserver'), 'ipn-1')
+        # Second read is served from the cache
+        with self.assertNumQueries(0):
+            self.assertEqual(ipn_registry.get_notification_id('testserver'), 'ipn-1')
+
+    @patch('App.integrations.pesapal_service.register_ipn_url')
+    @patch('App.integrations.pesapal_service.get_registered_ipns')
+    @patch('App.integrations.pesapal_service.submit_order_request')
+    @patch('App.integrations.pesapal_service.generate_access_token', return_value='tok')
+    def test_invalid_ipn_refreshes_once_then_orders_use_registry(self, _token, submit, ipn_list, register):
+        ipn_list.return_value = _response(200, [{'url': 'https://testserver/ipn/', 'ipn_id': 'ipn-new'}])
+        sent_ids = []
+        replies = iter([INVALID_IPN, REDIRECT, REDIRECT])
+
+        def fake_submit(token, payload):
+            sent_ids.append(payload['notification_id'])
+            return next(replies)
+
+        submit.side_effect = fake_submit
+
+        first = self.client.post(reverse('create_order'), {'amount': '1000'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(PesapalIpnRegistration.objects.get(host='testserver').notification_id, 'ipn-new')
+
+        second = self.client.post(reverse('create_order'), {'amount': '1000'})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(sent_ids, ['from-settings', 'ipn-new', 'ipn-new'])
+        ipn_list.assert_called_once()
+        register.assert_not_called()
+
+    @patch('App.integrations.pesapal_service.get_registered_ipns')
+    def test_refresh_skips_provider_when_another_worker_already_replaced_id(self, ipn_list):
+        ipn_registry.store('testserver', 'ipn-fresh', 'list')
+        self.assertEqual(ipn_registry.refresh('testserver', 'tok', stale_id='ipn-old'), 'ipn-fresh')
+        ipn_list.assert_not_called()
+
+    @patch('App.integrations.ipn_registry.WAIT_SECONDS', 0.5)
+    @patch('App.integrations.pesapal_service.get_registered_ipns')
+    def test_refresh_waits_while_another_worker_holds_the_lock(self, ipn_list):
+        caches['shared'].add(ipn_registry._lock_key('testserver'), 1, 30)
+        self.assertIsNone(ipn_registry.refresh('testserver', 'tok', stale_id='ipn-old'))
+        ipn_list.assert_not_called()
+
+    @patch('App.integrations.ipn_registry.WAIT_SECONDS', 0.5)
+    @patch('App.integrations.pesapal_async.get_registered_ipns', new_callable=AsyncMock)
+    async def test_async_refresh_keeps_cache_calls_off_the_event_loop(self, ipn_list):
+        loop_thread = threading.get_ident()
+        cache_threads = []
+        shared = caches['shared']
+
+        def tracked_cache():
+            cache_threads.append(threading.get_ident())
+            return shared
+
+        await shared.aadd(ipn_registry._lock_key('testserver'), 1, 30)
+        with patch('App.integrations.ipn_registry._cache', side_effect=tracked_cache):
+            self.assertIsNone(await ipn_registry.arefresh('testserver', 'tok', stale_id='ipn-old'))
+            ipn_list.assert_not_awaited()
+            await shared.adelete(ipn_registry._lock_key('testserver'))
+
+            ipn_list.return_value = _response(200, [{'url': 'https://testserver/ipn/', 'id': 'ipn-async'}])
+            self.assertEqual(await ipn_registry.arefresh('testserver', 'tok', stale_id='ipn-old'), 'ipn-async')
+        self.assertTrue(cache_threads)
+        self.assertNotIn(loop_thread, cache_threads)
+        self.assertIsNone(await shared.aget(ipn_registry._lock_key('testserver')))
+
+    @patch('App.integrations.pesapal_service.register_ipn_url')
+    @patch('App.integrations.pesapal_service.get_registered_ipns')
+    @patch('App.integrations.pesapal_service.generate_access_token', return_value='tok')
+    def test_warm_command_registers_missing_hosts(self, _token, ipn_list, register):
+        ipn_list.return_value = _response(200, [])
+        register.return_value = _response(200, {'ipn_id': 'ipn-reg', 'url': 'https://shop.example.com/ipn/'})
+        ipn_registry.store('known.example.com', 'ipn-known', 'list')
+
+        out = StringIO()
+        call_command('warm_ipn_registry', 'shop.example.com', 'known.example.com', stdout=out)
+
+        register.assert_called_once_with('tok', 'https://shop.example.com/ipn/')
+        row = PesapalIpnRegistration.objects.get(host='shop.example.com')
+        self.assertEqual((row.notification_id, row.source), ('ipn-reg', 'register'))
+        self.assertIn('ipn-known (stored)', out.getvalue())
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from App.models import PaymentRecord
+from App.admin.models.audit_log import AuditLog
+from App.reseller.earnings.models import Reseller, Commission, Invoice, Payout
+from App.reseller.marketing.models import MarketingLink
+
+
+class LoadToolsTests(TestCase):
+    def seed(self, **overrides):
+        opts = dict(users=20, resellers=10, commissions=120, invoices=15, payouts=15,
+                    payments=40, links=12, audit_logs=30, chunk_size=7, seed=42, stdout=StringIO())
+        opts.update(overrides)
+        call_command('seed_load_data', **opts)
+
+    def test_seed_load_data_creates_requested_volumes(self):
+        self.seed()
+        self.assertEqual(Reseller.objects.count(), 10)
+        self.assertEqual(Commission.objects.count(), 120)
+        self.assertEqual(Invoice.objects.count(), 15)
+        self.assertEqual(Payout.objects.count(), 15)
+        self.assertEqual(PaymentRecord.objects.count(), 40)
+        self.assertEqual(MarketingLink.objects.count(), 12)
+        self.assertEqual(AuditLog.objects.count(), 30)
+        # Backdated history is preserved rather than stamped with "now"
+        oldest = Commission.objects.order_by('calculation_date').first().calculation_date
+        newest = Commission.objects.order_by('-calculation_date').first().calculation_date
+        self.assertGreater((newest - oldest).days, 7)
+
+    def test_seed_load_data_can_rerun(self):
+        self.seed()
+        self.seed(seed=None)
+        self.assertEqual(Reseller.objects.count(), 20)
+
+    def test_benchmark_endpoints_writes_json(self):
+        self.seed()
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'bench.json')
+            call_command('benchmark_endpoints', iterations=1, warmup=0, output=out,
+                         only='finance_commissions_list,link_redirect,checkout_funnel', stdout=StringIO())
+            with open(out) as fh:
+                report = json.load(fh)
+            self.assertIn('finance_commissions_list', report['endpoints'])
+            self.assertIn('link_redirect', report['endpoints'])
+            self.assertIn(' -> /payment/', report['endpoints']['checkout_funnel']['path'])
+            self.assertIn('writes', report['endpoints']['checkout_funnel'])
+            self.assertGreater(report['endpoints']['finance_commissions_list']['queries'], 0)
+            self.assertEqual(report['row_counts']['commissions'], 120)
+
+            second = os.path.join(tmp, 'bench2.json')
+            stdout = StringIO()
+            call_command('benchmark_endpoints', iterations=1, warmup=0, output=second,
+                         only='link_redirect', compare=out, stdout=stdout)
+            self.assertIn('Comparison against', stdout.getvalue())
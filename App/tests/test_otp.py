@@ -0,0 +1,116 @@
+import json
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from App import otp
+from App.models import OTP
+from App.ratelimit import RateLimiter
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+TEST_LIMITS = {
+    'send_email': (2, 600),
+    'send_ip': (20, 60),
+    'verify_email': (3, 600),
+    'verify_ip': (20, 60),
+}
+
+
+@override_settings(CACHES=TEST_CACHES, OTP_RATE_LIMITS=TEST_LIMITS, OTP_TTL_MINUTES=10)
+class OTPTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+
+    def test_codes_are_stored_hashed_and_single_use(self):
+        code = otp.issue('a@example.com', 'login')
+        stored = OTP.objects.get(email='a@example.com')
+        self.assertNotEqual(stored.code, code)
+        self.assertEqual(stored.code, otp.hash_code('a@example.com', 'login', code))
+
+        self.assertEqual(otp.verify('a@example.com', 'register', code), otp.INVALID)
+        self.assertEqual(otp.verify('a@example.com', 'login', code), otp.VALID)
+        self.assertEqual(otp.verify('a@example.com', 'login', code), otp.INVALID)
+
+    def test_reissue_replaces_pending_code_and_expiry_is_reported(self):
+        first = otp.issue('a@example.com', 'login')
+        second = otp.issue('a@example.com', 'login')
+        self.assertEqual(OTP.objects.filter(email='a@example.com').count(), 1)
+        if first != second:
+            self.assertEqual(otp.verify('a@example.com', 'login', first), otp.INVALID)
+
+        OTP.objects.update(created_at=timezone.now() - timedelta(minutes=11))
+        self.assertEqual(otp.verify('a@example.com', 'login', second), otp.EXPIRED)
+
+    def test_send_and_verify_are_throttled_before_the_database(self):
+        otp.issue('a@example.com', 'login')
+        otp.issue('a@example.com', 'login')
+        with self.assertRaises(otp.RateLimited) as ctx:
+            otp.issue('a@example.com', 'login')
+        self.assertGreater(ctx.exception.retry_after, 0)
+        otp.issue('b@example.com', 'login')  # buckets are per email
+
+        for _ in range(3):
+            self.assertEqual(otp.verify('b@example.com', 'login', '000000'), otp.INVALID)
+        with self.assertNumQueries(0), self.assertRaises(otp.RateLimited):
+            otp.verify('b@example.com', 'login', '000000')
+
+    def test_limiter_resets_with_the_window(self):
+        limiter = RateLimiter('test', limit=2, window_seconds=10)
+        with patch('App.ratelimit.time.time', return_value=1000.0):
+            self.assertEqual(limiter.consume('k'), 0)
+            self.assertEqual(limiter.consume('k'), 0)
+            self.assertEqual(limiter.consume('k'), 10.0)
+        with patch('App.ratelimit.time.time', return_value=1005.0):
+            self.assertEqual(limiter.consume('k'), 5.0)
+        with patch('App.ratelimit.time.time', return_value=1010.0):
+            self.assertEqual(limiter.consume('k'), 0)
+
+    def test_parallel_attempts_never_exceed_the_limit(self):
+        limiter = RateLimiter('test', limit=3, window_seconds=600)
+        barrier, results = threading.Barrier(20), []
+
+        def attempt():
+            barrier.wait()
+            results.append(limiter.consume('k'))
+
+        threads = [threading.Thread(target=attempt) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(0), 3)
+
+    def test_purge_removes_only_expired_codes(self):
+        otp.issue('old@example.com', 'login')
+        otp.issue('new@example.com', 'login')
+        OTP.objects.filter(email='old@example.com').update(created_at=timezone.now() - timedelta(minutes=30))
+        out = StringIO()
+        call_command('purge_otps', '--batch-size', '1', stdout=out)
+        self.assertIn('Purged 1 expired OTP(s)', out.getvalue())
+        self.assertEqual(list(OTP.objects.values_list('email', flat=True)), ['new@example.com'])
+
+    @patch('App.views.send_mail')
+    def test_password_reset_resend_returns_429_when_throttled(self, send_mail):
+        User.objects.create_user(username='u@example.com', email='u@example.com', password='pw-123456')
+        start = self.client.post(
+            reverse('send_password_reset_code'),
+            json.dumps({'recovery_method': 'email', 'contact_value': 'u@example.com'}),
+            content_type='application/json',
+        )
+        self.assertEqual(start.status_code, 200)
+        self.client.post(reverse('resend_password_reset_code'))
+        response = self.client.post(reverse('resend_password_reset_code'))
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(send_mail.call_count, 2)
@@ -0,0 +1,146 @@
+import threading
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from App.integrations import pesapal_async, pesapal_monitor, pesapal_service
+from App.integrations.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+
+
+def _response(status_code, body=None):
+    resp = MagicMock(status_code=status_code)
+    resp.json.return_value = body if body is not None else {}
+    return resp
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=30)
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.snapshot()['state'], OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.snapshot()['state'], CLOSED)
+
+    def test_half_open_allows_a_single_probe(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        with patch('App.integrations.circuit_breaker.time.time', return_value=self._opened_at() + 31):
+            self.assertEqual(self.breaker.snapshot()['state'], HALF_OPEN)
+            self.assertTrue(self.breaker.allow())
+            self.assertFalse(self.breaker.allow())
+            self.breaker.record_success()
+            self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.snapshot()['state'], CLOSED)
+
+    def test_failed_probe_reopens(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        later = self._opened_at() + 31
+        with patch('App.integrations.circuit_breaker.time.time', return_value=later):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+            self.assertFalse(self.breaker.allow())
+            self.assertEqual(self.breaker.snapshot()['opened_at'], later)
+
+    def _opened_at(self):
+        return self.breaker.snapshot()['opened_at']
+
+
+@override_settings(CACHES=TEST_CACHES, PESAPAL_HEALTH_INTERVAL=60)
+class PesapalServiceBreakerTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+
+    def test_token_requests_fail_fast_once_open(self):
+        with patch('App.integrations.pesapal_service.requests.request',
+                   side_effect=requests.exceptions.ConnectTimeout('down')) as request:
+            results = [pesapal_service.generate_access_token() for _ in range(6)]
+        self.assertEqual(results, [None] * 6)
+        self.assertEqual(request.call_count, pesapal_service.breaker.failure_threshold)
+        self.assertEqual(pesapal_service.breaker.snapshot()['state'], OPEN)
+
+    def test_server_errors_count_but_client_errors_do_not(self):
+        with patch('App.integrations.pesapal_service.requests.request', return_value=_response(400)):
+            for _ in range(5):
+                pesapal_service.generate_access_token()
+        self.assertEqual(pesapal_service.breaker.snapshot()['state'], CLOSED)
+        with patch('App.integrations.pesapal_service.requests.request', return_value=_response(503)):
+            for _ in range(5):
+                pesapal_service.generate_access_token()
+        self.assertEqual(pesapal_service.breaker.snapshot()['state'], OPEN)
+
+    async def test_async_client_shares_the_breaker_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        breaker_threads = []
+        allow = pesapal_service.breaker.allow
+
+        def tracked_allow():
+            breaker_threads.append(threading.get_ident())
+            return allow()
+
+        client = MagicMock()
+        client.request = AsyncMock(return_value=_response(503))
+        with patch.object(pesapal_service.breaker, 'allow', side_effect=tracked_allow), \
+                patch('App.integrations.pesapal_async.get_client', return_value=client):
+            results = [await pesapal_async.generate_access_token() for _ in range(6)]
+        self.assertEqual(results, [None] * 6)
+        self.assertEqual(client.request.await_count, pesapal_service.breaker.failure_threshold)
+        self.assertEqual(pesapal_service.breaker.snapshot()['state'], OPEN)
+        self.assertNotIn(loop_thread, breaker_threads)
+
+    def test_probe_is_cached_for_health_view_and_admin_panel(self):
+        responses = [_response(200, {'token': 'tok'}), _response(200, [{'url': 'https://testserver/ipn/', 'id': 'x'}])]
+        with patch('App.integrations.pesapal_service.requests.request', side_effect=responses):
+            pesapal_monitor.probe()
+
+        staff = User.objects.create_user(username='ops', password='x', is_staff=True)
+        self.client.force_login(staff)
+        with patch('App.integrations.pesapal_service.requests.request') as request:
+            response = self.client.get('/pesapal/health/')
+            self.assertEqual(pesapal_monitor.panel_status(), 'healthy')
+        request.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body['ipn_registered_for_host'])
+        self.assertEqual(body['circuit']['state'], CLOSED)
+
+    def test_open_circuit_reported_without_provider_calls(self):
+        for _ in range(pesapal_service.breaker.failure_threshold):
+            pesapal_service.breaker.record_failure()
+        with patch('App.integrations.pesapal_service.requests.request') as request:
+            status = pesapal_monitor.probe()
+        request.assert_not_called()
+        self.assertFalse(status['token_ok'])
+        self.assertEqual(pesapal_monitor.panel_status(status), 'error')
+
+    def test_stale_status_refreshes_in_background(self):
+        stale = {'checked_at': timezone.now() - timedelta(minutes=5), 'token_ok': True, 'ipn_list_ok': True,
+                 'ipn_urls': [], 'error': None, 'latency_ms': 1.0}
+        caches['shared'].set(pesapal_monitor.STATUS_KEY, stale)
+        with patch.object(pesapal_monitor, 'refresh_in_background') as refresh:
+            status = pesapal_monitor.get_status()
+        refresh.assert_called_once()
+        self.assertTrue(status['token_ok'])
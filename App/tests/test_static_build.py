@@ -0,0 +1,87 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+
+from App.storage import legacy_font_files
+
+PRODUCTION_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'App.storage.ImmutableStaticFilesStorage'},
+}
+
+FONT_CSS = """@font-face {
+  font-family: 'Icons';
+  src: url("../fonts/icons.eot?v=1");
+  src: url("../fonts/icons.eot?#iefix&v=1") format("embedded-opentype"), url("../fonts/icons.woff2?v=1") format("woff2"), url("../fonts/icons.ttf?v=1") format("truetype");
+}
+@font-face { font-family: 'Display'; src: url("../fonts/display.ttf"); }
+.hero { background: url("../img/missing.png"); }
+/*# sourceMappingURL=site.css.map */
+"""
+
+
+class StaticBuildTests(SimpleTestCase):
+    def setUp(self):
+        self.src = Path(tempfile.mkdtemp())
+        self.out = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.src)
+        self.addCleanup(shutil.rmtree, self.out)
+        files = {
+            'css/site.css': FONT_CSS,
+            'css/site.css.map': '{}',
+            'js/app.js': 'console.log("app");\n//# sourceMappingURL=app.js.map\n',
+            'js/app.js.map': '{}',
+            'fonts/icons.eot': 'eot', 'fonts/icons.ttf': 'ttf', 'fonts/icons.woff2': 'woff2',
+            'fonts/display.ttf': 'ttf',
+            'css/old - Shortcut.lnk': 'lnk',
+        }
+        for name, content in files.items():
+            path = self.src / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+
+    def build(self):
+        with override_settings(
+            STORAGES=PRODUCTION_STORAGES, STATICFILES_DIRS=[str(self.src)], STATIC_ROOT=str(self.out),
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        ):
+            out, err = StringIO(), StringIO()
+            call_command('build_static', stdout=out, stderr=err)
+            return out.getvalue(), err.getvalue()
+
+    def test_legacy_fonts_are_only_stripped_next_to_web_fonts(self):
+        paths = ['fonts/a.eot', 'fonts/a.svg', 'fonts/a.woff', 'fonts/b.ttf', 'img/a.svg']
+        self.assertEqual(legacy_font_files(paths), {'fonts/a.eot', 'fonts/a.svg'})
+
+    def test_build_hashes_compresses_and_strips(self):
+        out, err = self.build()
+        manifest = json.loads((self.out / 'staticfiles.json').read_text())['paths']
+
+        # Maps, shortcuts and fonts with a WOFF2 sibling are left out
+        self.assertEqual(sorted(manifest), ['css/site.css', 'fonts/display.ttf', 'fonts/icons.woff2', 'js/app.js'])
+        self.assertEqual(list(self.out.rglob('*.map')) + list(self.out.rglob('*.eot')), [])
+
+        css = (self.out / manifest['css/site.css']).read_text()
+        self.assertIn(manifest['fonts/icons.woff2'].split('/')[-1], css)
+        self.assertIn(manifest['fonts/display.ttf'].split('/')[-1], css)
+        self.assertIn('url("../fonts/icons.eot?v=1")', css)
+        self.assertNotIn('sourceMappingURL', css)
+        self.assertNotIn('sourceMappingURL', (self.out / manifest['js/app.js']).read_text())
+        self.assertTrue((self.out / (manifest['css/site.css'] + '.gz')).exists())
+        self.assertTrue((self.out / (manifest['css/site.css'] + '.br')).exists())
+
+        # Broken references are reported, not fatal
+        self.assertIn('css/site.css references missing file ../img/missing.png', err)
+        self.assertIn('Built 8 static file(s)', out)  # hashed copies plus the unhashed originals
+
+    def test_build_requires_manifest_storage(self):
+        with override_settings(STORAGES={**PRODUCTION_STORAGES, 'staticfiles': {
+            'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}}):
+            with self.assertRaises(CommandError):
+                call_command('build_static', stdout=StringIO())
@@ -0,0 +1,209 @@
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from App import subscription_lifecycle
+from App.models import PaymentRecord, Plan, Subscription
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+
+
+def _response(status_code, body):
+    resp = MagicMock(status_code=status_code, text=str(body))
+    resp.json.return_value = body
+    return resp
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    PESAPAL_CALLBACK_BASE_URL='https://shop.example.com',
+    PESAPAL_NOTIFICATION_ID='ipn-1',
+    SUBSCRIPTION_RENEWAL_LEAD_DAYS=3,
+    SUBSCRIPTION_RENEWAL_CHUNK=2,
+    SUBSCRIPTION_SWEEP_BATCH=2,
+)
+class SubscriptionLifecycleTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.plan = Plan.objects.create(name='Standard', price=Decimal('5000.00'), yearly_price=Decimal('50000.00'))
+        self.now = timezone.now()
+
+    def _subscription(self, name, ends_in_days, auto_renewal=True, yearly=False):
+        user = User.objects.create_user(username=name, email=f'{name}@example.com', password='x')
+        end = self.now + timedelta(days=ends_in_days)
+        return Subscription.objects.create(
+            user=user, product='payroll', plan=self.plan, status='active', auto_renewal=auto_renewal,
+            start_date=end - timedelta(days=365 if yearly else 30), end_date=end,
+        )
+
+    def test_expire_lapsed_runs_one_update_per_batch(self):
+        lapsed = [self._subscription(f'old{i}', -1 - i, auto_renewal=False) for i in range(5)]
+        current = self._subscription('current', 10)
+
+        # 3 batches of (select ids + update), then the empty select that ends the loop
+        with self.assertNumQueries(7):
+            self.assertEqual(subscription_lifecycle.expire_lapsed(), 5)
+        self.assertEqual(Subscription.objects.filter(id__in=[s.id for s in lapsed], status='expired').count(), 5)
+        current.refresh_from_db()
+        self.assertEqual(current.status, 'active')
+
+    @patch('App.integrations.pesapal_service.generate_access_token', return_value='tok')
+    @patch('App.integrations.pesapal_service.submit_order_request')
+    def test_renewals_are_queued_once_with_bounded_concurrency(self, submit, _token):
+        due = [self._subscription(f'due{i}', 1 + i % 2) for i in range(5)]
+        yearly = self._subscription('yearly', 2, yearly=True)
+        self._subscription('later', 20)
+        self._subscription('manual', 1, auto_renewal=False)
+
+        lock, in_flight, peak = threading.Lock(), [0], [0]
+
+        def fake_submit(token, payload):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return _response(200, {'redirect_url': f"https://pay.example/{payload['id']}"})
+
+        submit.side_effect = fake_submit
+        result = subscription_lifecycle.queue_renewals(concurrency=2)
+
+        self.assertEqual(result, {'queued': 6, 'failed': 0})
+        self.assertLessEqual(peak[0], 2)
+        for sub in due + [yearly]:
+            sub.refresh_from_db()
+            self.assertTrue(sub.renewal_payment_url.startswith('https://pay.example/U'))
+            record = PaymentRecord.objects.get(order_id=sub.renewal_order_id)
+            self.assertEqual(record.status, 'initiated')
+        self.assertEqual(PaymentRecord.objects.get(order_id=yearly.renewal_order_id).amount, Decimal('50000.00'))
+        payload = submit.call_args.args[1]
+        self.assertEqual(payload['notification_id'], 'ipn-1')
+        self.assertEqual(payload['callback_url'], 'https://shop.example.com' + reverse('payment_confirm'))
+
+        # A second sweep finds nothing new to queue
+        self.assertEqual(subscription_lifecycle.queue_renewals(), {'queued': 0, 'failed': 0})
+        self.assertEqual(submit.call_count, 6)
+
+    @patch('App.integrations.pesapal_service.generate_access_token', return_value='tok')
+    @patch('App.integrations.pesapal_service.submit_order_request', return_value=_response(400, {'error': {'code': 'x'}}))
+    def test_failed_renewals_are_released_for_the_next_sweep(self, submit, _token):
+        sub = self._subscription('due', 1)
+        self.assertEqual(subscription_lifecycle.queue_renewals(), {'queued': 0, 'failed': 1})
+        submit.assert_called_once()
+        sub.refresh_from_db()
+        self.assertIsNone(sub.renewal_requested_at)
+        self.assertEqual(PaymentRecord.objects.get(user=sub.user).status, 'failed')
+
+    @patch('App.integrations.pesapal_service.get_transaction_status', return_value='COMPLETED')
+    def test_paid_renewal_reactivates_and_clears_the_queue(self, _status):
+        sub = self._subscription('due', -1)
+        Subscription.objects.filter(id=sub.id).update(
+            status='expired', renewal_requested_at=self.now, renewal_order_id=f'U{sub.user_id}-R-1',
+            renewal_payment_url='https://pay.example/1',
+        )
+        PaymentRecord.objects.create(
+            user=sub.user, order_id=f'U{sub.user_id}-R-1', amount=Decimal('5000.00'),
+            description='Payroll System - Monthly Plan (Standard) | RENEWAL', billing='monthly',
+        )
+        self.client.get(reverse('ipn_listener'), {'order_tracking_id': 'T1', 'order_merchant_reference': f'U{sub.user_id}-R-1'})
+
+        sub.refresh_from_db()
+        self.assertEqual(sub.status, 'active')
+        self.assertGreater(sub.end_date, self.now + timedelta(days=29))
+        self.assertEqual((sub.renewal_requested_at, sub.renewal_order_id, sub.renewal_payment_url), (None, '', ''))
+
+    def _renewal_record(self, sub, order_id, billing='monthly', plan_name='Standard'):
+        return PaymentRecord.objects.create(
+            user=sub.user, order_id=order_id, amount=Decimal('5000.00'), plan_name=plan_name, billing=billing,
+            description=f'Payroll System - {billing.title()} Plan ({plan_name}) | RENEWAL',
+        )
+
+    def test_early_renewal_extends_from_end_date_once(self):
+        sub = self._subscription('early', 2)
+        order_id = f'U{sub.user_id}-R-2'
+        Subscription.objects.filter(id=sub.id).update(renewal_requested_at=self.now, renewal_order_id=order_id)
+        self._renewal_record(sub, order_id)
+
+        # IPN, payment_confirm and reconcile_payments may all report the same payment
+        for _ in range(3):
+            subscription_lifecycle.activate_subscription(sub.user, self.plan, 'monthly', order_id=order_id)
+        renewed = Subscription.objects.get(id=sub.id)
+        self.assertEqual(renewed.end_date, sub.end_date + timedelta(days=30))
+        self.assertEqual((renewed.renewal_requested_at, renewed.renewal_order_id), (None, ''))
+        self.assertIsNotNone(PaymentRecord.objects.get(order_id=order_id).applied_at)
+
+    def test_renewal_keeps_the_plan_and_billing_of_the_order(self):
+        premium = Plan.objects.create(name='Premium', price=Decimal('9000.00'), yearly_price=Decimal('90000.00'))
+        sub = self._subscription('yearly', 2, yearly=True)
+        Subscription.objects.filter(id=sub.id).update(plan=premium, renewal_order_id=f'U{sub.user_id}-R-3')
+        self._renewal_record(sub, f'U{sub.user_id}-R-3', billing='yearly', plan_name='Premium')
+
+        # payment_confirm without a checkout cookie guesses the default plan, monthly
+        subscription_lifecycle.activate_subscription(sub.user, self.plan, 'monthly', order_id=f'U{sub.user_id}-R-3')
+        renewed = Subscription.objects.get(id=sub.id)
+        self.assertEqual(renewed.plan, premium)
+        self.assertEqual(renewed.end_date, sub.end_date + timedelta(days=365))
+
+    def test_superseded_renewal_order_is_still_honoured(self):
+        sub = self._subscription('superseded', 2)
+        self._renewal_record(sub, f'U{sub.user_id}-R-old')
+        self._renewal_record(sub, f'U{sub.user_id}-R-new')
+        Subscription.objects.filter(id=sub.id).update(
+            renewal_requested_at=self.now, renewal_order_id=f'U{sub.user_id}-R-new',
+            renewal_payment_url='https://pay.example/new',
+        )
+
+        subscription_lifecycle.activate_subscription(sub.user, self.plan, 'monthly', order_id=f'U{sub.user_id}-R-old')
+        renewed = Subscription.objects.get(id=sub.id)
+        self.assertEqual(renewed.end_date, sub.end_date + timedelta(days=30))
+        self.assertEqual(renewed.renewal_payment_url, '')
+        # Paying the newer order as well buys another period
+        subscription_lifecycle.activate_subscription(sub.user, self.plan, 'monthly', order_id=f'U{sub.user_id}-R-new')
+        self.assertEqual(Subscription.objects.get(id=sub.id).end_date, sub.end_date + timedelta(days=60))
+
+    @patch('App.integrations.pesapal_service.generate_access_token', return_value='tok')
+    @patch('App.integrations.pesapal_service.submit_order_request')
+    @override_settings(SUBSCRIPTION_RENEWAL_CLAIM_TIMEOUT_HOURS=6)
+    def test_only_unsubmitted_stale_claims_are_claimed_again(self, submit, _token):
+        submit.side_effect = lambda token, payload: _response(200, {'redirect_url': f"https://pay.example/{payload['id']}"})
+        crashed = self._subscription('crashed', 1)
+        submitted = self._subscription('submitted', 1)
+        recent = self._subscription('recent', 1)
+        Subscription.objects.filter(id=crashed.id).update(renewal_requested_at=self.now - timedelta(hours=7))
+        Subscription.objects.filter(id=submitted.id).update(
+            renewal_requested_at=self.now - timedelta(hours=7), renewal_order_id=f'U{submitted.user_id}-R-old',
+        )
+        Subscription.objects.filter(id=recent.id).update(renewal_requested_at=self.now - timedelta(hours=1))
+
+        self.assertEqual(subscription_lifecycle.queue_renewals(now=self.now), {'queued': 1, 'failed': 0})
+        crashed.refresh_from_db()
+        self.assertTrue(PaymentRecord.objects.filter(order_id=crashed.renewal_order_id).exists())
+        submitted.refresh_from_db()
+        self.assertEqual(submitted.renewal_order_id, f'U{submitted.user_id}-R-old')
+
+    def test_dashboards_link_the_pending_renewal(self):
+        sub = self._subscription('linked', 2)
+        Subscription.objects.filter(id=sub.id).update(renewal_payment_url='https://pay.example/renew-1')
+        self.client.force_login(sub.user)
+        for name in ('business-dashboard', 'business-subscriptions'):
+            self.assertContains(self.client.get(reverse(name)), 'https://pay.example/renew-1')
+
+    def test_command_expires_without_renewals(self):
+        self._subscription('old', -2)
+        out = StringIO()
+        call_command('sweep_subscriptions', '--no-renewals', stdout=out)
+        self.assertIn('expired=1', out.getvalue())
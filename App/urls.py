@@ -1,6 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
-from App import views
+from django.conf import settings
+from App import views, async_views
+
+# Under ASGI the outbound-I/O-bound Pesapal views run as coroutines
+pesapal_views = async_views if settings.PESAPAL_ASYNC_VIEWS else views
 
 urlpatterns = [
     path('', views.landing_page, name = 'landing'),
@@ -30,13 +34,13 @@ urlpatterns = [
     path('token/', views.get_token_view, name='get_token'),
     path('ipn/register/', views.register_ipn_view, name='register_ipn'),
     path('ipn/list/', views.list_ipns_view, name='list_ipns'),
-    path('ipn/register-current/', views.register_current_ipn, name='register_current_ipn'),
-    path('order/submit/', views.create_order_view, name='create_order'),
-    path('ipn/', views.ipn_listener, name='ipn_listener'),
+    path('ipn/register-current/', pesapal_views.register_current_ipn, name='register_current_ipn'),
+    path('order/submit/', pesapal_views.create_order_view, name='create_order'),
+    path('ipn/', pesapal_views.ipn_listener, name='ipn_listener'),
     path('payment/confirm', views.payment_confirm, name='payment_confirm'),
     
     # Diagnostics
-    path('pesapal/health/', views.pesapal_health, name='pesapal_health'),
+    path('pesapal/health/', pesapal_views.pesapal_health, name='pesapal_health'),
 
     path('logout/', views.logout, name='logout'),
     
@@ -4,15 +4,18 @@ from django.contrib.auth import login, authenticate
 from django.views.decorators.http import require_http_methods
 from django.conf import settings
 
-from App.models import OTP
+from App import checkout_state, otp as otp_service
 from App.models import UserProfile 
 from App.models import Business, Plan, Feature, Subscription
 from App.integrations.utils import send_otp, send_mail
 from django.views.generic import TemplateView
 from django.http import JsonResponse, Http404
-from App.integrations import pesapal_service
+from App.integrations import pesapal_service, ipn_registry
+from App.subscription_lifecycle import activate_subscription
+from App.reseller.marketing.services import AttributionService, ClickEventService
 from django.views.decorators.csrf import csrf_exempt
 from django.http import HttpResponse
+from django.core.files.storage import default_storage
 import json
 import uuid
 from django.contrib.auth.decorators import login_required
@@ -50,6 +53,11 @@ def register_user(request):
         if User.objects.filter(username=email).exists():
             return render(request, "auth/register.html", {"error": "User already exists."})
 
+        try:
+            code = otp_service.issue(email, 'register', request)
+        except otp_service.RateLimited as exc:
+            return render(request, "auth/register.html", {"error": rate_limited_message(exc)})
+
         # Temporarily store credentials in session
         request.session['reg_role'] = role
         request.session['reg_industry'] = industry
@@ -59,8 +67,7 @@ def register_user(request):
         request.session['reg_last_name'] = last_name
         request.session['reg_phone'] = phone
 
-        otp = OTP.objects.create(email=email, purpose='register')
-        send_otp(email, phone, otp.code)
+        send_otp(email, phone, code)
 
 
         return redirect('verify_register_otp')
@@ -83,40 +90,41 @@ def verify_register_otp(request):
         code = request.POST.get("otp")
 
         try:
-            otp = OTP.objects.get(email=email, code=code, purpose="register", is_verified=False)
-            if otp.is_expired():
-                return render(request, "auth/verify_otp.html", 
-                    {"error": "OTP expired.",
+            result = otp_service.verify(email, 'register', code, request)
+        except otp_service.RateLimited as exc:
+            return render(request, "auth/verify_otp.html",
+                    {"error": rate_limited_message(exc),
                     "action": "verify_register_otp"}
                     )
+        if result == otp_service.EXPIRED:
+            return render(request, "auth/verify_otp.html", 
+                {"error": "OTP expired.",
+                "action": "verify_register_otp"}
+                )
+        if result != otp_service.VALID:
+            return render(request, "auth/verify_otp.html",
+                    {"error": "Invalid OTP.",
+                    "action": "verify_register_otp"}
+)
 
-            otp.is_verified = True
-            otp.save()
-
-            user = User.objects.create_user( 
-            username=email,
-            email=email,
-            password=password,
-            first_name=first_name,
-            last_name=last_name
-            )
+        user = User.objects.create_user( 
+        username=email,
+        email=email,
+        password=password,
+        first_name=first_name,
+        last_name=last_name
+        )
 
-            # Save other fields to profile
-            from App.models import UserProfile
-            UserProfile.objects.create(user=user, phone=phone, role=role, industry=industry)
+        # Save other fields to profile
+        UserProfile.objects.create(user=user, phone=phone, role=role, industry=industry)
 
-            login(request, user)
+        login(request, user)
 
-            # Clear session
-            for key in ['reg_email', 'reg_password', 'reg_first_name', 'reg_last_name', 'reg_phone']:
-                request.session.pop(key, None)
+        # Clear session
+        for key in ['reg_email', 'reg_password', 'reg_first_name', 'reg_last_name', 'reg_phone']:
+            request.session.pop(key, None)
 
-            return redirect('onboarding')
-        except OTP.DoesNotExist:
-            return render(request, "auth/verify_otp.html",
-                    {"error": "Invalid OTP.",
-                    "action": "verify_register_otp"}
-)
+        return redirect('onboarding')
 
     return render(request, 'auth/verify_otp.html', {'action': 'verify_register_otp'})
 
@@ -136,12 +144,15 @@ def login_user(request):
                 except UserProfile.DoesNotExist:
                     phone = None
 
-                otp = OTP.objects.create(email=email, purpose='login')
+                try:
+                    code = otp_service.issue(email, 'login', request)
+                except otp_service.RateLimited as exc:
+                    return render(request, "auth/login.html", {"error": rate_limited_message(exc)})
 
                 if phone:
-                    send_otp(email, phone, otp.code)
+                    send_otp(email, phone, code)
                 else:
-                    send_mail(email, otp.code)
+                    send_mail(email, code)
 
                 request.session['otp_user_email'] = email
                 request.session['otp_user_password'] = password
@@ -174,42 +185,42 @@ def verify_login_otp(request):
         code = request.POST.get("otp")
 
         try:
-            otp = OTP.objects.get(email=email, code=code, purpose='login', is_verified=False)
-
-            if otp.is_expired():
-                return render(request, "auth/verify_otp.html",
-                        {"error": "OTP expired.",
+            result = otp_service.verify(email, 'login', code, request)
+        except otp_service.RateLimited as exc:
+            return render(request, "auth/verify_otp.html",
+                        {"error": rate_limited_message(exc),
                         "action": "verify_login_otp"}
 )
-
-            otp.is_verified = True
-            otp.save()
-
-            user = authenticate(request, username=email, password=password)
-            if user:
-                try:
-                    profile = UserProfile.objects.get(user=user)
-                except UserProfile.DoesNotExist:
-                    # If profile doesn't exist, create a default one or redirect to complete registration
-                    return redirect('register')
-                
-                login(request, user)
-                request.session.pop('otp_user_email', None)
-                request.session.pop('otp_user_password', None)
-
-                if profile.role == 'business_owner':
-                     return redirect('business-dashboard')
-                elif profile.role == 'admin':
-                    return redirect('admin-dashboard')  
-                else:
-                    return redirect('reseller-dashboard')
-
-        except OTP.DoesNotExist:
+        if result == otp_service.EXPIRED:
+            return render(request, "auth/verify_otp.html",
+                    {"error": "OTP expired.",
+                    "action": "verify_login_otp"}
+)
+        if result != otp_service.VALID:
             return render(request, "auth/verify_otp.html", 
                         {"error": "Invalid OTP.",
                         "action": "verify_login_otp"}
 )
 
+        user = authenticate(request, username=email, password=password)
+        if user:
+            try:
+                profile = UserProfile.objects.get(user=user)
+            except UserProfile.DoesNotExist:
+                # If profile doesn't exist, create a default one or redirect to complete registration
+                return redirect('register')
+            
+            login(request, user)
+            request.session.pop('otp_user_email', None)
+            request.session.pop('otp_user_password', None)
+
+            if profile.role == 'business_owner':
+                 return redirect('business-dashboard')
+            elif profile.role == 'admin':
+                return redirect('admin-dashboard')  
+            else:
+                return redirect('reseller-dashboard')
+
     return render(request, 'auth/verify_otp.html', {'action': 'verify_login_otp'})
 
 
@@ -245,15 +256,8 @@ def onboarding(request):
     return render(request, 'onboarding/onboarding.html')
 
 def payment(request):
-    # Get purchase context from session if available
-    purchase_context = {
-        'software': request.session.get('purchase_software'),
-        'plan': request.session.get('purchase_plan'),
-        'billing': request.session.get('purchase_billing'),
-        'users': request.session.get('purchase_users'),
-        'amount': request.session.get('purchase_amount'),
-        'description': request.session.get('purchase_description')
-    }
+    # Get purchase context from the checkout cookie if available
+    purchase_context = checkout_state.get_purchase(request)
     
     # If we have purchase context, pass it to the template
     context = {}
@@ -284,16 +288,25 @@ def register_current_ipn(request):
     Useful to quickly register https://<host>/ipn/ with Pesapal.
     """
     token = pesapal_service.generate_access_token()
+    ipn_url = _current_ipn_url(request)
+    res = pesapal_service.register_ipn_url(token, ipn_url)
+    return _ipn_registration_response(ipn_url, res)
+
+
+def _current_ipn_url(request):
     host = request.GET.get('host') or request.get_host()
     # Default to https scheme for production
-    ipn_url = f"https://{host}/ipn/"
-    res = pesapal_service.register_ipn_url(token, ipn_url)
+    return f"https://{host}/ipn/"
+
+
+def _ipn_registration_response(ipn_url, res):
     try:
         payload = res.json()
     except Exception:
         payload = {'status_code': res.status_code}
     return JsonResponse({'requested_url': ipn_url, 'status_code': res.status_code, 'response': payload}, status=res.status_code)
 
+
 def create_order_view(request):
     token = pesapal_service.generate_access_token()
     
@@ -302,18 +315,72 @@ def create_order_view(request):
         print("[PESAPAL] Failed to generate access token")
         return JsonResponse({"error": "Failed to authenticate with payment provider"}, status=500)
     
+    payload = _prepare_order(request)
+    res = pesapal_service.submit_order_request(token, payload)
+    
+    # Log response for debugging
+    print(f"[PESAPAL] Order submission response code: {res.status_code}")
+    
+    try:
+        res_json = res.json()
+    except Exception as e:
+        print(f"[PESAPAL] Failed to parse response JSON: {e}")
+        print(f"[PESAPAL] Response text: {res.text[:500]}...")  # First 500 chars
+        return JsonResponse({"error": "Invalid response from payment provider"}, status=500)
+    
+    redirect_url = _extract_redirect_url(res_json)
+    if 200 <= res.status_code < 300 and redirect_url:
+        return JsonResponse({
+            "redirect_url": redirect_url
+        })
+
+    # Log the actual error from Pesapal
+    error_msg, err_code = _provider_error(res_json, res.status_code)
+    print(f"[PESAPAL] Order submission failed: {error_msg}")
+    print(f"[PESAPAL] Full response: {res_json}")
+
+    # Self-heal: if InvalidIpnId, refresh this host's registry entry (single-flight) and retry once
+    if _is_invalid_ipn_error(error_msg, err_code):
+        try:
+            host = request.get_host()
+            stale_id = payload.get("notification_id")
+            found_id = ipn_registry.refresh(host, token, stale_id=stale_id)
+            if found_id and found_id != stale_id:
+                print(f"[PESAPAL] IPN for {host} resolved -> id={found_id}; retrying order...")
+                payload["notification_id"] = found_id
+                res2 = pesapal_service.submit_order_request(token, payload)
+                res2_json = _safe_json(res2, {})
+                redirect_url2 = _extract_redirect_url(res2_json)
+                if 200 <= res2.status_code < 300 and redirect_url2:
+                    return JsonResponse({"redirect_url": redirect_url2})
+                else:
+                    print(f"[PESAPAL] Retry after IPN fix failed. Status={res2.status_code} Body={res2_json}")
+            else:
+                print(f"[PESAPAL] Could not discover or register IPN for host {host}; leaving error as-is")
+        except Exception as heal_e:
+            print(f"[PESAPAL] Self-heal attempt for InvalidIpnId failed: {heal_e}")
+
+    return JsonResponse({"error": f"Payment provider error: {error_msg}"}, status=400)
+
+
+def _prepare_order(request):
+    """Build the SubmitOrderRequest payload and record the initiated payment.
+    Shared by the sync and async order views; reads the checkout cookies and touches the ORM.
+    """
     if request.content_type == 'application/json':
         data = json.loads(request.body)
         amount = float(data.get('amount', 0))
     else:
         amount = float(request.POST.get('amount', 0))
     
+    purchase = checkout_state.get_purchase(request)
+
     # Use purchase context for description if available
-    description = request.session.get('purchase_description', 'Payment description goes here')
+    description = purchase['description'] or 'Payment description goes here'
     
-    # If no amount provided but we have purchase amount in session, use it
+    # If no amount provided but we have a purchase amount in the checkout cookie, use it
     if amount == 0:
-        amount = request.session.get('purchase_amount', 0)
+        amount = purchase['amount'] or 0
 
     # Build a callback URL to our confirmation endpoint so we can verify and activate subscriptions
     # Prefer an explicit external base URL if configured (ensures correct host/scheme in proxies)
@@ -330,14 +397,13 @@ def create_order_view(request):
     print(f"[PESAPAL] Using callback_url: {callback_url}")
 
     # Attach affiliate markers if present for downstream reconciliation (non-authoritative)
-    affiliate_code = request.session.get('affiliate_code') or request.COOKIES.get('affiliate_code')
+    affiliate_code, affiliate_reseller_id = checkout_state.get_affiliate(request)
     if affiliate_code:
         description = f"{description} | AFF={affiliate_code}"
 
     # Build a merchant reference that embeds the user id for reliable postback handling
     if request.user.is_authenticated:
         merchant_ref = f"U{request.user.id}-{uuid.uuid4()}"
-        request.session['last_order_user_id'] = request.user.id
     else:
         merchant_ref = str(uuid.uuid4())
 
@@ -365,7 +431,8 @@ def create_order_view(request):
         "description": description,
         "callback_url": callback_url,
         "redirect_mode": "REDIRECT",
-        "notification_id": getattr(settings, 'PESAPAL_NOTIFICATION_ID', ''),
+        # Registry lookup (cache/DB); never scans the provider's IPN list
+        "notification_id": ipn_registry.get_notification_id(request.get_host()),
         "billing_address": {
             "email_address": email_address,
             "phone_number": phone,
@@ -390,134 +457,65 @@ def create_order_view(request):
     try:
         from App.models import PaymentRecord
         if request.user.is_authenticated:
-            PaymentRecord.objects.create(
+            record = PaymentRecord.objects.create(
                 user=request.user,
                 order_id=merchant_ref,
                 amount=amount,
                 currency='KES',
                 description=description,
                 phone_number=payer_phone,
-                plan_name=str(request.session.get('purchase_plan') or ''),
-                billing=str(request.session.get('purchase_billing') or 'monthly'),
+                plan_name=str(purchase['plan'] or ''),
+                billing=str(purchase['billing'] or 'monthly'),
                 payment_method='pesapal',
                 status='initiated'
             )
+            if affiliate_code:
+                AttributionService().record_order(record, affiliate_code, affiliate_reseller_id)
     except Exception as e:
         print(f"PaymentRecord create error: {e}")
 
-    res = pesapal_service.submit_order_request(token, payload)
-    
-    # Log response for debugging
-    print(f"[PESAPAL] Order submission response code: {res.status_code}")
-    
+    return payload
+
+
+def _safe_json(response, default):
     try:
-        res_json = res.json()
-    except Exception as e:
-        print(f"[PESAPAL] Failed to parse response JSON: {e}")
-        print(f"[PESAPAL] Response text: {res.text[:500]}...")  # First 500 chars
-        return JsonResponse({"error": "Invalid response from payment provider"}, status=500)
-    
-    # Accept any 2xx as success and support nested data.redirect_url and casing variants
-    redirect_url = None
-    if isinstance(res_json, dict):
-        candidates = ["redirect_url", "redirectUrl", "redirectURL"]
-        # Check top-level
+        return response.json() if hasattr(response, 'json') else default
+    except Exception:
+        return default
+
+
+def _extract_redirect_url(res_json):
+    # Accept top-level or nested data.redirect_url and casing variants
+    if not isinstance(res_json, dict):
+        return None
+    candidates = ["redirect_url", "redirectUrl", "redirectURL"]
+    for k in candidates:
+        if k in res_json and res_json[k]:
+            return res_json[k]
+    if isinstance(res_json.get("data"), dict):
+        data_obj = res_json["data"]
         for k in candidates:
-            if k in res_json and res_json[k]:
-                redirect_url = res_json[k]
-                break
-        # Check nested under data
-        if not redirect_url and isinstance(res_json.get("data"), dict):
-            data_obj = res_json["data"]
-            for k in candidates:
-                if k in data_obj and data_obj[k]:
-                    redirect_url = data_obj[k]
-                    break
+            if k in data_obj and data_obj[k]:
+                return data_obj[k]
+    return None
 
-    if 200 <= res.status_code < 300 and redirect_url:
-        return JsonResponse({
-            "redirect_url": redirect_url
-        })
-    else:
-        # Log the actual error from Pesapal
-        error_msg = None
-        err_code = None
-        err_obj = None
-        if isinstance(res_json, dict):
-            err_obj = res_json.get('error') if isinstance(res_json.get('error'), dict) else None
-            error_msg = (err_obj or {}).get('message') or res_json.get('message') or res_json.get('error') or res_json.get('status')
-            err_code = (err_obj or {}).get('code') or res_json.get('code') or res_json.get('error_code')
-        error_msg = error_msg or f"HTTP {res.status_code}"
-        print(f"[PESAPAL] Order submission failed: {error_msg}")
-        print(f"[PESAPAL] Full response: {res_json}")
-
-        # Self-heal: if InvalidIpnId, try to discover or register the correct IPN for this host, then retry once
-        healable = False
-        if isinstance(error_msg, str) and ('InvalidIpnId' in error_msg or 'IPN ID is invalid' in error_msg):
-            healable = True
-        if isinstance(err_code, str) and err_code == 'InvalidIpnId':
-            healable = True
-
-        if healable:
-            try:
-                # Build expected IPN URL for current host (always https)
-                host = request.get_host()
-                expected_ipn = f"https://{host}/ipn/"
-                # 1) Try get_registered_ipns
-                ipn_resp = pesapal_service.get_registered_ipns(token)
-                ipn_json = []
-                try:
-                    ipn_json = ipn_resp.json() if hasattr(ipn_resp, 'json') else []
-                except Exception:
-                    ipn_json = []
-                found_id = None
-                if isinstance(ipn_json, list):
-                    for item in ipn_json:
-                        url = (item.get('url') or item.get('Url') or '').strip()
-                        if url.lower() == expected_ipn.lower():
-                            found_id = item.get('id') or item.get('Id') or item.get('ipn_id') or item.get('IpnId')
-                            if found_id:
-                                break
-                # 2) If not found, register
-                if not found_id:
-                    reg_resp = pesapal_service.register_ipn_url(token, expected_ipn)
-                    try:
-                        reg_json = reg_resp.json() if hasattr(reg_resp, 'json') else {}
-                    except Exception:
-                        reg_json = {}
-                    found_id = reg_json.get('ipn_id') or reg_json.get('IpnId') or reg_json.get('id') or reg_json.get('Id')
-                if found_id:
-                    print(f"[PESAPAL] Discovered/registered IPN for {expected_ipn} -> id={found_id}; retrying order...")
-                    payload["notification_id"] = found_id
-                    res2 = pesapal_service.submit_order_request(token, payload)
-                    try:
-                        res2_json = res2.json()
-                    except Exception:
-                        res2_json = {}
-                    # Extract redirect url again
-                    redirect_url2 = None
-                    if isinstance(res2_json, dict):
-                        candidates = ["redirect_url", "redirectUrl", "redirectURL"]
-                        for k in candidates:
-                            if k in res2_json and res2_json[k]:
-                                redirect_url2 = res2_json[k]
-                                break
-                        if not redirect_url2 and isinstance(res2_json.get("data"), dict):
-                            data_obj2 = res2_json["data"]
-                            for k in candidates:
-                                if k in data_obj2 and data_obj2[k]:
-                                    redirect_url2 = data_obj2[k]
-                                    break
-                    if 200 <= res2.status_code < 300 and redirect_url2:
-                        return JsonResponse({"redirect_url": redirect_url2})
-                    else:
-                        print(f"[PESAPAL] Retry after IPN fix failed. Status={res2.status_code} Body={res2_json}")
-                else:
-                    print(f"[PESAPAL] Could not discover or register IPN for host {host}; leaving error as-is")
-            except Exception as heal_e:
-                print(f"[PESAPAL] Self-heal attempt for InvalidIpnId failed: {heal_e}")
 
-        return JsonResponse({"error": f"Payment provider error: {error_msg}"}, status=400)
+def _provider_error(res_json, status_code):
+    """Return (message, code) from a Pesapal error response."""
+    error_msg = None
+    err_code = None
+    if isinstance(res_json, dict):
+        err_obj = res_json.get('error') if isinstance(res_json.get('error'), dict) else None
+        error_msg = (err_obj or {}).get('message') or res_json.get('message') or res_json.get('error') or res_json.get('status')
+        err_code = (err_obj or {}).get('code') or res_json.get('code') or res_json.get('error_code')
+    return error_msg or f"HTTP {status_code}", err_code
+
+
+def _is_invalid_ipn_error(error_msg, err_code):
+    if isinstance(error_msg, str) and ('InvalidIpnId' in error_msg or 'IPN ID is invalid' in error_msg):
+        return True
+    return isinstance(err_code, str) and err_code == 'InvalidIpnId'
+
 
 @csrf_exempt
 def ipn_listener(request):
@@ -528,6 +526,13 @@ def ipn_listener(request):
     - Marks PaymentRecord completed/failed (idempotent).
     - On COMPLETED, activates subscription and creates commission based on affiliate attribution.
     """
+    tracking_id, merchant_reference = _ipn_params(request)
+    token = pesapal_service.generate_access_token()
+    status = pesapal_service.get_transaction_status(token, tracking_id, merchant_reference)
+    return _apply_ipn_status(tracking_id, merchant_reference, status)
+
+
+def _ipn_params(request):
     # Normalize params (Pesapal may send different casings)
     tracking_id = (
         request.GET.get("order_tracking_id")
@@ -541,10 +546,11 @@ def ipn_listener(request):
         or request.GET.get("merchant_reference")
         or request.GET.get("MerchantReference")
     )
+    return tracking_id, merchant_reference
 
-    token = pesapal_service.generate_access_token()
-    status = pesapal_service.get_transaction_status(token, tracking_id, merchant_reference)
 
+def _apply_ipn_status(tracking_id, merchant_reference, status):
+    """Record a verified provider status; on COMPLETED activate the subscription and commission."""
     from App.models import PaymentRecord
     pr = None
     try:
@@ -612,50 +618,12 @@ def ipn_listener(request):
             except Exception:
                 pass
 
-            now = timezone.now()
-            period = timedelta(days=365) if billing == 'yearly' else timedelta(days=30)
-            Subscription.objects.update_or_create(
-                user=user_for_actions,
-                product='payroll',
-                defaults={
-                    'plan': plan,
-                    'status': 'active',
-                    'start_date': now,
-                    'end_date': now + period,
-                    'auto_renewal': True,
-                }
-            )
+            activate_subscription(user_for_actions, plan, billing, order_id=merchant_reference)
 
-        # Create commission using AFF marker and MarketingLink mapping
+        # Commission for attributed orders; the link/reseller was recorded when the order was created
         try:
-            # Extract affiliate code from description: "... | AFF=CODE"
-            affiliate_code = None
-            desc = (pr.description if pr else '') or ''
-            if 'AFF=' in desc:
-                affiliate_code = desc.split('AFF=', 1)[1].strip()
-            if affiliate_code:
-                from App.reseller.marketing.models import MarketingLink as ML
-                ml = ML.objects.filter(code=affiliate_code, is_active=True).first()
-                if ml:
-                    from App.reseller.earnings.models.reseller import Reseller as ResellerModel
-                    from App.reseller.earnings.services.commission_service import CommissionService
-                    reseller = ResellerModel.objects.get(id=ml.reseller_id)
-                    sale_amount = float(pr.amount) if pr else (float(plan.yearly_price) if billing=='yearly' and plan and plan.yearly_price else (float(plan.price) if plan else 0))
-                    commission_rate = float(reseller.get_tier_commission_rate())
-                    client_name = (user_for_actions.get_full_name() or user_for_actions.username) if user_for_actions else ''
-                    client_email = (user_for_actions.email if user_for_actions else '')
-                    notes = f"link_code={affiliate_code}; product=payroll; billing={billing}"
-                    CommissionService().create_commission({
-                        'reseller': reseller,
-                        'sale_amount': sale_amount,
-                        'commission_rate': commission_rate,
-                        'transaction_reference': tracking_id or merchant_reference or str(uuid.uuid4()),
-                        'client_name': client_name,
-                        'client_email': client_email,
-                        'product_name': 'Payroll Subscription',
-                        'product_type': 'subscription',
-                        'notes': notes,
-                    })
+            if pr:
+                AttributionService().settle(pr, tracking_id=tracking_id, billing=billing, client=user_for_actions)
         except Exception as e:
             print(f"IPN Commission creation error: {e}")
 
@@ -728,90 +696,48 @@ def payment_confirm(request):
             user_for_actions = User.objects.get(id=uid)
         except Exception:
             pass
-    if not user_for_actions:
-        last_uid = request.session.get('last_order_user_id')
-        if last_uid:
-            try:
-                user_for_actions = User.objects.get(id=last_uid)
-            except Exception:
-                user_for_actions = None
 
     if status == "COMPLETED":
         # On successful payment, activate subscription if applicable
-        software = request.session.get('purchase_software', 'payroll')
-        plan_name = request.session.get('purchase_plan')
-        billing = request.session.get('purchase_billing', 'monthly')
+        purchase = checkout_state.get_purchase(request)
+        software = purchase['software'] or 'payroll'
+        plan_name = purchase['plan']
+        billing = purchase['billing'] or 'monthly'
         if software == 'payroll' and user_for_actions:
             try:
                 plan = Plan.objects.get(name=plan_name)
             except Plan.DoesNotExist:
                 plan = Plan.objects.filter(is_active=True).order_by('display_order').first()
-            now = timezone.now()
-            period = timedelta(days=365) if billing == 'yearly' else timedelta(days=30)
             if plan:
-                Subscription.objects.update_or_create(
-                    user=user_for_actions,
-                    product='payroll',
-                    defaults={
-                        'plan': plan,
-                        'status': 'active',
-                        'start_date': now,
-                        'end_date': now + period,
-                        'auto_renewal': True,
-                    }
-                )
+                activate_subscription(user_for_actions, plan, billing, order_id=merchant_reference)
 
-            # Create reseller commission if attributed via short link
+            # Create reseller commission if attributed via short link (no-op if the IPN already did)
             try:
-                affiliate_code = request.session.get('affiliate_code') or request.COOKIES.get('affiliate_code')
-                affiliate_reseller_id = request.session.get('affiliate_reseller_id')
-                from App.reseller.earnings.models.reseller import Reseller as ResellerModel
-                from App.reseller.earnings.services.commission_service import CommissionService
-                from App.reseller.earnings.models import Commission as CommissionModel
-                if affiliate_code and not affiliate_reseller_id:
-                    # Resolve reseller from MarketingLink
-                    try:
-                        from App.reseller.marketing.models import MarketingLink as ML
-                        ml = ML.objects.filter(code=affiliate_code, is_active=True).first()
-                        if ml:
-                            affiliate_reseller_id = ml.reseller_id
-                    except Exception:
-                        affiliate_reseller_id = None
-                if affiliate_reseller_id and affiliate_code:
-                    # Ensure idempotency: skip if a commission already exists for this transaction reference
-                    tx_ref = tracking_id or merchant_reference or str(uuid.uuid4())
-                    if not CommissionModel.objects.filter(transaction_reference=tx_ref).exists():
-                        reseller = ResellerModel.objects.get(id=affiliate_reseller_id)
-                        # Determine sale amount (from session or plan)
-                        sale_amount = request.session.get('purchase_amount')
-                        if (not sale_amount) and plan:
-                            sale_amount = float(plan.yearly_price) if billing == 'yearly' and plan.yearly_price else float(plan.price)
-                        sale_amount = sale_amount or (pr.amount if pr else 0)
-                        commission_rate = float(reseller.get_tier_commission_rate())
-                        client_name = (user_for_actions.get_full_name() or user_for_actions.username)
-                        client_email = user_for_actions.email
-                        notes = f"link_code={affiliate_code}; product=payroll; billing={billing}"
-                        CommissionService().create_commission({
-                            'reseller': reseller,
-                            'sale_amount': sale_amount,
-                            'commission_rate': commission_rate,
-                            'transaction_reference': tx_ref,
-                            'client_name': client_name,
-                            'client_email': client_email,
-                            'product_name': 'Payroll Subscription',
-                            'product_type': 'subscription',
-                            'notes': notes,
-                        })
+                if pr:
+                    fallback_code, fallback_reseller_id = checkout_state.get_affiliate(request)
+                    # Sale amount falls back to the checkout cookie/plan only when the record has none
+                    sale_amount = purchase['amount']
+                    if (not sale_amount) and plan:
+                        sale_amount = float(plan.yearly_price) if billing == 'yearly' and plan.yearly_price else float(plan.price)
+                    AttributionService().settle(
+                        pr,
+                        tracking_id=tracking_id,
+                        sale_amount=sale_amount,
+                        billing=billing,
+                        client=user_for_actions,
+                        fallback_code=fallback_code,
+                        fallback_reseller_id=fallback_reseller_id,
+                    )
             except Exception as e:
                 # Do not fail user flow if commission creation fails
                 print(f"Commission creation error: {e}")
 
-        # Clear purchase context (keep affiliate cookie; session keys not needed anymore)
-        for k in ['purchase_software','purchase_plan','purchase_billing','purchase_users','purchase_amount','purchase_description','last_order_user_id']:
-            request.session.pop(k, None)
         # Friendly UX: send user to business dashboard (validated by active subscription)
         messages.success(request, 'Payment successful. Your Payroll subscription is now active.')
-        return redirect('business-dashboard')
+        response = redirect('business-dashboard')
+        # Clear purchase context (keep affiliate cookie)
+        checkout_state.clear_purchase(request, response)
+        return response
     else:
         messages.error(request, 'Payment could not be verified. Please contact support if you were charged.')
         return redirect('business-subscriptions')
@@ -895,68 +821,38 @@ def business_billing_export(request):
 
 @login_required
 def business_invoice_download(request, order_id: str):
-    """Generate and download a PDF invoice/receipt for a PaymentRecord.
-    Uses reportlab if available; otherwise returns a simple text fallback as PDF.
+    """Download a PDF invoice/receipt for a PaymentRecord.
+    The PDF is rendered once per distinct content and served from storage
+    afterwards (ETag/Range aware). Falls back to plain text without ReportLab.
     """
     from App.models import PaymentRecord
+    from App.integrations.pdf_service import content_hash, render_pdf, serve_pdf, store_pdf
     pr = get_object_or_404(PaymentRecord, user=request.user, order_id=order_id)
 
-    # Try ReportLab
+    lines = [
+        f"Invoice #: {pr.order_id}",
+        f"Date: {pr.created_at.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"User: {request.user.email}",
+        f"Description: {pr.description or 'Payment'}",
+        f"Amount: {pr.currency} {pr.amount}",
+        f"Status: {pr.status.title()} (provider: {pr.provider_status or 'N/A'})",
+        f"Phone: {pr.phone_number or '—'}",
+        f"Plan: {pr.plan_name or '—'} | Billing: {(pr.billing or '').title()}",
+    ]
+    digest = content_hash(lines)
+    name = f"receipts/{pr.created_at:%Y/%m}/{pr.order_id}-{digest[:16]}.pdf"
+
     try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.pdfgen import canvas
-        from io import BytesIO
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-        y = height - 50
-
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(50, y, "Invoice / Receipt")
-        y -= 30
-        p.setFont("Helvetica", 10)
-        p.drawString(50, y, f"Invoice #: {pr.order_id}")
-        y -= 15
-        p.drawString(50, y, f"Date: {pr.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
-        y -= 15
-        p.drawString(50, y, f"User: {request.user.email}")
-        y -= 15
-        p.drawString(50, y, f"Description: {pr.description or 'Payment'}")
-        y -= 15
-        p.drawString(50, y, f"Amount: {pr.currency} {pr.amount}")
-        y -= 15
-        p.drawString(50, y, f"Status: {pr.status.title()} (provider: {pr.provider_status or 'N/A'})")
-        y -= 15
-        p.drawString(50, y, f"Phone: {pr.phone_number or '—'}")
-        y -= 15
-        p.drawString(50, y, f"Plan: {pr.plan_name or '—'} | Billing: {(pr.billing or '').title()}")
-        y -= 30
-        p.setFont("Helvetica-Oblique", 9)
-        p.drawString(50, y, "Thank you for your payment.")
-
-        p.showPage()
-        p.save()
-        pdf = buffer.getvalue()
-        buffer.close()
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename=\"invoice_{pr.order_id}.pdf\"'
-        return response
-    except Exception:
-        # Fallback: simple text with PDF content type (not ideal, but functional)
-        content = (
-            f"Invoice #: {pr.order_id}\n"
-            f"Date: {pr.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
-            f"User: {request.user.email}\n"
-            f"Description: {pr.description or 'Payment'}\n"
-            f"Amount: {pr.currency} {pr.amount}\n"
-            f"Status: {pr.status} (provider: {pr.provider_status or 'N/A'})\n"
-            f"Phone: {pr.phone_number or '—'}\n"
-            f"Plan: {pr.plan_name or '—'} | Billing: {(pr.billing or '').title()}\n"
-        )
-        response = HttpResponse(content, content_type='application/octet-stream')
+        if not default_storage.exists(name):
+            store_pdf(name, render_pdf("Invoice / Receipt", lines, footer="Thank you for your payment."))
+    except ImportError:
+        # Fallback: simple text (ReportLab not installed)
+        response = HttpResponse("\n".join(lines) + "\n", content_type='application/octet-stream')
         response['Content-Disposition'] = f'attachment; filename=\"invoice_{pr.order_id}.txt\"'
         return response
 
+    return serve_pdf(request, name, f"invoice_{pr.order_id}.pdf", digest, last_modified=pr.updated_at)
+
 @login_required
 def business_users(request):
     return render(request, 'dashboards/business/pages/user-management.html')
@@ -983,12 +879,6 @@ def business_purchase_software(request):
         billing = request.POST.get('billing', 'monthly')
         users = request.POST.get('users', '1')
         
-        # Store purchase details in session for payment processing
-        request.session['purchase_software'] = software
-        request.session['purchase_plan'] = plan
-        request.session['purchase_billing'] = billing
-        request.session['purchase_users'] = users
-        
         # Calculate pricing for payroll only
         pricing = {
             'payroll': {'standard': 5000, 'professional': 8000}
@@ -1007,12 +897,13 @@ def business_purchase_software(request):
             base_cost = int(base_cost * 12 * 0.85)  # 15% discount
             total_cost = base_cost + setup_fee
         
-        # Store pricing for payment
-        request.session['purchase_amount'] = total_cost
-        request.session['purchase_description'] = f"{software_name_map['payroll']} - {plan.title()} Plan ({billing})"
-        
-        # Redirect to existing payment flow
-        return redirect('payment')
+        # Redirect to existing payment flow, carrying purchase details and pricing in the checkout cookie
+        response = redirect('payment')
+        checkout_state.set_purchase(
+            response, software=software, plan=plan, billing=billing, users=users, amount=total_cost,
+            description=f"{software_name_map['payroll']} - {plan.title()} Plan ({billing})",
+        )
+        return response
     
     return redirect('business-dashboard')
 
@@ -1032,15 +923,13 @@ def subscribe_payroll(request):
         amount = float(plan.price)
         billing = 'monthly'
 
-    # Store purchase details in session for payment processing
-    request.session['purchase_software'] = 'payroll'
-    request.session['purchase_plan'] = plan.name
-    request.session['purchase_billing'] = billing
-    request.session['purchase_users'] = '1'
-    request.session['purchase_amount'] = amount
-    request.session['purchase_description'] = f"Payroll System - {billing.title()} Plan ({plan.name})"
-
-    return redirect('payment')
+    # Store purchase details in the checkout cookie for payment processing
+    response = redirect('payment')
+    checkout_state.set_purchase(
+        response, software='payroll', plan=plan.name, billing=billing, users='1', amount=amount,
+        description=f"Payroll System - {billing.title()} Plan ({plan.name})",
+    )
+    return response
 
 @login_required
 def launch_payroll(request):
@@ -1066,76 +955,59 @@ def payment_failed(request):
 @staff_member_required
 def pesapal_health(request):
     """Check Pesapal configuration and connectivity.
-    Returns JSON with:
+    Served from the cached background probe (App.integrations.pesapal_monitor);
+    pass ?live=1 to probe now. Returns JSON with:
     - token_ok: whether we obtained an access token
     - base_url: Pesapal base URL in use
     - notification_id_set: whether PESAPAL_NOTIFICATION_ID is configured
     - branch_set: whether PESAPAL_BRANCH is configured
     - ipn_list_ok: whether the IPN list endpoint responded OK
     - ipn_registered_for_host: whether an IPN exists matching https://<host>/ipn/
+    - circuit: the shared circuit breaker state
     """
-    from django.http import JsonResponse
-    from django.utils.timezone import now
-    from App.integrations import pesapal_service
-    import traceback
+    from App.integrations import pesapal_monitor
+
+    status = pesapal_monitor.probe() if request.GET.get('live') else pesapal_monitor.get_status()
+    result = _health_result(status, request.get_host())
+    return JsonResponse(result, status=200 if result['token_ok'] else 500)
+
 
+def _health_result(status, host):
+    expected = f"https://{host}/ipn/"
+    ipn_urls = status['ipn_urls']
     result = {
-        'checked_at': now().isoformat(),
+        'checked_at': status['checked_at'].isoformat() if status['checked_at'] else None,
         'base_url': getattr(settings, 'PESAPAL_BASE_URL', ''),
         'notification_id_set': bool(getattr(settings, 'PESAPAL_NOTIFICATION_ID', '')),
         'branch_set': bool(getattr(settings, 'PESAPAL_BRANCH', '')),
-        'token_ok': False,
-        'ipn_list_ok': False,
-        'ipn_registered_for_host': False,
-        'details': {},
-    }
-
-    try:
-        token = pesapal_service.generate_access_token()
-        result['token_ok'] = bool(token)
-        if token:
-            # Try listing IPNs
-            resp = pesapal_service.get_registered_ipns(token)
-            result['ipn_list_ok'] = (getattr(resp, 'status_code', 0) == 200)
-            try:
-                data = resp.json() if hasattr(resp, 'json') else []
-            except Exception:
-                data = []
-            # Match expected URL for this host
-            host = request.get_host()
-            expected = f"https://{host}/ipn/"
-            # Pesapal may return list of dicts; try to match by url field case-insensitively
-            found = False
-            if isinstance(data, list):
-                for item in data:
-                    url = (item.get('url') or item.get('Url') or '').strip()
-                    if url.lower() == expected.lower():
-                        found = True
-                        break
-            result['ipn_registered_for_host'] = found
+        'token_ok': status['token_ok'],
+        'ipn_list_ok': status['ipn_list_ok'],
+        # Pesapal may return list of dicts; match by url case-insensitively
+        'ipn_registered_for_host': any(url.lower() == expected.lower() for url in ipn_urls or []),
+        'circuit': status['breaker'],
+        'details': {
+            'latency_ms': status['latency_ms'],
             # Keep minimal diagnostics (no secrets)
-            result['details']['ipn_count'] = len(data) if isinstance(data, list) else None
-            result['details']['expected_ipn'] = expected
-        else:
-            result['details']['error'] = 'Failed to obtain access token; check PESAPAL_CONSUMER_KEY/SECRET and BASE_URL'
-    except Exception as e:
-        result['details']['exception'] = str(e)
-        result['details']['trace'] = traceback.format_exc().splitlines()[-3:]
-
-    return JsonResponse(result, status=200 if result['token_ok'] else 500)
+            'ipn_count': len(ipn_urls) if ipn_urls is not None else None,
+            'expected_ipn': expected,
+        },
+    }
+    if status['error']:
+        result['details']['error'] = status['error']
+    return result
 
 def admin_dashboard(request):
     return render(request, 'dashboards/admin/dashboard.html')
 
 from django.conf import settings
-from django.db.models import F
 from urllib.parse import urlparse
 from App.reseller.marketing.models import MarketingLink
 
 def link_redirect(request, code: str):
-    """Resolve a marketing link code, increment click count, set attribution, and redirect safely.
-    - Increments MarketingLink.clicks atomically.
-    - Stores attribution in session and a cookie (affiliate_code) for 30 days.
+    """Resolve a marketing link code, record the click, set attribution, and redirect safely.
+    - Appends a click event through the buffered writer; MarketingLink.clicks
+      is advanced by the rollup job (rollup_link_clicks), not here.
+    - Stores attribution in a signed cookie (App.checkout_state), so clicks create no session.
     - Redirects only to same-origin destinations; otherwise falls back to '/'.
     """
     try:
@@ -1144,12 +1016,7 @@ def link_redirect(request, code: str):
         # Unknown or inactive code: send to a safe default (landing)
         return redirect('landing')
 
-    # Increment clicks atomically
-    MarketingLink.objects.filter(pk=link.pk).update(clicks=F('clicks') + 1)
-
-    # Store attribution server-side
-    request.session['affiliate_code'] = link.code
-    request.session['affiliate_reseller_id'] = link.reseller_id
+    ClickEventService().record_click(link, request)
 
     # Build a safe redirect target (same host or relative URL only)
     target = link.destination_url or '/'
@@ -1164,10 +1031,7 @@ def link_redirect(request, code: str):
 
     # Prepare response and set cookie
     resp = redirect(target)
-    max_age = 30 * 24 * 60 * 60  # 30 days
-    secure = getattr(settings, 'SESSION_COOKIE_SECURE', False)
-    samesite = getattr(settings, 'SESSION_COOKIE_SAMESITE', 'Lax') or 'Lax'
-    resp.set_cookie('affiliate_code', link.code, max_age=max_age, secure=secure, samesite=samesite)
+    checkout_state.set_affiliate(resp, link)
     return resp
 
 def edit_plans(request):
@@ -1281,6 +1145,15 @@ def get_active_plans(request):
         })
     return JsonResponse({'plans': plan_list})
 
+def rate_limited_message(exc):
+    return f"Too many attempts. Please try again in {exc.retry_after:.0f} seconds."
+
+
+def rate_limited_response(exc):
+    response = JsonResponse({'success': False, 'message': rate_limited_message(exc)}, status=429)
+    response['Retry-After'] = str(int(exc.retry_after) + 1)
+    return response
+
 # ==============================================================================
 # NEW RESEND OTP FUNCTIONALITY - Added by AI Assistant on 2025-01-10
 # ==============================================================================
@@ -1299,15 +1172,11 @@ def resend_register_otp(request):
         return redirect('register')
     
     try:
-        # Mark any existing unverified OTPs as expired by deleting them
-        # This prevents accumulation of multiple active OTPs
-        OTP.objects.filter(email=email, purpose='register', is_verified=False).delete()
-        
-        # Generate new OTP for registration
-        otp = OTP.objects.create(email=email, purpose='register')
+        # Replaces any unverified OTP, so only the newest code is ever active
+        code = otp_service.issue(email, 'register', request)
         
         # Send the new OTP via email and SMS
-        send_otp(email, phone, otp.code)
+        send_otp(email, phone, code)
         
         # Return success response
         return JsonResponse({
@@ -1315,6 +1184,8 @@ def resend_register_otp(request):
             'message': 'OTP resent successfully! Please check your email and SMS.'
         })
         
+    except otp_service.RateLimited as exc:
+        return rate_limited_response(exc)
     except Exception as e:
         # Handle any errors during OTP generation or sending
         return JsonResponse({
@@ -1349,19 +1220,15 @@ def resend_login_otp(request):
         except UserProfile.DoesNotExist:
             phone = None
         
-        # Mark any existing unverified OTPs as expired by deleting them
-        # This prevents accumulation of multiple active OTPs
-        OTP.objects.filter(email=email, purpose='login', is_verified=False).delete()
-        
-        # Generate new OTP for login
-        otp = OTP.objects.create(email=email, purpose='login')
+        # Replaces any unverified OTP, so only the newest code is ever active
+        code = otp_service.issue(email, 'login', request)
         
         # Send the new OTP via email and SMS (if phone available)
         if phone:
-            send_otp(email, phone, otp.code)
+            send_otp(email, phone, code)
         else:
             # Fallback to email-only if no phone number
-            send_mail(email, otp.code)
+            send_mail(email, code)
         
         # Return success response
         return JsonResponse({
@@ -1369,6 +1236,8 @@ def resend_login_otp(request):
             'message': 'OTP resent successfully! Please check your email and SMS.'
         })
         
+    except otp_service.RateLimited as exc:
+        return rate_limited_response(exc)
     except Exception as e:
         # Handle any errors during OTP generation or sending
         return JsonResponse({
@@ -1432,11 +1301,8 @@ def send_password_reset_code(request):
             except UserProfile.DoesNotExist:
                 pass
         
-        # Delete any existing unverified password reset OTPs
-        OTP.objects.filter(email=email, purpose='password_reset', is_verified=False).delete()
-        
-        # Generate new OTP
-        otp = OTP.objects.create(email=email, purpose='password_reset')
+        # Replaces any unverified password reset OTP
+        code = otp_service.issue(email, 'password_reset', request)
         
         # Store email in session for later steps
         request.session['reset_email'] = email
@@ -1444,10 +1310,10 @@ def send_password_reset_code(request):
         # Send OTP
         if recovery_method == 'email' or not phone:
             # Send via email only
-            send_mail(email, otp.code)
+            send_mail(email, code)
         else:
             # Send via both email and SMS
-            send_otp(email, phone, otp.code)
+            send_otp(email, phone, code)
         
         return JsonResponse({
             'success': True, 
@@ -1455,6 +1321,8 @@ def send_password_reset_code(request):
             'contact_masked': mask_contact(contact_value, recovery_method)
         })
         
+    except otp_service.RateLimited as exc:
+        return rate_limited_response(exc)
     except json.JSONDecodeError:
         return JsonResponse({
             'success': False, 
@@ -1492,39 +1360,29 @@ def verify_password_reset_code(request):
                 'message': 'Session expired. Please start over.'
             }, status=400)
         
-        # Verify OTP
-        try:
-            otp = OTP.objects.get(
-                email=email, 
-                code=code, 
-                purpose='password_reset', 
-                is_verified=False
-            )
-            
-            if otp.is_expired():
-                return JsonResponse({
-                    'success': False, 
-                    'message': 'Verification code has expired. Please request a new one.'
-                }, status=400)
-            
-            # Mark OTP as verified but don't delete it yet
-            otp.is_verified = True
-            otp.save()
-            
-            # Store verification status in session
-            request.session['reset_code_verified'] = True
-            
+        # Verify OTP (marks it verified; reset_password deletes it)
+        result = otp_service.verify(email, 'password_reset', code, request)
+        if result == otp_service.EXPIRED:
             return JsonResponse({
-                'success': True, 
-                'message': 'Code verified successfully'
-            })
-            
-        except OTP.DoesNotExist:
+                'success': False, 
+                'message': 'Verification code has expired. Please request a new one.'
+            }, status=400)
+        if result != otp_service.VALID:
             return JsonResponse({
                 'success': False, 
                 'message': 'Invalid verification code'
             }, status=400)
+        
+        # Store verification status in session
+        request.session['reset_code_verified'] = True
+        
+        return JsonResponse({
+            'success': True, 
+            'message': 'Code verified successfully'
+        })
             
+    except otp_service.RateLimited as exc:
+        return rate_limited_response(exc)
     except json.JSONDecodeError:
         return JsonResponse({
             'success': False, 
@@ -1589,7 +1447,7 @@ def reset_password(request):
             request.session.pop('reset_code_verified', None)
             
             # Delete used OTPs
-            OTP.objects.filter(email=email, purpose='password_reset').delete()
+            otp_service.discard(email, 'password_reset')
             
             return JsonResponse({
                 'success': True, 
@@ -1639,17 +1497,14 @@ def resend_password_reset_code(request):
         except UserProfile.DoesNotExist:
             pass
         
-        # Delete old OTPs
-        OTP.objects.filter(email=email, purpose='password_reset', is_verified=False).delete()
-        
-        # Generate new OTP
-        otp = OTP.objects.create(email=email, purpose='password_reset')
+        # Replaces the old unverified OTP
+        code = otp_service.issue(email, 'password_reset', request)
         
         # Send OTP
         if phone:
-            send_otp(email, phone, otp.code)
+            send_otp(email, phone, code)
         else:
-            send_mail(email, otp.code)
+            send_mail(email, code)
         
         return JsonResponse({
             'success': True, 
@@ -1661,6 +1516,8 @@ def resend_password_reset_code(request):
             'success': False, 
             'message': 'User not found'
         }, status=404)
+    except otp_service.RateLimited as exc:
+        return rate_limited_response(exc)
     except Exception as e:
         print(f"Error in resend_password_reset_code: {str(e)}")
         return JsonResponse({
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Serve the Pesapal-facing views as coroutines (see App/async_views.py)
+os.environ.setdefault('PESAPAL_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
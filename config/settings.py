@@ -78,11 +78,22 @@ PESAPAL_CONSUMER_SECRET = config('PESAPAL_CONSUMER_SECRET', default='')
 PESAPAL_SANDBOX = config('PESAPAL_SANDBOX', cast=bool, default=True)  # Set to False in production
 PESAPAL_NOTIFICATION_ID = config('PESAPAL_NOTIFICATION_ID', default='')
 PESAPAL_BRANCH = config('PESAPAL_BRANCH', default='')
+# Route order/IPN/health views to their async versions; config.asgi turns this on
+PESAPAL_ASYNC_VIEWS = config('PESAPAL_ASYNC_VIEWS', cast=bool, default=False)
+# Circuit breaker: open after N consecutive failures, probe again after the reset period
+PESAPAL_CONNECT_TIMEOUT = config('PESAPAL_CONNECT_TIMEOUT', cast=float, default=5)
+PESAPAL_BREAKER_FAILURES = config('PESAPAL_BREAKER_FAILURES', cast=int, default=3)
+PESAPAL_BREAKER_RESET_SECONDS = config('PESAPAL_BREAKER_RESET_SECONDS', cast=int, default=30)
+# Background health probe; the health endpoint and admin status panel read its cached result
+PESAPAL_HEALTH_INTERVAL = config('PESAPAL_HEALTH_INTERVAL', cast=int, default=60)
 
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise, made async-capable so ASGI requests stay on the event loop
+    'App.middleware.AsyncWhiteNoiseMiddleware',
+    # Per-request read-replica pin (App.db_router)
+    'App.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -91,7 +102,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  
+# Sessions are read from the shared cache and written through to the database,
+# so a cache flush or restart logs nobody out. Checkout and affiliate state is
+# kept in signed cookies instead (App.checkout_state), so anonymous link clicks
+# and purchase setup write no session rows. manage.py purge_sessions deletes
+# expired rows in batches (run daily)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'shared'
+CHECKOUT_COOKIE_MAX_AGE = config('CHECKOUT_COOKIE_MAX_AGE', cast=int, default=2 * 60 * 60)
+AFFILIATE_COOKIE_MAX_AGE = config('AFFILIATE_COOKIE_MAX_AGE', cast=int, default=30 * 24 * 60 * 60)
 
 ROOT_URLCONF = 'config.urls'
 
@@ -128,35 +147,146 @@ DATABASES = {
     }
 }
 
+def postgres_database(parsed):
+    query = parse_qs(parsed.query)
+    sslmode = (query.get('sslmode', ['require'])[0] or 'require')
+    options = {'sslmode': sslmode}
+    sslrootcert = config('DB_SSLROOTCERT', default=None)
+    if sslrootcert:
+        p = Path(sslrootcert)
+        if not p.is_absolute():
+            p = BASE_DIR / p
+        options['sslrootcert'] = str(p)
+    else:
+        ca_default = BASE_DIR / 'config' / 'aiven-ca.pem'
+        if ca_default.exists():
+            options['sslrootcert'] = str(ca_default)
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': (parsed.path[1:] if parsed.path else ''),
+        'USER': parsed.username,
+        'PASSWORD': parsed.password,
+        'HOST': parsed.hostname,
+        'PORT': parsed.port or 5432,
+        'OPTIONS': options,
+    }
+
+
 # Switch to Postgres if DATABASE_URL is provided
 DATABASE_URL = config('DATABASE_URL', default=None)
 if DATABASE_URL:
     parsed = urlparse(DATABASE_URL)
     if parsed.scheme.startswith('postgres'):
-        query = parse_qs(parsed.query)
-        sslmode = (query.get('sslmode', ['require'])[0] or 'require')
-        options = {'sslmode': sslmode}
-        sslrootcert = config('DB_SSLROOTCERT', default=None)
-        if sslrootcert:
-            p = Path(sslrootcert)
-            if not p.is_absolute():
-                p = BASE_DIR / p
-            options['sslrootcert'] = str(p)
-        else:
-            ca_default = BASE_DIR / 'config' / 'aiven-ca.pem'
-            if ca_default.exists():
-                options['sslrootcert'] = str(ca_default)
-        DATABASES = {
-            'default': {
-                'ENGINE': 'django.db.backends.postgresql',
-                'NAME': (parsed.path[1:] if parsed.path else ''),
-                'USER': parsed.username,
-                'PASSWORD': parsed.password,
-                'HOST': parsed.hostname,
-                'PORT': parsed.port or 5432,
-                'OPTIONS': options,
-            }
-        }
+        DATABASES = {'default': postgres_database(parsed)}
+
+# Optional read replica for analytics and reports (App.db_router): code opts in with
+# use_replica, and a request that writes keeps reading from the primary. Under the
+# test runner the alias mirrors the primary's test database
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default=None)
+if DATABASE_REPLICA_URL:
+    parsed = urlparse(DATABASE_REPLICA_URL)
+    if parsed.scheme.startswith('postgres'):
+        DATABASES['replica'] = {**postgres_database(parsed), 'TEST': {'MIRROR': 'default'}}
+DATABASE_ROUTERS = ['App.db_router.ReplicaRouter']
+
+# Caches: 'default' is per process; 'shared' is visible to every worker on the
+# host (or cluster, with Redis) and holds cross-worker state such as the
+# Pesapal circuit breaker and health probe result. Set REDIS_URL in production:
+# the file-based fallback's add()/incr() are not atomic across processes, so
+# breaker probes and single-flight locks are only best effort without Redis
+REDIS_URL = config('REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('SHARED_CACHE_DIR', default='/tmp/evolve-shared-cache'),
+    },
+}
+
+# One-time codes expire after OTP_TTL_MINUTES (manage.py purge_otps deletes them).
+# Attempt limits per email and per client address, as (attempts, window seconds);
+# counters live in the 'shared' cache, which must be Redis for the limits to hold
+# across processes. Behind a proxy, set RATELIMIT_CLIENT_IP_HEADER
+# (e.g. HTTP_X_FORWARDED_FOR) so clients are told apart
+OTP_TTL_MINUTES = config('OTP_TTL_MINUTES', cast=int, default=10)
+OTP_RATE_LIMITS = {
+    'send_email': (3, 360),
+    'send_ip': (20, 600),
+    'verify_email': (5, 300),
+    'verify_ip': (30, 300),
+}
+RATELIMIT_CLIENT_IP_HEADER = config('RATELIMIT_CLIENT_IP_HEADER', default='')
+
+# Subscription lifecycle sweeper (manage.py sweep_subscriptions): expiry batch size,
+# renewal orders claimed per chunk, concurrent Pesapal submissions, how many
+# days before end_date an auto-renewal order is raised, and after how many hours
+# a renewal claim whose order was never submitted (crashed sweep) is claimed again
+SUBSCRIPTION_SWEEP_BATCH = config('SUBSCRIPTION_SWEEP_BATCH', cast=int, default=1000)
+SUBSCRIPTION_RENEWAL_CHUNK = config('SUBSCRIPTION_RENEWAL_CHUNK', cast=int, default=100)
+SUBSCRIPTION_RENEWAL_CONCURRENCY = config('SUBSCRIPTION_RENEWAL_CONCURRENCY', cast=int, default=4)
+SUBSCRIPTION_RENEWAL_LEAD_DAYS = config('SUBSCRIPTION_RENEWAL_LEAD_DAYS', cast=int, default=3)
+SUBSCRIPTION_RENEWAL_CLAIM_TIMEOUT_HOURS = config('SUBSCRIPTION_RENEWAL_CLAIM_TIMEOUT_HOURS', cast=int, default=24)
+
+# Marketing link clicks: raw events are buffered per process (size/age thresholds,
+# flushed at request end) and folded into hourly/daily rollups by rollup_link_clicks,
+# which then drops raw events older than CLICK_EVENT_RETENTION_HOURS
+CLICK_BUFFER_SIZE = config('CLICK_BUFFER_SIZE', cast=int, default=200)
+CLICK_BUFFER_MAX_AGE = config('CLICK_BUFFER_MAX_AGE', cast=float, default=10)
+CLICK_EVENT_RETENTION_HOURS = config('CLICK_EVENT_RETENTION_HOURS', cast=int, default=48)
+CLICK_HOURLY_RETENTION_DAYS = config('CLICK_HOURLY_RETENTION_DAYS', cast=int, default=90)
+CLICK_HOURLY_MAX_HOURS = 72
+# Reseller conversion funnels (click -> order -> completed -> commission) are cached
+# per hour and per reseller cache version; new or settled attributions bump the version
+ATTRIBUTION_FUNNEL_CACHE_SECONDS = config('ATTRIBUTION_FUNNEL_CACHE_SECONDS', cast=int, default=300)
+
+# Bulk lead/referral imports: rows validated and inserted per chunk; only the first
+# SALES_IMPORT_MAX_ERRORS row errors are kept. Uploads are imported on a background thread;
+# with SALES_IMPORT_ASYNC off they are imported inside the upload request
+SALES_IMPORT_CHUNK_SIZE = config('SALES_IMPORT_CHUNK_SIZE', cast=int, default=1000)
+SALES_IMPORT_MAX_ERRORS = config('SALES_IMPORT_MAX_ERRORS', cast=int, default=1000)
+SALES_IMPORT_ASYNC = config('SALES_IMPORT_ASYNC', cast=bool, default=True)
+# Reseller sales summaries start from the latest daily snapshot (manage.py
+# snapshot_sales_analytics, run just after midnight) instead of counting every row
+SALES_SUMMARY_FROM_SNAPSHOTS = config('SALES_SUMMARY_FROM_SNAPSHOTS', cast=bool, default=False)
+
+# Reseller leaderboards (manage.py refresh_leaderboards, e.g. every few minutes):
+# month and quarter boards are kept for this many months back. Deleted commissions
+# are queued in the 'shared' cache for the next run; if that cache is lost, run
+# refresh_leaderboards --full (a nightly --full run is a cheap safety net)
+LEADERBOARD_HISTORY_MONTHS = config('LEADERBOARD_HISTORY_MONTHS', cast=int, default=12)
+
+# Reseller pages (App.reseller.page_cache): summaries are cached in the 'shared'
+# cache under a per-reseller version that saves to commissions, invoices, payouts
+# and the reseller bump; the timeout only bounds how long unused entries linger
+RESELLER_PAGE_CACHE_SECONDS = config('RESELLER_PAGE_CACHE_SECONDS', cast=int, default=3600)
+
+# Admin dashboard table statistics (engine metadata, refreshed in the background)
+TABLE_STATS_REFRESH_SECONDS = config('TABLE_STATS_REFRESH_SECONDS', cast=int, default=300)
+
+# Revenue forecasts: days of daily revenue history each model is fitted on. Fits
+# are cached and extended as days close (manage.py refresh_revenue_forecasts
+# brings the platform and every reseller up to date in one run)
+REVENUE_FORECAST_HISTORY_DAYS = config('REVENUE_FORECAST_HISTORY_DAYS', cast=int, default=365)
+
+# Admin dashboard bootstrap endpoint: sections evaluated in parallel, each worker
+# holds its own DB connection while it runs (1 = evaluate sequentially)
+DASHBOARD_BOOTSTRAP_WORKERS = config('DASHBOARD_BOOTSTRAP_WORKERS', cast=int, default=4)
+DASHBOARD_BOOTSTRAP_TIMEOUT = config('DASHBOARD_BOOTSTRAP_TIMEOUT', cast=float, default=10)
+
+# Admin audit log: entries are buffered per process and bulk-inserted at the end
+# of the request or when a threshold is hit (size 1 = write immediately).
+# AUDIT_SYNC_ACTIONS are always written before the call returns.
+AUDIT_BUFFER_SIZE = config('AUDIT_BUFFER_SIZE', cast=int, default=50)
+AUDIT_BUFFER_MAX_AGE = config('AUDIT_BUFFER_MAX_AGE', cast=float, default=5)
+AUDIT_SYNC_ACTIONS = ['payout', 'suspend']
+# archive_audit_logs moves rows older than this into gzip files under AUDIT_ARCHIVE_DIR
+AUDIT_RETENTION_DAYS = config('AUDIT_RETENTION_DAYS', cast=int, default=180)
+AUDIT_ARCHIVE_DIR = config('AUDIT_ARCHIVE_DIR', default=str(BASE_DIR / 'audit_archive'))
 
 
 # Password validation
@@ -199,6 +329,10 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Uploaded and generated files (e.g. cached invoice PDFs)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+
 # Static files storage configuration
 # For Django 5.1+ we need to use the STORAGES setting
 if DEBUG:
@@ -212,24 +346,28 @@ if DEBUG:
         },
     }
 else:
-    # Use WhiteNoise in production
-    # Using basic StaticFilesStorage temporarily to debug manifest issues
+    # Production: hash-named, gzip/brotli precompressed files plus a manifest,
+    # produced by `manage.py build_static` and served by WhiteNoise
     STORAGES = {
         "default": {
             "BACKEND": "django.core.files.storage.FileSystemStorage",
         },
         "staticfiles": {
-            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+            "BACKEND": "App.storage.ImmutableStaticFilesStorage",
         },
     }
     
 # WhiteNoise settings
-WHITENOISE_USE_FINDERS = True
-WHITENOISE_AUTOREFRESH = True
-WHITENOISE_SKIP_COMPRESS_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'webp', 'zip', 'gz', 'tgz', 'bz2', 'tbz', 'xz', 'br']
-WHITENOISE_MAX_AGE = 31536000
-
-# Additional setting for troubleshooting
+# Outside development WhiteNoise indexes STATIC_ROOT once at startup; finders and
+# autorefresh scan the filesystem on every request
+WHITENOISE_USE_FINDERS = DEBUG
+WHITENOISE_AUTOREFRESH = DEBUG
+WHITENOISE_SKIP_COMPRESS_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'webp', 'woff', 'woff2', 'zip', 'gz', 'tgz', 'bz2', 'tbz', 'xz', 'br']
+# Hashed names are always served "immutable" for 10 years; this max-age only applies
+# to unhashed paths (URLs hardcoded in templates), which change between deploys
+WHITENOISE_MAX_AGE = config('WHITENOISE_MAX_AGE', cast=int, default=3600)
+
+# Names missing from the manifest fall back to the unhashed file instead of raising
 WHITENOISE_MANIFEST_STRICT = False
 
 # Default primary key field type
@@ -15,9 +15,9 @@ pip install -r requirements.txt
 echo "Running database migrations..."
 python manage.py migrate --noinput
 
-# Collect static files
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
+# Build static files (hashed names, gzip/brotli copies, manifest)
+echo "Building static files..."
+python manage.py build_static
 
 # Create superuser if needed (optional, only for first deployment)
 # Uncomment the following lines if you want to create a default superuser
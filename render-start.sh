@@ -54,11 +54,29 @@ TIMEOUT=${GUNICORN_TIMEOUT:-120}
 echo "[render-start] Running database migrations..."
 python manage.py migrate --noinput
 
-# Collect static files (optional; set COLLECTSTATIC=0 to skip)
+# Resolve Pesapal IPN ids for this host up front (checkouts only read the registry)
+echo "[render-start] Warming Pesapal IPN registry..."
+python manage.py warm_ipn_registry || echo "[render-start] IPN registry warm-up failed; orders will resolve on first InvalidIpnId"
+
+# Build static files: hashed names, gzip/brotli copies and the manifest (optional; set COLLECTSTATIC=0 to skip)
 COLLECT=${COLLECTSTATIC:-1}
 if [ "$COLLECT" != "0" ] && [ "$COLLECT" != "false" ] && [ "$COLLECT" != "False" ] && [ "$COLLECT" != "FALSE" ]; then
-  echo "[render-start] Collecting static files..."
-  python manage.py collectstatic --noinput --verbosity=1
+  echo "[render-start] Building static files..."
+  python manage.py build_static
+fi
+
+# SERVER_PROFILE=uvicorn serves config.asgi, where the Pesapal order/IPN/health
+# views run as coroutines and a slow provider no longer ties up a worker thread.
+PROFILE=${SERVER_PROFILE:-gunicorn}
+if [ "$PROFILE" = "uvicorn" ]; then
+  echo "[render-start] Starting Uvicorn (workers=${WORKERS})..."
+  exec uvicorn config.asgi:application \
+    --host 0.0.0.0 \
+    --port ${PORT:-8000} \
+    --workers ${WORKERS} \
+    --proxy-headers \
+    --forwarded-allow-ips "*" \
+    --timeout-keep-alive ${UVICORN_KEEPALIVE:-5}
 fi
 
 echo "[render-start] Starting Gunicorn (workers=${WORKERS}, threads=${THREADS}, timeout=${TIMEOUT})..."
@@ -67,4 +85,3 @@ exec gunicorn config.wsgi:application \
   --workers ${WORKERS} \
   --threads ${THREADS} \
   --timeout ${TIMEOUT}
-